@@ -0,0 +1,1025 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the map terrain grid and pathfinding code.
+
+Usage:
+    python MapBenchmarks.py astar --size 300 --queries 20
+    python MapBenchmarks.py grid-build --sizes 250 500 1000
+    python MapBenchmarks.py hierarchical --size 500 --queries 20
+    python MapBenchmarks.py jps --size 500 --queries 20
+    python MapBenchmarks.py settlement-sites --size 1000 --count 20
+    python MapBenchmarks.py travel-precision --size 1000 --queries 20
+    python MapBenchmarks.py regions --size 1000 --biomes 500 --workers 4
+    python MapBenchmarks.py location-index --count 100000 --queries 2000
+    python MapBenchmarks.py location-memory --count 200000
+    python MapBenchmarks.py location-io --count 100000 --workers 4
+    python MapBenchmarks.py settlements --size 1000 --entities 200 --workers 4
+    python MapBenchmarks.py borders --size 200 --entities 30
+    python MapBenchmarks.py territories --size 200 --entities 30 --ticks 20
+    python MapBenchmarks.py relations --size 400 --entities 200 --years 300
+"""
+import argparse
+import math
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from MapRegionManager import MapGrid, GridPosition, MapRegionManager
+from MapWorldState import MapWorldState
+from MapPathfinding import DIAGONAL_COST, HierarchicalPathfinder
+from MapSpatialIndex import CategoryKDTreeIndex, UniformGridIndex
+
+
+def synthetic_heights(width: int, height: int, seed: int = 42) -> np.ndarray:
+    """Continent-like (height, width) height values in 0..1 from a few random sine waves"""
+    rng = np.random.default_rng(seed)
+    ys, xs = np.mgrid[0:height, 0:width]
+    values = np.zeros((height, width))
+    total_amplitude = 0.0
+    for _ in range(6):
+        fx, fy = rng.uniform(0.5, 4.0, size=2)
+        phase = rng.uniform(0, 2 * math.pi)
+        amplitude = rng.uniform(0.3, 1.0)
+        values += amplitude * np.sin(fx * xs / width * 2 * math.pi + phase) * \
+            np.cos(fy * ys / height * 2 * math.pi + phase)
+        total_amplitude += amplitude
+    return 0.45 + 0.35 * values / total_amplitude
+
+
+BIOME_TYPES = ["temperate forest", "grassland", "desert", "taiga", "tundra", "wetland", "tropical rainforest"]
+
+
+def build_synthetic_region_manager(width: int, height: int, river_count: int = 50, biome_count: int = 0,
+                                   seed: int = 42) -> MapRegionManager:
+    """Build a region manager with synthetic heightmap, river and biome data loaded (grid not generated)"""
+    rng = random.Random(seed)
+    heights = synthetic_heights(width, height, seed)
+
+    # Biomes as horizontal bands of rows
+    biomes = []
+    for biome_index in range(biome_count):
+        first_row = biome_index * height // biome_count
+        last_row = (biome_index + 1) * height // biome_count
+        biomes.append({"i": biome_index + 1, "name": f"Biome {biome_index + 1}",
+                       "type": BIOME_TYPES[biome_index % len(BIOME_TYPES)],
+                       "cells": list(range(first_row * width, last_row * width))})
+
+    rivers = []
+    for river_index in range(river_count):
+        x, y = rng.randrange(width), rng.randrange(height)
+        cells = []
+        for _ in range(rng.randint(20, 20 + width // 2)):
+            x = min(max(x + rng.randint(-1, 1), 0), width - 1)
+            y = min(max(y + rng.randint(-1, 1), 0), height - 1)
+            cells.append(y * width + x)
+        rivers.append({"i": river_index + 1, "type": rng.choice(["brook", "stream", "river", "major river"]),
+                       "width": rng.uniform(0.5, 4.0), "cells": cells})
+
+    world_state = MapWorldState()
+    world_state.map_data = {
+        "info": {"width": width, "height": height},
+        "heights": heights.ravel().tolist(),
+        "rivers": rivers,
+        "biomes": biomes
+    }
+
+    region_manager = MapRegionManager()
+    region_manager.world_state = world_state
+    region_manager.load_biomes_from_map()
+    region_manager.load_heightmap_from_map()
+    region_manager.load_rivers_from_map()
+    return region_manager
+
+
+def build_synthetic_grid(width: int, height: int, seed: int = 42) -> MapGrid:
+    """Build a grid with continent-like terrain"""
+    region_manager = build_synthetic_region_manager(width, height, river_count=0, seed=seed)
+    region_manager.generate_map_grid()
+    return region_manager.map_grid
+
+
+def build_plains_grid(width: int, height: int, lake_count: int = 60, seed: int = 42) -> MapGrid:
+    """Build a grid of open plains at uniform cost, with a cheaper road strip and scattered lakes"""
+    rng = np.random.default_rng(seed)
+    grid = MapGrid(width, height)
+    plain_code = grid.get_terrain_code("plain")
+    road_code = grid.get_terrain_code("road")
+    lake_code = grid.get_terrain_code("water")
+
+    codes = np.full((height, width), plain_code, dtype=np.uint8)
+    costs = np.full((height, width), 2.0, dtype=np.float32)
+    # The road makes the cheapest step cost, and so the A* heuristic, half the plains cost
+    codes[:, :max(width // 8, 1)] = road_code
+    costs[:, :max(width // 8, 1)] = 1.0
+    passable = np.ones((height, width), dtype=bool)
+    for _ in range(lake_count):
+        x, y = rng.integers(0, width), rng.integers(0, height)
+        lake_width, lake_height = rng.integers(2, max(width // 25, 3)), rng.integers(2, max(height // 25, 3))
+        codes[y:y + lake_height, x:x + lake_width] = lake_code
+        passable[y:y + lake_height, x:x + lake_width] = False
+
+    grid.set_all_cells(codes, costs, passable)
+    return grid
+
+
+def random_passable_pairs(grid: MapGrid, count: int, seed: int = 7) -> List[Tuple[GridPosition, GridPosition]]:
+    """Pick random pairs of passable cells"""
+    rng = random.Random(seed)
+    passable = [(x, y) for y in range(grid.height) for x in range(grid.width) if grid.get_cell(x, y).is_passable]
+    pairs = []
+    for _ in range(count):
+        (sx, sy), (ex, ey) = rng.sample(passable, 2)
+        pairs.append((GridPosition(sx, sy), GridPosition(ex, ey)))
+    return pairs
+
+
+def path_cost(grid: MapGrid, path: List[GridPosition]) -> float:
+    """Total movement cost of a path under the grid's step rules"""
+    total = 0.0
+    for previous, current in zip(path, path[1:]):
+        step = DIAGONAL_COST if previous.x != current.x and previous.y != current.y else 1.0
+        total += grid.get_cell(current.x, current.y).movement_cost * step
+    return total
+
+
+class _LegacyNode:
+    def __init__(self, position: GridPosition):
+        self.position = position
+        self.g_cost = float('inf')
+        self.h_cost = 0.0
+        self.parent: Optional['_LegacyNode'] = None
+
+    @property
+    def f_cost(self) -> float:
+        return self.g_cost + self.h_cost
+
+
+def legacy_find_path(grid: MapGrid, start: GridPosition, end: GridPosition) -> List[GridPosition]:
+    """The original list-scanning A* with a Manhattan heuristic, kept as a baseline"""
+    open_list: List[_LegacyNode] = []
+    closed_set = set()
+    all_nodes = {}
+
+    start_node = _LegacyNode(start)
+    start_node.g_cost = 0
+    start_node.h_cost = abs(start.x - end.x) + abs(start.y - end.y)
+    open_list.append(start_node)
+    all_nodes[start] = start_node
+
+    while open_list:
+        current_node = open_list[0]
+        for i in range(1, len(open_list)):
+            if (open_list[i].f_cost < current_node.f_cost or
+                    (open_list[i].f_cost == current_node.f_cost and
+                     open_list[i].h_cost < current_node.h_cost)):
+                current_node = open_list[i]
+
+        open_list.remove(current_node)
+        closed_set.add(current_node.position)
+
+        if current_node.position == end:
+            path = []
+            while current_node:
+                path.append(current_node.position)
+                current_node = current_node.parent
+            path.reverse()
+            return path
+
+        for dy in range(-1, 2):
+            for dx in range(-1, 2):
+                if dx == 0 and dy == 0:
+                    continue
+                nx = current_node.position.x + dx
+                ny = current_node.position.y + dy
+                if not grid.is_in_bounds(nx, ny):
+                    continue
+                neighbor_pos = GridPosition(nx, ny)
+                if neighbor_pos in closed_set:
+                    continue
+                cell = grid.get_cell(nx, ny)
+                if not cell.is_passable:
+                    continue
+                movement_cost = cell.movement_cost
+                if dx != 0 and dy != 0:
+                    movement_cost *= 1.414
+                g_cost = current_node.g_cost + movement_cost
+
+                if neighbor_pos in all_nodes:
+                    neighbor_node = all_nodes[neighbor_pos]
+                    if g_cost >= neighbor_node.g_cost:
+                        continue
+                else:
+                    neighbor_node = _LegacyNode(neighbor_pos)
+                    all_nodes[neighbor_pos] = neighbor_node
+
+                neighbor_node.g_cost = g_cost
+                neighbor_node.h_cost = abs(nx - end.x) + abs(ny - end.y)
+                neighbor_node.parent = current_node
+                if neighbor_node not in open_list:
+                    open_list.append(neighbor_node)
+
+    return []
+
+
+def legacy_build_location_grid(points: Dict[str, Tuple[float, float]], cell_size: float) -> Dict[str, List[str]]:
+    """The original string-keyed location grid from MapLocationManager.regenerate_spatial_index"""
+    location_grid = {}
+    for location_id, (x, y) in points.items():
+        grid_key = f"{int(x / cell_size)}_{int(y / cell_size)}"
+        if grid_key not in location_grid:
+            location_grid[grid_key] = []
+        location_grid[grid_key].append(location_id)
+    return location_grid
+
+
+def legacy_locations_within_distance(location_grid: Dict[str, List[str]], points: Dict[str, Tuple[float, float]],
+                                     cell_size: float, center_x: float, center_y: float,
+                                     distance: float) -> List[str]:
+    """The original MapLocationManager.get_locations_within_distance"""
+    result = []
+    grid_radius = int(distance / cell_size) + 1
+    center_grid_x = int(center_x / cell_size)
+    center_grid_y = int(center_y / cell_size)
+    for dx in range(-grid_radius, grid_radius + 1):
+        for dy in range(-grid_radius, grid_radius + 1):
+            grid_key = f"{center_grid_x + dx}_{center_grid_y + dy}"
+            if grid_key in location_grid:
+                for location_id in location_grid[grid_key]:
+                    x, y = points[location_id]
+                    if math.sqrt((x - center_x) ** 2 + (y - center_y) ** 2) <= distance:
+                        result.append(location_id)
+    return result
+
+
+def legacy_nearest_location(location_grid: Dict[str, List[str]], points: Dict[str, Tuple[float, float]],
+                            cell_size: float, x: float, y: float) -> Optional[str]:
+    """The original MapLocationManager.get_nearest_location (stops at the first ring with any match)"""
+    nearest_id = None
+    nearest_distance = float('inf')
+    for radius in range(1, 10):
+        found = False
+        for dx in range(-radius, radius + 1):
+            for dy in range(-radius, radius + 1):
+                if abs(dx) != radius and abs(dy) != radius:
+                    continue
+                grid_key = f"{int(x / cell_size) + dx}_{int(y / cell_size) + dy}"
+                for location_id in location_grid.get(grid_key, []):
+                    location_x, location_y = points[location_id]
+                    distance = math.sqrt((location_x - x) ** 2 + (location_y - y) ** 2)
+                    if distance < nearest_distance:
+                        nearest_distance = distance
+                        nearest_id = location_id
+                        found = True
+        if found:
+            break
+    return nearest_id
+
+
+def benchmark_astar(size: int, queries: int, skip_legacy: bool = False):
+    """Compare the heap-based A* engine against the original implementation"""
+    print(f"Building {size}x{size} synthetic grid...")
+    grid = build_synthetic_grid(size, size)
+    pairs = random_passable_pairs(grid, queries)
+    grid.get_step_costs()  # Build the flat cost cache outside the timed region
+
+    start_time = time.perf_counter()
+    heap_costs = []
+    for start, end in pairs:
+        heap_costs.append(path_cost(grid, grid.find_path(start, end)))
+    heap_time = time.perf_counter() - start_time
+    print(f"Heap A*:   {heap_time:.3f}s total, {heap_time / queries * 1000:.1f} ms/query")
+
+    if skip_legacy:
+        return
+
+    start_time = time.perf_counter()
+    legacy_costs = []
+    for start, end in pairs:
+        legacy_costs.append(path_cost(grid, legacy_find_path(grid, start, end)))
+    legacy_time = time.perf_counter() - start_time
+    print(f"Legacy A*: {legacy_time:.3f}s total, {legacy_time / queries * 1000:.1f} ms/query")
+    print(f"Speedup:   {legacy_time / heap_time:.1f}x")
+
+    # The legacy heuristic overestimates diagonal moves, so its paths can be more expensive
+    worse = sum(1 for h, l in zip(heap_costs, legacy_costs) if h > l + 1e-6)
+    print(f"Heap A* path cost: {sum(heap_costs):.1f}, legacy: {sum(legacy_costs):.1f}, "
+          f"queries where heap A* was worse: {worse}")
+
+
+def benchmark_jump_point_search(size: int, queries: int):
+    """Compare jump point search against A*: node expansions and wall time on two kinds of terrain"""
+    for label, grid in (("Synthetic continent", build_synthetic_grid(size, size)),
+                        ("Uniform plains", build_plains_grid(size, size))):
+        pairs = random_passable_pairs(grid, queries)
+        grid.get_step_costs()
+
+        start_time = time.perf_counter()
+        grid.jump_point_pathfinder.build()
+        print(f"{label} {size}x{size}: jump tables built in {time.perf_counter() - start_time:.3f}s")
+
+        results = {}
+        for mode, engine in (("astar", grid.pathfinder), ("jps", grid.jump_point_pathfinder)):
+            elapsed = 0.0
+            expansions = 0
+            total_cost = 0.0
+            for start, end in pairs:
+                start_time = time.perf_counter()
+                path = grid.find_path(start, end, mode=mode)
+                elapsed += time.perf_counter() - start_time
+                expansions += engine.nodes_expanded
+                total_cost += path_cost(grid, path)
+            results[mode] = (elapsed, expansions, total_cost)
+            print(f"  {mode:5s}: {elapsed / queries * 1000:8.1f} ms/query, {expansions / queries:9.0f} expansions/query, "
+                  f"path cost {total_cost:.1f}")
+
+        astar_time, astar_expansions, _ = results["astar"]
+        jps_time, jps_expansions, _ = results["jps"]
+        print(f"  Speedup: {astar_time / jps_time:.1f}x, {astar_expansions / max(jps_expansions, 1):.1f}x fewer expansions")
+
+
+def benchmark_grid_build(sizes: List[int], river_count: int):
+    """Time generate_map_grid at several grid sizes to show how it scales"""
+    for size in sizes:
+        region_manager = build_synthetic_region_manager(size, size, river_count)
+
+        start_time = time.perf_counter()
+        region_manager.generate_map_grid()
+        elapsed = time.perf_counter() - start_time
+
+        cell_count = size * size
+        print(f"{size}x{size} ({cell_count} cells, {river_count} rivers): {elapsed:.3f}s, "
+              f"{elapsed / cell_count * 1e9:.0f} ns/cell")
+
+
+def benchmark_hierarchical(size: int, queries: int, cluster_size: int):
+    """Compare hierarchical pathfinding against full A*: speedup versus path-quality loss"""
+    print(f"Building {size}x{size} synthetic grid...")
+    grid = build_synthetic_grid(size, size)
+    grid.get_step_costs()
+
+    pathfinder = HierarchicalPathfinder(grid, cluster_size)
+    grid.hierarchical_pathfinder = pathfinder
+    pathfinder.build()
+    print(f"Cluster graph build: {pathfinder.build_time:.3f}s "
+          f"({len(pathfinder.intra_edges)} transition nodes, {cluster_size}x{cluster_size} clusters)")
+
+    # Only long queries use the cluster graph
+    pairs = [(start, end) for start, end in random_passable_pairs(grid, queries * 4)
+             if max(abs(start.x - end.x), abs(start.y - end.y)) >= pathfinder.min_query_distance][:queries]
+
+    astar_time = 0.0
+    hierarchical_time = 0.0
+    cost_ratios = []
+    for start, end in pairs:
+        start_time = time.perf_counter()
+        astar_path = grid.find_path(start, end)
+        astar_time += time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        hierarchical_path = grid.find_path(start, end, mode="hierarchical")
+        hierarchical_time += time.perf_counter() - start_time
+
+        if astar_path and hierarchical_path:
+            cost_ratios.append(path_cost(grid, hierarchical_path) / max(path_cost(grid, astar_path), 1e-9))
+
+    print(f"A*:           {astar_time:.3f}s total, {astar_time / len(pairs) * 1000:.1f} ms/query")
+    print(f"Hierarchical: {hierarchical_time:.3f}s total, {hierarchical_time / len(pairs) * 1000:.1f} ms/query")
+    print(f"Speedup:      {astar_time / hierarchical_time:.1f}x over {len(pairs)} long queries")
+    if cost_ratios:
+        mean_loss = (sum(cost_ratios) / len(cost_ratios) - 1.0) * 100
+        print(f"Path cost vs. optimal: +{mean_loss:.1f}% mean, +{(max(cost_ratios) - 1.0) * 100:.1f}% worst")
+
+
+def benchmark_settlement_sites(size: int, count: int):
+    """Time settlement-site scoring at full resolution and at the old 1/100 sampling step"""
+    print(f"Building {size}x{size} synthetic map...")
+    region_manager = build_synthetic_region_manager(size, size, river_count=200, biome_count=8)
+    region_manager.generate_map_grid()
+
+    start_time = time.perf_counter()
+    region_manager.get_biome_settlement_scores()
+    print(f"Region analyses: {time.perf_counter() - start_time:.3f}s")
+
+    start_time = time.perf_counter()
+    region_manager.get_water_distance_raster()
+    print(f"Water distance transform: {time.perf_counter() - start_time:.3f}s")
+
+    for step_size in (max(1, size // 100), 1):
+        start_time = time.perf_counter()
+        locations = region_manager.find_settlement_locations(count, step_size=step_size)
+        elapsed = time.perf_counter() - start_time
+        print(f"Step {step_size}: {elapsed:.3f}s for {len(locations)} locations "
+              f"({(size // step_size) ** 2} candidate sites)")
+
+
+def benchmark_travel_precision(size: int, queries: int):
+    """Compare calculate_travel_time at each precision: query time and error against exact"""
+    print(f"Building {size}x{size} synthetic map...")
+    region_manager = build_synthetic_region_manager(size, size, river_count=100)
+    region_manager.generate_map_grid()
+    pyramid = region_manager.map_grid.pyramid
+    print(f"Pyramid levels: {', '.join(f'{level.width}x{level.height}' for level in pyramid.levels)}")
+
+    pairs = random_passable_pairs(region_manager.map_grid, queries)
+    exact_hours = []
+    for precision in ("exact", "coarse", "rough"):
+        # Rough queries reuse path trees per start cell, so time a warm second pass as well
+        for repeat in range(2 if precision == "rough" else 1):
+            hours = []
+            start_time = time.perf_counter()
+            for start, end in pairs:
+                estimate = region_manager.calculate_travel_time(start.x, start.y, end.x, end.y, precision=precision)
+                hours.append(estimate.travel_time_hours if estimate.is_valid else float('inf'))
+            elapsed = time.perf_counter() - start_time
+
+            label = f"{precision} (warm)" if repeat else precision
+            if precision == "exact":
+                exact_hours = hours
+                print(f"{label:14s} {elapsed / queries * 1e6:10.0f} us/query")
+                # Clear cached routes so later passes aren't comparing against cache hits
+                region_manager.map_grid.path_cache.clear()
+                continue
+
+            errors = [abs(h - e) / e for h, e in zip(hours, exact_hours) if e not in (0, float('inf'))]
+            mean_error = sum(errors) / len(errors) * 100 if errors else 0.0
+            print(f"{label:14s} {elapsed / queries * 1e6:10.0f} us/query, {mean_error:.1f}% mean error")
+
+
+def benchmark_region_analysis(size: int, biome_count: int, workers: Optional[int]):
+    """Time per-region analyze_region calls against the batched analyze_all_regions and its disk cache"""
+    print(f"Building {size}x{size} synthetic map with {biome_count} biomes...")
+    region_manager = build_synthetic_region_manager(size, size, river_count=200, biome_count=biome_count)
+    region_manager.build_cell_indexes()
+
+    start_time = time.perf_counter()
+    for biome in region_manager.biomes.values():
+        region_manager.analyze_region(biome)
+    print(f"analyze_region per biome: {time.perf_counter() - start_time:.3f}s")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        map_file_path = os.path.join(cache_dir, "benchmark.map")
+        for label, worker_count, path in (("in process", 1, ""), (f"{workers or os.cpu_count()} workers", workers, ""),
+                                           ("save", 1, map_file_path), ("cached", 1, map_file_path)):
+            start_time = time.perf_counter()
+            region_manager.analyze_all_regions(workers=worker_count, map_file_path=path)
+            print(f"analyze_all_regions ({label}): {time.perf_counter() - start_time:.3f}s")
+
+
+def benchmark_location_index(count: int, queries: int, map_size: float, radius: float):
+    """Compare the integer-keyed uniform grid index against the original string-keyed location grid"""
+    rng = random.Random(42)
+    # Clustered like real settlements: most locations near a few hundred centers
+    centers = [(rng.uniform(0, map_size), rng.uniform(0, map_size)) for _ in range(max(count // 500, 1))]
+    points = {}
+    for index in range(count):
+        if rng.random() < 0.8:
+            center_x, center_y = rng.choice(centers)
+            x = min(max(rng.gauss(center_x, map_size / 50), 0.0), map_size)
+            y = min(max(rng.gauss(center_y, map_size / 50), 0.0), map_size)
+        else:
+            x, y = rng.uniform(0, map_size), rng.uniform(0, map_size)
+        points[f"location_{index}"] = (x, y)
+    query_points = [(rng.uniform(0, map_size), rng.uniform(0, map_size)) for _ in range(queries)]
+    legacy_cell_size = 10.0
+
+    print(f"{count} locations on a {map_size:.0f}x{map_size:.0f} map, {queries} queries, radius {radius}")
+
+    start_time = time.perf_counter()
+    location_grid = legacy_build_location_grid(points, legacy_cell_size)
+    legacy_build = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    index = UniformGridIndex()
+    index.build((location_id, x, y) for location_id, (x, y) in points.items())
+    index_build = time.perf_counter() - start_time
+    print(f"Build:   legacy {legacy_build * 1000:8.1f} ms, uniform grid {index_build * 1000:8.1f} ms "
+          f"(cell size {index.cell_size:.2f}, {len(index.buckets)} buckets)")
+
+    start_time = time.perf_counter()
+    legacy_results = [legacy_locations_within_distance(location_grid, points, legacy_cell_size, x, y, radius)
+                      for x, y in query_points]
+    legacy_range = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    index_results = [index.query_radius(x, y, radius) for x, y in query_points]
+    index_range = time.perf_counter() - start_time
+
+    mismatches = sum(1 for legacy, new in zip(legacy_results, index_results) if sorted(legacy) != sorted(new))
+    print(f"Range:   legacy {legacy_range / queries * 1e6:8.1f} us, uniform grid {index_range / queries * 1e6:8.1f} us "
+          f"per query ({legacy_range / index_range:.1f}x, {mismatches} mismatched results)")
+
+    start_time = time.perf_counter()
+    for x, y in query_points:
+        legacy_nearest_location(location_grid, points, legacy_cell_size, x, y)
+    legacy_nearest = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for x, y in query_points:
+        index.nearest(x, y)
+    index_nearest = time.perf_counter() - start_time
+    print(f"Nearest: legacy {legacy_nearest / queries * 1e6:8.1f} us, uniform grid {index_nearest / queries * 1e6:8.1f} us "
+          f"per query ({legacy_nearest / index_nearest:.1f}x)")
+
+    # k-d trees, with a quarter of the locations in a second category
+    start_time = time.perf_counter()
+    tree_index = CategoryKDTreeIndex()
+    tree_index.build((location_id, "rare" if index % 4 == 0 else "common", x, y)
+                     for index, (location_id, (x, y)) in enumerate(points.items()))
+    print(f"k-d trees: built in {(time.perf_counter() - start_time) * 1000:.1f} ms")
+    for k, categories in ((1, None), (10, None), (10, ["rare"])):
+        start_time = time.perf_counter()
+        tree_index.k_nearest_batch(query_points, k, categories)
+        elapsed = time.perf_counter() - start_time
+        print(f"  k={k:<3d} {'all' if categories is None else categories[0]:6s} {elapsed / queries * 1e6:8.1f} us per query")
+
+    # Incremental upkeep, as during settlement generation: a nearest query after every insert
+    start_time = time.perf_counter()
+    tree_index = CategoryKDTreeIndex()
+    for index, (location_id, (x, y)) in enumerate(points.items()):
+        tree_index.insert(location_id, "rare" if index % 4 == 0 else "common", x, y)
+        tree_index.k_nearest(x, y, 1, ["rare"])
+    elapsed = time.perf_counter() - start_time
+    print(f"  {count} inserts with a nearest query after each: {elapsed:.2f}s ({elapsed / count * 1e6:.1f} us per insert)")
+
+
+def legacy_location_record(data: Dict) -> SimpleNamespace:
+    """A plain object with one attribute per field and lists of its own, laid out like the original location classes"""
+    return SimpleNamespace(**{key: list(value) if isinstance(value, list) else value for key, value in data.items()})
+
+
+def benchmark_location_memory(count: int):
+    """Compare memory per settlement in the columnar location store against plain per-instance objects"""
+    # Imported here since the location manager pulls in the world, region and political managers
+    from MapLocationManager import LocationType, Settlement
+
+    rng = random.Random(42)
+    state_ids = [f"state_{index}" for index in range(200)]
+    types = [LocationType.CITY, LocationType.TOWN, LocationType.VILLAGE, LocationType.HAMLET]
+    print(f"{count} settlements")
+
+    def create_settlement(index: int) -> Settlement:
+        settlement = Settlement(f"settlement_{index}", f"Settlement {index}",
+                                (rng.uniform(0, 1000), rng.uniform(0, 1000)), rng.choice(types),
+                                rng.randint(50, 50000))
+        settlement.state_id = rng.choice(state_ids)
+        settlement.has_walls = rng.random() < 0.5
+        settlement.wealth = rng.random()
+        return settlement
+
+    template = create_settlement(0).to_dict()
+    del template["size_category"]
+
+    results = {}
+    for label in ("plain objects", "columnar store"):
+        tracemalloc.start()
+        start_time = time.perf_counter()
+        if label == "plain objects":
+            records = [legacy_location_record(dict(template, id=f"settlement_{index}", name=f"Settlement {index}",
+                                                   x=rng.uniform(0, 1000), y=rng.uniform(0, 1000)))
+                       for index in range(count)]
+        else:
+            records = [create_settlement(index) for index in range(count)]
+        elapsed = time.perf_counter() - start_time
+        used, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[label] = used
+        print(f"{label:15s} {used / count:8.0f} bytes per settlement, created in {elapsed:.2f}s")
+        del records
+
+    print(f"Columnar store uses {results['plain objects'] / results['columnar store']:.1f}x less memory")
+
+
+def benchmark_location_io(count: int, workers: Optional[int]):
+    """Time saving and loading locations as JSON, JSON Lines and the binary column format"""
+    # Imported here since the location manager pulls in the world, region and political managers
+    from MapLocationManager import LocationType, MapLocationManager
+
+    rng = random.Random(42)
+    manager = MapLocationManager()
+    types = [LocationType.CITY, LocationType.TOWN, LocationType.VILLAGE]
+    for index in range(count // 2):
+        manager.create_settlement(f"Settlement {index}", (rng.uniform(0, 1000), rng.uniform(0, 1000)),
+                                  rng.choice(types), rng.randint(50, 50000), f"state_{rng.randrange(200)}")
+    settlement_ids = list(manager.settlements)
+    for index in range(count - len(settlement_ids)):
+        settlement = manager.settlements[rng.choice(settlement_ids)]
+        manager.create_point_of_interest(f"Place {index}", (settlement.x, settlement.y),
+                                         parent_location_id=settlement.id)
+    print(f"{len(manager.locations)} locations")
+
+    bounds = (0.0, 0.0, 316.0, 316.0)
+    worker_label = f"full, {workers or os.cpu_count()} workers"
+    formats = (
+        ("JSON", ".json", manager.save_to_json, [("full", lambda loader, path: loader.load_from_json(path))]),
+        ("JSON Lines", ".jsonl", manager.save_to_jsonl, [
+            ("full", lambda loader, path: loader.load_from_jsonl(path, workers=1)),
+            (worker_label, lambda loader, path: loader.load_from_jsonl(path, workers=workers)),
+            ("10% area", lambda loader, path: loader.load_from_jsonl(path, bounds, workers=1))]),
+        ("binary", ".mloc", manager.save_to_binary, [
+            ("full", lambda loader, path: loader.load_from_binary(path)),
+            ("10% area", lambda loader, path: loader.load_from_binary(path, bounds))]),
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        for label, extension, save, loads in formats:
+            path = os.path.join(directory, "locations" + extension)
+            start_time = time.perf_counter()
+            save(path)
+            print(f"{label:10s} {os.path.getsize(path) / 1e6:7.1f} MB, save {time.perf_counter() - start_time:6.2f}s")
+
+            for load_label, load in loads:
+                loader = MapLocationManager()
+                start_time = time.perf_counter()
+                load(loader, path)
+                print(f"{'':10s} load ({load_label}): {time.perf_counter() - start_time:6.2f}s, "
+                      f"{len(loader.locations)} locations")
+
+
+def benchmark_settlement_generation(size: int, entity_count: int, workers: Optional[int]):
+    """Time serial settlement generation against the seeded parallel mode, and check it's reproducible"""
+    # Imported here since the location manager pulls in the world, region and political managers
+    from MapLocationManager import MapLocationManager
+
+    print(f"Building {size}x{size} synthetic map with {entity_count} political entities...")
+    region_manager = build_synthetic_region_manager(size, size)
+    region_manager.build_cell_indexes()
+
+    # Entities own horizontal bands of rows, centered in their band
+    entities = {}
+    for index in range(entity_count):
+        first_cell = index * size * size // entity_count
+        last_cell = (index + 1) * size * size // entity_count
+        entities[index + 1] = SimpleNamespace(id=index + 1, name=f"Realm {index + 1}",
+                                              center_cell_id=(first_cell + last_cell) // 2,
+                                              territory_cells=set(range(first_cell, last_cell)))
+    political_manager = SimpleNamespace(entities=entities)
+
+    def generate(label: str, run) -> list:
+        manager = MapLocationManager()
+        manager.region_manager = region_manager
+        manager.political_manager = political_manager
+        start_time = time.perf_counter()
+        run(manager)
+        print(f"{label}: {time.perf_counter() - start_time:.3f}s, {len(manager.settlements)} settlements")
+        return [(settlement.name, settlement.x, settlement.y, settlement.population)
+                for settlement in manager.settlements.values()]
+
+    generate("generate_settlements_from_political_entities",
+             lambda manager: manager.generate_settlements_from_political_entities())
+    serial = generate("generate_settlements_parallel (in process)",
+                      lambda manager: manager.generate_settlements_parallel(1, 1))
+    parallel = generate(f"generate_settlements_parallel ({workers or os.cpu_count()} workers)",
+                        lambda manager: manager.generate_settlements_parallel(1, workers))
+    print(f"Same settlements for any worker count: {serial == parallel}")
+
+
+def build_synthetic_political_manager(region_manager: MapRegionManager, entity_count: int, seed: int = 42):
+    """Build a political manager whose entities split the map into Voronoi territories around random centers"""
+    # Imported here since the political manager is only needed by the political benchmarks
+    from MapPoliticalManager import MapPoliticalManager
+
+    rng = np.random.default_rng(seed)
+    width = region_manager.cell_index_width
+    cell_count = region_manager.cell_heights.size
+    centers = rng.choice(cell_count, entity_count, replace=False)
+    xs, ys = np.arange(cell_count) % width, np.arange(cell_count) // width
+
+    # Nearest center per cell, one center at a time to keep memory flat
+    nearest = np.zeros(cell_count, dtype=np.int64)
+    best = np.full(cell_count, np.inf)
+    for index, center in enumerate(centers.tolist()):
+        distance = (xs - center % width) ** 2 + (ys - center // width) ** 2
+        closer = distance < best
+        nearest[closer] = index
+        best[closer] = distance[closer]
+
+    political_manager = MapPoliticalManager(SimpleNamespace(current_date=0), region_manager)
+    order = np.argsort(nearest, kind="stable")
+    starts = np.searchsorted(nearest[order], np.arange(entity_count + 1))
+    for index, center in enumerate(centers.tolist()):
+        entity = political_manager.create_entity(f"Realm {index + 1}", center_cell_id=center)
+        entity.add_territory(order[starts[index]:starts[index + 1]].tolist())
+    return political_manager
+
+
+def legacy_calculate_all_borders(political_manager) -> Dict[Tuple[int, int], set]:
+    """The original border calculation: every entity pair, walking the first entity's cells and their neighbors"""
+    region_manager = political_manager.region_manager
+    width, cell_count = region_manager.cell_index_width, region_manager.cell_heights.size
+
+    def neighboring_cells(cell: int) -> List[int]:
+        # Plain-Python neighbor lookup, so per-call array overhead doesn't skew the comparison
+        x, y = cell % width, cell // width
+        return [(y + dy) * width + x + dx for dx, dy in MapRegionManager.CELL_NEIGHBOR_OFFSETS
+                if 0 <= x + dx < width and 0 <= (y + dy) * width + x + dx < cell_count]
+
+    borders = {}
+    entities = list(political_manager.entities.values())
+    for index, entity1 in enumerate(entities):
+        for entity2 in entities[index + 1:]:
+            border_cells = set()
+            for cell in entity1.territory_cells:
+                for neighbor in neighboring_cells(cell):
+                    if neighbor in entity2.territory_cells:
+                        border_cells.add(cell)
+                        break
+            if border_cells:
+                borders[(entity1.id, entity2.id)] = border_cells
+    return borders
+
+
+def benchmark_political_borders(size: int, entity_count: int):
+    """Time the single-pass border calculation against the original pairwise one"""
+    print(f"Building {size}x{size} synthetic map with {entity_count} political entities...")
+    region_manager = build_synthetic_region_manager(size, size)
+    region_manager.build_cell_indexes()
+    political_manager = build_synthetic_political_manager(region_manager, entity_count)
+
+    start_time = time.perf_counter()
+    region_manager.get_cell_neighbor_pairs()
+    print(f"Cell adjacency list: {time.perf_counter() - start_time:.3f}s")
+
+    start_time = time.perf_counter()
+    political_manager._calculate_all_borders()
+    print(f"_calculate_all_borders: {time.perf_counter() - start_time:.3f}s, {len(political_manager.borders)} borders")
+
+    start_time = time.perf_counter()
+    legacy_borders = legacy_calculate_all_borders(political_manager)
+    print(f"Pairwise calculation: {time.perf_counter() - start_time:.3f}s")
+    same = legacy_borders == {(border.entity1_id, border.entity2_id): border.cells
+                              for border in political_manager.borders}
+    print(f"Same borders: {same}")
+
+    # Hand frontier cells of one entity to a neighbor, as a monthly tick might
+    rng = random.Random(42)
+    border = rng.choice(political_manager.borders)
+    loser = political_manager.entities[border.entity1_id]
+    winner = political_manager.entities[border.entity2_id]
+    moved_cells = set(rng.sample(sorted(border.cells), min(100, len(border.cells))))
+    rounds = 20
+    total_time = 0.0
+    for _ in range(rounds):
+        loser.remove_territory(moved_cells)
+        winner.add_territory(moved_cells)
+        start_time = time.perf_counter()
+        political_manager._update_borders()
+        total_time += time.perf_counter() - start_time
+        loser, winner = winner, loser
+    print(f"Incremental update after {len(moved_cells)} cells changed owner: {total_time / rounds:.4f}s")
+
+
+def legacy_territory_components(region_manager: MapRegionManager, cells: set) -> List[set]:
+    """Connected pieces of a territory by breadth-first search, as a per-tick query would without union-find"""
+    width, cell_count = region_manager.cell_index_width, region_manager.cell_heights.size
+    components, seen = [], set()
+    for start in cells:
+        if start in seen:
+            continue
+        seen.add(start)
+        component, queue = {start}, deque([start])
+        while queue:
+            cell = queue.popleft()
+            x, y = cell % width, cell // width
+            for dx, dy in MapRegionManager.CELL_NEIGHBOR_OFFSETS:
+                neighbor = (y + dy) * width + x + dx
+                if (0 <= x + dx < width and 0 <= neighbor < cell_count
+                        and neighbor in cells and neighbor not in seen):
+                    seen.add(neighbor)
+                    component.add(neighbor)
+                    queue.append(neighbor)
+        components.append(component)
+    return components
+
+
+def benchmark_territory_connectivity(size: int, entity_count: int, ticks: int):
+    """Time union-find territory queries over simulated ticks against a breadth-first search per tick"""
+    print(f"Building {size}x{size} synthetic map with {entity_count} political entities...")
+    region_manager = build_synthetic_region_manager(size, size)
+    region_manager.build_cell_indexes()
+    political_manager = build_synthetic_political_manager(region_manager, entity_count)
+    political_manager._calculate_all_borders()
+    entities = list(political_manager.entities.values())
+
+    start_time = time.perf_counter()
+    for entity in entities:
+        entity.get_connectivity(region_manager)
+    print(f"Union-find build, all entities: {time.perf_counter() - start_time:.3f}s")
+
+    # Each tick one entity takes frontier cells from a neighbor, and every entity is queried
+    rng = random.Random(42)
+    tick_moves = []
+    for _ in range(ticks):
+        border = rng.choice(political_manager.borders)
+        tick_moves.append((border.entity1_id, border.entity2_id,
+                           set(rng.sample(sorted(border.cells), min(20, len(border.cells))))))
+
+    def run_ticks(query) -> float:
+        total_time = 0.0
+        for loser_id, winner_id, cells in tick_moves:
+            political_manager.entities[loser_id].remove_territory(cells)
+            political_manager.entities[winner_id].add_territory(cells)
+            start_time = time.perf_counter()
+            for entity in entities:
+                query(entity)
+            total_time += time.perf_counter() - start_time
+        # Hand the cells back so both runs see the same territories
+        for loser_id, winner_id, cells in reversed(tick_moves):
+            political_manager.entities[winner_id].remove_territory(cells)
+            political_manager.entities[loser_id].add_territory(cells)
+        return total_time
+
+    def union_find_query(entity):
+        entity.calculate_disconnected_territories(region_manager)
+        entity.calculate_compactness(region_manager)
+
+    union_find_time = run_ticks(union_find_query)
+    print(f"Union-find exclaves and metrics: {union_find_time / ticks:.4f}s per tick")
+    legacy_time = run_ticks(lambda entity: legacy_territory_components(region_manager, entity.territory_cells))
+    print(f"Breadth-first search: {legacy_time / ticks:.4f}s per tick")
+
+    same = all(sorted(map(len, entity.get_connectivity(region_manager).get_components()))
+               == sorted(map(len, legacy_territory_components(region_manager, entity.territory_cells)))
+               for entity in entities)
+    print(f"Same components: {same}")
+
+
+def legacy_update_relationships(political_manager) -> None:
+    """The original relationship update: every entity pair in Python, rescanning the disputes per pair"""
+    # Imported here since the political manager is only needed by the political benchmarks
+    from MapPoliticalManager import RelationType
+
+    worse = {RelationType.PEACE: RelationType.NEUTRAL, RelationType.NEUTRAL: RelationType.TENSION,
+             RelationType.TENSION: RelationType.CONFLICT}
+    better = {RelationType.WAR: RelationType.CONFLICT, RelationType.CONFLICT: RelationType.TENSION,
+              RelationType.TENSION: RelationType.NEUTRAL, RelationType.NEUTRAL: RelationType.PEACE}
+    entity_ids = list(political_manager.entities.keys())
+    for index, entity1_id in enumerate(entity_ids):
+        for entity2_id in entity_ids[index + 1:]:
+            if random.random() >= 0.02:
+                continue
+            current = political_manager.entities[entity1_id].relations.get(entity2_id, RelationType.NEUTRAL)
+            has_dispute = any(not dispute.resolved and entity1_id in dispute.claimant_ids
+                              and entity2_id in dispute.claimant_ids for dispute in political_manager.disputes)
+            if has_dispute:
+                if current == RelationType.CONFLICT:
+                    new = RelationType.WAR if random.random() < 0.3 else current
+                else:
+                    new = worse.get(current, current)
+            else:
+                new = better.get(current, current) if random.random() < 0.7 else current
+            if new != current:
+                political_manager.set_relation(entity1_id, entity2_id, new)
+
+
+def benchmark_political_relations(size: int, entity_count: int, years: int):
+    """Time the vectorized monthly relationship update against the original per-pair loop"""
+    print(f"Building {size}x{size} synthetic map with {entity_count} political entities...")
+    region_manager = build_synthetic_region_manager(size, size)
+    region_manager.build_cell_indexes()
+    political_manager = build_synthetic_political_manager(region_manager, entity_count)
+    political_manager._calculate_all_borders()
+    random.seed(42)
+    political_manager._initialize_relations_between_entities()
+    political_manager.generate_border_conflicts(entity_count // 10)
+
+    # Through update(), as the game calls it; disputes and random events are included, so
+    # borders and entity stats change along the way
+    months = years * 12
+    start_time = time.perf_counter()
+    for _ in range(months):
+        political_manager.update()
+    elapsed = time.perf_counter() - start_time
+    print(f"update(), monthly calls: {years} years in {elapsed:.3f}s ({elapsed / months * 1000:.2f}ms per month)")
+
+    start_time = time.perf_counter()
+    for _ in range(years):
+        political_manager.update(months=12)
+    elapsed = time.perf_counter() - start_time
+    print(f"update(months=12), yearly calls: {years} years in {elapsed:.3f}s ({elapsed / months * 1000:.2f}ms per month)")
+
+    # The original update(): disputes, the per-pair loop, then random events
+    start_time = time.perf_counter()
+    for _ in range(120):
+        political_manager._process_disputes()
+        legacy_update_relationships(political_manager)
+        if random.random() < 0.1:
+            political_manager._generate_random_political_event()
+    elapsed = (time.perf_counter() - start_time) / 120
+    print(f"Original update(), per-pair loop: {elapsed * 1000:.2f}ms per month, "
+          f"{elapsed * months:.1f}s for {years} years (extrapolated)")
+
+    counts = {}
+    for relation in political_manager.relation_matrix.get_relations(next(iter(political_manager.entities))).values():
+        counts[relation.value] = counts.get(relation.value, 0) + 1
+    print(f"Relations of the first entity: {counts}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark map grid and pathfinding code')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    astar_parser = subparsers.add_parser('astar', help='Heap A* engine vs. the original find_path')
+    astar_parser.add_argument('--size', type=int, default=300, help='Grid width and height (default: 300)')
+    astar_parser.add_argument('--queries', type=int, default=20, help='Number of random path queries (default: 20)')
+    astar_parser.add_argument('--skip-legacy', action='store_true', help='Only time the heap A* engine')
+
+    grid_parser = subparsers.add_parser('grid-build', help='generate_map_grid build time by grid size')
+    grid_parser.add_argument('--sizes', type=int, nargs='+', default=[250, 500, 1000],
+                             help='Grid widths/heights to build (default: 250 500 1000)')
+    grid_parser.add_argument('--rivers', type=int, default=200, help='Number of synthetic rivers (default: 200)')
+
+    hpa_parser = subparsers.add_parser('hierarchical', help='Hierarchical pathfinding vs. full A*')
+    hpa_parser.add_argument('--size', type=int, default=500, help='Grid width and height (default: 500)')
+    hpa_parser.add_argument('--queries', type=int, default=20, help='Number of long path queries (default: 20)')
+    hpa_parser.add_argument('--cluster-size', type=int, default=32, help='Cluster width and height (default: 32)')
+
+    jps_parser = subparsers.add_parser('jps', help='Jump point search vs. A*')
+    jps_parser.add_argument('--size', type=int, default=500, help='Grid width and height (default: 500)')
+    jps_parser.add_argument('--queries', type=int, default=20, help='Number of random queries (default: 20)')
+
+    settlement_parser = subparsers.add_parser('settlement-sites', help='find_settlement_locations scoring time')
+    settlement_parser.add_argument('--size', type=int, default=1000, help='Map width and height (default: 1000)')
+    settlement_parser.add_argument('--count', type=int, default=20, help='Locations to pick (default: 20)')
+
+    precision_parser = subparsers.add_parser('travel-precision', help='calculate_travel_time at each precision')
+    precision_parser.add_argument('--size', type=int, default=1000, help='Map width and height (default: 1000)')
+    precision_parser.add_argument('--queries', type=int, default=20, help='Number of random queries (default: 20)')
+
+    regions_parser = subparsers.add_parser('regions', help='Batched region analysis and its disk cache')
+    regions_parser.add_argument('--size', type=int, default=1000, help='Map width and height (default: 1000)')
+    regions_parser.add_argument('--biomes', type=int, default=500, help='Number of biome regions (default: 500)')
+    regions_parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+
+    location_parser = subparsers.add_parser('location-index', help='Location spatial index vs. the string-keyed grid')
+    location_parser.add_argument('--count', type=int, default=100000, help='Number of locations (default: 100000)')
+    location_parser.add_argument('--queries', type=int, default=2000, help='Number of queries (default: 2000)')
+    location_parser.add_argument('--map-size', type=float, default=1000.0, help='Map width and height (default: 1000)')
+    location_parser.add_argument('--radius', type=float, default=25.0, help='Range query radius (default: 25)')
+
+    memory_parser = subparsers.add_parser('location-memory', help='Columnar location store vs. plain objects')
+    memory_parser.add_argument('--count', type=int, default=200000, help='Number of settlements (default: 200000)')
+
+    io_parser = subparsers.add_parser('location-io', help='Location save/load time by file format')
+    io_parser.add_argument('--count', type=int, default=100000, help='Number of locations (default: 100000)')
+    io_parser.add_argument('--workers', type=int, default=None, help='JSON Lines parser processes (default: CPU count)')
+
+    settlements_parser = subparsers.add_parser('settlements', help='Serial vs. parallel settlement generation')
+    settlements_parser.add_argument('--size', type=int, default=1000, help='Map width and height (default: 1000)')
+    settlements_parser.add_argument('--entities', type=int, default=200, help='Political entities (default: 200)')
+    settlements_parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+
+    borders_parser = subparsers.add_parser('borders', help='Single-pass vs. pairwise political border calculation')
+    borders_parser.add_argument('--size', type=int, default=200, help='Map width and height (default: 200)')
+    borders_parser.add_argument('--entities', type=int, default=30, help='Political entities (default: 30)')
+
+    territories_parser = subparsers.add_parser('territories', help='Union-find territory connectivity vs. BFS per tick')
+    territories_parser.add_argument('--size', type=int, default=200, help='Map width and height (default: 200)')
+    territories_parser.add_argument('--entities', type=int, default=30, help='Political entities (default: 30)')
+    territories_parser.add_argument('--ticks', type=int, default=20, help='Territory changes to simulate (default: 20)')
+
+    relations_parser = subparsers.add_parser('relations', help='Vectorized vs. per-pair relationship updates')
+    relations_parser.add_argument('--size', type=int, default=400, help='Map width and height (default: 400)')
+    relations_parser.add_argument('--entities', type=int, default=200, help='Political entities (default: 200)')
+    relations_parser.add_argument('--years', type=int, default=300, help='Years of monthly updates (default: 300)')
+
+    args = parser.parse_args()
+
+    if args.benchmark == 'astar':
+        benchmark_astar(args.size, args.queries, args.skip_legacy)
+    elif args.benchmark == 'grid-build':
+        benchmark_grid_build(args.sizes, args.rivers)
+    elif args.benchmark == 'hierarchical':
+        benchmark_hierarchical(args.size, args.queries, args.cluster_size)
+    elif args.benchmark == 'jps':
+        benchmark_jump_point_search(args.size, args.queries)
+    elif args.benchmark == 'settlement-sites':
+        benchmark_settlement_sites(args.size, args.count)
+    elif args.benchmark == 'travel-precision':
+        benchmark_travel_precision(args.size, args.queries)
+    elif args.benchmark == 'regions':
+        benchmark_region_analysis(args.size, args.biomes, args.workers)
+    elif args.benchmark == 'location-index':
+        benchmark_location_index(args.count, args.queries, args.map_size, args.radius)
+    elif args.benchmark == 'location-memory':
+        benchmark_location_memory(args.count)
+    elif args.benchmark == 'location-io':
+        benchmark_location_io(args.count, args.workers)
+    elif args.benchmark == 'settlements':
+        benchmark_settlement_generation(args.size, args.entities, args.workers)
+    elif args.benchmark == 'borders':
+        benchmark_political_borders(args.size, args.entities)
+    elif args.benchmark == 'territories':
+        benchmark_territory_connectivity(args.size, args.entities, args.ticks)
+    elif args.benchmark == 'relations':
+        benchmark_political_relations(args.size, args.entities, args.years)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,14 +9,19 @@ Based on the structure from Azgaar's Fantasy Map Generator
 import json
 import os
 import random
-import math
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
 from typing import Dict, List, Tuple, Set, Optional, Union, Any
 
+import numpy as np
+
 # Import from other MapAI components
 from MapWorldState import MapWorldState
 from MapRegionManager import MapRegionManager
 from MapPoliticalManager import MapPoliticalManager
+from MapSpatialIndex import CategoryKDTreeIndex, UniformGridIndex
+from MapLocationStore import (StoreColumn, StoredRecord, StringTableReader, StringTableWriter, atomic_open,
+                              read_column_file, write_column_file)
 
 
 class LocationType(Enum):
@@ -71,8 +76,40 @@ class PointOfInterestCategory(Enum):
     CRAFTING_HALL = "Crafting Hall"
 
 
-class Location:
-    """Base class for all locations in the game world"""
+class Location(StoredRecord):
+    """
+    Base class for all locations in the game world
+
+    Attributes live in columns of the class's LocationStore (see MapLocationStore), so
+    a location object only holds its row number.
+    """
+
+    __slots__ = ()
+
+    id = StoreColumn.string()
+    name = StoreColumn.text()
+    x = StoreColumn.number()
+    y = StoreColumn.number()
+    type = StoreColumn.enum(LocationType, LocationType.LANDMARK)
+    description = StoreColumn.text()
+    discovered = StoreColumn.flag()
+    notes = StoreColumn.list_value()
+
+    # Physical characteristics
+    elevation = StoreColumn.number()
+    temperature = StoreColumn.number()
+    humidity = StoreColumn.number()
+    biome_id = StoreColumn.string()
+
+    # References to other entities
+    region_id = StoreColumn.string()
+    state_id = StoreColumn.string()
+    culture_id = StoreColumn.string()
+
+    # Game-specific data
+    danger_level = StoreColumn.number(0.5)  # 0.0-1.0 scale
+    available_quests = StoreColumn.list_value()
+    available_resources = StoreColumn.list_value()
 
     def __init__(self,
                  location_id: str,
@@ -88,29 +125,11 @@ class Location:
             position: (x, y) coordinates
             location_type: Type of location
         """
+        super().__init__()
         self.id = location_id
         self.name = name
         self.x, self.y = position
         self.type = location_type
-        self.description = ""
-        self.discovered = False
-        self.notes = []
-
-        # Physical characteristics
-        self.elevation = 0.0
-        self.temperature = 0.0
-        self.humidity = 0.0
-        self.biome_id = ""
-
-        # References to other entities
-        self.region_id = ""
-        self.state_id = ""
-        self.culture_id = ""
-
-        # Game-specific data
-        self.danger_level = 0.5  # 0.0-1.0 scale
-        self.available_quests = []
-        self.available_resources = []
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert location to a dictionary for serialization"""
@@ -122,7 +141,7 @@ class Location:
             "type": self.type.value,
             "description": self.description,
             "discovered": self.discovered,
-            "notes": self.notes,
+            "notes": self.peek_list("notes"),
             "elevation": self.elevation,
             "temperature": self.temperature,
             "humidity": self.humidity,
@@ -131,8 +150,8 @@ class Location:
             "state_id": self.state_id,
             "culture_id": self.culture_id,
             "danger_level": self.danger_level,
-            "available_quests": self.available_quests,
-            "available_resources": self.available_resources
+            "available_quests": self.peek_list("available_quests"),
+            "available_resources": self.peek_list("available_resources")
         }
 
     @classmethod
@@ -165,6 +184,36 @@ class Location:
 class Settlement(Location):
     """Represents a settlement (city, town, village, etc.)"""
 
+    __slots__ = ()
+
+    population = StoreColumn.integer()
+    is_capital = StoreColumn.flag()
+    is_port = StoreColumn.flag()
+
+    # Settlement features
+    has_walls = StoreColumn.flag()
+    has_castle = StoreColumn.flag()
+    has_temple = StoreColumn.flag()
+    has_market = StoreColumn.flag()
+    has_shanty_town = StoreColumn.flag()
+
+    # Economic and social factors
+    wealth = StoreColumn.number(0.5)  # 0.0-1.0 scale
+    stability = StoreColumn.number(0.5)  # 0.0-1.0 scale
+    authority_type = StoreColumn.string()  # e.g., "mayor", "lord", "council", etc.
+    authority_name = StoreColumn.text()
+
+    # Points of interest in this settlement
+    points_of_interest = StoreColumn.list_value()
+
+    # Trading and resources
+    trading_goods = StoreColumn.list_value()
+    local_resources = StoreColumn.list_value()
+
+    # Settlement appearance
+    architecture_style = StoreColumn.string()
+    notable_features = StoreColumn.list_value()
+
     def __init__(self,
                  location_id: str,
                  name: str,
@@ -184,32 +233,6 @@ class Settlement(Location):
         super().__init__(location_id, name, position, location_type)
 
         self.population = population
-        self.is_capital = False
-        self.is_port = False
-
-        # Settlement features
-        self.has_walls = False
-        self.has_castle = False
-        self.has_temple = False
-        self.has_market = False
-        self.has_shanty_town = False
-
-        # Economic and social factors
-        self.wealth = 0.5  # 0.0-1.0 scale
-        self.stability = 0.5  # 0.0-1.0 scale
-        self.authority_type = ""  # e.g., "mayor", "lord", "council", etc.
-        self.authority_name = ""
-
-        # Points of interest in this settlement
-        self.points_of_interest: List[PointOfInterest] = []
-
-        # Trading and resources
-        self.trading_goods = []
-        self.local_resources = []
-
-        # Settlement appearance
-        self.architecture_style = ""
-        self.notable_features = []
 
     def get_size_category(self) -> SettlementSizeCategory:
         """Determine the settlement size category based on population"""
@@ -242,11 +265,11 @@ class Settlement(Location):
             "stability": self.stability,
             "authority_type": self.authority_type,
             "authority_name": self.authority_name,
-            "points_of_interest": [poi.to_dict() for poi in self.points_of_interest],
-            "trading_goods": self.trading_goods,
-            "local_resources": self.local_resources,
+            "points_of_interest": [poi.to_dict() for poi in self.peek_list("points_of_interest")],
+            "trading_goods": self.peek_list("trading_goods"),
+            "local_resources": self.peek_list("local_resources"),
             "architecture_style": self.architecture_style,
-            "notable_features": self.notable_features,
+            "notable_features": self.peek_list("notable_features"),
             "size_category": self.get_size_category().value
         })
         return data
@@ -304,6 +327,17 @@ class Settlement(Location):
 class PointOfInterest(Location):
     """Represents a specific point of interest within a location or the world"""
 
+    __slots__ = ()
+
+    category = StoreColumn.enum(PointOfInterestCategory, PointOfInterestCategory.SHOP)
+    parent_location_id = StoreColumn.string(None)
+    owner_name = StoreColumn.text()
+    npcs = StoreColumn.list_value()
+    quest_hooks = StoreColumn.list_value()
+    items_available = StoreColumn.list_value()
+    room_count = StoreColumn.integer()
+    quality = StoreColumn.number(0.5)  # 0.0-1.0 scale
+
     def __init__(self,
                  location_id: str,
                  name: str,
@@ -326,12 +360,6 @@ class PointOfInterest(Location):
 
         self.category = category
         self.parent_location_id = parent_location_id
-        self.owner_name = ""
-        self.npcs = []
-        self.quest_hooks = []
-        self.items_available = []
-        self.room_count = 0
-        self.quality = 0.5  # 0.0-1.0 scale
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert point of interest to a dictionary for serialization"""
@@ -340,9 +368,9 @@ class PointOfInterest(Location):
             "category": self.category.value,
             "parent_location_id": self.parent_location_id,
             "owner_name": self.owner_name,
-            "npcs": self.npcs,
-            "quest_hooks": self.quest_hooks,
-            "items_available": self.items_available,
+            "npcs": self.peek_list("npcs"),
+            "quest_hooks": self.peek_list("quest_hooks"),
+            "items_available": self.peek_list("items_available"),
             "room_count": self.room_count,
             "quality": self.quality
         })
@@ -389,6 +417,19 @@ class PointOfInterest(Location):
 class Dungeon(Location):
     """Represents a dungeon or other adventure location"""
 
+    __slots__ = ()
+
+    difficulty = StoreColumn.integer(1)
+    size = StoreColumn.string("Medium")
+    levels = StoreColumn.integer(1)
+    origin = StoreColumn.string()  # e.g., "natural", "constructed", "magical", etc.
+    current_inhabitants = StoreColumn.list_value()
+    previous_inhabitants = StoreColumn.list_value()
+    traps = StoreColumn.list_value()
+    treasure = StoreColumn.list_value()
+    notable_features = StoreColumn.list_value()
+    completed = StoreColumn.flag()
+
     def __init__(self,
                  location_id: str,
                  name: str,
@@ -411,14 +452,6 @@ class Dungeon(Location):
 
         self.difficulty = difficulty
         self.size = size
-        self.levels = 1
-        self.origin = ""  # e.g., "natural", "constructed", "magical", etc.
-        self.current_inhabitants = []
-        self.previous_inhabitants = []
-        self.traps = []
-        self.treasure = []
-        self.notable_features = []
-        self.completed = False
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert dungeon to a dictionary for serialization"""
@@ -428,11 +461,11 @@ class Dungeon(Location):
             "size": self.size,
             "levels": self.levels,
             "origin": self.origin,
-            "current_inhabitants": self.current_inhabitants,
-            "previous_inhabitants": self.previous_inhabitants,
-            "traps": self.traps,
-            "treasure": self.treasure,
-            "notable_features": self.notable_features,
+            "current_inhabitants": self.peek_list("current_inhabitants"),
+            "previous_inhabitants": self.peek_list("previous_inhabitants"),
+            "traps": self.peek_list("traps"),
+            "treasure": self.peek_list("treasure"),
+            "notable_features": self.peek_list("notable_features"),
             "completed": self.completed
         })
         return data
@@ -477,6 +510,183 @@ class Dungeon(Location):
         return dungeon
 
 
+def location_from_dict(data: Dict[str, Any]) -> Location:
+    """Create a Location, Settlement, PointOfInterest or Dungeon from a to_dict dictionary"""
+    if "population" in data:
+        return Settlement.from_dict(data)
+    if "category" in data:
+        return PointOfInterest.from_dict(data)
+    if "difficulty" in data:
+        return Dungeon.from_dict(data)
+    return Location.from_dict(data)
+
+
+def location_in_filter(data: Dict[str, Any], bounds: Optional[Tuple[float, float, float, float]],
+                       type_values: Optional[Set[str]]) -> bool:
+    """Check a location dictionary against optional (min_x, min_y, max_x, max_y) bounds and type values"""
+    if type_values is not None and data["type"] not in type_values:
+        return False
+    if bounds is not None:
+        min_x, min_y, max_x, max_y = bounds
+        return min_x <= data["x"] <= max_x and min_y <= data["y"] <= max_y
+    return True
+
+
+def read_location_lines(filepath: str, start: int, end: int, bounds: Optional[Tuple[float, float, float, float]],
+                        type_values: Optional[Set[str]]) -> List[Dict[str, Any]]:
+    """
+    Parse the location lines of a JSON Lines location file that start within [start, end)
+
+    Lines are assigned to the byte range their first character falls in, so splitting a
+    file into adjacent ranges reads every line exactly once. The header line is skipped.
+    """
+    results = []
+    with open(filepath, 'rb') as f:
+        if start > 0:
+            # Skip the line that started before this range
+            f.seek(start - 1)
+            f.readline()
+        else:
+            f.readline()
+
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            if line.strip():
+                data = json.loads(line)
+                if location_in_filter(data, bounds, type_values):
+                    results.append(data)
+    return results
+
+
+def make_settlement_name(rng, region_name: str, is_capital: bool, prefixes: List[str], suffixes: List[str]) -> str:
+    """
+    Generate a name for a settlement
+
+    Args:
+        rng: Source of random draws (the random module or a random.Random)
+        region_name: Name of the region/state the settlement is in
+        is_capital: Whether this is a capital city
+        prefixes: Name prefixes to choose from
+        suffixes: Name suffixes to choose from
+
+    Returns:
+        Generated settlement name
+    """
+    if is_capital:
+        # Capitals often share the name of the state or region
+        if rng.random() < 0.6:
+            return region_name
+
+        if rng.random() < 0.5:
+            return f"New {region_name}"
+
+        capital_suffixes = ["City", "Keep", "Throne", "Crown", "Hold", "Palace"]
+        return f"{region_name} {rng.choice(capital_suffixes)}"
+
+    # Generate a name for regular settlements
+    if rng.random() < 0.3:
+        # Use a prefix with region name
+        prefix = rng.choice(prefixes)
+        return f"{prefix} {region_name}"
+
+    if rng.random() < 0.3:
+        # Use region name with a suffix
+        suffix = rng.choice(suffixes)
+        return f"{region_name}{suffix}"
+
+    # Generate a completely new name
+    if rng.random() < 0.5:
+        # Use prefix + suffix
+        prefix = rng.choice(prefixes)
+        suffix = rng.choice(suffixes)
+        return f"{prefix}{suffix}"
+    else:
+        # Use a random combination of syllables
+        syllables = ["al", "an", "ar", "ba", "ber", "borg", "burgh", "by", "ca", "cen",
+                     "cle", "co", "dal", "den", "dor", "el", "en", "er", "ford", "ga",
+                     "gard", "gate", "gle", "glen", "ham", "haven", "hill", "in", "ing",
+                     "ke", "la", "lake", "land", "le", "leigh", "li", "lin", "lis", "lo",
+                     "mer", "mi", "minster", "mont", "more", "mouth", "na", "ne", "ness",
+                     "nor", "o", "polis", "port", "pur", "ra", "ri", "rich", "ridge", "ris",
+                     "ro", "se", "shaw", "shi", "shire", "side", "sta", "stead", "ston",
+                     "stone", "ta", "ter", "terrace", "ton", "town", "vale", "valley",
+                     "view", "ville", "vis", "wan", "water", "well", "wich", "wick",
+                     "wood", "worth", "wyn"]
+
+        name_length = rng.randint(2, 4)
+        name = "".join(rng.choice(syllables) for _ in range(name_length))
+
+        # Capitalize first letter
+        return name.capitalize()
+
+
+def plan_entity_settlements(seed: str, entity_name: str, center_cell_id: int, territory_cells: np.ndarray,
+                            unsuitable_cells: Optional[np.ndarray], prefixes: List[str],
+                            suffixes: List[str]) -> List[Tuple[LocationType, int, str, int, bool]]:
+    """
+    Place the capital, towns and villages of one political entity, the way
+    generate_settlements_from_political_entities does, but drawing only from a
+    random.Random seeded with seed so the result doesn't depend on what ran before
+
+    Args:
+        seed: Seed for this entity's random draws
+        entity_name: Name of the entity, used for settlement names
+        center_cell_id: Cell of the capital
+        territory_cells: Sorted cell IDs of the entity's territory
+        unsuitable_cells: Per-cell flags for terrain settlements avoid (None if unknown)
+        prefixes: Settlement name prefixes
+        suffixes: Settlement name suffixes
+
+    Returns:
+        (location type, cell ID, name, population, has walls) per settlement, capital first
+    """
+    rng = random.Random(seed)
+    plans = [(LocationType.CAPITAL, center_cell_id, make_settlement_name(rng, entity_name, True, prefixes, suffixes),
+              rng.randint(10000, 50000), True)]
+    if not territory_cells.size:
+        return plans
+
+    # Same candidates as get_settlement_candidate_cells: away from the capital and on suitable terrain
+    candidate_cells = territory_cells
+    if territory_cells.size > 1:
+        keep = np.abs(territory_cells - center_cell_id) >= 100
+        if unsuitable_cells is not None:
+            in_range = territory_cells < unsuitable_cells.size
+            keep[in_range] &= ~unsuitable_cells[territory_cells[in_range]]
+        if keep.any():
+            candidate_cells = territory_cells[keep]
+
+    num_towns = max(1, territory_cells.size // 500)
+    num_villages = max(2, territory_cells.size // 200)
+    for location_type, count in ((LocationType.TOWN, num_towns), (LocationType.VILLAGE, num_villages)):
+        for _ in range(count):
+            cell_id = int(candidate_cells[rng.randrange(candidate_cells.size)])
+            name = make_settlement_name(rng, entity_name, False, prefixes, suffixes)
+            if location_type == LocationType.TOWN:
+                plans.append((location_type, cell_id, name, rng.randint(2000, 8000), rng.random() < 0.7))
+            else:
+                plans.append((location_type, cell_id, name, rng.randint(200, 1000), False))
+    return plans
+
+
+# Terrain flags and name parts shared with settlement worker processes (set by _init_settlement_worker)
+_worker_settlement_context: Optional[Tuple[Optional[np.ndarray], List[str], List[str]]] = None
+
+
+def _init_settlement_worker(unsuitable_cells: Optional[np.ndarray], prefixes: List[str], suffixes: List[str]):
+    global _worker_settlement_context
+    _worker_settlement_context = (unsuitable_cells, prefixes, suffixes)
+
+
+def _plan_entity_settlements_in_worker(seed: str, entity_name: str, center_cell_id: int,
+                                       territory_cells: np.ndarray) -> List[Tuple[LocationType, int, str, int, bool]]:
+    unsuitable_cells, prefixes, suffixes = _worker_settlement_context
+    return plan_entity_settlements(seed, entity_name, center_cell_id, territory_cells, unsuitable_cells,
+                                   prefixes, suffixes)
+
+
 class MapLocationManager:
     """
     Manages locations, settlements, points of interest, and landmarks.
@@ -486,6 +696,17 @@ class MapLocationManager:
     # Singleton instance
     _instance = None
 
+    # Persistence groups for the binary format, one per location class
+    BINARY_GROUPS = (("location", Location), ("settlement", Settlement),
+                     ("poi", PointOfInterest), ("dungeon", Dungeon))
+    BINARY_FORMAT_VERSION = 1
+
+    # JSON Lines files smaller than this are always parsed in process
+    JSONL_PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+
+    # Terrain types settlements are not placed on
+    UNSUITABLE_SETTLEMENT_TERRAINS = ["ocean", "sea", "mountain", "high_mountain", "glacier"]
+
     @classmethod
     def instance(cls):
         if cls._instance is None:
@@ -510,9 +731,19 @@ class MapLocationManager:
         self.next_poi_id = 1
         self.next_dungeon_id = 1
 
-        # Cache for spatial queries
-        self.location_grid = {}
-        self.grid_cell_size = 10.0  # Grid cell size for spatial indexing
+        # Spatial indexes over location positions: a uniform grid for range queries (bucket size
+        # adapts to location density) and k-d trees per location type for nearest-neighbor queries
+        self.spatial_index = UniformGridIndex()
+        self.nearest_index = CategoryKDTreeIndex()
+
+        # Secondary indexes: location type -> IDs, state -> settlement IDs, state -> capital ID,
+        # settlement -> POI IDs. ID dicts are insertion-ordered sets (values unused). All location
+        # indexes are kept up to date by add_location, move_location, remove_location and
+        # update_settlement_state; validate_indexes checks them against the collections
+        self.location_ids_by_type: Dict[LocationType, Dict[str, None]] = {}
+        self.settlement_ids_by_state: Dict[str, Dict[str, None]] = {}
+        self.capital_id_by_state: Dict[str, str] = {}
+        self.poi_ids_by_settlement: Dict[str, Dict[str, None]] = {}
 
         # Name generation
         self.settlement_name_prefixes = [
@@ -637,8 +868,7 @@ class MapLocationManager:
                 capital.has_castle = True
                 capital.has_walls = True
 
-                self.settlements[capital_id] = capital
-                self.locations[capital_id] = capital
+                self.add_location(capital)
 
                 # Generate additional settlements for this entity
                 self.generate_settlements_for_entity(entity)
@@ -647,11 +877,76 @@ class MapLocationManager:
         except Exception as ex:
             print(f"Error generating settlements from political entities: {str(ex)}")
 
+    def generate_settlements_parallel(self, seed: int = 0, workers: Optional[int] = None) -> int:
+        """
+        Generate settlements for every political entity, planning entities across a process pool
+
+        Each entity's capital, towns and villages are drawn from a random generator seeded with
+        seed and the entity ID, and settlement IDs are assigned in entity order once all plans
+        are in, so the result is the same for any number of workers. Workers get the per-cell
+        unsuitable terrain flags once, through the pool initializer.
+
+        Args:
+            seed: Base seed for the per-entity random generators
+            workers: Number of worker processes (defaults to the CPU count; 1 runs in this process)
+
+        Returns:
+            Number of settlements generated
+        """
+        if not self.political_manager:
+            print("Political manager not available, skipping settlement generation")
+            return 0
+
+        entities = [entity for entity in self.political_manager.entities.values() if entity.center_cell_id]
+        unsuitable_cells = None
+        if self.region_manager:
+            unsuitable_cells = self.region_manager.get_terrain_cell_mask(self.UNSUITABLE_SETTLEMENT_TERRAINS)
+        tasks = [(f"{seed}:{entity.id}", entity.name, entity.center_cell_id,
+                  np.array(sorted(entity.territory_cells), dtype=np.int64)) for entity in entities]
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(tasks))
+        if workers <= 1:
+            plans = [plan_entity_settlements(*task, unsuitable_cells, self.settlement_name_prefixes,
+                                             self.settlement_name_suffixes) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_settlement_worker,
+                                     initargs=(unsuitable_cells, self.settlement_name_prefixes,
+                                               self.settlement_name_suffixes)) as executor:
+                plans = list(executor.map(_plan_entity_settlements_in_worker, *zip(*tasks),
+                                          chunksize=max(1, len(tasks) // (workers * 4))))
+
+        # Merge in entity order
+        count = 0
+        for entity, entity_plans in zip(entities, plans):
+            for location_type, cell_id, name, population, has_walls in entity_plans:
+                settlement = Settlement(
+                    location_id=f"settlement_{self.next_settlement_id}",
+                    name=name,
+                    position=self.convert_cell_id_to_position(cell_id),
+                    location_type=location_type,
+                    population=population
+                )
+                self.next_settlement_id += 1
+
+                settlement.state_id = entity.id
+                settlement.has_walls = has_walls
+                if location_type == LocationType.CAPITAL:
+                    settlement.is_capital = True
+                    settlement.has_castle = True
+
+                self.add_location(settlement)
+                count += 1
+
+        print(f"Generated {count} settlements for {len(entities)} political entities with {workers} worker(s)")
+        return count
+
     def convert_cell_id_to_position(self, cell_id: int) -> Tuple[float, float]:
         """Convert a cell ID to (x, y) position"""
         if self.region_manager:
             # Use region manager's conversion if available
-            return self.region_manager.GetCellPosition(cell_id)
+            return self.region_manager.get_cell_position(cell_id)
         else:
             # Fallback calculation
             grid_size = 1000  # Default grid size
@@ -667,13 +962,17 @@ class MapLocationManager:
         num_towns = max(1, territory_size // 500)
         num_villages = max(2, territory_size // 200)
 
+        # Scan the territory once for all of this entity's settlements
+        candidate_cells = self.get_settlement_candidate_cells(entity.territory_cells, entity.center_cell_id)
+
         # Generate towns
         for _ in range(num_towns):
             if not entity.territory_cells:
                 continue
 
             # Select a cell for the town
-            cell_id = self.select_settlement_location(entity.territory_cells, entity.center_cell_id)
+            cell_id = self.select_settlement_location(entity.territory_cells, entity.center_cell_id,
+                                                      candidate_cells)
 
             # Get position from cell ID
             x, y = self.convert_cell_id_to_position(cell_id)
@@ -695,8 +994,7 @@ class MapLocationManager:
             town.state_id = entity.id
             town.has_walls = random.random() < 0.7
 
-            self.settlements[town_id] = town
-            self.locations[town_id] = town
+            self.add_location(town)
 
         # Generate villages
         for _ in range(num_villages):
@@ -704,7 +1002,8 @@ class MapLocationManager:
                 continue
 
             # Select a cell for the village
-            cell_id = self.select_settlement_location(entity.territory_cells, entity.center_cell_id)
+            cell_id = self.select_settlement_location(entity.territory_cells, entity.center_cell_id,
+                                                      candidate_cells)
 
             # Get position from cell ID
             x, y = self.convert_cell_id_to_position(cell_id)
@@ -725,26 +1024,47 @@ class MapLocationManager:
 
             village.state_id = entity.id
 
-            self.settlements[village_id] = village
-            self.locations[village_id] = village
+            self.add_location(village)
 
-    def select_settlement_location(self, territory_cells: Set[int], capital_cell_id: int) -> int:
+    def select_settlement_location(self, territory_cells: Set[int], capital_cell_id: int,
+                                   candidate_cells: Optional[List[int]] = None) -> int:
         """
         Select a good cell for settlement placement
 
         Args:
             territory_cells: Set of cell IDs belonging to a territory
             capital_cell_id: Cell ID of the capital to avoid placing too close
+            candidate_cells: Result of get_settlement_candidate_cells for the same territory, so
+                placing several settlements doesn't rescan the territory each time
 
         Returns:
             Selected cell ID
         """
+        if candidate_cells is None:
+            candidate_cells = self.get_settlement_candidate_cells(territory_cells, capital_cell_id)
+
+        # If there's only one cell, use it
+        if len(territory_cells) <= 1:
+            return candidate_cells[0]
+
+        return random.choice(candidate_cells)
+
+    def get_settlement_candidate_cells(self, territory_cells: Set[int], capital_cell_id: int) -> List[int]:
+        """
+        Get the cells select_settlement_location chooses from
+
+        Args:
+            territory_cells: Set of cell IDs belonging to a territory
+            capital_cell_id: Cell ID of the capital to avoid placing too close
+
+        Returns:
+            Cells suitable for a settlement, or every territory cell if none are
+        """
         # Convert to list for selection
         cells = list(territory_cells)
 
-        # If there's only one cell, use it
         if len(cells) <= 1:
-            return cells[0]
+            return cells
 
         # Try to find cells that are suitable for settlements
         suitable_cells = []
@@ -758,12 +1078,8 @@ class MapLocationManager:
             if self.is_cell_suitable_for_settlement(cell_id):
                 suitable_cells.append(cell_id)
 
-        # If we found suitable cells, randomly select one
-        if suitable_cells:
-            return random.choice(suitable_cells)
-
-        # Otherwise, select a random cell
-        return random.choice(cells)
+        # If we found suitable cells, select among them, otherwise among all cells
+        return suitable_cells if suitable_cells else cells
 
     def is_cell_suitable_for_settlement(self, cell_id: int) -> bool:
         """
@@ -779,97 +1095,242 @@ class MapLocationManager:
         if not self.region_manager:
             return True
 
-        # Check terrain type
-        terrain_type = self.region_manager.GetTerrainTypeForCell(cell_id)
+        # Check terrain type; anything not unsuitable (or without terrain data) will do
+        terrain_type = self.region_manager.get_terrain_type_for_cell(cell_id)
+        return terrain_type not in self.UNSUITABLE_SETTLEMENT_TERRAINS
 
-        # Unsuitable terrain types
-        unsuitable_terrains = ["ocean", "sea", "mountain", "high_mountain", "glacier"]
+    def generate_settlement_name(self, region_name: str, is_capital: bool) -> str:
+        """
+        Generate a name for a settlement
 
-        if terrain_type in unsuitable_terrains:
-            return False
+        Args:
+            region_name: Name of the region/state the settlement is in
+            is_capital: Whether this is a capital city
+
+        Returns:
+            Generated settlement name
+        """
+        return make_settlement_name(random, region_name, is_capital, self.settlement_name_prefixes,
+                                    self.settlement_name_suffixes)
 
-        # Check if there's water nearby (good for settlements)
-        neighboring_cells = self.region_manager.GetNeighboringCells(cell_id)
+    def regenerate_spatial_index(self):
+        """Rebuild every location index from the location collections, e.g. after a bulk load"""
+        self.spatial_index.build((location_id, location.x, location.y)
+                                 for location_id, location in self.locations.items())
+        self.nearest_index.build((location_id, location.type, location.x, location.y)
+                                 for location_id, location in self.locations.items())
+
+        self.location_ids_by_type = {}
+        self.settlement_ids_by_state = {}
+        self.capital_id_by_state = {}
+        self.poi_ids_by_settlement = {}
+        for location in self.locations.values():
+            self._index_location_fields(location)
+
+        # Point settlements at the managed POI objects rather than their own deserialized copies
+        for settlement_id, settlement in self.settlements.items():
+            settlement.points_of_interest = self.get_points_of_interest_in_settlement(settlement_id)
+
+    def add_location(self, location: Location):
+        """
+        Add a location to the collections and update every location index
+
+        Args:
+            location: Location to add; settlements, points of interest and dungeons also
+                go into their own collections
+        """
+        if location.id in self.locations:
+            self.remove_location(location.id)
+
+        self._add_to_collections(location)
+        if isinstance(location, Settlement):
+            # Pick up POIs that were added before their settlement
+            if location.id in self.poi_ids_by_settlement:
+                location.points_of_interest = self.get_points_of_interest_in_settlement(location.id)
+        elif isinstance(location, PointOfInterest):
+            # If this POI belongs to a settlement, add it to the settlement's POIs
+            if location.parent_location_id and location.parent_location_id in self.settlements:
+                self.settlements[location.parent_location_id].points_of_interest.append(location)
+
+        self.spatial_index.insert(location.id, location.x, location.y)
+        self.nearest_index.insert(location.id, location.type, location.x, location.y)
+        self._index_location_fields(location)
+
+    def _add_to_collections(self, location: Location):
+        # Collections only; bulk loads call regenerate_spatial_index afterwards
+        self.locations[location.id] = location
+        if isinstance(location, Settlement):
+            self.settlements[location.id] = location
+        elif isinstance(location, PointOfInterest):
+            self.points_of_interest[location.id] = location
+        elif isinstance(location, Dungeon):
+            self.dungeons[location.id] = location
+
+    def move_location(self, location_id: str, x: float, y: float) -> bool:
+        """
+        Move a location and update the spatial indexes
+
+        Args:
+            location_id: ID of the location
+            x: New X coordinate
+            y: New Y coordinate
 
-        for neighbor_cell in neighboring_cells:
-            neighbor_terrain = self.region_manager.GetTerrainTypeForCell(neighbor_cell)
-            if neighbor_terrain in ["river", "lake"]:
-                return True
+        Returns:
+            True if moved, False if the location doesn't exist
+        """
+        location = self.locations.get(location_id)
+        if not location:
+            return False
 
-        # Default to suitable if nothing else applies
+        location.x, location.y = x, y
+        self.spatial_index.move(location_id, x, y)
+        self.nearest_index.move(location_id, x, y)
         return True
 
-    def generate_settlement_name(self, region_name: str, is_capital: bool) -> str:
+    def remove_location(self, location_id: str) -> bool:
         """
-        Generate a name for a settlement
+        Remove a location from the collections and every location index. Removing a settlement
+        also removes its points of interest
 
         Args:
-            region_name: Name of the region/state the settlement is in
-            is_capital: Whether this is a capital city
+            location_id: ID of the location
 
         Returns:
-            Generated settlement name
+            True if removed, False if the location doesn't exist
         """
-        if is_capital:
-            # Capitals often share the name of the state or region
-            if random.random() < 0.6:
-                return region_name
+        location = self.locations.pop(location_id, None)
+        if not location:
+            return False
 
-            if random.random() < 0.5:
-                return f"New {region_name}"
-
-            capital_suffixes = ["City", "Keep", "Throne", "Crown", "Hold", "Palace"]
-            return f"{region_name} {random.choice(capital_suffixes)}"
-
-        # Generate a name for regular settlements
-        if random.random() < 0.3:
-            # Use a prefix with region name
-            prefix = random.choice(self.settlement_name_prefixes)
-            return f"{prefix} {region_name}"
-
-        if random.random() < 0.3:
-            # Use region name with a suffix
-            suffix = random.choice(self.settlement_name_suffixes)
-            return f"{region_name}{suffix}"
-
-        # Generate a completely new name
-        if random.random() < 0.5:
-            # Use prefix + suffix
-            prefix = random.choice(self.settlement_name_prefixes)
-            suffix = random.choice(self.settlement_name_suffixes)
-            return f"{prefix}{suffix}"
-        else:
-            # Use a random combination of syllables
-            syllables = ["al", "an", "ar", "ba", "ber", "borg", "burgh", "by", "ca", "cen",
-                         "cle", "co", "dal", "den", "dor", "el", "en", "er", "ford", "ga",
-                         "gard", "gate", "gle", "glen", "ham", "haven", "hill", "in", "ing",
-                         "ke", "la", "lake", "land", "le", "leigh", "li", "lin", "lis", "lo",
-                         "mer", "mi", "minster", "mont", "more", "mouth", "na", "ne", "ness",
-                         "nor", "o", "polis", "port", "pur", "ra", "ri", "rich", "ridge", "ris",
-                         "ro", "se", "shaw", "shi", "shire", "side", "sta", "stead", "ston",
-                         "stone", "ta", "ter", "terrace", "ton", "town", "vale", "valley",
-                         "view", "ville", "vis", "wan", "water", "well", "wich", "wick",
-                         "wood", "worth", "wyn"]
-
-            name_length = random.randint(2, 4)
-            name = "".join(random.choice(syllables) for _ in range(name_length))
-
-            # Capitalize first letter
-            return name.capitalize()
+        for poi_id in list(self.poi_ids_by_settlement.get(location_id, ())):
+            self.remove_location(poi_id)
 
-    def regenerate_spatial_index(self):
-        """Regenerate the spatial index for fast location lookups"""
-        self.location_grid = {}
+        self.settlements.pop(location_id, None)
+        self.points_of_interest.pop(location_id, None)
+        self.dungeons.pop(location_id, None)
 
-        for location_id, location in self.locations.items():
-            grid_x = int(location.x / self.grid_cell_size)
-            grid_y = int(location.y / self.grid_cell_size)
-            grid_key = f"{grid_x}_{grid_y}"
+        if isinstance(location, PointOfInterest) and location.parent_location_id in self.settlements:
+            parent = self.settlements[location.parent_location_id]
+            parent.points_of_interest = [poi for poi in parent.points_of_interest if poi.id != location_id]
+
+        self.spatial_index.remove(location_id)
+        self.nearest_index.remove(location_id)
+        self._unindex_location_fields(location)
+        return True
 
-            if grid_key not in self.location_grid:
-                self.location_grid[grid_key] = []
+    def update_settlement_state(self, settlement_id: str, state_id: Optional[str] = None,
+                                is_capital: Optional[bool] = None) -> bool:
+        """
+        Change the political entity a settlement belongs to, or whether it's a capital, and
+        update the state and capital indexes
 
-            self.location_grid[grid_key].append(location_id)
+        Args:
+            settlement_id: ID of the settlement
+            state_id: ID of the new political entity (None to keep the current one)
+            is_capital: Whether the settlement is its state's capital (None to keep the current value)
+
+        Returns:
+            True if updated, False if the settlement doesn't exist
+        """
+        settlement = self.settlements.get(settlement_id)
+        if not settlement:
+            return False
+
+        self._unindex_settlement_state(settlement)
+        if state_id is not None:
+            settlement.state_id = state_id
+        if is_capital is not None:
+            settlement.is_capital = is_capital
+        self._index_settlement_state(settlement)
+        return True
+
+    def validate_indexes(self) -> List[str]:
+        """
+        Check every location index against the location collections
+
+        Returns:
+            Descriptions of the inconsistencies found (empty if the indexes are consistent)
+        """
+        problems = []
+
+        for location_id, location in self.locations.items():
+            if self.spatial_index.positions.get(location_id) != (location.x, location.y):
+                problems.append(f"{location_id}: range index position out of date")
+            if self.nearest_index.items.get(location_id) != (location.type, location.x, location.y):
+                problems.append(f"{location_id}: nearest-neighbor index entry out of date")
+        if len(self.spatial_index) != len(self.locations) or len(self.nearest_index) != len(self.locations):
+            problems.append("Spatial indexes contain removed locations")
+
+        expected_by_type: Dict[LocationType, Set[str]] = {}
+        expected_by_state: Dict[str, Set[str]] = {}
+        expected_pois: Dict[str, Set[str]] = {}
+        for location_id, location in self.locations.items():
+            expected_by_type.setdefault(location.type, set()).add(location_id)
+            if isinstance(location, Settlement):
+                expected_by_state.setdefault(location.state_id, set()).add(location_id)
+            elif isinstance(location, PointOfInterest) and location.parent_location_id:
+                expected_pois.setdefault(location.parent_location_id, set()).add(location_id)
+
+        for name, index, expected in (("type", self.location_ids_by_type, expected_by_type),
+                                      ("state", self.settlement_ids_by_state, expected_by_state),
+                                      ("settlement POI", self.poi_ids_by_settlement, expected_pois)):
+            for key in set(index) | set(expected):
+                if set(index.get(key, ())) != expected.get(key, set()):
+                    problems.append(f"{name} index out of date for {key}")
+
+        for state_id, settlement_ids in expected_by_state.items():
+            capital_ids = {settlement_id for settlement_id in settlement_ids
+                           if self.settlements[settlement_id].is_capital}
+            if capital_ids and self.capital_id_by_state.get(state_id) not in capital_ids:
+                problems.append(f"capital index out of date for {state_id}")
+        for state_id in self.capital_id_by_state:
+            if state_id not in expected_by_state:
+                problems.append(f"capital index has removed state {state_id}")
+
+        for settlement_id, settlement in self.settlements.items():
+            if [poi.id for poi in settlement.points_of_interest] != list(self.poi_ids_by_settlement.get(settlement_id, ())):
+                problems.append(f"{settlement_id}: points of interest list out of date")
+
+        return problems
+
+    def _index_location_fields(self, location: Location):
+        self.location_ids_by_type.setdefault(location.type, {})[location.id] = None
+        if isinstance(location, Settlement):
+            self._index_settlement_state(location)
+        elif isinstance(location, PointOfInterest) and location.parent_location_id:
+            self.poi_ids_by_settlement.setdefault(location.parent_location_id, {})[location.id] = None
+
+    def _unindex_location_fields(self, location: Location):
+        self._discard_index_entry(self.location_ids_by_type, location.type, location.id)
+        if isinstance(location, Settlement):
+            self._unindex_settlement_state(location)
+        elif isinstance(location, PointOfInterest) and location.parent_location_id:
+            self._discard_index_entry(self.poi_ids_by_settlement, location.parent_location_id, location.id)
+
+    def _index_settlement_state(self, settlement: Settlement):
+        self.settlement_ids_by_state.setdefault(settlement.state_id, {})[settlement.id] = None
+        if settlement.is_capital:
+            self.capital_id_by_state.setdefault(settlement.state_id, settlement.id)
+
+    def _unindex_settlement_state(self, settlement: Settlement):
+        state_id = settlement.state_id
+        self._discard_index_entry(self.settlement_ids_by_state, state_id, settlement.id)
+        if self.capital_id_by_state.get(state_id) == settlement.id:
+            del self.capital_id_by_state[state_id]
+
+            # Fall back to any other capital of the state
+            for settlement_id in self.settlement_ids_by_state.get(state_id, ()):
+                if self.settlements[settlement_id].is_capital:
+                    self.capital_id_by_state[state_id] = settlement_id
+                    break
+
+    @staticmethod
+    def _discard_index_entry(index: Dict[Any, Dict[str, None]], key: Any, location_id: str):
+        location_ids = index.get(key)
+        if location_ids is not None:
+            location_ids.pop(location_id, None)
+            if not location_ids:
+                del index[key]
 
     def create_settlement(self, name: str, position: Tuple[float, float],
                           location_type: LocationType = LocationType.TOWN,
@@ -909,19 +1370,8 @@ class MapLocationManager:
             settlement.has_castle = True
             settlement.has_walls = True
 
-        # Add to collections
-        self.settlements[settlement_id] = settlement
-        self.locations[settlement_id] = settlement
-
-        # Update spatial index
-        grid_x = int(position[0] / self.grid_cell_size)
-        grid_y = int(position[1] / self.grid_cell_size)
-        grid_key = f"{grid_x}_{grid_y}"
-
-        if grid_key not in self.location_grid:
-            self.location_grid[grid_key] = []
-
-        self.location_grid[grid_key].append(settlement_id)
+        # Add to collections and indexes
+        self.add_location(settlement)
 
         return settlement
 
@@ -956,24 +1406,8 @@ class MapLocationManager:
             parent_location_id=parent_location_id
         )
 
-        # Add to collections
-        self.points_of_interest[poi_id] = poi
-        self.locations[poi_id] = poi
-
-        # If this POI belongs to a settlement, add it to the settlement's POIs
-        if parent_location_id and parent_location_id in self.settlements:
-            parent = self.settlements[parent_location_id]
-            parent.points_of_interest.append(poi)
-
-        # Update spatial index
-        grid_x = int(position[0] / self.grid_cell_size)
-        grid_y = int(position[1] / self.grid_cell_size)
-        grid_key = f"{grid_x}_{grid_y}"
-
-        if grid_key not in self.location_grid:
-            self.location_grid[grid_key] = []
-
-        self.location_grid[grid_key].append(poi_id)
+        # Add to collections and indexes (and to the parent settlement's POIs)
+        self.add_location(poi)
 
         return poi
 
@@ -1007,19 +1441,8 @@ class MapLocationManager:
             size=size
         )
 
-        # Add to collections
-        self.dungeons[dungeon_id] = dungeon
-        self.locations[dungeon_id] = dungeon
-
-        # Update spatial index
-        grid_x = int(position[0] / self.grid_cell_size)
-        grid_y = int(position[1] / self.grid_cell_size)
-        grid_key = f"{grid_x}_{grid_y}"
-
-        if grid_key not in self.location_grid:
-            self.location_grid[grid_key] = []
-
-        self.location_grid[grid_key].append(dungeon_id)
+        # Add to collections and indexes
+        self.add_location(dungeon)
 
         return dungeon
 
@@ -1226,32 +1649,39 @@ class MapLocationManager:
         Returns:
             List of locations within the distance
         """
-        result = []
+        location_ids = self.spatial_index.query_radius(center_x, center_y, distance)
+        return [self.locations[location_id] for location_id in location_ids if location_id in self.locations]
 
-        # Calculate grid cell range to search
-        grid_radius = int(distance / self.grid_cell_size) + 1
-        center_grid_x = int(center_x / self.grid_cell_size)
-        center_grid_y = int(center_y / self.grid_cell_size)
+    def get_locations_within_travel_time(self, x: float, y: float, max_days: float,
+                                         travel_speed: float = 1.0,
+                                         location_type: Optional[LocationType] = None) -> List[Tuple[Location, float]]:
+        """
+        Find all locations reachable within a number of days of travel over the terrain
 
-        # Search all grid cells within radius
-        for dx in range(-grid_radius, grid_radius + 1):
-            for dy in range(-grid_radius, grid_radius + 1):
-                grid_key = f"{center_grid_x + dx}_{center_grid_y + dy}"
+        Args:
+            x: X coordinate of the starting point
+            y: Y coordinate of the starting point
+            max_days: Maximum travel time in days
+            travel_speed: Travel speed multiplier, as for MapRegionManager.calculate_travel_time
+            location_type: Optional filter for location type
 
-                if grid_key in self.location_grid:
-                    # Check each location in this grid cell
-                    for location_id in self.location_grid[grid_key]:
-                        location = self.locations.get(location_id)
+        Returns:
+            List of (location, travel days) pairs, nearest first
+        """
+        if not self.region_manager:
+            return []
 
-                        if location:
-                            # Calculate actual distance
-                            dx = location.x - center_x
-                            dy = location.y - center_y
-                            actual_distance = math.sqrt(dx * dx + dy * dy)
+        candidates = [location for location in self.locations.values()
+                      if not location_type or location.type == location_type]
+        if not candidates:
+            return []
 
-                            if actual_distance <= distance:
-                                result.append(location)
+        travel_days = self.region_manager.get_travel_days_to_positions(
+            [(x, y)], [location.x for location in candidates], [location.y for location in candidates],
+            max_days, travel_speed)
 
+        result = [(location, days) for location, days in zip(candidates, travel_days.tolist()) if days <= max_days]
+        result.sort(key=lambda pair: pair[1])
         return result
 
     def get_nearest_location(self, x: float, y: float,
@@ -1267,49 +1697,44 @@ class MapLocationManager:
         Returns:
             Nearest location or None if none found
         """
-        nearest_location = None
-        nearest_distance = float('inf')
+        nearest = self.k_nearest(x, y, 1, [location_type] if location_type else None)
+        return nearest[0][0] if nearest else None
 
-        # Search in expanding grid cells
-        for radius in range(1, 10):  # Limit search radius
-            found = False
-
-            for dx in range(-radius, radius + 1):
-                for dy in range(-radius, radius + 1):
-                    # Only check the perimeter of each square
-                    if abs(dx) != radius and abs(dy) != radius:
-                        continue
-
-                    grid_x = int(x / self.grid_cell_size) + dx
-                    grid_y = int(y / self.grid_cell_size) + dy
-                    grid_key = f"{grid_x}_{grid_y}"
-
-                    if grid_key in self.location_grid:
-                        for location_id in self.location_grid[grid_key]:
-                            location = self.locations.get(location_id)
-
-                            if not location:
-                                continue
+    def k_nearest(self, x: float, y: float, k: int, types: Optional[List[LocationType]] = None,
+                  max_distance: float = float('inf')) -> List[Tuple[Location, float]]:
+        """
+        Find the k nearest locations to a point, exactly and at any range
 
-                            # Skip if type doesn't match filter
-                            if location_type and location.type != location_type:
-                                continue
+        Args:
+            x: X coordinate
+            y: Y coordinate
+            k: Number of locations to return
+            types: Optional location types to restrict the search to
+            max_distance: Ignore locations further away than this
 
-                            # Calculate distance
-                            dx = location.x - x
-                            dy = location.y - y
-                            distance = math.sqrt(dx * dx + dy * dy)
+        Returns:
+            Up to k (location, distance) pairs, nearest first
+        """
+        return [(self.locations[location_id], distance)
+                for location_id, distance in self.nearest_index.k_nearest(x, y, k, types, max_distance)]
 
-                            if distance < nearest_distance:
-                                nearest_distance = distance
-                                nearest_location = location
-                                found = True
+    def k_nearest_batch(self, points: List[Tuple[float, float]], k: int,
+                        types: Optional[List[LocationType]] = None,
+                        max_distance: float = float('inf')) -> List[List[Tuple[Location, float]]]:
+        """
+        Find the k nearest locations to each of many points
 
-            # Stop searching if we found a location in this radius
-            if found:
-                break
+        Args:
+            points: (x, y) query points
+            k: Number of locations to return per point
+            types: Optional location types to restrict the search to
+            max_distance: Ignore locations further away than this
 
-        return nearest_location
+        Returns:
+            For each query point, up to k (location, distance) pairs, nearest first
+        """
+        return [[(self.locations[location_id], distance) for location_id, distance in nearest]
+                for nearest in self.nearest_index.k_nearest_batch(points, k, types, max_distance)]
 
     def get_locations_by_type(self, location_type: LocationType) -> List[Location]:
         """
@@ -1321,7 +1746,7 @@ class MapLocationManager:
         Returns:
             List of locations of the specified type
         """
-        return [loc for loc in self.locations.values() if loc.type == location_type]
+        return [self.locations[location_id] for location_id in self.location_ids_by_type.get(location_type, ())]
 
     def get_settlements_by_state(self, state_id: str) -> List[Settlement]:
         """
@@ -1333,7 +1758,7 @@ class MapLocationManager:
         Returns:
             List of settlements belonging to the entity
         """
-        return [s for s in self.settlements.values() if s.state_id == state_id]
+        return [self.settlements[settlement_id] for settlement_id in self.settlement_ids_by_state.get(state_id, ())]
 
     def get_capital_of_state(self, state_id: str) -> Optional[Settlement]:
         """
@@ -1345,11 +1770,20 @@ class MapLocationManager:
         Returns:
             Capital settlement or None if not found
         """
-        for settlement in self.settlements.values():
-            if settlement.state_id == state_id and settlement.is_capital:
-                return settlement
+        capital_id = self.capital_id_by_state.get(state_id)
+        return self.settlements[capital_id] if capital_id else None
 
-        return None
+    def get_points_of_interest_in_settlement(self, settlement_id: str) -> List[PointOfInterest]:
+        """
+        Get all points of interest belonging to a settlement
+
+        Args:
+            settlement_id: ID of the settlement
+
+        Returns:
+            List of points of interest whose parent is the settlement
+        """
+        return [self.points_of_interest[poi_id] for poi_id in self.poi_ids_by_settlement.get(settlement_id, ())]
 
     def generate_dungeons_in_region(self, region_id: str, count: int = 3) -> List[Dungeon]:
         """
@@ -1509,15 +1943,10 @@ class MapLocationManager:
         try:
             data = {
                 "locations": {loc_id: loc.to_dict() for loc_id, loc in self.locations.items()},
-                "next_ids": {
-                    "location_id": self.next_location_id,
-                    "settlement_id": self.next_settlement_id,
-                    "poi_id": self.next_poi_id,
-                    "dungeon_id": self.next_dungeon_id
-                }
+                "next_ids": self.get_next_ids()
             }
 
-            with open(filepath, 'w') as f:
+            with atomic_open(filepath) as f:
                 json.dump(data, f, indent=2)
 
             print(f"Saved location data to {filepath}")
@@ -1541,43 +1970,16 @@ class MapLocationManager:
                 data = json.load(f)
 
             # Clear existing collections
-            self.locations.clear()
-            self.settlements.clear()
-            self.points_of_interest.clear()
-            self.dungeons.clear()
+            self.clear_locations()
 
-            # Load locations
+            # Load locations; settlements, POIs and dungeons are recognized by their own fields
             locations_data = data.get("locations", {})
 
-            for loc_id, loc_data in locations_data.items():
-                location_type = loc_data.get("type", "")
-
-                if "population" in loc_data:
-                    # This is a settlement
-                    settlement = Settlement.from_dict(loc_data)
-                    self.settlements[loc_id] = settlement
-                    self.locations[loc_id] = settlement
-                elif "category" in loc_data:
-                    # This is a point of interest
-                    poi = PointOfInterest.from_dict(loc_data)
-                    self.points_of_interest[loc_id] = poi
-                    self.locations[loc_id] = poi
-                elif "difficulty" in loc_data:
-                    # This is a dungeon
-                    dungeon = Dungeon.from_dict(loc_data)
-                    self.dungeons[loc_id] = dungeon
-                    self.locations[loc_id] = dungeon
-                else:
-                    # Generic location
-                    location = Location.from_dict(loc_data)
-                    self.locations[loc_id] = location
+            for loc_data in locations_data.values():
+                self._add_to_collections(location_from_dict(loc_data))
 
             # Load next IDs
-            next_ids = data.get("next_ids", {})
-            self.next_location_id = next_ids.get("location_id", self.next_location_id)
-            self.next_settlement_id = next_ids.get("settlement_id", self.next_settlement_id)
-            self.next_poi_id = next_ids.get("poi_id", self.next_poi_id)
-            self.next_dungeon_id = next_ids.get("dungeon_id", self.next_dungeon_id)
+            self.set_next_ids(data.get("next_ids", {}))
 
             # Regenerate spatial index
             self.regenerate_spatial_index()
@@ -1588,6 +1990,202 @@ class MapLocationManager:
             print(f"Error loading location data: {str(ex)}")
             return False
 
+    def clear_locations(self):
+        """Remove every location (indexes are rebuilt by the caller)"""
+        self.locations.clear()
+        self.settlements.clear()
+        self.points_of_interest.clear()
+        self.dungeons.clear()
+
+    def get_next_ids(self) -> Dict[str, int]:
+        """Get the ID counters, as saved with location data"""
+        return {
+            "location_id": self.next_location_id,
+            "settlement_id": self.next_settlement_id,
+            "poi_id": self.next_poi_id,
+            "dungeon_id": self.next_dungeon_id
+        }
+
+    def set_next_ids(self, next_ids: Dict[str, int]):
+        """Restore ID counters saved by get_next_ids, keeping current values for missing ones"""
+        self.next_location_id = next_ids.get("location_id", self.next_location_id)
+        self.next_settlement_id = next_ids.get("settlement_id", self.next_settlement_id)
+        self.next_poi_id = next_ids.get("poi_id", self.next_poi_id)
+        self.next_dungeon_id = next_ids.get("dungeon_id", self.next_dungeon_id)
+
+    def save_to_jsonl(self, filepath: str) -> bool:
+        """
+        Save location data as JSON Lines: a header line with the ID counters, then one line
+        per location, written one at a time rather than built up as a single document
+
+        Args:
+            filepath: Path to save file (replaced atomically)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            with atomic_open(filepath) as f:
+                f.write(json.dumps({"next_ids": self.get_next_ids()}) + "\n")
+                for location in self.locations.values():
+                    data = location.to_dict()
+                    if isinstance(location, Settlement):
+                        # Points of interest have lines of their own
+                        data["points_of_interest"] = []
+                    f.write(json.dumps(data) + "\n")
+
+            print(f"Saved location data to {filepath}")
+            return True
+        except Exception as ex:
+            print(f"Error saving location data: {str(ex)}")
+            return False
+
+    def load_from_jsonl(self, filepath: str, bounds: Optional[Tuple[float, float, float, float]] = None,
+                        location_types: Optional[List[LocationType]] = None, workers: Optional[int] = None) -> bool:
+        """
+        Load location data saved by save_to_jsonl, replacing the current locations
+
+        Args:
+            filepath: Path to load file
+            bounds: Only load locations within (min_x, min_y, max_x, max_y)
+            location_types: Only load locations of these types
+            workers: Processes to parse the file with (default: CPU count; small files are
+                always parsed in process)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            type_values = {location_type.value for location_type in location_types} if location_types else None
+            with open(filepath, 'rb') as f:
+                header = json.loads(f.readline())
+
+            file_size = os.path.getsize(filepath)
+            workers = workers or os.cpu_count() or 1
+            if workers <= 1 or file_size < self.JSONL_PARALLEL_MIN_BYTES:
+                chunks = [read_location_lines(filepath, 0, file_size, bounds, type_values)]
+            else:
+                # Adjacent byte ranges, parsed in parallel and merged in file order
+                boundaries = [file_size * index // (workers * 4) for index in range(workers * 4 + 1)]
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    chunks = list(executor.map(read_location_lines, [filepath] * (len(boundaries) - 1),
+                                               boundaries[:-1], boundaries[1:], [bounds] * (len(boundaries) - 1),
+                                               [type_values] * (len(boundaries) - 1)))
+
+            self.clear_locations()
+            for chunk in chunks:
+                for loc_data in chunk:
+                    self._add_to_collections(location_from_dict(loc_data))
+
+            self.set_next_ids(header.get("next_ids", {}))
+            self.regenerate_spatial_index()
+
+            print(f"Loaded {len(self.locations)} locations from {filepath}")
+            return True
+        except Exception as ex:
+            print(f"Error loading location data: {str(ex)}")
+            return False
+
+    def save_to_binary(self, filepath: str) -> bool:
+        """
+        Save location data in the binary column format: the columns of each location class's
+        store (see MapLocationStore) plus one shared string table
+
+        Args:
+            filepath: Path to save file (replaced atomically)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            rows_by_class: Dict[type, List[int]] = {location_class: [] for _, location_class in self.BINARY_GROUPS}
+            order_by_class: Dict[type, List[int]] = {location_class: [] for _, location_class in self.BINARY_GROUPS}
+            for order, location in enumerate(self.locations.values()):
+                rows_by_class[type(location)].append(location._row)
+                order_by_class[type(location)].append(order)
+
+            strings = StringTableWriter()
+            arrays: Dict[str, np.ndarray] = {}
+            header = {"version": self.BINARY_FORMAT_VERSION, "next_ids": self.get_next_ids(),
+                      "counts": {}, "enums": {}}
+            for group, location_class in self.BINARY_GROUPS:
+                rows = np.array(rows_by_class[location_class], dtype=np.int64)
+                # Settlement POI lists hold objects and are rebuilt from the POIs on load
+                columns, enums = location_class.store.export_rows(rows, strings, skip_columns=("points_of_interest",))
+                arrays.update({f"{group}.{name}": values for name, values in columns.items()})
+                arrays[f"{group}.order"] = np.array(order_by_class[location_class], dtype=np.int64)
+                header["counts"][group] = len(rows)
+                header["enums"][group] = enums
+
+            arrays["strings.data"], arrays["strings.offsets"] = strings.to_arrays()
+            write_column_file(filepath, header, arrays)
+
+            print(f"Saved location data to {filepath}")
+            return True
+        except Exception as ex:
+            print(f"Error saving location data: {str(ex)}")
+            return False
+
+    def load_from_binary(self, filepath: str, bounds: Optional[Tuple[float, float, float, float]] = None,
+                         location_types: Optional[List[LocationType]] = None) -> bool:
+        """
+        Load location data saved by save_to_binary, replacing the current locations. The file
+        is memory-mapped and filtered column-wise, so partial loads only build the locations
+        they keep
+
+        Args:
+            filepath: Path to load file
+            bounds: Only load locations within (min_x, min_y, max_x, max_y)
+            location_types: Only load locations of these types
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            header, arrays = read_column_file(filepath)
+            if header.get("version") != self.BINARY_FORMAT_VERSION:
+                raise ValueError(f"unsupported location file version {header.get('version')}")
+            strings = StringTableReader(arrays["strings.data"], arrays["strings.offsets"])
+            type_values = {location_type.value for location_type in location_types} if location_types else None
+
+            loaded: List[Tuple[int, Location]] = []
+            for group, location_class in self.BINARY_GROUPS:
+                count = header["counts"].get(group, 0)
+                if not count:
+                    continue
+
+                prefix = f"{group}."
+                columns = {name[len(prefix):]: values for name, values in arrays.items() if name.startswith(prefix)}
+                enums = header["enums"].get(group, {})
+
+                keep = np.ones(count, dtype=bool)
+                if bounds is not None:
+                    min_x, min_y, max_x, max_y = bounds
+                    keep &= (columns["x"] >= min_x) & (columns["x"] <= max_x)
+                    keep &= (columns["y"] >= min_y) & (columns["y"] <= max_y)
+                if type_values is not None:
+                    type_codes = [code for code, value in enumerate(enums["type"]) if value in type_values]
+                    keep &= np.isin(columns["type"], type_codes)
+
+                selected = np.flatnonzero(keep)
+                locations = location_class.import_rows(columns, enums, strings, selected)
+                loaded.extend(zip(columns["order"][selected].tolist(), locations))
+
+            # Restore the saved location order
+            loaded.sort(key=lambda pair: pair[0])
+            self.clear_locations()
+            for _, location in loaded:
+                self._add_to_collections(location)
+
+            self.set_next_ids(header.get("next_ids", {}))
+            self.regenerate_spatial_index()
+
+            print(f"Loaded {len(self.locations)} locations from {filepath}")
+            return True
+        except Exception as ex:
+            print(f"Error loading location data: {str(ex)}")
+            return False
+
     def update_world_state(self):
         """Update the world state with the current locations data"""
         if not self.world_state:
@@ -1685,6 +2283,27 @@ class MapLocationManager:
         except Exception:
             return []
 
+    def GetLocationsWithinTravelTime(self, x: float, y: float, days: float,
+                                     travel_speed: float = 1.0) -> List[Dict[str, Any]]:
+        """
+        Unity interface method: Get locations within a number of days of travel from a point
+
+        Args:
+            x: X coordinate
+            y: Y coordinate
+            days: Maximum travel time in days
+            travel_speed: Travel speed multiplier
+
+        Returns:
+            List of dictionaries containing location data plus travel_days, nearest first
+        """
+        result = []
+        for location, travel_days in self.get_locations_within_travel_time(x, y, days, travel_speed):
+            location_data = location.to_dict()
+            location_data["travel_days"] = round(travel_days, 2)
+            result.append(location_data)
+        return result
+
     def GetNearestLocation(self, x: float, y: float, location_type: str = None) -> Dict[str, Any]:
         """
         Unity interface method: Get the nearest location to a point
@@ -1708,6 +2327,49 @@ class MapLocationManager:
         except Exception:
             return {}
 
+    def GetNearestLocations(self, x: float, y: float, count: int, location_types: List[str] = None,
+                            max_distance: float = None) -> List[Dict[str, Any]]:
+        """
+        Unity interface method: Get the nearest locations to a point
+
+        Args:
+            x: X coordinate
+            y: Y coordinate
+            count: Number of locations to return
+            location_types: Optional types of location to find
+            max_distance: Optional maximum distance
+
+        Returns:
+            List of dictionaries containing location data plus distance, nearest first
+        """
+        try:
+            loc_types = [LocationType(location_type) for location_type in location_types] if location_types else None
+            nearest = self.k_nearest(x, y, count, loc_types,
+                                     max_distance if max_distance is not None else float('inf'))
+            return [dict(location.to_dict(), distance=distance) for location, distance in nearest]
+        except Exception:
+            return []
+
+    def GetNearestLocationsBatch(self, points: List[Tuple[float, float]], count: int,
+                                 location_type: str = None) -> List[List[Dict[str, Any]]]:
+        """
+        Unity interface method: Get the nearest locations to each of many points
+
+        Args:
+            points: (x, y) query points
+            count: Number of locations to return per point
+            location_type: Optional type of location to find
+
+        Returns:
+            For each query point, a list of dictionaries containing location data plus distance
+        """
+        try:
+            loc_types = [LocationType(location_type)] if location_type else None
+            return [[dict(location.to_dict(), distance=distance) for location, distance in nearest]
+                    for nearest in self.k_nearest_batch(points, count, loc_types)]
+        except Exception:
+            return []
+
     def GetSettlementsByState(self, state_id: str) -> List[Dict[str, Any]]:
         """
         Unity interface method: Get all settlements in a state
@@ -1748,11 +2410,21 @@ class MapLocationManager:
         Returns:
             List of dictionaries containing POI data
         """
-        if settlement_id in self.settlements:
-            settlement = self.settlements[settlement_id]
-            return [poi.to_dict() for poi in settlement.points_of_interest]
+        return [poi.to_dict() for poi in self.get_points_of_interest_in_settlement(settlement_id)]
 
-        return []
+    def SetSettlementState(self, settlement_id: str, state_id: str, is_capital: bool = False) -> bool:
+        """
+        Unity interface method: Transfer a settlement to another state
+
+        Args:
+            settlement_id: ID of the settlement
+            state_id: ID of the new state
+            is_capital: Whether the settlement becomes the state's capital
+
+        Returns:
+            True if updated, False if the settlement doesn't exist
+        """
+        return self.update_settlement_state(settlement_id, state_id, is_capital)
 
     def CreateNewSettlement(self, name: str, x: float, y: float,
                             location_type: str = "Town", population: int = 0,
@@ -1860,6 +2532,32 @@ class MapLocationManager:
             print(f"Error creating dungeon: {str(ex)}")
             return ""
 
+    def MoveLocation(self, location_id: str, x: float, y: float) -> bool:
+        """
+        Unity interface method: Move a location
+
+        Args:
+            location_id: ID of the location
+            x: New X coordinate
+            y: New Y coordinate
+
+        Returns:
+            True if moved, False if the location doesn't exist
+        """
+        return self.move_location(location_id, x, y)
+
+    def RemoveLocation(self, location_id: str) -> bool:
+        """
+        Unity interface method: Remove a location
+
+        Args:
+            location_id: ID of the location
+
+        Returns:
+            True if removed, False if the location doesn't exist
+        """
+        return self.remove_location(location_id)
+
     def PopulateSettlementWithPOIs(self, settlement_id: str) -> List[str]:
         """
         Unity interface method: Populate a settlement with points of interest
@@ -1889,7 +2587,8 @@ class MapLocationManager:
 
     def SaveLocationsToFile(self, filepath: str) -> bool:
         """
-        Unity interface method: Save location data to a file
+        Unity interface method: Save location data to a file, as JSON Lines for a .jsonl
+        path, in the binary column format for a .mloc path, and as JSON otherwise
 
         Args:
             filepath: Path to save file
@@ -1897,11 +2596,17 @@ class MapLocationManager:
         Returns:
             True if successful, False otherwise
         """
+        extension = os.path.splitext(filepath)[1].lower()
+        if extension == ".jsonl":
+            return self.save_to_jsonl(filepath)
+        if extension == ".mloc":
+            return self.save_to_binary(filepath)
         return self.save_to_json(filepath)
 
     def LoadLocationsFromFile(self, filepath: str) -> bool:
         """
-        Unity interface method: Load location data from a file
+        Unity interface method: Load location data from a file, in the format given by its
+        extension as for SaveLocationsToFile
 
         Args:
             filepath: Path to load file
@@ -1909,8 +2614,41 @@ class MapLocationManager:
         Returns:
             True if successful, False otherwise
         """
+        extension = os.path.splitext(filepath)[1].lower()
+        if extension == ".jsonl":
+            return self.load_from_jsonl(filepath)
+        if extension == ".mloc":
+            return self.load_from_binary(filepath)
         return self.load_from_json(filepath)
 
+    def LoadLocationsInBounds(self, filepath: str, min_x: float, min_y: float, max_x: float, max_y: float,
+                              location_types: List[str] = None) -> bool:
+        """
+        Unity interface method: Load only the locations within a rectangle from a .jsonl or
+        .mloc file
+
+        Args:
+            filepath: Path to load file
+            min_x: Minimum X coordinate
+            min_y: Minimum Y coordinate
+            max_x: Maximum X coordinate
+            max_y: Maximum Y coordinate
+            location_types: Optional location type names to restrict the load to
+
+        Returns:
+            True if successful, False otherwise
+        """
+        bounds = (min_x, min_y, max_x, max_y)
+        try:
+            types = [LocationType(location_type) for location_type in location_types] if location_types else None
+        except ValueError:
+            print(f"Invalid location type in: {location_types}")
+            return False
+
+        if os.path.splitext(filepath)[1].lower() == ".mloc":
+            return self.load_from_binary(filepath, bounds, types)
+        return self.load_from_jsonl(filepath, bounds, types)
+
     def GenerateAllSettlements(self) -> int:
         """
         Unity interface method: Generate settlements for all political entities
@@ -1921,4 +2659,18 @@ class MapLocationManager:
         initial_count = len(self.settlements)
         self.generate_settlements_from_political_entities()
         return len(self.settlements) - initial_count
+
+    def GenerateAllSettlementsSeeded(self, seed: int, workers: int = 0) -> int:
+        """
+        Unity interface method: Generate settlements for all political entities reproducibly,
+        across worker processes
+
+        Args:
+            seed: Base seed; the same seed gives the same settlements for any worker count
+            workers: Number of worker processes (0 for the CPU count)
+
+        Returns:
+            Number of settlements generated
+        """
+        return self.generate_settlements_parallel(seed, workers or None)
     # endregion
\ No newline at end of file
@@ -0,0 +1,537 @@
+"""
+Columnar storage for location attributes.
+
+Each location object is a lightweight proxy holding only its row number in a
+LocationStore. Numeric and flag attributes live in NumPy arrays. Repetitive
+strings (and other hashable values such as None) are interned into a shared
+value table and stored as int32 indexes, while mostly-unique text such as names
+is packed as UTF-8 into one buffer per column. Enums are stored as uint8 member
+codes, and lists are kept in sparse per-column dicts that only hold rows whose
+list was used.
+
+Stores can export and import rows column by column, which together with the
+column file helpers at the end of the module gives a compact binary format.
+"""
+
+import json
+import os
+import struct
+import sys
+from contextlib import contextmanager
+from enum import Enum
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Type
+
+import numpy as np
+
+
+class StoreColumn:
+    """
+    Descriptor for a location attribute stored in a column of the class's LocationStore.
+
+    Use the constructors (number, integer, flag, string, text, enum, list_value) to declare
+    columns in the class body of a StoredRecord subclass; each returns the descriptor
+    subclass for its kind of column. Assigning an empty list to a list column clears it
+    rather than storing that list object.
+    """
+
+    FLOAT = "float"
+    INT = "int"
+    BOOL = "bool"
+    STRING = "string"
+    TEXT = "text"
+    ENUM = "enum"
+    LIST = "list"
+
+    def __init__(self, kind: str, default: Any = None, enum_type: Optional[Type[Enum]] = None):
+        self.kind = kind
+        self.default = default
+        self.enum_members: List[Enum] = list(enum_type) if enum_type else []
+        self.enum_codes: Dict[Enum, int] = {member: code for code, member in enumerate(self.enum_members)}
+        self.name = ""
+
+    @classmethod
+    def number(cls, default: float = 0.0) -> 'StoreColumn':
+        return _ScalarColumn(cls.FLOAT, float(default))
+
+    @classmethod
+    def integer(cls, default: int = 0) -> 'StoreColumn':
+        return _ScalarColumn(cls.INT, int(default))
+
+    @classmethod
+    def flag(cls, default: bool = False) -> 'StoreColumn':
+        return _ScalarColumn(cls.BOOL, bool(default))
+
+    @classmethod
+    def string(cls, default: Hashable = "") -> 'StoreColumn':
+        return _StringColumn(cls.STRING, default)
+
+    @classmethod
+    def text(cls) -> 'StoreColumn':
+        """String column for mostly-unique values; defaults to the empty string"""
+        return _TextColumn(cls.TEXT, "")
+
+    @classmethod
+    def enum(cls, enum_type: Type[Enum], default: Enum) -> 'StoreColumn':
+        return _EnumColumn(cls.ENUM, default, enum_type)
+
+    @classmethod
+    def list_value(cls) -> 'StoreColumn':
+        return _ListColumn(cls.LIST)
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    @property
+    def dtype(self):
+        # Text columns keep each row's offset into the column's buffer
+        return {self.FLOAT: np.float64, self.INT: np.int32, self.BOOL: np.bool_,
+                self.STRING: np.int32, self.TEXT: np.int64, self.ENUM: np.uint8}.get(self.kind)
+
+    def encode_default(self, store: 'LocationStore'):
+        """Get the array value new rows start with"""
+        if self.kind == self.STRING:
+            return store.intern(self.default)
+        if self.kind == self.ENUM:
+            return self.enum_codes[self.default]
+        if self.kind == self.TEXT:
+            return 0
+        return self.default
+
+
+class _ScalarColumn(StoreColumn):
+    def __get__(self, record, owner):
+        if record is None:
+            return self
+        return owner.store.arrays[self.name].item(record._row)
+
+    def __set__(self, record, value):
+        type(record).store.arrays[self.name][record._row] = value
+
+
+class _StringColumn(StoreColumn):
+    def __get__(self, record, owner):
+        if record is None:
+            return self
+        store = owner.store
+        return store.values[store.arrays[self.name].item(record._row)]
+
+    def __set__(self, record, value):
+        store = type(record).store
+        store.arrays[self.name][record._row] = store.intern(value)
+
+
+class _TextColumn(StoreColumn):
+    def __get__(self, record, owner):
+        if record is None:
+            return self
+        return owner.store.get_text(self.name, record._row)
+
+    def __set__(self, record, value):
+        type(record).store.set_text(self.name, record._row, value)
+
+
+class _EnumColumn(StoreColumn):
+    def __get__(self, record, owner):
+        if record is None:
+            return self
+        return self.enum_members[owner.store.arrays[self.name].item(record._row)]
+
+    def __set__(self, record, value):
+        type(record).store.arrays[self.name][record._row] = self.enum_codes[value]
+
+
+class _ListColumn(StoreColumn):
+    def __get__(self, record, owner):
+        if record is None:
+            return self
+
+        # Materialize the list on first access so in-place changes stick
+        rows = owner.store.lists[self.name]
+        value = rows.get(record._row)
+        if value is None:
+            value = rows[record._row] = []
+        return value
+
+    def __set__(self, record, value):
+        rows = type(record).store.lists[self.name]
+        if value:
+            rows[record._row] = value
+        else:
+            rows.pop(record._row, None)
+
+
+class LocationStore:
+    """
+    Growable column arrays for one StoredRecord class.
+
+    Rows of released records go on a free list and are reused. The interned value
+    table only grows, so it holds every distinct string ever stored. Text buffers are
+    compacted once overwritten or released text takes up half of them.
+    """
+
+    INITIAL_CAPACITY = 256
+
+    def __init__(self, columns: List[StoreColumn]):
+        self.columns: Dict[str, StoreColumn] = {column.name: column for column in columns}
+
+        # Interned values; index 0 is the empty string
+        self.values: List[Hashable] = [""]
+        self.value_codes: Dict[Hashable, int] = {"": 0}
+
+        self.capacity = self.INITIAL_CAPACITY
+        self.row_count = 0
+        self.free_rows: List[int] = []
+
+        self.defaults: Dict[str, Any] = {}
+        self.arrays: Dict[str, np.ndarray] = {}
+        self.lists: Dict[str, Dict[int, list]] = {}
+
+        # Text columns: UTF-8 buffer, per-row byte lengths (offsets are in arrays) and unused bytes
+        self.text_buffers: Dict[str, bytearray] = {}
+        self.text_lengths: Dict[str, np.ndarray] = {}
+        self.text_garbage: Dict[str, int] = {}
+
+        for name, column in self.columns.items():
+            if column.kind == StoreColumn.LIST:
+                self.lists[name] = {}
+                continue
+
+            self.defaults[name] = column.encode_default(self)
+            self.arrays[name] = np.full(self.capacity, self.defaults[name], dtype=column.dtype)
+            if column.kind == StoreColumn.TEXT:
+                self.text_buffers[name] = bytearray()
+                self.text_lengths[name] = np.zeros(self.capacity, dtype=np.int32)
+                self.text_garbage[name] = 0
+
+    def __len__(self) -> int:
+        return self.row_count - len(self.free_rows)
+
+    def intern(self, value: Hashable) -> int:
+        """Get the code for a value, adding it to the value table if needed"""
+        code = self.value_codes.get(value)
+        if code is None:
+            code = self.value_codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def get_text(self, name: str, row: int) -> str:
+        offset = self.arrays[name].item(row)
+        return self.text_buffers[name][offset:offset + self.text_lengths[name].item(row)].decode()
+
+    def set_text(self, name: str, row: int, value: str):
+        buffer = self.text_buffers[name]
+        lengths = self.text_lengths[name]
+        encoded = value.encode()
+        self.text_garbage[name] += int(lengths[row])
+        self.arrays[name][row] = len(buffer)
+        lengths[row] = len(encoded)
+        buffer += encoded
+        if self.text_garbage[name] * 2 > len(buffer):
+            self._compact_text(name)
+
+    def allocate(self) -> int:
+        """Get a row holding default values for every column"""
+        if self.free_rows:
+            row = self.free_rows.pop()
+            for name, default in self.defaults.items():
+                self.arrays[name][row] = default
+            for name, lengths in self.text_lengths.items():
+                self.text_garbage[name] += int(lengths[row])
+                lengths[row] = 0
+            return row
+
+        if self.row_count == self.capacity:
+            self._grow()
+        row = self.row_count
+        self.row_count += 1
+        return row
+
+    def release(self, row: int):
+        """Return a row to the free list"""
+        for rows in self.lists.values():
+            rows.pop(row, None)
+        self.free_rows.append(row)
+
+    def peek_list(self, name: str, row: int) -> list:
+        """Get a list column value without storing an empty list for rows that never used it"""
+        value = self.lists[name].get(row)
+        return value if value is not None else []
+
+    def column(self, name: str, rows) -> np.ndarray:
+        """Get the raw values of a numeric, flag or code column for an array of rows"""
+        return self.arrays[name][rows]
+
+    def memory_usage(self) -> int:
+        """Approximate bytes used by the arrays, value table and list dicts"""
+        total = sum(array.nbytes for array in self.arrays.values())
+        total += sum(lengths.nbytes for lengths in self.text_lengths.values())
+        total += sum(len(buffer) for buffer in self.text_buffers.values())
+        total += sys.getsizeof(self.values) + sys.getsizeof(self.value_codes)
+        total += sum(sys.getsizeof(value) for value in self.values)
+        for rows in self.lists.values():
+            total += sys.getsizeof(rows) + sum(sys.getsizeof(value) for value in rows.values())
+        return total
+
+    def export_rows(self, rows: np.ndarray, strings: 'StringTableWriter',
+                    skip_columns: Tuple[str, ...] = ()) -> Tuple[Dict[str, np.ndarray], Dict[str, List[Any]]]:
+        """
+        Get the values of some rows as one array per column, for saving.
+
+        Args:
+            rows: Rows to export
+            strings: String table that string and text values (and lists, as JSON) are coded into
+            skip_columns: Columns to leave out
+
+        Returns:
+            The arrays, and the member values of each enum column so codes survive enum changes.
+            A list column is exported as "<name>.rows" (positions in rows of non-empty lists)
+            and "<name>.values" (string codes of the lists as JSON).
+        """
+        arrays: Dict[str, np.ndarray] = {}
+        enums: Dict[str, List[Any]] = {}
+        for name, column in self.columns.items():
+            if name in skip_columns:
+                continue
+
+            if column.kind == StoreColumn.LIST:
+                row_lists = self.lists[name]
+                used = [(index, row_lists[row]) for index, row in enumerate(rows.tolist()) if row_lists.get(row)]
+                arrays[f"{name}.rows"] = np.array([index for index, _ in used], dtype=np.int32)
+                arrays[f"{name}.values"] = np.array([strings.code(json.dumps(value)) for _, value in used],
+                                                    dtype=np.int32)
+            elif column.kind == StoreColumn.STRING:
+                value_codes = np.array([strings.code(value) for value in self.values], dtype=np.int32)
+                arrays[name] = value_codes[self.arrays[name][rows]]
+            elif column.kind == StoreColumn.TEXT:
+                arrays[name] = np.array([strings.code(self.get_text(name, row)) for row in rows.tolist()],
+                                        dtype=np.int32)
+            else:
+                arrays[name] = self.arrays[name][rows]
+                if column.kind == StoreColumn.ENUM:
+                    enums[name] = [member.value for member in column.enum_members]
+        return arrays, enums
+
+    def _grow(self):
+        old_capacity = self.capacity
+        self.capacity *= 2
+        for name, array in self.arrays.items():
+            grown = np.full(self.capacity, self.defaults[name], dtype=array.dtype)
+            grown[:old_capacity] = array
+            self.arrays[name] = grown
+        for name, lengths in self.text_lengths.items():
+            grown = np.zeros(self.capacity, dtype=np.int32)
+            grown[:old_capacity] = lengths
+            self.text_lengths[name] = grown
+
+    def _compact_text(self, name: str):
+        # Rewrite the buffer with only the bytes rows still point at
+        buffer = self.text_buffers[name]
+        offsets = self.arrays[name]
+        lengths = self.text_lengths[name]
+        compacted = bytearray()
+        for row in np.flatnonzero(lengths[:self.row_count]).tolist():
+            offset = offsets[row]
+            offsets[row] = len(compacted)
+            compacted += buffer[offset:offset + lengths[row]]
+        self.text_buffers[name] = compacted
+        self.text_garbage[name] = 0
+
+
+class StoredRecord:
+    """
+    Base class for objects whose attributes live in a per-class LocationStore.
+
+    Each subclass gets its own store with the StoreColumn attributes declared on it
+    and its bases. Instances only hold their row number; the row is released when
+    the instance is garbage collected. Pickling and copying go through to_dict and
+    from_dict, so copies get rows of their own.
+    """
+
+    __slots__ = ('_row',)
+
+    store: LocationStore = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        columns = {}
+        for klass in reversed(cls.__mro__):
+            for name, attribute in vars(klass).items():
+                if isinstance(attribute, StoreColumn):
+                    columns[name] = attribute
+        cls.store = LocationStore(list(columns.values()))
+
+    def __init__(self):
+        self._row = type(self).store.allocate()
+
+    def __del__(self):
+        try:
+            type(self).store.release(self._row)
+        except AttributeError:
+            # Never got a row (failed __init__) or the interpreter is shutting down
+            pass
+
+    def __reduce__(self):
+        return type(self).from_dict, (self.to_dict(),)
+
+    def peek_list(self, name: str) -> list:
+        """Get a list attribute without storing an empty list for it"""
+        return type(self).store.peek_list(name, self._row)
+
+    @classmethod
+    def import_rows(cls, arrays: Dict[str, np.ndarray], enums: Dict[str, List[Any]],
+                    strings: 'StringTableReader', selected: np.ndarray) -> List['StoredRecord']:
+        """
+        Create records from arrays written by LocationStore.export_rows.
+
+        Args:
+            arrays: Exported arrays; columns missing from them keep their defaults
+            enums: Enum member values the exported enum codes refer to
+            strings: String table the exported strings were coded into
+            selected: Indexes of the exported rows to create records for
+
+        Returns:
+            The new records, in the order of selected
+        """
+        store = cls.store
+        rows = np.array([store.allocate() for _ in range(len(selected))], dtype=np.int64)
+        new_rows = dict(zip(selected.tolist(), rows.tolist()))
+
+        for name, column in store.columns.items():
+            if column.kind == StoreColumn.LIST:
+                if f"{name}.rows" not in arrays:
+                    continue
+                row_lists = store.lists[name]
+                for index, code in zip(arrays[f"{name}.rows"].tolist(), arrays[f"{name}.values"].tolist()):
+                    if index in new_rows:
+                        row_lists[new_rows[index]] = json.loads(strings.get(code))
+                continue
+
+            if name not in arrays:
+                continue
+            values = arrays[name][selected]
+            if column.kind == StoreColumn.STRING:
+                unique_codes, inverse = np.unique(values, return_inverse=True)
+                store_codes = np.array([store.intern(strings.get(code)) for code in unique_codes.tolist()],
+                                       dtype=np.int32)
+                store.arrays[name][rows] = store_codes[inverse]
+            elif column.kind == StoreColumn.TEXT:
+                for row, code in zip(rows.tolist(), values.tolist()):
+                    value = strings.get(code)
+                    if value:
+                        store.set_text(name, row, value)
+            elif column.kind == StoreColumn.ENUM:
+                enum_type = type(column.default)
+                member_codes = np.array([column.enum_codes[enum_type(value)] for value in enums[name]], dtype=np.uint8)
+                store.arrays[name][rows] = member_codes[values]
+            else:
+                store.arrays[name][rows] = values
+
+        records = []
+        for row in rows.tolist():
+            record = cls.__new__(cls)
+            record._row = row
+            records.append(record)
+        return records
+
+
+class StringTableWriter:
+    """Collects the distinct strings written to a column file, giving each an int32 code (-1 for None)"""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def to_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the UTF-8 bytes of all strings and the start offset of each (plus the end offset)"""
+        encoded = [value.encode() for value in self.strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(data) for data in encoded])
+        return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+class StringTableReader:
+    """Decodes codes written by StringTableWriter"""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets.tolist()
+
+    def get(self, code: int) -> Optional[str]:
+        if code < 0:
+            return None
+        return self.data[self.offsets[code]:self.offsets[code + 1]].tobytes().decode()
+
+
+COLUMN_FILE_MAGIC = b"MAPCOLS1"
+
+
+@contextmanager
+def atomic_open(filepath: str, mode: str = 'w'):
+    """
+    Open a temporary file next to filepath for writing, and move it over filepath only
+    once the block completes, so readers never see a partly written file.
+    """
+    temp_path = f"{filepath}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, mode) as f:
+            yield f
+        os.replace(temp_path, filepath)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def write_column_file(filepath: str, header: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+    """
+    Atomically write named arrays and a JSON header as a column file.
+
+    Layout: magic, little-endian uint64 header length, JSON header (which records each
+    array's dtype, length and offset), then the raw arrays, each 8-byte aligned.
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = [array.dtype.str, int(array.size), offset]
+        offset += array.nbytes + (-array.nbytes) % 8
+
+    header_bytes = json.dumps(dict(header, arrays=layout)).encode()
+    header_bytes += b" " * ((-len(header_bytes)) % 8)
+
+    with atomic_open(filepath, 'wb') as f:
+        f.write(COLUMN_FILE_MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for array in arrays.values():
+            f.write(array.tobytes())
+            f.write(b"\0" * ((-array.nbytes) % 8))
+
+
+def read_column_file(filepath: str) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """
+    Memory-map a column file written by write_column_file.
+
+    Returns:
+        The header and read-only arrays backed by the mapping, so only the parts of
+        the file that are used get read
+    """
+    with open(filepath, 'rb') as f:
+        if f.read(len(COLUMN_FILE_MAGIC)) != COLUMN_FILE_MAGIC:
+            raise ValueError(f"{filepath} is not a column file")
+        header_length, = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_length))
+
+    data_start = len(COLUMN_FILE_MAGIC) + 8 + header_length
+    mapped = np.memmap(filepath, dtype=np.uint8, mode='r')
+    arrays = {name: np.frombuffer(mapped, dtype=np.dtype(dtype), count=count, offset=data_start + offset)
+              for name, (dtype, count, offset) in header.pop("arrays").items()}
+    return header, arrays
@@ -0,0 +1,1314 @@
+"""
+Pathfinding engines for the MapGrid terrain grid.
+
+Cells are addressed by integer keys (y * width + x) rather than GridPosition
+objects so the search loops only touch ints, floats and flat lists.
+"""
+
+import heapq
+import math
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Cost multiplier for diagonal steps (matches the grid's movement rules)
+DIAGONAL_COST = 1.414
+
+# Neighbor offsets as (dx, dy, step multiplier)
+NEIGHBOR_OFFSETS = (
+    (-1, -1, DIAGONAL_COST), (0, -1, 1.0), (1, -1, DIAGONAL_COST),
+    (-1, 0, 1.0), (1, 0, 1.0),
+    (-1, 1, DIAGONAL_COST), (0, 1, 1.0), (1, 1, DIAGONAL_COST)
+)
+
+INF = math.inf
+
+
+def octile_distance(dx: int, dy: int, min_step_cost: float = 1.0) -> float:
+    """
+    Octile distance scaled by the cheapest step cost on the grid.
+
+    Using the same 1.414 diagonal factor as the movement rules keeps the
+    heuristic consistent, so A* never needs to reopen a closed cell.
+    """
+    dx = abs(dx)
+    dy = abs(dy)
+    if dx > dy:
+        return min_step_cost * (dx + (DIAGONAL_COST - 1.0) * dy)
+    return min_step_cost * (dy + (DIAGONAL_COST - 1.0) * dx)
+
+
+def reconstruct_key_path(parents: Dict[int, int], end_key: int) -> List[int]:
+    """Walk the parent links back from the end key and return the path start-to-end"""
+    path = [end_key]
+    key = parents[end_key]
+    while key != -1:
+        path.append(key)
+        key = parents[key]
+    path.reverse()
+    return path
+
+
+class AStarEngine:
+    """
+    Binary-heap A* over a MapGrid.
+
+    Uses lazy deletion instead of decrease-key: improved cells are pushed again
+    and stale heap entries are skipped when popped.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+
+        # Statistics from the last search
+        self.nodes_expanded: int = 0
+
+    def find_path(self, start_key: int, end_key: int,
+                  bounds: Optional[Tuple[int, int, int, int]] = None) -> List[int]:
+        """
+        Find the cheapest path between two cell keys, or [] if unreachable.
+
+        Args:
+            start_key: Cell key of the start
+            end_key: Cell key of the goal
+            bounds: Optional (min_x, min_y, max_x, max_y) box, max exclusive, that the path must stay in
+        """
+        grid = self.grid
+        width = grid.width
+        min_x, min_y, max_x, max_y = bounds if bounds else (0, 0, width, grid.height)
+        costs = grid.get_step_costs()
+        min_cost = grid.get_min_step_cost()
+        diagonal_extra = DIAGONAL_COST - 1.0
+
+        self.nodes_expanded = 0
+
+        if costs[start_key] == INF or costs[end_key] == INF:
+            return []
+
+        end_x = end_key % width
+        end_y = end_key // width
+
+        g_costs: Dict[int, float] = {start_key: 0.0}
+        parents: Dict[int, int] = {start_key: -1}
+        closed: Set[int] = set()
+
+        start_h = octile_distance(start_key % width - end_x, start_key // width - end_y, min_cost)
+        # Heap entries are (f, h, key); ties on f prefer the cell closer to the goal
+        open_heap = [(start_h, start_h, start_key)]
+
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+
+        while open_heap:
+            _, _, key = heappop(open_heap)
+            if key in closed:
+                continue  # Stale entry
+
+            if key == end_key:
+                return reconstruct_key_path(parents, key)
+
+            closed.add(key)
+            self.nodes_expanded += 1
+
+            base_g = g_costs[key]
+            x = key % width
+            y = key // width
+
+            for dx, dy, step in NEIGHBOR_OFFSETS:
+                nx = x + dx
+                ny = y + dy
+                if nx < min_x or ny < min_y or nx >= max_x or ny >= max_y:
+                    continue
+
+                neighbor_key = ny * width + nx
+                cell_cost = costs[neighbor_key]
+                if cell_cost == INF or neighbor_key in closed:
+                    continue
+
+                g = base_g + cell_cost * step
+                if g >= g_costs.get(neighbor_key, INF):
+                    continue
+
+                g_costs[neighbor_key] = g
+                parents[neighbor_key] = key
+
+                hx = nx - end_x if nx > end_x else end_x - nx
+                hy = ny - end_y if ny > end_y else end_y - ny
+                if hx > hy:
+                    h = min_cost * (hx + diagonal_extra * hy)
+                else:
+                    h = min_cost * (hy + diagonal_extra * hx)
+
+                heappush(open_heap, (g + h, h, neighbor_key))
+
+        # No path found
+        return []
+
+
+def jump_pass_flags(costs: np.ndarray) -> np.ndarray:
+    """
+    Per-cell bit flags telling a jump point search which moves can pass through a cell.
+
+    Bit i is set when a move in direction NEIGHBOR_OFFSETS[i] that enters the cell leaves
+    it with no forced neighbors: every other neighbor is reached at least as cheaply by a
+    path that doesn't go through the cell. On uniform-cost terrain this reduces to the usual
+    jump point search rules (only obstacles force neighbors); where costs vary, cheaper
+    detours next to the cell force it to be expanded.
+
+    Args:
+        costs: (height, width) step costs, inf for impassable cells
+
+    Returns:
+        (height, width) uint8 array of flags
+    """
+    height, width = costs.shape
+    padded = np.pad(costs, 1, constant_values=INF)
+
+    def shifted(dx: int, dy: int) -> np.ndarray:
+        return padded[1 + dy:1 + dy + height, 1 + dx:1 + dx + width]
+
+    flags = np.zeros((height, width), dtype=np.uint8)
+    for bit, (dx, dy, _) in enumerate(NEIGHBOR_OFFSETS):
+        can_pass = np.ones((height, width), dtype=bool)
+        if dx == 0 or dy == 0:
+            # Straight move: the side cells and the diagonals ahead of them must be reachable
+            # at least as cheaply without stepping through this cell
+            for side in (1, -1):
+                side_x, side_y = abs(dy) * side, abs(dx) * side
+                side_costs = shifted(side_x, side_y)
+                ahead_costs = shifted(dx + side_x, dy + side_y)
+                can_pass &= np.isinf(side_costs) | (DIAGONAL_COST * side_costs <= costs + side_costs)
+                can_pass &= np.isinf(ahead_costs) | (np.isfinite(side_costs) & (
+                    DIAGONAL_COST * side_costs + ahead_costs <= costs + DIAGONAL_COST * ahead_costs))
+        else:
+            # Diagonal move: the cells diagonally behind must be strictly cheaper to reach
+            # around this cell, since paths through it take the diagonal step first
+            for (behind_x, behind_y), (target_x, target_y) in (((-dx, 0), (-dx, dy)), ((0, -dy), (dx, -dy))):
+                behind_costs = shifted(behind_x, behind_y)
+                target_costs = shifted(target_x, target_y)
+                can_pass &= np.isinf(target_costs) | (np.isfinite(behind_costs) &
+                                                      (behind_costs < DIAGONAL_COST * costs))
+        flags |= can_pass.astype(np.uint8) << bit
+
+    return flags
+
+
+def straight_jump_steps(costs: np.ndarray, flags: np.ndarray, direction: int) -> np.ndarray:
+    """
+    Where a straight jump from each cell stops, for jump point search.
+
+    Args:
+        costs: (height, width) step costs, inf for impassable cells
+        flags: Matching jump_pass_flags
+        direction: Index of a straight direction in NEIGHBOR_OFFSETS
+
+    Returns:
+        (height, width) int64 array: k > 0 if the jump reaches a jump point k steps away,
+        -k if it runs into an obstacle or the grid edge at step k
+    """
+    dx, dy, _ = NEIGHBOR_OFFSETS[direction]
+    stops = np.isinf(costs) | ((flags >> direction & 1) == 0)
+
+    # Orient the arrays so the jump runs along increasing column index
+    def orient(values: np.ndarray) -> np.ndarray:
+        if dy:
+            values = values.T
+        return values[:, ::-1] if dx < 0 or dy < 0 else values
+
+    oriented_stops = orient(stops)
+    oriented_blocked = orient(np.isinf(costs))
+    length = oriented_stops.shape[1]
+    columns = np.arange(length)
+
+    # First stop strictly past each column (length for the grid edge)
+    stop_columns = np.where(oriented_stops, columns, length)
+    next_stop = np.minimum.accumulate(stop_columns[:, ::-1], axis=1)[:, ::-1]
+    first_stop = np.concatenate((next_stop[:, 1:], np.full((next_stop.shape[0], 1), length)), axis=1)
+
+    steps = first_stop - columns
+    rows = np.arange(oriented_stops.shape[0])[:, None]
+    blocked = (first_stop == length) | oriented_blocked[rows, np.minimum(first_stop, length - 1)]
+    result = np.where(blocked, -steps, steps)
+
+    # Undo the orientation
+    if dx < 0 or dy < 0:
+        result = result[:, ::-1]
+    return result.T if dy else result
+
+
+# Directions a jump point search continues in after passing through a cell without forced
+# neighbors, by the index of the direction it arrived in: straight moves carry on, diagonal
+# moves also branch into their two straight components
+NATURAL_DIRECTIONS = tuple(
+    (direction,) if dx == 0 or dy == 0 else
+    (direction, NEIGHBOR_OFFSETS.index((dx, 0, 1.0)), NEIGHBOR_OFFSETS.index((0, dy, 1.0)))
+    for direction, (dx, dy, _) in enumerate(NEIGHBOR_OFFSETS)
+)
+ALL_DIRECTIONS = tuple(range(len(NEIGHBOR_OFFSETS)))
+STRAIGHT_DIRECTIONS = tuple(direction for direction, (dx, dy, _) in enumerate(NEIGHBOR_OFFSETS)
+                            if dx == 0 or dy == 0)
+
+
+class JumpPointEngine:
+    """
+    Jump point search (JPS) over a MapGrid, for terrain with large uniform-cost areas.
+
+    Instead of pushing every neighbor, the search jumps in straight and diagonal lines
+    until it reaches a cell with a forced neighbor (see jump_pass_flags) or the goal, and
+    only those jump points go on the heap. Across uniform-cost areas this skips the many
+    equally cheap symmetric paths that A* expands one by one; where costs vary from cell
+    to cell most cells have forced neighbors and the search degrades to plain A*. Paths
+    are optimal, the same cost as AStarEngine's.
+
+    Where every straight jump stops is precomputed (straight_jump_steps), so straight
+    jumps, and the straight checks made at each step of a diagonal jump, are O(1).
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+
+        # Flat per-cell jump_pass_flags and straight_jump_steps by direction (built lazily,
+        # patched as cells change)
+        self._pass_flags: Optional[List[int]] = None
+        self._jump_steps: Dict[int, List[int]] = {}
+
+        # Statistics from the last search
+        self.nodes_expanded: int = 0
+
+    def build(self):
+        """Build the pass flags and straight jump tables"""
+        grid = self.grid
+        costs = np.array(grid.get_step_costs(), dtype=np.float64).reshape(grid.height, grid.width)
+        flags = jump_pass_flags(costs)
+        self._pass_flags = flags.ravel().tolist()
+        self._jump_steps = {direction: straight_jump_steps(costs, flags, direction).ravel().tolist()
+                            for direction in STRAIGHT_DIRECTIONS}
+
+    def invalidate(self):
+        """Drop the jump tables so they are rebuilt on the next search"""
+        self._pass_flags = None
+        self._jump_steps = {}
+
+    def mark_dirty(self, x: int, y: int):
+        """Recompute the jump tables around a changed cell"""
+        if self._pass_flags is None:
+            return
+
+        grid = self.grid
+        width = grid.width
+        costs = grid.get_step_costs()
+
+        # Flags of the changed cell and its neighbors depend on cells up to two steps away
+        min_x, max_x = max(x - 2, 0), min(x + 3, width)
+        min_y, max_y = max(y - 2, 0), min(y + 3, grid.height)
+        window = np.where(grid.passable[min_y:max_y, min_x:max_x],
+                          grid.movement_costs[min_y:max_y, min_x:max_x].astype(np.float64), INF)
+        flags = jump_pass_flags(window)
+        for cell_y in range(max(y - 1, 0), min(y + 2, grid.height)):
+            for cell_x in range(max(x - 1, 0), min(x + 2, width)):
+                self._pass_flags[cell_y * width + cell_x] = int(flags[cell_y - min_y, cell_x - min_x])
+
+        # Straight jumps along the rows and columns through those cells
+        for direction in STRAIGHT_DIRECTIONS:
+            dx, dy, _ = NEIGHBOR_OFFSETS[direction]
+            if dx:
+                for row in range(max(y - 1, 0), min(y + 2, grid.height)):
+                    line = slice(row * width, (row + 1) * width)
+                    steps = straight_jump_steps(np.array(costs[line], dtype=np.float64)[None, :],
+                                                np.array(self._pass_flags[line], dtype=np.uint8)[None, :], direction)
+                    self._jump_steps[direction][line] = steps.ravel().tolist()
+            else:
+                for column in range(max(x - 1, 0), min(x + 2, width)):
+                    line = slice(column, None, width)
+                    steps = straight_jump_steps(np.array(costs[line], dtype=np.float64)[:, None],
+                                                np.array(self._pass_flags[line], dtype=np.uint8)[:, None], direction)
+                    self._jump_steps[direction][line] = steps.ravel().tolist()
+
+    def find_path(self, start_key: int, end_key: int) -> List[int]:
+        """Find the cheapest path between two cell keys, or [] if unreachable"""
+        grid = self.grid
+        width = grid.width
+        costs = grid.get_step_costs()
+        if self._pass_flags is None:
+            self.build()
+        flags = self._pass_flags
+        min_cost = grid.get_min_step_cost()
+
+        self.nodes_expanded = 0
+
+        if costs[start_key] == INF or costs[end_key] == INF:
+            return []
+
+        end_x = end_key % width
+        end_y = end_key // width
+
+        g_costs: Dict[int, float] = {start_key: 0.0}
+        parents: Dict[int, int] = {start_key: -1}
+        arrival_directions: Dict[int, int] = {start_key: -1}
+        closed: Set[int] = set()
+
+        start_h = octile_distance(start_key % width - end_x, start_key // width - end_y, min_cost)
+        open_heap = [(start_h, start_h, start_key)]
+
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+
+        while open_heap:
+            _, _, key = heappop(open_heap)
+            if key in closed:
+                continue  # Stale entry
+
+            if key == end_key:
+                return self.expand_jump_path(reconstruct_key_path(parents, key))
+
+            closed.add(key)
+            self.nodes_expanded += 1
+
+            base_g = g_costs[key]
+
+            # Prune to the natural directions unless this cell has forced neighbors
+            arrival = arrival_directions[key]
+            if arrival >= 0 and flags[key] >> arrival & 1:
+                directions = NATURAL_DIRECTIONS[arrival]
+            else:
+                directions = ALL_DIRECTIONS
+
+            for direction in directions:
+                jump_key, jump_cost = self.jump(key, direction, end_key)
+                if jump_key < 0 or jump_key in closed:
+                    continue
+
+                g = base_g + jump_cost
+                if g >= g_costs.get(jump_key, INF):
+                    continue
+
+                g_costs[jump_key] = g
+                parents[jump_key] = key
+                arrival_directions[jump_key] = direction
+
+                h = octile_distance(jump_key % width - end_x, jump_key // width - end_y, min_cost)
+                heappush(open_heap, (g + h, h, jump_key))
+
+        # No path found
+        return []
+
+    def straight_jump(self, key: int, direction: int, end_key: int) -> int:
+        """
+        Steps from a cell to the jump point a straight jump reaches (the goal counts as one),
+        or -1 if the jump runs into an obstacle or the grid edge first
+        """
+        width = self.grid.width
+        steps = self._jump_steps[direction][key]
+        reach = steps if steps > 0 else -steps - 1
+
+        # Stop early at the goal if it lies on the line within reach
+        dx, dy, _ = NEIGHBOR_OFFSETS[direction]
+        offset = end_key - key
+        if dy == 0:
+            if end_key // width == key // width and 0 < offset * dx <= reach:
+                return offset * dx
+        elif offset % width == 0 and 0 < offset // width * dy <= reach:
+            return offset // width * dy
+
+        return steps if steps > 0 else -1
+
+    def jump(self, key: int, direction: int, end_key: int) -> Tuple[int, float]:
+        """
+        Move from a cell in one direction until reaching a jump point.
+
+        Returns:
+            (jump_key, cost): the jump point and the cost of getting there, or (-1, 0.0)
+            if the line runs into an obstacle or the grid edge first
+        """
+        grid = self.grid
+        width = grid.width
+        costs = grid.get_step_costs()
+        dx, dy, step = NEIGHBOR_OFFSETS[direction]
+
+        if dx == 0 or dy == 0:
+            steps = self.straight_jump(key, direction, end_key)
+            if steps < 0:
+                return -1, 0.0
+            stride = dx + dy * width
+            jump_key = key + steps * stride
+            if stride > 0:
+                return jump_key, sum(costs[key + stride:jump_key + 1:stride])
+            return jump_key, sum(costs[jump_key:key:-stride])
+
+        # Diagonal: step one cell at a time, stopping wherever a straight component finds a jump point
+        flags = self._pass_flags
+        bit = 1 << direction
+        horizontal = NEIGHBOR_OFFSETS.index((dx, 0, 1.0))
+        vertical = NEIGHBOR_OFFSETS.index((0, dy, 1.0))
+        height = grid.height
+        x = key % width
+        y = key // width
+
+        cost = 0.0
+        while True:
+            x += dx
+            y += dy
+            if x < 0 or y < 0 or x >= width or y >= height:
+                return -1, 0.0
+
+            key = y * width + x
+            cell_cost = costs[key]
+            if cell_cost == INF:
+                return -1, 0.0
+
+            cost += cell_cost * step
+            if key == end_key or not flags[key] & bit:
+                return key, cost
+
+            if self.straight_jump(key, horizontal, end_key) >= 0 or self.straight_jump(key, vertical, end_key) >= 0:
+                return key, cost
+
+    def expand_jump_path(self, jump_path: List[int]) -> List[int]:
+        """Fill in the cells between consecutive jump points, which always lie on a straight or diagonal line"""
+        width = self.grid.width
+        path = jump_path[:1]
+        for from_key, to_key in zip(jump_path, jump_path[1:]):
+            x, y = from_key % width, from_key // width
+            to_x, to_y = to_key % width, to_key // width
+            dx = (to_x > x) - (to_x < x)
+            dy = (to_y > y) - (to_y < y)
+            while x != to_x or y != to_y:
+                x += dx
+                y += dy
+                path.append(y * width + x)
+        return path
+
+
+def bounded_dijkstra(costs: List[float], width: int, source_key: int,
+                     bounds: Tuple[int, int, int, int], reverse: bool = False) -> Dict[int, float]:
+    """
+    Cheapest cost from a source cell to every reachable cell inside a box.
+
+    Args:
+        costs: Flat per-cell step costs (inf for impassable cells)
+        width: Grid width
+        source_key: Cell key to search from
+        bounds: (min_x, min_y, max_x, max_y) box, max exclusive
+        reverse: Compute the cost of reaching the source from each cell instead
+
+    Returns:
+        Dictionary mapping cell keys to path costs
+    """
+    min_x, min_y, max_x, max_y = bounds
+    distances: Dict[int, float] = {source_key: 0.0}
+    closed: Set[int] = set()
+    open_heap = [(0.0, source_key)]
+
+    while open_heap:
+        distance, key = heapq.heappop(open_heap)
+        if key in closed:
+            continue
+        closed.add(key)
+
+        # Searching backwards, every step into this cell from a neighbor costs this cell
+        leave_cost = costs[key] if reverse else 0.0
+        x = key % width
+        y = key // width
+
+        for dx, dy, step in NEIGHBOR_OFFSETS:
+            nx = x + dx
+            ny = y + dy
+            if nx < min_x or ny < min_y or nx >= max_x or ny >= max_y:
+                continue
+
+            neighbor_key = ny * width + nx
+            cell_cost = costs[neighbor_key]
+            if cell_cost == INF or neighbor_key in closed:
+                continue
+
+            new_distance = distance + (leave_cost if reverse else cell_cost) * step
+            if new_distance < distances.get(neighbor_key, INF):
+                distances[neighbor_key] = new_distance
+                heapq.heappush(open_heap, (new_distance, neighbor_key))
+
+    return distances
+
+
+def dijkstra_field(costs: List[float], width: int, height: int, source_keys: Iterable[int],
+                   max_cost: float = INF) -> np.ndarray:
+    """
+    Cheapest cost from the nearest of several source cells to every cell of the grid.
+
+    Args:
+        costs: Flat per-cell step costs (inf for impassable cells)
+        width: Grid width
+        height: Grid height
+        source_keys: Cell keys to search from, all at cost 0
+        max_cost: Stop expanding cells that cost more than this to reach
+
+    Returns:
+        (height, width) float64 array of path costs, inf where unreached
+    """
+    distances = [INF] * (width * height)
+    open_heap = []
+    for source_key in source_keys:
+        if distances[source_key] != 0.0:
+            distances[source_key] = 0.0
+            open_heap.append((0.0, source_key))
+    heapq.heapify(open_heap)
+
+    while open_heap:
+        distance, key = heapq.heappop(open_heap)
+        if distance > distances[key]:
+            continue
+
+        x = key % width
+        y = key // width
+
+        for dx, dy, step in NEIGHBOR_OFFSETS:
+            nx = x + dx
+            ny = y + dy
+            if nx < 0 or ny < 0 or nx >= width or ny >= height:
+                continue
+
+            neighbor_key = ny * width + nx
+            new_distance = distance + costs[neighbor_key] * step
+            if new_distance < distances[neighbor_key] and new_distance <= max_cost:
+                distances[neighbor_key] = new_distance
+                heapq.heappush(open_heap, (new_distance, neighbor_key))
+
+    return np.array(distances, dtype=np.float64).reshape(height, width)
+
+
+def shortest_path_tree(costs: List[float], width: int, height: int,
+                       source_key: int) -> Tuple[List[float], List[int]]:
+    """
+    Cheapest cost and parent link from a source cell to every reachable cell of the grid.
+
+    Returns:
+        (distances, parents): flat lists indexed by cell key, inf and -1 where unreached;
+        reconstruct_key_path(parents, key) gives the path to any reached cell
+    """
+    distances = [INF] * (width * height)
+    parents = [-1] * (width * height)
+    distances[source_key] = 0.0
+    open_heap = [(0.0, source_key)]
+
+    while open_heap:
+        distance, key = heapq.heappop(open_heap)
+        if distance > distances[key]:
+            continue
+
+        x = key % width
+        y = key // width
+
+        for dx, dy, step in NEIGHBOR_OFFSETS:
+            nx = x + dx
+            ny = y + dy
+            if nx < 0 or ny < 0 or nx >= width or ny >= height:
+                continue
+
+            neighbor_key = ny * width + nx
+            new_distance = distance + costs[neighbor_key] * step
+            if new_distance < distances[neighbor_key]:
+                distances[neighbor_key] = new_distance
+                parents[neighbor_key] = key
+                heapq.heappush(open_heap, (new_distance, neighbor_key))
+
+    return distances, parents
+
+
+class TravelCostField:
+    """
+    Travel costs from a set of source cells to every cell within max_cost.
+
+    Costs are in movement cost units, the same units the A* engine minimizes;
+    calculate_travel_time turns them into hours by dividing by the travel speed.
+    """
+
+    def __init__(self, source_keys: Tuple[int, ...], costs: np.ndarray, max_cost: float):
+        self.source_keys: Tuple[int, ...] = source_keys
+        self.costs: np.ndarray = costs  # (height, width), inf where unreached
+        self.max_cost: float = max_cost
+
+    def covers(self, max_cost: float) -> bool:
+        """Check whether this field is exact up to a cost"""
+        return max_cost <= self.max_cost
+
+    def get_costs_at(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Get the travel cost to many grid positions (inf if unreached or off the grid)"""
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        height, width = self.costs.shape
+        in_bounds = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        return np.where(in_bounds, self.costs[np.where(in_bounds, ys, 0), np.where(in_bounds, xs, 0)], INF)
+
+    def isochrone(self, max_cost: float) -> np.ndarray:
+        """Get a (height, width) bool mask of the cells reachable within a cost"""
+        return self.costs <= max_cost
+
+    def reached_mask(self) -> np.ndarray:
+        """Cells the field reached plus their neighbors, i.e. every cell a terrain change could matter in"""
+        reached = np.isfinite(self.costs)
+        grown = reached.copy()
+        grown[1:, :] |= reached[:-1, :]
+        grown[:-1, :] |= reached[1:, :]
+        grown[:, 1:] |= grown[:, :-1].copy()
+        grown[:, :-1] |= grown[:, 1:].copy()
+        return grown
+
+
+# Grid shared with travel cost matrix worker processes (set by _init_matrix_worker)
+_worker_grid: Optional[Tuple[List[float], int, int]] = None
+
+
+def _init_matrix_worker(costs: List[float], width: int, height: int):
+    global _worker_grid
+    _worker_grid = (costs, width, height)
+
+
+def _matrix_row(source_key: int, target_keys: np.ndarray, max_cost: float) -> np.ndarray:
+    costs, width, height = _worker_grid
+    return dijkstra_field(costs, width, height, [source_key], max_cost).ravel()[target_keys]
+
+
+def travel_cost_matrix(costs: List[float], width: int, height: int, source_keys: List[int],
+                       target_keys: List[int], max_cost: float = INF, workers: Optional[int] = None) -> np.ndarray:
+    """
+    Travel costs from each source cell to each target cell, one Dijkstra search per source.
+
+    Searches run across a process pool; each worker receives the grid once when it starts.
+
+    Args:
+        costs: Flat per-cell step costs (inf for impassable cells)
+        width: Grid width
+        height: Grid height
+        source_keys: Cell keys of the matrix rows
+        target_keys: Cell keys of the matrix columns
+        max_cost: Stop each search beyond this cost (costs past it come back as inf)
+        workers: Number of worker processes (defaults to the CPU count; 1 runs in this process)
+
+    Returns:
+        (sources, targets) float64 array of path costs, inf where unreachable
+    """
+    target_keys = np.asarray(target_keys, dtype=np.int64)
+    matrix = np.full((len(source_keys), len(target_keys)), INF)
+    if not len(source_keys):
+        return matrix
+
+    # Cells shared by several sources are only searched once
+    unique_sources = list(dict.fromkeys(source_keys))
+    workers = min(workers or os.cpu_count() or 1, len(unique_sources))
+
+    if workers <= 1:
+        rows = {source_key: dijkstra_field(costs, width, height, [source_key], max_cost).ravel()[target_keys]
+                for source_key in unique_sources}
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_matrix_worker,
+                                 initargs=(costs, width, height)) as executor:
+            results = executor.map(_matrix_row, unique_sources, [target_keys] * len(unique_sources),
+                                   [max_cost] * len(unique_sources))
+            rows = dict(zip(unique_sources, results))
+
+    for row, source_key in enumerate(source_keys):
+        matrix[row] = rows[source_key]
+    return matrix
+
+
+class HierarchicalPathfinder:
+    """
+    Hierarchical A* (HPA*) over a MapGrid.
+
+    The grid is split into square clusters. Wherever two neighboring clusters
+    share a run of passable border cells, transition cells are placed on both
+    sides of the border. The transition cells form an abstract graph whose
+    edges are the crossings between clusters and the cheapest in-cluster paths
+    between transitions of the same cluster. Long queries are answered on the
+    abstract graph and then refined into grid cells one cluster at a time.
+    """
+
+    # Entrances at least this wide get a transition at each end instead of one in the middle
+    WIDE_ENTRANCE_WIDTH = 6
+
+    def __init__(self, grid, cluster_size: int = 32, min_query_distance: Optional[int] = None):
+        """
+        Args:
+            grid: The MapGrid to search
+            cluster_size: Width and height of a cluster in cells
+            min_query_distance: Queries shorter than this (in cells, Chebyshev distance) use plain A*.
+                Defaults to two cluster widths.
+        """
+        self.grid = grid
+        self.cluster_size: int = cluster_size
+        self.min_query_distance: int = min_query_distance if min_query_distance is not None else 2 * cluster_size
+        self.clusters_x: int = (grid.width + cluster_size - 1) // cluster_size
+        self.clusters_y: int = (grid.height + cluster_size - 1) // cluster_size
+
+        # Transition cell pairs per border, keyed by (axis, cluster x, cluster y) of the
+        # cluster to the left ("h") or above ("v") of the border
+        self.border_transitions: Dict[Tuple[str, int, int], List[Tuple[int, int]]] = {}
+
+        # Abstract graph
+        self.cluster_nodes: Dict[int, List[int]] = {}
+        self.intra_edges: Dict[int, Dict[int, float]] = {}
+        self.inter_edges: Dict[int, Dict[int, float]] = {}
+
+        self.is_built: bool = False
+        self.dirty_clusters: Set[int] = set()
+
+        # Statistics
+        self.build_time: float = 0.0
+        self.abstract_nodes_expanded: int = 0
+
+    def build(self):
+        """Precompute transitions and in-cluster costs for the whole grid"""
+        start_time = time.perf_counter()
+        costs = self._cost_plane()
+
+        self.border_transitions.clear()
+        for cluster_y in range(self.clusters_y):
+            for cluster_x in range(self.clusters_x):
+                for border in self._borders_of_cluster(cluster_x, cluster_y, leading_only=True):
+                    self.border_transitions[border] = self._find_transitions(border, costs)
+
+        self.cluster_nodes = self._collect_cluster_nodes(range(self.clusters_x * self.clusters_y))
+        self.intra_edges = self._compute_all_intra_edges(costs)
+        self._rebuild_inter_edges()
+
+        self.is_built = True
+        self.dirty_clusters.clear()
+        self.build_time = time.perf_counter() - start_time
+
+    def invalidate(self):
+        """Drop the abstract graph; it is rebuilt on the next query"""
+        self.is_built = False
+        self.dirty_clusters.clear()
+
+    def mark_dirty(self, x: int, y: int):
+        """Mark the cluster containing a changed cell for an incremental rebuild"""
+        if self.is_built:
+            self.dirty_clusters.add(self.cluster_of(x, y))
+
+    def cluster_of(self, x: int, y: int) -> int:
+        """Get the cluster ID that contains a grid position"""
+        return (y // self.cluster_size) * self.clusters_x + (x // self.cluster_size)
+
+    def cluster_bounds(self, cluster_id: int) -> Tuple[int, int, int, int]:
+        """Get the (min_x, min_y, max_x, max_y) box of a cluster, max exclusive"""
+        cluster_x = cluster_id % self.clusters_x
+        cluster_y = cluster_id // self.clusters_x
+        min_x = cluster_x * self.cluster_size
+        min_y = cluster_y * self.cluster_size
+        return (min_x, min_y,
+                min(min_x + self.cluster_size, self.grid.width),
+                min(min_y + self.cluster_size, self.grid.height))
+
+    def find_path(self, start_key: int, end_key: int) -> List[int]:
+        """Find a path between two cell keys, using the abstract graph for long queries"""
+        width = self.grid.width
+        costs = self.grid.get_step_costs()
+        if costs[start_key] == INF or costs[end_key] == INF:
+            return []
+
+        start_x, start_y = start_key % width, start_key // width
+        end_x, end_y = end_key % width, end_key // width
+        if max(abs(start_x - end_x), abs(start_y - end_y)) < self.min_query_distance:
+            return self.grid.pathfinder.find_path(start_key, end_key)
+
+        self._ensure_built()
+
+        abstract_path = self._abstract_search(start_key, end_key, costs)
+        if not abstract_path:
+            # Transitions only model straight border crossings; fall back to a full search
+            return self.grid.pathfinder.find_path(start_key, end_key)
+
+        return self._refine(abstract_path)
+
+    def _ensure_built(self):
+        if not self.is_built:
+            self.build()
+        elif self.dirty_clusters:
+            self._rebuild_clusters(self.dirty_clusters)
+            self.dirty_clusters.clear()
+
+    def _cost_plane(self) -> np.ndarray:
+        """Per-cell step costs as a (height, width) float64 array, inf where impassable"""
+        return np.where(self.grid.passable, self.grid.movement_costs.astype(np.float64), INF)
+
+    def _borders_of_cluster(self, cluster_x: int, cluster_y: int,
+                            leading_only: bool = False) -> List[Tuple[str, int, int]]:
+        """Get the borders of a cluster (only the right and bottom ones if leading_only)"""
+        borders = []
+        if cluster_x + 1 < self.clusters_x:
+            borders.append(("h", cluster_x, cluster_y))
+        if cluster_y + 1 < self.clusters_y:
+            borders.append(("v", cluster_x, cluster_y))
+        if not leading_only:
+            if cluster_x > 0:
+                borders.append(("h", cluster_x - 1, cluster_y))
+            if cluster_y > 0:
+                borders.append(("v", cluster_x, cluster_y - 1))
+        return borders
+
+    def _border_clusters(self, border: Tuple[str, int, int]) -> Tuple[int, int]:
+        """Get the IDs of the two clusters on either side of a border"""
+        axis, cluster_x, cluster_y = border
+        first = cluster_y * self.clusters_x + cluster_x
+        return (first, first + 1) if axis == "h" else (first, first + self.clusters_x)
+
+    def _find_transitions(self, border: Tuple[str, int, int], costs: np.ndarray) -> List[Tuple[int, int]]:
+        """Find the transition cell pairs across a border"""
+        axis, cluster_x, cluster_y = border
+        size = self.cluster_size
+        width = self.grid.width
+
+        if axis == "h":
+            near = (cluster_x + 1) * size - 1
+            start = cluster_y * size
+            end = min(start + size, self.grid.height)
+            open_cells = np.isfinite(costs[start:end, near]) & np.isfinite(costs[start:end, near + 1])
+        else:
+            near = (cluster_y + 1) * size - 1
+            start = cluster_x * size
+            end = min(start + size, width)
+            open_cells = np.isfinite(costs[near, start:end]) & np.isfinite(costs[near + 1, start:end])
+
+        # Find runs of open cells along the border
+        transitions = []
+        run_start = None
+        for offset, is_open in enumerate(open_cells.tolist() + [False]):
+            if is_open and run_start is None:
+                run_start = offset
+            elif not is_open and run_start is not None:
+                run_end = offset - 1
+                if run_end - run_start + 1 >= self.WIDE_ENTRANCE_WIDTH:
+                    positions = [run_start, run_end]
+                else:
+                    positions = [(run_start + run_end) // 2]
+
+                for position in positions:
+                    along = start + position
+                    if axis == "h":
+                        transitions.append((along * width + near, along * width + near + 1))
+                    else:
+                        transitions.append((near * width + along, (near + 1) * width + along))
+                run_start = None
+
+        return transitions
+
+    def _collect_cluster_nodes(self, cluster_ids) -> Dict[int, List[int]]:
+        """Gather the transition cells that lie in each of the given clusters"""
+        width = self.grid.width
+        nodes: Dict[int, List[int]] = {}
+        for cluster_id in cluster_ids:
+            cluster_x = cluster_id % self.clusters_x
+            cluster_y = cluster_id // self.clusters_x
+            cluster_nodes = set()
+            for border in self._borders_of_cluster(cluster_x, cluster_y):
+                for near_key, far_key in self.border_transitions.get(border, []):
+                    for key in (near_key, far_key):
+                        if self.cluster_of(key % width, key // width) == cluster_id:
+                            cluster_nodes.add(key)
+            nodes[cluster_id] = sorted(cluster_nodes)
+        return nodes
+
+    def _rebuild_inter_edges(self):
+        """Rebuild the border-crossing edges from the current transitions"""
+        step_costs = self.grid.get_step_costs()
+        self.inter_edges = {}
+        for transitions in self.border_transitions.values():
+            for near_key, far_key in transitions:
+                self.inter_edges.setdefault(near_key, {})[far_key] = step_costs[far_key]
+                self.inter_edges.setdefault(far_key, {})[near_key] = step_costs[near_key]
+
+    def _compute_all_intra_edges(self, costs: np.ndarray) -> Dict[int, Dict[int, float]]:
+        """
+        Compute in-cluster costs between transitions for every cluster at once.
+
+        Each round relaxes one transition per cluster in all clusters simultaneously,
+        using directional sweeps over a (clusters_y, clusters_x, size, size) view.
+        """
+        size = self.cluster_size
+        width = self.grid.width
+        padded = np.full((self.clusters_y * size, self.clusters_x * size), INF)
+        padded[:costs.shape[0], :costs.shape[1]] = costs
+
+        # (cluster y, cluster x, local y, local x)
+        blocks = np.ascontiguousarray(padded.reshape(self.clusters_y, size, self.clusters_x, size).transpose(0, 2, 1, 3))
+        diagonal_blocks = blocks * DIAGONAL_COST
+
+        edges: Dict[int, Dict[int, float]] = {}
+        max_nodes = max((len(nodes) for nodes in self.cluster_nodes.values()), default=0)
+
+        for slot in range(max_nodes):
+            sources = [(cluster_id, nodes[slot]) for cluster_id, nodes in self.cluster_nodes.items()
+                       if len(nodes) > slot]
+
+            distances = np.full(blocks.shape, INF)
+            for cluster_id, key in sources:
+                x, y = key % width, key // width
+                distances[y // size, x // size, y % size, x % size] = 0.0
+
+            while _sweep_block_distances(distances, blocks, diagonal_blocks):
+                pass
+
+            for cluster_id, source_key in sources:
+                targets = edges.setdefault(source_key, {})
+                for target_key in self.cluster_nodes[cluster_id]:
+                    if target_key == source_key:
+                        continue
+                    x, y = target_key % width, target_key // width
+                    distance = distances[y // size, x // size, y % size, x % size]
+                    if distance != INF:
+                        targets[target_key] = float(distance)
+
+        return edges
+
+    def _rebuild_clusters(self, cluster_ids: Set[int]):
+        """Recompute transitions and in-cluster costs around changed clusters"""
+        costs = self._cost_plane()
+        step_costs = self.grid.get_step_costs()
+
+        # Re-scan every border touching a changed cluster; the clusters across them change too
+        affected = set(cluster_ids)
+        for cluster_id in cluster_ids:
+            for border in self._borders_of_cluster(cluster_id % self.clusters_x, cluster_id // self.clusters_x):
+                self.border_transitions[border] = self._find_transitions(border, costs)
+                affected.update(self._border_clusters(border))
+
+        for cluster_id in affected:
+            for key in self.cluster_nodes.get(cluster_id, []):
+                self.intra_edges.pop(key, None)
+
+        self.cluster_nodes.update(self._collect_cluster_nodes(affected))
+
+        for cluster_id in affected:
+            nodes = self.cluster_nodes[cluster_id]
+            bounds = self.cluster_bounds(cluster_id)
+            for source_key in nodes:
+                distances = bounded_dijkstra(step_costs, self.grid.width, source_key, bounds)
+                self.intra_edges[source_key] = {key: distances[key] for key in nodes
+                                                if key != source_key and key in distances}
+
+        self._rebuild_inter_edges()
+
+    def _abstract_search(self, start_key: int, end_key: int, costs: List[float]) -> List[int]:
+        """A* over the abstract graph, with the start and goal linked into their clusters"""
+        width = self.grid.width
+        min_cost = self.grid.get_min_step_cost()
+
+        start_cluster = self.cluster_of(start_key % width, start_key // width)
+        end_cluster = self.cluster_of(end_key % width, end_key // width)
+
+        # Costs from the start to its cluster's transitions, and from the goal cluster's transitions to the goal
+        start_distances = bounded_dijkstra(costs, width, start_key, self.cluster_bounds(start_cluster))
+        start_links = {key: start_distances[key] for key in self.cluster_nodes.get(start_cluster, [])
+                       if key in start_distances and key != start_key}
+        end_distances = bounded_dijkstra(costs, width, end_key, self.cluster_bounds(end_cluster), reverse=True)
+        end_links = {key: end_distances[key] for key in self.cluster_nodes.get(end_cluster, [])
+                     if key in end_distances and key != end_key}
+
+        end_x = end_key % width
+        end_y = end_key // width
+        g_costs: Dict[int, float] = {start_key: 0.0}
+        parents: Dict[int, int] = {start_key: -1}
+        closed: Set[int] = set()
+        open_heap = [(0.0, start_key)]
+        self.abstract_nodes_expanded = 0
+
+        while open_heap:
+            _, key = heapq.heappop(open_heap)
+            if key in closed:
+                continue
+            if key == end_key:
+                return reconstruct_key_path(parents, key)
+
+            closed.add(key)
+            self.abstract_nodes_expanded += 1
+            base_g = g_costs[key]
+
+            neighbors = []
+            if key == start_key:
+                neighbors.extend(start_links.items())
+            neighbors.extend(self.intra_edges.get(key, {}).items())
+            neighbors.extend(self.inter_edges.get(key, {}).items())
+            if key in end_links:
+                neighbors.append((end_key, end_links[key]))
+
+            for neighbor_key, edge_cost in neighbors:
+                if neighbor_key in closed:
+                    continue
+
+                g = base_g + edge_cost
+                if g >= g_costs.get(neighbor_key, INF):
+                    continue
+
+                g_costs[neighbor_key] = g
+                parents[neighbor_key] = key
+                h = octile_distance(neighbor_key % width - end_x, neighbor_key // width - end_y, min_cost)
+                heapq.heappush(open_heap, (g + h, neighbor_key))
+
+        return []
+
+    def _refine(self, abstract_path: List[int]) -> List[int]:
+        """Expand an abstract path into grid cells, searching one cluster at a time"""
+        width = self.grid.width
+        path = [abstract_path[0]]
+
+        for from_key, to_key in zip(abstract_path, abstract_path[1:]):
+            from_x, from_y = from_key % width, from_key // width
+            to_x, to_y = to_key % width, to_key // width
+
+            if abs(from_x - to_x) <= 1 and abs(from_y - to_y) <= 1:
+                # Border crossing between neighboring cells
+                path.append(to_key)
+                continue
+
+            bounds = self.cluster_bounds(self.cluster_of(from_x, from_y))
+            segment = self.grid.pathfinder.find_path(from_key, to_key, bounds)
+            if not segment:
+                return []
+            path.extend(segment[1:])
+
+        return path
+
+
+def _sweep_block_distances(distances: np.ndarray, costs: np.ndarray, diagonal_costs: np.ndarray) -> bool:
+    """
+    Relax in-cluster distances with one down, up, right and left sweep.
+
+    All arrays are (clusters_y, clusters_x, size, size). Returns True if any distance improved.
+    """
+    before = distances.copy()
+
+    for transpose in (False, True):
+        # Sweeping rows handles vertical and diagonal steps; the transposed view handles horizontal ones
+        d = distances.swapaxes(2, 3) if transpose else distances
+        c = costs.swapaxes(2, 3) if transpose else costs
+        dc = diagonal_costs.swapaxes(2, 3) if transpose else diagonal_costs
+        size = d.shape[2]
+
+        for rows in (range(1, size), range(size - 2, -1, -1)):
+            offset = -1 if rows.step > 0 else 1
+            for row in rows:
+                current = d[:, :, row, :]
+                previous = d[:, :, row + offset, :]
+                np.minimum(current, previous + c[:, :, row, :], out=current)
+                np.minimum(current[..., 1:], previous[..., :-1] + dc[:, :, row, 1:], out=current[..., 1:])
+                np.minimum(current[..., :-1], previous[..., 1:] + dc[:, :, row, :-1], out=current[..., :-1])
+
+    return not np.array_equal(before, distances)
+
+
+class PathCacheEntry:
+    """A cached pathfinding result and the grid regions it depends on"""
+
+    def __init__(self, value: Any, start_key: int, end_key: int, cost: float, regions: Set[int]):
+        self.value = value
+        self.start_key: int = start_key
+        self.end_key: int = end_key
+        self.cost: float = cost  # inf when no path was found
+        self.regions: Set[int] = regions
+
+
+class PathCache:
+    """
+    Bounded LRU cache of pathfinding results for a MapGrid.
+
+    Entries are indexed by the square grid regions their path passes through.
+    When cells change, entries whose path crosses a changed region are dropped.
+    When a cell gets cheaper, an entry is also dropped if a route through that
+    region could now beat its cached cost (checked with an octile lower bound).
+    Unreachable results count as infinitely expensive and are always dropped.
+    """
+
+    def __init__(self, grid, max_entries: int = 1024, region_size: int = 32):
+        self.grid = grid
+        self.max_entries: int = max_entries
+        self.region_size: int = region_size
+        self.regions_x: int = (grid.width + region_size - 1) // region_size
+
+        self._entries: 'OrderedDict[Hashable, PathCacheEntry]' = OrderedDict()
+        self._keys_by_region: Dict[int, Set[Hashable]] = {}
+
+        # Statistics
+        self.hits: int = 0
+        self.misses: int = 0
+        self.invalidations: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a cached value, or None on a miss"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def put(self, key: Hashable, value: Any, start_key: int, end_key: int, path_keys: List[int]):
+        """
+        Cache a value computed from a path.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            start_key: Cell key the query started from
+            end_key: Cell key the query ended at
+            path_keys: Cell keys of the path the value was computed from ([] if unreachable)
+        """
+        if key in self._entries:
+            self._remove(key)
+
+        width = self.grid.width
+        regions = {self.region_of(k % width, k // width) for k in path_keys}
+        for endpoint in (start_key, end_key):
+            x, y = endpoint % width, endpoint // width
+            if self.grid.passable[y, x]:
+                regions.add(self.region_of(x, y))
+            else:
+                # The path starts from the nearest passable cell, which only changes within
+                # that cell's distance can move
+                distance = self.grid.get_nearest_passable_map().distances[y, x]
+                radius = int(math.ceil(distance)) if distance != INF else 0
+                regions.update(self._regions_in_box(x - radius, y - radius, x + radius + 1, y + radius + 1))
+
+        entry = PathCacheEntry(value, start_key, end_key, self._path_cost(path_keys), regions)
+        self._entries[key] = entry
+        for region in regions:
+            self._keys_by_region.setdefault(region, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def put_field(self, key: Hashable, field: TravelCostField):
+        """Cache a travel cost field, dropped when any cell it reached (or borders) changes"""
+        if key in self._entries:
+            self._remove(key)
+
+        ys, xs = np.nonzero(field.reached_mask())
+        regions = set(np.unique((ys // self.region_size) * self.regions_x + xs // self.region_size).tolist())
+
+        self._entries[key] = PathCacheEntry(field, -1, -1, 0.0, regions)
+        for region in regions:
+            self._keys_by_region.setdefault(region, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate_cells(self, xs: Iterable[int], ys: Iterable[int], decreased: Iterable[bool]):
+        """
+        Drop entries affected by changed cells.
+
+        Args:
+            xs: X coordinates of cells whose step cost changed
+            ys: Y coordinates of cells whose step cost changed
+            decreased: Whether each cell became cheaper (or passable)
+        """
+        if not self._entries:
+            return
+
+        changed_regions = set()
+        decreased_regions = set()
+        for x, y, is_decrease in zip(xs, ys, decreased):
+            region = self.region_of(int(x), int(y))
+            changed_regions.add(region)
+            if is_decrease:
+                decreased_regions.add(region)
+
+        stale = set()
+        for region in changed_regions:
+            stale.update(self._keys_by_region.get(region, ()))
+
+        if decreased_regions:
+            width = self.grid.width
+            min_cost = self.grid.get_min_step_cost()
+            boxes = [self.region_bounds(region) for region in decreased_regions]
+            for key, entry in self._entries.items():
+                if key in stale or entry.start_key < 0:
+                    # Entries without endpoints (travel cost fields) cover every region they depend on
+                    continue
+                if entry.cost == INF:
+                    stale.add(key)
+                    continue
+
+                start = (entry.start_key % width, entry.start_key // width)
+                end = (entry.end_key % width, entry.end_key // width)
+                for box in boxes:
+                    if (_octile_to_box(start, box, min_cost) + _octile_to_box(end, box, min_cost)) < entry.cost:
+                        stale.add(key)
+                        break
+
+        for key in stale:
+            self._remove(key)
+        self.invalidations += len(stale)
+
+    def clear(self):
+        """Drop every entry"""
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._keys_by_region.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the current size"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations
+        }
+
+    def region_of(self, x: int, y: int) -> int:
+        """Get the region ID that contains a grid position"""
+        return (y // self.region_size) * self.regions_x + (x // self.region_size)
+
+    def region_bounds(self, region: int) -> Tuple[int, int, int, int]:
+        """Get the (min_x, min_y, max_x, max_y) box of a region, max exclusive"""
+        min_x = (region % self.regions_x) * self.region_size
+        min_y = (region // self.regions_x) * self.region_size
+        return (min_x, min_y, min(min_x + self.region_size, self.grid.width),
+                min(min_y + self.region_size, self.grid.height))
+
+    def _regions_in_box(self, min_x: int, min_y: int, max_x: int, max_y: int) -> Set[int]:
+        min_x, min_y = max(min_x, 0), max(min_y, 0)
+        max_x, max_y = min(max_x, self.grid.width), min(max_y, self.grid.height)
+        size = self.region_size
+        return {(ry * self.regions_x + rx)
+                for ry in range(min_y // size, (max_y - 1) // size + 1)
+                for rx in range(min_x // size, (max_x - 1) // size + 1)}
+
+    def _path_cost(self, path_keys: List[int]) -> float:
+        if not path_keys:
+            return INF
+
+        width = self.grid.width
+        costs = self.grid.get_step_costs()
+        total = 0.0
+        for previous, current in zip(path_keys, path_keys[1:]):
+            diagonal = previous % width != current % width and previous // width != current // width
+            total += costs[current] * (DIAGONAL_COST if diagonal else 1.0)
+        return total
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key)
+        for region in entry.regions:
+            keys = self._keys_by_region.get(region)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_region[region]
+
+
+def _octile_to_box(point: Tuple[int, int], box: Tuple[int, int, int, int], min_cost: float) -> float:
+    """Lower bound on the cost from a point to the nearest cell of a box"""
+    x, y = point
+    min_x, min_y, max_x, max_y = box
+    dx = max(min_x - x, 0, x - (max_x - 1))
+    dy = max(min_y - y, 0, y - (max_y - 1))
+    return octile_distance(dx, dy, min_cost)
@@ -10,7 +10,9 @@ import json
 import os
 import random
 from enum import Enum
-from typing import Dict, List, Tuple, Set, Optional, Union, Any
+from typing import Dict, List, Tuple, Set, Optional, Union, Any, Iterable
+
+import numpy as np
 
 # Import from other MapAI components
 from MapWorldState import MapWorldState
@@ -95,6 +97,9 @@ class PoliticalEntity:
         self.core_provinces: List[int] = []  # Core/heartland provinces
         self.frontier_provinces: List[int] = []  # Border/frontier provinces
         self.disconnected_territories: List[Set[int]] = []  # Exclaves/colonies
+        self.frontier_cells: Set[int] = set()  # Cells next to a cell this entity doesn't own
+        self.owner_index: Optional['CellOwnerIndex'] = None  # Set by the manager tracking this entity
+        self.connectivity: Optional['TerritoryConnectivity'] = None  # Built on demand, dropped when cells are lost
         
         # Relations with other entities
         self.relations: Dict[int, RelationType] = {}  # Entity ID to relation type
@@ -136,36 +141,129 @@ class PoliticalEntity:
             self.territory_cells.add(cell_ids)
         else:
             self.territory_cells.update(cell_ids)
+        
+        if self.owner_index is not None:
+            self.owner_index.assign(cell_ids, self.id)
+        if self.connectivity is not None:
+            self.connectivity.add_cells(cell_ids)
     
     def remove_territory(self, cell_ids: Union[int, List[int], Set[int]]) -> None:
         """Remove territory cells from this entity"""
+        cell_count = len(self.territory_cells)
         if isinstance(cell_ids, int):
             self.territory_cells.discard(cell_ids)
         else:
             self.territory_cells.difference_update(cell_ids)
+        
+        if self.owner_index is not None:
+            self.owner_index.release(cell_ids, self.id)
+        if len(self.territory_cells) != cell_count:
+            # Losing cells can split a component, which union-find can't undo
+            self.connectivity = None
+    
+    def get_connectivity(self, region_manager) -> 'TerritoryConnectivity':
+        """Get the union-find over this entity's territory, rebuilding it if cells were lost"""
+        if self.connectivity is None or self.connectivity.region_manager is not region_manager:
+            self.connectivity = TerritoryConnectivity(region_manager)
+            self.connectivity.rebuild(self.territory_cells)
+        return self.connectivity
+    
+    def _get_main_root(self, connectivity: 'TerritoryConnectivity') -> Optional[int]:
+        """Root of the main territory: the component holding the center cell, else the largest"""
+        if self.center_cell_id in connectivity:
+            return connectivity.find(self.center_cell_id)
+        return connectivity.largest_component_root()
     
     def calculate_borders(self, region_manager) -> Dict[int, Set[int]]:
         """
         Calculate border cells with other political entities
         
+        Needs the cell owner index attached by the manager; without it no other owners are known.
+        
         Returns:
-            Dict mapping entity IDs to set of shared border cell IDs
+            Dict mapping entity IDs to set of shared border cell IDs (this entity's side)
         """
-        # Implementation would use region_manager to find bordering cells
-        # between this entity's territory and others
-        # This is a placeholder for the actual implementation
-        return {}
+        if self.owner_index is None or not self.territory_cells:
+            return {}
+        
+        cells, neighbors = region_manager.get_cell_neighbors(
+            np.fromiter(self.territory_cells, dtype=np.int64, count=len(self.territory_cells)))
+        neighbor_owners = self.owner_index.get_owners(neighbors)
+        foreign = (neighbor_owners != self.id) & (neighbor_owners != CellOwnerIndex.NO_OWNER)
+        
+        borders: Dict[int, Set[int]] = {}
+        for owner_id, owner_cells in MapPoliticalManager._group_cells_by_owner(cells[foreign], neighbor_owners[foreign]):
+            borders[owner_id] = set(owner_cells)
+        return borders
     
     def calculate_disconnected_territories(self, region_manager) -> List[Set[int]]:
         """
         Identify disconnected territories (exclaves)
         
+        Every connected piece of territory apart from the main one, which holds the center
+        cell (or is the largest piece if the center cell was lost).
+        
         Returns:
-            List of sets containing cell IDs for each disconnected territory
+            List of sets containing cell IDs for each disconnected territory, largest first
         """
-        # Implementation would use region_manager to find disconnected regions
-        # This is a placeholder for the actual implementation
-        return []
+        connectivity = self.get_connectivity(region_manager)
+        main_root = self._get_main_root(connectivity)
+        self.disconnected_territories = [component for component in connectivity.get_components()
+                                         if connectivity.find(next(iter(component))) != main_root]
+        return self.disconnected_territories
+    
+    def is_exclave(self, cell_id: int, region_manager) -> bool:
+        """Whether a cell of this entity is cut off from its main territory"""
+        if cell_id not in self.territory_cells:
+            return False
+        connectivity = self.get_connectivity(region_manager)
+        return connectivity.find(cell_id) != self._get_main_root(connectivity)
+    
+    def calculate_provinces(self, region_manager) -> None:
+        """
+        Split the territory into core provinces (cells of the main territory with every
+        neighbor owned) and frontier provinces (the rest: cells touching foreign or
+        unowned land, and all exclave cells)
+        """
+        if not self.territory_cells:
+            self.core_provinces, self.frontier_provinces = [], []
+            return
+        
+        territory = np.fromiter(self.territory_cells, dtype=np.int64, count=len(self.territory_cells))
+        cells, neighbors = region_manager.get_cell_neighbors(territory)
+        exposed = np.unique(cells[~np.isin(neighbors, territory)])
+        
+        connectivity = self.get_connectivity(region_manager)
+        main_root = self._get_main_root(connectivity)
+        territory = np.setdiff1d(territory, exposed)
+        in_main = np.fromiter((connectivity.find(cell) == main_root for cell in territory.tolist()),
+                              dtype=bool, count=territory.size)
+        self.core_provinces = territory[in_main].tolist()
+        self.frontier_provinces = np.union1d(exposed, territory[~in_main]).tolist()
+    
+    def calculate_compactness(self, region_manager) -> Dict[str, float]:
+        """
+        Measure how compact and connected the territory is
+        
+        Returns:
+            Dict with cell_count, component_count, exclave_cell_count, main_territory_share
+            (fraction of cells in the main territory), perimeter (cell edges on the territory's
+            outline) and compactness (Polsby-Popper 4*pi*area/perimeter^2 on that outline;
+            higher is more compact, about 0.79 for a square)
+        """
+        connectivity = self.get_connectivity(region_manager)
+        cell_count = connectivity.cell_count
+        main_root = self._get_main_root(connectivity)
+        main_cell_count = connectivity.component_size(main_root) if main_root is not None else 0
+        perimeter = connectivity.perimeter
+        return {
+            "cell_count": cell_count,
+            "component_count": connectivity.component_count,
+            "exclave_cell_count": cell_count - main_cell_count,
+            "main_territory_share": main_cell_count / cell_count if cell_count else 0.0,
+            "perimeter": perimeter,
+            "compactness": 4 * np.pi * cell_count / perimeter ** 2 if perimeter else 0.0,
+        }
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert entity to a dictionary for serialization"""
@@ -330,9 +428,637 @@ class TerritorialDispute:
         return dispute
 
 
+class CellOwnerIndex:
+    """
+    Dense cell -> owner lookup: an int32 array indexed by cell ID holding the ID of the
+    entity that owns each cell, or NO_OWNER. It grows as higher cell IDs are assigned.
+    
+    Entities keep it current from add_territory and remove_territory once the manager
+    has attached it. Invariant: a cell is NO_OWNER exactly when no tracked entity holds it
+    in territory_cells. Where territories overlap, it holds the entity that claimed the
+    cell last; the earlier claimants are remembered, and when the owner releases the cell
+    it goes back to the most recent claimant still holding it. Owner changes are also
+    recorded until take_changes collects them, so borders can be updated for just the
+    cells that changed hands.
+    """
+    
+    NO_OWNER = -1
+    
+    def __init__(self, cell_count: int = 0):
+        self.owners = np.full(max(cell_count, 1), self.NO_OWNER, dtype=np.int32)
+        self._earlier_claimants: Dict[int, List[int]] = {}  # Overlapping cells only, oldest claim first
+        self._changed_cells: List[np.ndarray] = []
+        self._previous_owners: List[np.ndarray] = []
+    
+    @staticmethod
+    def _as_cell_array(cell_ids: Union[int, Iterable[int], np.ndarray]) -> np.ndarray:
+        if isinstance(cell_ids, (int, np.integer)):
+            return np.array([cell_ids], dtype=np.int64)
+        if isinstance(cell_ids, np.ndarray):
+            return cell_ids.astype(np.int64, copy=False)
+        return np.fromiter(cell_ids, dtype=np.int64)
+    
+    def assign(self, cell_ids: Union[int, Iterable[int], np.ndarray], entity_id: int) -> None:
+        """Make entity_id the owner of cells"""
+        cells = self._as_cell_array(cell_ids)
+        cells = cells[cells >= 0]
+        if not cells.size:
+            return
+        
+        max_cell_id = int(cells.max())
+        if max_cell_id >= self.owners.size:
+            grown = np.full(max(max_cell_id + 1, self.owners.size * 2), self.NO_OWNER, dtype=np.int32)
+            grown[:self.owners.size] = self.owners
+            self.owners = grown
+        
+        cells = np.unique(cells)
+        previous = self.owners[cells]
+        changed = previous != entity_id
+        
+        # A reclaimed cell moves entity_id to the top of its claimants; a cell taken from
+        # another entity keeps that entity as an earlier claimant
+        self._forget_claims(cells, entity_id)
+        claimed = changed & (previous != self.NO_OWNER)
+        for cell, previous_owner in zip(cells[claimed].tolist(), previous[claimed].tolist()):
+            self._earlier_claimants.setdefault(cell, []).append(previous_owner)
+        
+        self._changed_cells.append(cells[changed])
+        self._previous_owners.append(previous[changed])
+        self.owners[cells] = entity_id
+    
+    def release(self, cell_ids: Union[int, Iterable[int], np.ndarray], entity_id: int) -> None:
+        """Give up entity_id's claim on cells; those it owns go back to their latest earlier claimant"""
+        cells = self._as_cell_array(cell_ids)
+        cells = np.unique(cells[(cells >= 0) & (cells < self.owners.size)])
+        owned = self.owners[cells] == entity_id
+        self._forget_claims(cells[~owned], entity_id)
+        
+        cells = cells[owned]
+        new_owners = np.full(cells.size, self.NO_OWNER, dtype=np.int32)
+        if self._earlier_claimants:
+            for index, cell in enumerate(cells.tolist()):
+                claimants = self._earlier_claimants.get(cell)
+                if claimants:
+                    new_owners[index] = claimants.pop()
+                    if not claimants:
+                        del self._earlier_claimants[cell]
+        
+        self._changed_cells.append(cells)
+        self._previous_owners.append(np.full(cells.size, entity_id, dtype=np.int32))
+        self.owners[cells] = new_owners
+    
+    def _forget_claims(self, cells: np.ndarray, entity_id: int) -> None:
+        """Drop entity_id from the earlier claimants of cells"""
+        if not self._earlier_claimants or not cells.size:
+            return
+        overlapping = np.fromiter(self._earlier_claimants, dtype=np.int64, count=len(self._earlier_claimants))
+        for cell in overlapping[np.isin(overlapping, cells)].tolist():
+            claimants = [claimant for claimant in self._earlier_claimants[cell] if claimant != entity_id]
+            if claimants:
+                self._earlier_claimants[cell] = claimants
+            else:
+                del self._earlier_claimants[cell]
+    
+    def get_owner(self, cell_id: int) -> int:
+        """Get the owner of a cell, or NO_OWNER"""
+        if 0 <= cell_id < self.owners.size:
+            return int(self.owners[cell_id])
+        return self.NO_OWNER
+    
+    def get_owners(self, cell_ids: Union[Iterable[int], np.ndarray]) -> np.ndarray:
+        """Get the owner of each cell, with NO_OWNER for unowned and out-of-range cells"""
+        cells = self._as_cell_array(cell_ids)
+        in_range = (cells >= 0) & (cells < self.owners.size)
+        return np.where(in_range, self.owners[np.where(in_range, cells, 0)], self.NO_OWNER)
+    
+    def take_changes(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Collect the cells whose owner changed since the last call (or clear_changes)
+        
+        Returns:
+            (cells, previous_owners): each changed cell once, with its owner before the
+            first of its changes
+        """
+        if not self._changed_cells:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32)
+        
+        cells = np.concatenate(self._changed_cells)
+        previous_owners = np.concatenate(self._previous_owners)
+        self.clear_changes()
+        
+        cells, first_changes = np.unique(cells, return_index=True)
+        previous_owners = previous_owners[first_changes]
+        
+        # Drop cells that ended up back with their original owner
+        changed = self.owners[cells] != previous_owners
+        return cells[changed], previous_owners[changed]
+    
+    def clear_changes(self) -> None:
+        """Forget the recorded owner changes"""
+        self._changed_cells = []
+        self._previous_owners = []
+    
+    def rebuild(self, entities: Iterable[PoliticalEntity]) -> None:
+        """Recompute every owner from entity territories"""
+        self.owners.fill(self.NO_OWNER)
+        self._earlier_claimants = {}
+        for entity in entities:
+            self.assign(entity.territory_cells, entity.id)
+        self.clear_changes()
+
+
+class TerritoryConnectivity:
+    """
+    Union-find over the cells of one territory, linking cells that are adjacent on the map
+    (eight-connected, like borders). Each set is a connected piece of the territory.
+    
+    Adding cells only links them to their owned neighbors, so growth is cheap. Cells cannot
+    be unlinked, so after cells are lost the structure is rebuilt from the whole territory.
+    The perimeter (cell edges facing cells outside the territory, or the map edge) is kept
+    alongside for compactness metrics.
+    """
+    
+    def __init__(self, region_manager):
+        self.region_manager = region_manager
+        self._parent: Dict[int, int] = {}
+        self._size: Dict[int, int] = {}  # Root -> cells in its component
+        self.perimeter = 0
+        self._components: Optional[List[Set[int]]] = None
+    
+    @property
+    def cell_count(self) -> int:
+        return len(self._parent)
+    
+    @property
+    def component_count(self) -> int:
+        return len(self._size)
+    
+    def __contains__(self, cell_id: int) -> bool:
+        return cell_id in self._parent
+    
+    def find(self, cell_id: int) -> int:
+        """Get the representative cell of a cell's component"""
+        parent = self._parent
+        while parent[cell_id] != cell_id:
+            # Path halving
+            parent[cell_id] = parent[parent[cell_id]]
+            cell_id = parent[cell_id]
+        return cell_id
+    
+    def _union(self, cell1: int, cell2: int) -> None:
+        root1, root2 = self.find(cell1), self.find(cell2)
+        if root1 == root2:
+            return
+        if self._size[root1] < self._size[root2]:
+            root1, root2 = root2, root1
+        self._parent[root2] = root1
+        self._size[root1] += self._size.pop(root2)
+    
+    def connected(self, cell1: int, cell2: int) -> bool:
+        """Whether two territory cells are in the same component"""
+        return cell1 in self._parent and cell2 in self._parent and self.find(cell1) == self.find(cell2)
+    
+    def component_size(self, cell_id: int) -> int:
+        """Get the number of cells in a territory cell's component"""
+        return self._size[self.find(cell_id)]
+    
+    def largest_component_root(self) -> Optional[int]:
+        """Get the representative cell of the largest component, or None for an empty territory"""
+        if not self._size:
+            return None
+        return max(self._size, key=self._size.get)
+    
+    def add_cells(self, cell_ids: Union[int, Iterable[int], np.ndarray]) -> None:
+        """Add cells to the territory, linking them to their neighbors in it"""
+        cells = np.unique(CellOwnerIndex._as_cell_array(cell_ids))
+        new_cells = np.array([cell for cell in cells.tolist() if cell not in self._parent], dtype=np.int64)
+        if not new_cells.size:
+            return
+        
+        for cell in new_cells.tolist():
+            self._parent[cell] = cell
+            self._size[cell] = 1
+        self._components = None
+        
+        # Link each new cell to its owned neighbors; a pair of new cells shows up from both
+        # sides, so keep it only from the higher cell
+        cells, neighbors = self.region_manager.get_cell_neighbors(new_cells)
+        owned = self._contains(neighbors)
+        new_neighbors = np.isin(neighbors, new_cells)
+        linked = owned & (~new_neighbors | (neighbors < cells))
+        for cell, neighbor in zip(cells[linked].tolist(), neighbors[linked].tolist()):
+            self._union(cell, neighbor)
+        
+        # Each cell has four edges; every edge shared with another territory cell is interior
+        # to the territory and leaves the perimeter of both cells
+        cells, neighbors = self.region_manager.get_cell_neighbors(
+            new_cells, self.region_manager.ORTHOGONAL_NEIGHBOR_OFFSETS)
+        owned = self._contains(neighbors)
+        new_neighbors = np.isin(neighbors, new_cells)
+        self.perimeter += 4 * new_cells.size - 2 * int((owned & ~new_neighbors).sum()) - int(new_neighbors.sum())
+    
+    def rebuild(self, cell_ids: Union[Iterable[int], np.ndarray]) -> None:
+        """Start over from a whole territory"""
+        self._parent = {}
+        self._size = {}
+        self.perimeter = 0
+        self._components = None
+        self.add_cells(cell_ids)
+    
+    def _contains(self, cell_ids: np.ndarray) -> np.ndarray:
+        parent = self._parent
+        return np.fromiter((cell in parent for cell in cell_ids.tolist()), dtype=bool, count=cell_ids.size)
+    
+    def get_components(self) -> List[Set[int]]:
+        """
+        Get the connected pieces of the territory
+        
+        Returns:
+            List of sets of cell IDs, largest first (cached until cells are added)
+        """
+        if self._components is None:
+            components: Dict[int, Set[int]] = {root: set() for root in self._size}
+            for cell in self._parent:
+                components[self.find(cell)].add(cell)
+            self._components = sorted(components.values(), key=len, reverse=True)
+        return self._components
+
+
+class RelationMatrix:
+    """
+    Dense entity x entity diplomacy state. Each entity gets a slot, and slot-indexed arrays
+    hold the relation type entity i has with entity j and i's opinion of j (-100 to 100).
+    Occupied slots are always 0..count - 1: removing an entity moves the last one into its
+    slot, so updates work on the leading count x count block.
+    
+    Each month opinions drift toward a target set by border pressure, disputes, shared
+    culture and military and economic ratios (see update). Relations on the war-to-peace
+    ladder then move one step toward the band the pair's mutual opinion falls in; other
+    relation types (alliances, vassalage, truces) only change through set_relation.
+    
+    The target's inputs (border lengths, disputed pairs, entity stats) are kept here too,
+    and the target is only recomputed after one of them changes.
+    """
+    
+    NO_ENTITY = -1
+    
+    RELATION_TYPES = list(RelationType)
+    RELATION_LADDER = [RelationType.WAR, RelationType.CONFLICT, RelationType.TENSION,
+                       RelationType.NEUTRAL, RelationType.PEACE]
+    # Mutual opinion at which each rung of the ladder after the first starts
+    LADDER_THRESHOLDS = [-60.0, -30.0, -10.0, 20.0]
+    
+    # Opinion a relation starts from when it is set
+    RELATION_OPINIONS = {
+        RelationType.ALLIANCE: 80.0,
+        RelationType.PEACE: 35.0,
+        RelationType.NEUTRAL: 5.0,
+        RelationType.TENSION: -20.0,
+        RelationType.CONFLICT: -45.0,
+        RelationType.WAR: -80.0,
+        RelationType.VASSAL: 50.0,
+        RelationType.SUZERAIN: 50.0,
+        RelationType.TRUCE: -5.0
+    }
+    
+    # Monthly update rule: share of the gap to the target opinion closed each month, the
+    # largest random opinion change, and the weight of each term of the target
+    OPINION_DRIFT = 0.05
+    OPINION_NOISE = 3.0
+    BORDER_PRESSURE_WEIGHT = 40.0  # All of an entity's border facing the other
+    DISPUTE_WEIGHT = 50.0
+    SHARED_CULTURE_WEIGHT = 25.0
+    MILITARY_FEAR_WEIGHT = 20.0  # Neighbor with all the military strength between them
+    MILITARY_AMBITION_WEIGHT = 20.0  # Neighbor with none of it, scaled by expansionism
+    ECONOMIC_WEIGHT = 15.0  # Economies of equal size
+    
+    # Slot x slot arrays and their values for a new slot
+    PAIR_ARRAYS = {"relations": RELATION_TYPES.index(RelationType.NEUTRAL), "opinions": 0.0, "known": False,
+                   "border_lengths": 0.0, "disputed": False}
+    # Per-slot entity stats and their values for a new slot
+    SLOT_ARRAYS = {"entity_ids": NO_ENTITY, "culture_ids": -1, "military": 0.0, "economy": 0.0, "expansionism": 0.0}
+    
+    def __init__(self, capacity: int = 16):
+        capacity = max(capacity, 1)
+        self.count = 0
+        self.entity_ids = np.full(capacity, self.NO_ENTITY, dtype=np.int64)
+        self.culture_ids = np.full(capacity, -1, dtype=np.int64)
+        self.military = np.zeros(capacity, dtype=np.float32)
+        self.economy = np.zeros(capacity, dtype=np.float32)
+        self.expansionism = np.zeros(capacity, dtype=np.float32)
+        self.relations = np.full((capacity, capacity), self.PAIR_ARRAYS["relations"], dtype=np.int8)
+        self.opinions = np.zeros((capacity, capacity), dtype=np.float32)
+        self.known = np.zeros((capacity, capacity), dtype=bool)  # Whether a relation was ever set
+        self.border_lengths = np.zeros((capacity, capacity), dtype=np.float32)  # Border cells, both ways
+        self.disputed = np.zeros((capacity, capacity), dtype=bool)  # Unresolved territorial dispute
+        self._slots: Dict[int, int] = {}
+        self._slot_lookup = np.full(capacity, self.NO_ENTITY, dtype=np.int64)  # Entity ID -> slot
+        self._target: Optional[np.ndarray] = None  # Cached drift-scaled target, None when stale
+        self._ladder_state: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None  # See _get_ladder_state
+        
+        ladder_positions = np.full(len(self.RELATION_TYPES), -1, dtype=np.int8)
+        for position, relation in enumerate(self.RELATION_LADDER):
+            ladder_positions[self.RELATION_TYPES.index(relation)] = position
+        self._ladder_positions = ladder_positions
+        self._ladder_codes = np.array([self.RELATION_TYPES.index(relation) for relation in self.RELATION_LADDER],
+                                      dtype=np.int8)
+        
+        # Mutual opinion sum (opinion both ways) below which each ladder position steps down
+        # and at which it steps up, indexed by position + 1 so off-ladder pairs never move
+        thresholds = [2 * threshold for threshold in self.LADDER_THRESHOLDS]
+        self._step_down_below = np.array([-np.inf, -np.inf] + thresholds, dtype=np.float32)
+        self._step_up_from = np.array([np.inf] + thresholds + [np.inf], dtype=np.float32)
+    
+    def __contains__(self, entity_id: int) -> bool:
+        return entity_id in self._slots
+    
+    @property
+    def capacity(self) -> int:
+        return self.entity_ids.size
+    
+    def get_slot(self, entity_id: int) -> int:
+        """Get the slot of an entity in the arrays"""
+        return self._slots[entity_id]
+    
+    def get_slots(self, entity_ids: np.ndarray) -> np.ndarray:
+        """Get the slot of each entity, or NO_ENTITY for entities without one"""
+        entity_ids = np.asarray(entity_ids, dtype=np.int64)
+        in_range = (entity_ids >= 0) & (entity_ids < self._slot_lookup.size)
+        return np.where(in_range, self._slot_lookup[np.where(in_range, entity_ids, 0)], self.NO_ENTITY)
+    
+    def _set_slot(self, entity_id: int, slot: int) -> None:
+        self.entity_ids[slot] = entity_id
+        self._slots[entity_id] = slot
+        if entity_id >= self._slot_lookup.size:
+            lookup = np.full(max(entity_id + 1, self._slot_lookup.size * 2), self.NO_ENTITY, dtype=np.int64)
+            lookup[:self._slot_lookup.size] = self._slot_lookup
+            self._slot_lookup = lookup
+        if entity_id >= 0:
+            self._slot_lookup[entity_id] = slot
+    
+    def add_entity(self, entity_id: int) -> int:
+        """Give an entity a slot, with no relations, borders or stats yet; returns the slot"""
+        if entity_id in self._slots:
+            return self._slots[entity_id]
+        
+        if self.count == self.capacity:
+            self._grow(self.capacity * 2)
+        slot = self.count
+        self.count += 1
+        for name, fill in self.PAIR_ARRAYS.items():
+            values = getattr(self, name)
+            values[slot, :] = fill
+            values[:, slot] = fill
+        for name, fill in self.SLOT_ARRAYS.items():
+            getattr(self, name)[slot] = fill
+        self._set_slot(entity_id, slot)
+        self._target = None
+        self._ladder_state = None
+        return slot
+    
+    def _grow(self, capacity: int) -> None:
+        old_capacity = self.capacity
+        for name, fill in self.PAIR_ARRAYS.items():
+            old = getattr(self, name)
+            grown = np.full((capacity, capacity), fill, dtype=old.dtype)
+            grown[:old_capacity, :old_capacity] = old
+            setattr(self, name, grown)
+        for name, fill in self.SLOT_ARRAYS.items():
+            old = getattr(self, name)
+            grown = np.full(capacity, fill, dtype=old.dtype)
+            grown[:old_capacity] = old
+            setattr(self, name, grown)
+    
+    def remove_entity(self, entity_id: int) -> None:
+        """Free an entity's slot, forgetting its relations in both directions"""
+        slot = self._slots.pop(entity_id, None)
+        if slot is None:
+            return
+        
+        if 0 <= entity_id < self._slot_lookup.size:
+            self._slot_lookup[entity_id] = self.NO_ENTITY
+        
+        # Move the last occupied slot into the freed one
+        last = self.count - 1
+        if slot != last:
+            for name in self.PAIR_ARRAYS:
+                values = getattr(self, name)
+                values[slot, :] = values[last, :]
+                values[:, slot] = values[:, last]
+            for name in self.SLOT_ARRAYS:
+                values = getattr(self, name)
+                values[slot] = values[last]
+            self._set_slot(int(self.entity_ids[slot]), slot)
+        self.entity_ids[last] = self.NO_ENTITY
+        self.count = last
+        self._target = None
+        self._ladder_state = None
+    
+    def set_relation(self, entity1_id: int, entity2_id: int, relation: RelationType,
+                     opinion: Optional[float] = None) -> None:
+        """
+        Set the relation entity1 has with entity2
+        
+        Args:
+            entity1_id: ID of the entity holding the relation
+            entity2_id: ID of the other entity
+            relation: Type of relation
+            opinion: entity1's opinion of entity2 (default: RELATION_OPINIONS for the relation)
+        """
+        slot1, slot2 = self._slots[entity1_id], self._slots[entity2_id]
+        self.relations[slot1, slot2] = self.RELATION_TYPES.index(relation)
+        self.opinions[slot1, slot2] = self.RELATION_OPINIONS[relation] if opinion is None else opinion
+        self.known[slot1, slot2] = True
+        if self._ladder_state is not None:
+            position = self._ladder_positions[self.relations[slot1, slot2]] if slot1 != slot2 else -1
+            self._set_ladder_positions((np.array([slot1]), np.array([slot2])), np.array([position], dtype=np.int8))
+    
+    def get_relation(self, entity1_id: int, entity2_id: int) -> Optional[RelationType]:
+        """Get the relation entity1 has with entity2, or None if none was set"""
+        slot1, slot2 = self._slots.get(entity1_id), self._slots.get(entity2_id)
+        if slot1 is None or slot2 is None or not self.known[slot1, slot2]:
+            return None
+        return self.RELATION_TYPES[self.relations[slot1, slot2]]
+    
+    def get_relations(self, entity_id: int) -> Dict[int, RelationType]:
+        """Get every relation an entity has, by the other entity's ID"""
+        slot = self._slots.get(entity_id)
+        if slot is None:
+            return {}
+        others = np.flatnonzero(self.known[slot, :self.count])
+        return {int(self.entity_ids[other]): self.RELATION_TYPES[code]
+                for other, code in zip(others.tolist(), self.relations[slot, others].tolist())}
+    
+    def get_opinions(self, entity_id: int) -> Dict[int, float]:
+        """Get an entity's opinion of every entity it has a relation with, by ID"""
+        slot = self._slots.get(entity_id)
+        if slot is None:
+            return {}
+        others = np.flatnonzero(self.known[slot, :self.count])
+        return {int(self.entity_ids[other]): opinion
+                for other, opinion in zip(others.tolist(), self.opinions[slot, others].tolist())}
+    
+    def set_border_length(self, entity1_id: int, entity2_id: int, length: int) -> None:
+        """Set the number of border cells between two entities (zero when they stop bordering)"""
+        slot1, slot2 = self._slots.get(entity1_id), self._slots.get(entity2_id)
+        if slot1 is None or slot2 is None or self.border_lengths[slot1, slot2] == length:
+            return
+        self.border_lengths[slot1, slot2] = length
+        self.border_lengths[slot2, slot1] = length
+        self._target = None
+    
+    def clear_border_lengths(self) -> None:
+        """Forget every border, before setting them all again"""
+        self.border_lengths[:self.count, :self.count] = 0
+        self._target = None
+    
+    def set_disputes(self, claimant_groups: Iterable[Iterable[int]]) -> None:
+        """Mark every pair within each group of entities as disputed, and no other pair"""
+        disputed = self.disputed[:self.count, :self.count]
+        disputed[:] = False
+        for claimant_ids in claimant_groups:
+            slots = self.get_slots(np.fromiter(claimant_ids, dtype=np.int64))
+            slots = slots[slots != self.NO_ENTITY]
+            disputed[np.ix_(slots, slots)] = True
+        np.fill_diagonal(disputed, False)
+        self._target = None
+    
+    def set_entity_stats(self, entity_ids: np.ndarray, culture_ids: np.ndarray, military: np.ndarray,
+                         economy: np.ndarray, expansionism: np.ndarray) -> None:
+        """Update the stats of some entities, leaving the cached target alone if nothing changed"""
+        slots = self.get_slots(entity_ids)
+        valid = slots != self.NO_ENTITY
+        slots = slots[valid]
+        for name, values in (("culture_ids", culture_ids), ("military", military),
+                             ("economy", economy), ("expansionism", expansionism)):
+            stored = getattr(self, name)
+            values = np.asarray(values, dtype=stored.dtype)[valid]
+            if not np.array_equal(stored[slots], values):
+                stored[slots] = values
+                self._target = None
+    
+    def _calculate_target(self) -> np.ndarray:
+        """Target opinion of row entity for column entity, over the occupied slots"""
+        count = self.count
+        lengths = self.border_lengths[:count, :count]
+        border_totals = lengths.sum(axis=1, keepdims=True)
+        pressure = np.divide(lengths, border_totals, out=np.zeros_like(lengths), where=border_totals > 0)
+        
+        strength = self.military[:count]
+        strength_totals = strength[:, None] + strength[None, :]
+        other_share = np.divide(np.broadcast_to(strength[None, :], strength_totals.shape), strength_totals,
+                                out=np.full_like(strength_totals, 0.5), where=strength_totals > 0)
+        threat = self.MILITARY_FEAR_WEIGHT * np.clip(2 * other_share - 1, 0, None)
+        threat += (self.MILITARY_AMBITION_WEIGHT * np.clip(1 - 2 * other_share, 0, None)
+                   * self.expansionism[:count, None])
+        threat *= lengths > 0
+        
+        wealth = self.economy[:count]
+        wealth_max = np.maximum(wealth[:, None], wealth[None, :])
+        target = np.divide(np.minimum(wealth[:, None], wealth[None, :]), wealth_max,
+                           out=np.zeros_like(wealth_max), where=wealth_max > 0)
+        target *= self.ECONOMIC_WEIGHT
+        cultures = self.culture_ids[:count]
+        np.add(target, self.SHARED_CULTURE_WEIGHT, out=target, where=cultures[:, None] == cultures[None, :])
+        np.subtract(target, self.DISPUTE_WEIGHT, out=target, where=self.disputed[:count, :count])
+        target -= self.BORDER_PRESSURE_WEIGHT * pressure
+        target -= threat
+        return target
+    
+    def _get_ladder_state(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Ladder position of every occupied pair (-1 when off the ladder or unknown), with the
+        mutual opinion sum below which each steps down and at which each steps up
+        """
+        if self._ladder_state is None:
+            count = self.count
+            positions = np.take(self._ladder_positions, self.relations[:count, :count])
+            positions[~self.known[:count, :count]] = -1
+            np.fill_diagonal(positions, -1)
+            self._ladder_state = (positions, np.take(self._step_down_below, positions + 1),
+                                  np.take(self._step_up_from, positions + 1))
+        return self._ladder_state
+    
+    def _set_ladder_positions(self, pairs: Tuple[np.ndarray, np.ndarray], positions: np.ndarray) -> None:
+        ladder_positions, step_down_below, step_up_from = self._ladder_state
+        ladder_positions[pairs] = positions
+        step_down_below[pairs] = self._step_down_below[positions + 1]
+        step_up_from[pairs] = self._step_up_from[positions + 1]
+    
+    def update(self, rng: np.random.Generator, months: int = 1) -> List[Tuple[int, int, RelationType, RelationType]]:
+        """
+        Advance opinions and ladder relations by some months, all pairs at once
+        
+        Args:
+            rng: Source of the random opinion changes
+            months: Number of monthly steps to take
+        
+        Returns:
+            (entity1_id, entity2_id, old_relation, new_relation) for every relation that changed
+        """
+        count = self.count
+        if count < 2 or months <= 0:
+            return []
+        
+        # Each month: opinions += drift * (target - opinions) + uniform noise in +-OPINION_NOISE,
+        # with the drift scaling and the noise offset folded into the cached target
+        if self._target is None:
+            self._target = self._calculate_target() * self.OPINION_DRIFT - self.OPINION_NOISE
+        target = self._target
+        positions, step_down_below, step_up_from = self._get_ladder_state()
+        
+        opinions = self.opinions[:count, :count].copy()
+        noise = np.empty_like(opinions)
+        mutual = np.empty_like(opinions)
+        step_up = np.empty(opinions.shape, dtype=bool)
+        step_down = np.empty(opinions.shape, dtype=bool)
+        stepped_rows, stepped_columns = [], []
+        for _ in range(months):
+            opinions *= 1 - self.OPINION_DRIFT
+            opinions += target
+            rng.random(out=noise, dtype=np.float32)
+            noise *= 2 * self.OPINION_NOISE
+            opinions += noise
+            np.clip(opinions, -100.0, 100.0, out=opinions)
+            
+            # One rung per month toward the band of the pair's mutual opinion
+            np.add(opinions, opinions.T, out=mutual)
+            np.greater_equal(mutual, step_up_from, out=step_up)
+            np.less(mutual, step_down_below, out=step_down)
+            if step_up.any() or step_down.any():
+                stepped = np.nonzero(step_up | step_down)
+                self._set_ladder_positions(stepped, positions[stepped] + step_up[stepped] - step_down[stepped].astype(np.int8))
+                stepped_rows.append(stepped[0])
+                stepped_columns.append(stepped[1])
+        self.opinions[:count, :count] = opinions
+        
+        if not stepped_rows:
+            return []
+        
+        # Pairs that ended the months on a different rung than they started on
+        stepped = np.unique(np.concatenate(stepped_rows) * count + np.concatenate(stepped_columns))
+        rows, columns = stepped // count, stepped % count
+        old_codes = self.relations[rows, columns]
+        new_codes = self._ladder_codes[positions[rows, columns]]
+        changed = new_codes != old_codes
+        rows, columns, old_codes, new_codes = rows[changed], columns[changed], old_codes[changed], new_codes[changed]
+        self.relations[rows, columns] = new_codes
+        return [(int(self.entity_ids[row]), int(self.entity_ids[column]),
+                 self.RELATION_TYPES[old_code], self.RELATION_TYPES[new_code])
+                for row, column, old_code, new_code in zip(rows.tolist(), columns.tolist(), old_codes.tolist(),
+                                                           new_codes.tolist())]
+
+
 class MapPoliticalManager:
     """Manages political entities, borders, and relations within the game world"""
     
+    # Political map color of cells no entity owns
+    NEUTRAL_COLOR = "#CCCCCC"
+    
+    # A border is natural when most of its cells have one of these groups of terrain
+    NATURAL_BORDER_WATER_TERRAINS = ["river", "water", "sea"]
+    NATURAL_BORDER_MOUNTAIN_TERRAINS = ["mountain", "highland", "hill"]
+    
     def __init__(self, world_state: MapWorldState, region_manager: MapRegionManager):
         """
         Initialize the political manager
@@ -348,8 +1074,9 @@ class MapPoliticalManager:
         self.entities: Dict[int, PoliticalEntity] = {}
         self.next_entity_id = 1
         
-        # Borders between entities
+        # Borders between entities, and the computed ones by (entity1_id, entity2_id)
         self.borders: List[Border] = []
+        self._border_index: Dict[Tuple[int, int], Border] = {}
         
         # Territorial disputes
         self.disputes: List[TerritorialDispute] = []
@@ -357,6 +1084,14 @@ class MapPoliticalManager:
         # Neutral territories (not claimed by any entity)
         self.neutral_territories: Set[int] = set()
         
+        # Owner of each cell, kept current by the entities in self.entities
+        self.cell_owners = CellOwnerIndex()
+        
+        # Relations and opinions between the entities in self.entities, and the unresolved
+        # disputes last handed to it
+        self.relation_matrix = RelationMatrix()
+        self._relation_dispute_claimants: List[Tuple[int, ...]] = []
+        
         # Historical data
         self.historical_entities: Dict[int, PoliticalEntity] = {}  # Defunct entities
         self.political_events: List[Dict[str, Any]] = []  # Major political events
@@ -400,6 +1135,7 @@ class MapPoliticalManager:
         )
         
         self.entities[entity.id] = entity
+        self._track_entity(entity)
         self.next_entity_id += 1
         
         # Mark entity foundation date and add to world history
@@ -412,6 +1148,12 @@ class MapPoliticalManager:
         
         return entity
     
+    def _track_entity(self, entity: PoliticalEntity) -> None:
+        """Attach the cell owner index to an entity and record its current territory"""
+        entity.owner_index = self.cell_owners
+        self.cell_owners.assign(entity.territory_cells, entity.id)
+        self.relation_matrix.add_entity(entity.id)
+    
     def remove_entity(self, entity_id: int, reason: str = "dissolved") -> bool:
         """
         Remove a political entity
@@ -438,7 +1180,10 @@ class MapPoliticalManager:
             description=f"{entity.full_name} was {reason}"
         )
         
-        # Move to historical entities
+        # Release its cells and move to historical entities
+        self.cell_owners.release(entity.territory_cells, entity_id)
+        self.relation_matrix.remove_entity(entity_id)
+        entity.owner_index = None
         entity.is_active = False
         self.historical_entities[entity_id] = entity
         del self.entities[entity_id]
@@ -519,6 +1264,7 @@ class MapPoliticalManager:
         # Set relation for first entity
         old_relation = entity1.relations.get(entity2_id, RelationType.NEUTRAL)
         entity1.set_relation(entity2_id, relation)
+        self.relation_matrix.set_relation(entity1_id, entity2_id, relation)
         
         # Record if relation changed
         if old_relation != relation:
@@ -531,6 +1277,7 @@ class MapPoliticalManager:
         # Set bidirectional relation if requested
         if bidirectional:
             entity2.set_relation(entity1_id, relation)
+            self.relation_matrix.set_relation(entity2_id, entity1_id, relation)
         
         return True
     
@@ -550,38 +1297,28 @@ class MapPoliticalManager:
         
         entity = self.entities[entity_id]
         
-        # Check which cells are already claimed by other entities
-        other_entities_cells = set()
-        for other_id, other_entity in self.entities.items():
-            if other_id != entity_id:
-                other_entities_cells.update(other_entity.territory_cells)
-        
-        # Determine which cells are neutral vs. contested
-        neutral_cells = new_cells.difference(other_entities_cells)
-        contested_cells = new_cells.intersection(other_entities_cells)
+        # Determine which cells are neutral vs. contested, by who owns them
+        cells = np.fromiter(new_cells, dtype=np.int64, count=len(new_cells))
+        owners = self.cell_owners.get_owners(cells)
+        contested = (owners != CellOwnerIndex.NO_OWNER) & (owners != entity_id)
+        neutral_cells = set(cells[~contested].tolist())
         
         # Add neutral cells to entity territory
         entity.add_territory(neutral_cells)
         self.neutral_territories.difference_update(neutral_cells)
         
-        # Create disputes for contested cells
-        for cell in contested_cells:
-            # Find which entities claim this cell
-            claimants = [eid for eid, e in self.entities.items() 
-                         if cell in e.territory_cells]
-            
-            # Create a dispute
-            if claimants:
-                dispute = TerritorialDispute(
-                    disputed_cells={cell},
-                    claimant_ids=claimants + [entity_id],
-                    current_controller_id=claimants[0],  # Current controller
-                    start_date=self.world_state.current_date
-                )
-                self.disputes.append(dispute)
+        # Create disputes for contested cells, controlled by their current owner
+        for cell, owner_id in zip(cells[contested].tolist(), owners[contested].tolist()):
+            dispute = TerritorialDispute(
+                disputed_cells={cell},
+                claimant_ids=[owner_id, entity_id],
+                current_controller_id=owner_id,
+                start_date=self.world_state.current_date
+            )
+            self.disputes.append(dispute)
         
         # Update borders
-        self._calculate_all_borders()
+        self._update_borders()
         
         return True
     
@@ -667,7 +1404,7 @@ class MapPoliticalManager:
             winner.add_territory(dispute.disputed_cells)
         
         # Update borders
-        self._calculate_all_borders()
+        self._update_borders()
         
         # Record event
         winner_name = self.entities[winner_id].name if winner_id in self.entities else "Unknown"
@@ -733,23 +1470,17 @@ class MapPoliticalManager:
         Returns:
             Dictionary mapping entity IDs to their influence in the region (0.0-1.0)
         """
-                    # Get cells in this region
-            region_cells = self.region_manager.GetRegionCells(region_id)
-            if not region_cells:
-                return {}
-            
-            # Calculate influence for each entity in the region
-            entity_influences = {}
-            total_cells = len(region_cells)
-            
-            for entity_id, entity in self.entities.items():
-                # Count how many cells in this region belong to this entity
-                entity_cells = entity.territory_cells.intersection(region_cells)
-                if entity_cells:
-                    influence = len(entity_cells) / total_cells
-                    entity_influences[entity_id] = influence
-            
-            return entity_influences
+        # Get cells in this region
+        region_cells = self.region_manager.get_region_cells(region_id)
+        if region_cells.size == 0:
+            return {}
+        
+        # Count how many cells in this region belong to each entity
+        owners = self.cell_owners.get_owners(region_cells)
+        entity_ids, counts = np.unique(owners[owners != CellOwnerIndex.NO_OWNER], return_counts=True)
+        total_cells = region_cells.size
+        
+        return {entity_id: count / total_cells for entity_id, count in zip(entity_ids.tolist(), counts.tolist())}
     
     def get_entity_at_position(self, x: float, y: float) -> Optional[PoliticalEntity]:
         """
@@ -763,16 +1494,12 @@ class MapPoliticalManager:
             The political entity at this position, or None if not found
         """
         # Convert position to cell ID using MapRegionManager
-        cell_id = self.region_manager.GetCellIdFromPosition(x, y)
+        cell_id = self.region_manager.get_cell_id_at_position(x, y)
         if cell_id < 0:
             return None
         
         # Find entity that owns this cell
-        for entity in self.entities.values():
-            if cell_id in entity.territory_cells:
-                return entity
-        
-        return None
+        return self.entities.get(self.cell_owners.get_owner(cell_id))
     
     def get_political_map_color(self, x: float, y: float) -> str:
         """
@@ -788,43 +1515,208 @@ class MapPoliticalManager:
         entity = self.get_entity_at_position(x, y)
         if entity:
             return entity.color
-        return "#CCCCCC"  # Default gray for neutral territories
+        return self.NEUTRAL_COLOR  # Default gray for neutral territories
+    
+    def get_political_map_colors(self, xs: np.ndarray, ys: np.ndarray) -> List[str]:
+        """
+        Get the political map color at many positions at once
+        
+        Args:
+            xs: X coordinates
+            ys: Y coordinates
+        
+        Returns:
+            Hex color code per position, NEUTRAL_COLOR where no entity controls the area
+        """
+        cell_ids = self.region_manager.get_cell_ids_at_positions(xs, ys)
+        owners = self.cell_owners.get_owners(cell_ids)
+        
+        # Look up each distinct owner's color once
+        owner_ids, inverse = np.unique(owners, return_inverse=True)
+        palette = [self.entities[owner_id].color if owner_id in self.entities else self.NEUTRAL_COLOR
+                   for owner_id in owner_ids.tolist()]
+        return [palette[index] for index in inverse.ravel().tolist()]
     
     def _calculate_all_borders(self) -> None:
         """
-        Calculate all borders between political entities
+        Calculate all borders between political entities, and every entity's frontier
+        cells, in one pass over the cell adjacency list
+        """
+        self.cell_owners.clear_changes()
+        self.borders = self._compute_borders(*self.region_manager.get_cell_neighbor_pairs())
+        self._border_index = {(border.entity1_id, border.entity2_id): border for border in self.borders}
+        self._calculate_frontier_cells()
+        self._sync_relation_borders()
+    
+    def _sync_relation_borders(self, pairs: Optional[Iterable[Tuple[int, int]]] = None) -> None:
+        """
+        Hand the relation matrix the border length of some entity pairs (default: every
+        pair, after forgetting the old lengths)
+        """
+        if pairs is None:
+            self.relation_matrix.clear_border_lengths()
+            pairs = list(self._border_index)
+        for entity1_id, entity2_id in pairs:
+            length = sum(len(self._border_index[pair].cells)
+                         for pair in ((entity1_id, entity2_id), (entity2_id, entity1_id))
+                         if pair in self._border_index)
+            self.relation_matrix.set_border_length(entity1_id, entity2_id, length)
+    
+    def _calculate_frontier_cells(self) -> None:
+        """Recompute every entity's frontier cells: both sides of adjacent cells with different owners"""
+        cells_a, cells_b = self.region_manager.get_cell_neighbor_pairs()
+        owners_a = self.cell_owners.get_owners(cells_a)
+        owners_b = self.cell_owners.get_owners(cells_b)
+        differs = owners_a != owners_b
+        for entity in self.entities.values():
+            entity.frontier_cells = set()
+        self._add_frontier_cells(np.concatenate((cells_a[differs], cells_b[differs])),
+                                 np.concatenate((owners_a[differs], owners_b[differs])))
+    
+    def _update_borders(self) -> None:
         """
-        self.borders.clear()
+        Bring borders and frontier cells up to date with the cells that changed owner since
+        the last update, touching only those cells and their neighbors
+        """
+        changed_cells, previous_owners = self.cell_owners.take_changes()
+        if not changed_cells.size:
+            return
         
-        # Keep track of which entity pairs we've already processed
-        processed_pairs = set()
+        # Cells whose border and frontier membership may have changed, with their owners before
+        neighbor_cells = self.region_manager.get_cell_neighbors(changed_cells)[1]
+        affected_cells = np.union1d(changed_cells, neighbor_cells)
+        old_owners = self.cell_owners.get_owners(affected_cells)
+        old_owners[np.searchsorted(affected_cells, changed_cells)] = previous_owners
+        
+        # Take affected cells out of the frontiers and borders of their old owners; a border
+        # cell always belongs to the border's first entity
+        cells_by_old_owner = dict(self._group_cells_by_owner(affected_cells, old_owners))
+        for owner_id, cells in cells_by_old_owner.items():
+            owner = self.entities.get(owner_id)
+            if owner is not None:
+                owner.frontier_cells.difference_update(cells)
+        
+        touched_pairs = set()
+        for pair, border in self._border_index.items():
+            cells = cells_by_old_owner.get(pair[0])
+            if cells is not None and not border.cells.isdisjoint(cells):
+                border.cells.difference_update(cells)
+                touched_pairs.add(pair)
+        
+        # Add them back where their current neighbors put them
+        cells, neighbors = self.region_manager.get_cell_neighbors(affected_cells)
+        owners = self.cell_owners.get_owners(cells)
+        differs = owners != self.cell_owners.get_owners(neighbors)
+        self._add_frontier_cells(cells[differs], owners[differs])
+        
+        for border in self._compute_borders(cells, neighbors, one_sided=True):
+            pair = (border.entity1_id, border.entity2_id)
+            if pair in self._border_index:
+                self._border_index[pair].cells.update(border.cells)
+            else:
+                self._border_index[pair] = border
+            touched_pairs.add(pair)
+        
+        # Drop emptied borders and reclassify the other touched ones
+        for pair in touched_pairs:
+            if not self._border_index[pair].cells:
+                del self._border_index[pair]
+        touched_borders = [self._border_index[pair] for pair in touched_pairs if pair in self._border_index]
+        if touched_borders:
+            lengths = np.array([len(border.cells) for border in touched_borders], dtype=np.int64)
+            starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            border_cells = np.fromiter((cell for border in touched_borders for cell in border.cells),
+                                       dtype=np.int64, count=int(lengths.sum()))
+            for border, border_type in zip(touched_borders, self._classify_border_types(border_cells, starts)):
+                border.border_type = border_type
+                border.is_contested = False
+                border.length = len(border.cells)
+        
+        self.borders = list(self._border_index.values())
+        self._sync_relation_borders(touched_pairs)
+    
+    def _add_frontier_cells(self, cells: np.ndarray, owners: np.ndarray) -> None:
+        """Add cells to the frontier of their owners (unowned cells and unknown owners are skipped)"""
+        for owner_id, owner_cells in self._group_cells_by_owner(cells, owners):
+            entity = self.entities.get(owner_id)
+            if entity is not None:
+                entity.frontier_cells.update(owner_cells)
+    
+    @staticmethod
+    def _group_cells_by_owner(cells: np.ndarray, owners: np.ndarray) -> List[Tuple[int, List[int]]]:
+        """Split cells by owner, leaving out unowned ones"""
+        owned = owners != CellOwnerIndex.NO_OWNER
+        order = np.argsort(owners[owned], kind="stable")
+        cells, owners = cells[owned][order], owners[owned][order]
+        starts = np.flatnonzero(np.concatenate(([True], owners[1:] != owners[:-1])))[:owners.size]
+        ends = np.append(starts[1:], owners.size)
+        return [(int(owners[start]), cells[start:end].tolist()) for start, end in zip(starts, ends)]
+    
+    def _compute_borders(self, cells_a: np.ndarray, cells_b: np.ndarray, one_sided: bool = False) -> List[Border]:
+        """
+        Compute the borders found among pairs of adjacent cells
+        
+        A border between two entities holds the cells of whichever comes first in
+        self.entities that are adjacent to the other's territory, as
+        _calculate_border_between_entities gives them. Borders are returned in the
+        order that visiting entity pairs in self.entities order would find them.
         
-        # For each entity, check for borders with other entities
-        for entity1_id, entity1 in self.entities.items():
-            for entity2_id, entity2 in self.entities.items():
-                # Skip if same entity or already processed this pair
-                if entity1_id == entity2_id or (entity1_id, entity2_id) in processed_pairs or (entity2_id, entity1_id) in processed_pairs:
-                    continue
-                
-                # Calculate border cells between these entities
-                border_cells = self._calculate_border_between_entities(entity1, entity2)
-                
-                if border_cells:
-                    # Determine border type
-                    border_type = self._determine_border_type(border_cells)
-                    
-                    # Create border object
-                    border = Border(
-                        entity1_id=entity1_id,
-                        entity2_id=entity2_id,
-                        cells=border_cells,
-                        border_type=border_type
-                    )
-                    
-                    self.borders.append(border)
-                
-                # Mark this pair as processed
-                processed_pairs.add((entity1_id, entity2_id))
+        Args:
+            cells_a: Cells adjacent to the same-index cells of cells_b
+            cells_b: Cells adjacent to the same-index cells of cells_a
+            one_sided: Only take border cells from cells_a (for pairs that list every
+                neighbor of each cell in cells_a)
+        
+        Returns:
+            List of Border objects, one per pair of entities with any border cells
+        """
+        # Pairs whose cells belong to two different entities
+        ranks_a = self._get_entity_ranks(self.cell_owners.get_owners(cells_a))
+        ranks_b = self._get_entity_ranks(self.cell_owners.get_owners(cells_b))
+        crossing = (ranks_a != ranks_b) & (ranks_a >= 0) & (ranks_b >= 0)
+        if one_sided:
+            crossing &= ranks_a < ranks_b
+        cells_a, cells_b = cells_a[crossing].astype(np.int64), cells_b[crossing].astype(np.int64)
+        ranks_a, ranks_b = ranks_a[crossing], ranks_b[crossing]
+        if not cells_a.size:
+            return []
+        
+        # The border cell is on the side of the entity that comes first
+        a_first = ranks_a < ranks_b
+        pair_keys = np.where(a_first, ranks_a, ranks_b) * len(self.entities) + np.where(a_first, ranks_b, ranks_a)
+        border_cells = np.where(a_first, cells_a, cells_b)
+        
+        # Group cells by entity pair, dropping cells found through several neighbors
+        order = np.lexsort((border_cells, pair_keys))
+        pair_keys, border_cells = pair_keys[order], border_cells[order]
+        distinct = np.ones(pair_keys.size, dtype=bool)
+        distinct[1:] = (pair_keys[1:] != pair_keys[:-1]) | (border_cells[1:] != border_cells[:-1])
+        pair_keys, border_cells = pair_keys[distinct], border_cells[distinct]
+        starts = np.flatnonzero(np.concatenate(([True], pair_keys[1:] != pair_keys[:-1])))
+        
+        entity_ids = list(self.entities.keys())
+        border_types = self._classify_border_types(border_cells, starts)
+        ends = np.append(starts[1:], border_cells.size)
+        borders = []
+        for start, end, border_type in zip(starts.tolist(), ends.tolist(), border_types):
+            first_rank, second_rank = divmod(int(pair_keys[start]), len(entity_ids))
+            borders.append(Border(
+                entity1_id=entity_ids[first_rank],
+                entity2_id=entity_ids[second_rank],
+                cells=set(border_cells[start:end].tolist()),
+                border_type=border_type
+            ))
+        return borders
+    
+    def _get_entity_ranks(self, owners: np.ndarray) -> np.ndarray:
+        """Get the position of each owner in self.entities, or -1 for no owner or an untracked one"""
+        if not self.entities:
+            return np.full(owners.shape, -1, dtype=np.int64)
+        
+        entity_ids = np.fromiter(self.entities.keys(), dtype=np.int64, count=len(self.entities))
+        sorter = np.argsort(entity_ids)
+        positions = np.minimum(np.searchsorted(entity_ids[sorter], owners), entity_ids.size - 1)
+        return np.where(entity_ids[sorter][positions] == owners, sorter[positions], -1)
     
     def _calculate_border_between_entities(self, entity1: PoliticalEntity, entity2: PoliticalEntity) -> Set[int]:
         """
@@ -837,20 +1729,10 @@ class MapPoliticalManager:
         Returns:
             Set of cell IDs that form the border
         """
-        border_cells = set()
-        
-        # For each cell in entity1, check if it's adjacent to any cell in entity2
-        for cell1 in entity1.territory_cells:
-            # Get neighboring cells
-            neighbor_cells = self.region_manager.GetNeighboringCells(cell1)
-            
-            # Check if any neighbors belong to entity2
-            for neighbor in neighbor_cells:
-                if neighbor in entity2.territory_cells:
-                    border_cells.add(cell1)
-                    break
-        
-        return border_cells
+        # Cells of entity1 with any neighbor owned by entity2
+        territory = np.fromiter(entity1.territory_cells, dtype=np.int64, count=len(entity1.territory_cells))
+        cells, neighbors = self.region_manager.get_cell_neighbors(territory)
+        return set(cells[self.cell_owners.get_owners(neighbors) == entity2.id].tolist())
     
     def _determine_border_type(self, border_cells: Set[int]) -> BorderType:
         """
@@ -862,29 +1744,33 @@ class MapPoliticalManager:
         Returns:
             BorderType enum value
         """
-        # Count terrain types along border
-        terrain_counts = {}
-        
-        for cell_id in border_cells:
-            terrain = self.region_manager.GetTerrainTypeForCell(cell_id)
-            terrain_counts[terrain] = terrain_counts.get(terrain, 0) + 1
+        if not border_cells:
+            return BorderType.ARTIFICIAL
         
-        # If mostly water (river), it's a natural border
-        water_terrains = ["river", "water", "sea"]
-        water_count = sum(terrain_counts.get(t, 0) for t in water_terrains)
+        cells = np.fromiter(border_cells, dtype=np.int64, count=len(border_cells))
+        return self._classify_border_types(cells, np.zeros(1, dtype=np.int64))[0]
+    
+    def _classify_border_types(self, cells: np.ndarray, starts: np.ndarray) -> List[BorderType]:
+        """
+        Determine the type of many borders at once, from the terrain of their cells
         
-        if water_count > len(border_cells) * 0.5:
-            return BorderType.NATURAL
+        A border is natural if most of its cells are water (including rivers) or most are
+        mountainous; otherwise it is artificial.
         
-        # If mostly mountains, it's a natural border
-        mountain_terrains = ["mountain", "highland", "hill"]
-        mountain_count = sum(terrain_counts.get(t, 0) for t in mountain_terrains)
+        Args:
+            cells: Concatenated border cells of every border
+            starts: Start of each border's cells in cells (each border has at least one cell)
         
-        if mountain_count > len(border_cells) * 0.5:
-            return BorderType.NATURAL
+        Returns:
+            BorderType per border
+        """
+        lengths = np.diff(np.append(starts, cells.size))
+        natural = np.zeros(starts.size, dtype=bool)
+        for terrain_types in (self.NATURAL_BORDER_WATER_TERRAINS, self.NATURAL_BORDER_MOUNTAIN_TERRAINS):
+            cell_matches = self.region_manager.get_terrain_cell_mask(terrain_types, cells)
+            natural |= np.add.reduceat(cell_matches.astype(np.int64), starts) > lengths * 0.5
         
-        # Default to artificial border
-        return BorderType.ARTIFICIAL
+        return [BorderType.NATURAL if is_natural else BorderType.ARTIFICIAL for is_natural in natural.tolist()]
     
     def _update_borders_after_entity_change(self, changed_entity_id: int) -> None:
         """
@@ -893,11 +1779,9 @@ class MapPoliticalManager:
         Args:
             changed_entity_id: ID of the entity that changed
         """
-        # Remove borders involving this entity
-        self.borders = [b for b in self.borders if b.entity1_id != changed_entity_id and b.entity2_id != changed_entity_id]
-        
-        # Recalculate all borders
-        self._calculate_all_borders()
+        # Borders and frontiers follow cell ownership, so updating around the cells that
+        # changed hands covers borders involving this entity
+        self._update_borders()
     
     def add_political_event(self, event_type: str, description: str, entity_id: int = None, 
                            entity_ids: List[int] = None, winner_id: int = None, 
@@ -938,6 +1822,7 @@ class MapPoliticalManager:
         """
         # Clear existing entities
         self.entities.clear()
+        self.cell_owners.rebuild([])
         self.next_entity_id = 1
         
         # Get suitable locations for capitals
@@ -1052,7 +1937,7 @@ class MapPoliticalManager:
             frontier.remove(current_cell)
             
             # Get neighboring cells
-            neighbors = self.region_manager.GetNeighboringCells(current_cell)
+            neighbors = self.region_manager.get_neighboring_cells(current_cell)
             
             for neighbor in neighbors:
                 # Skip if already in territory or in another entity's territory
@@ -1080,14 +1965,8 @@ class MapPoliticalManager:
         Returns:
             True if the cell belongs to any entity (except the excluded one), False otherwise
         """
-        for entity_id, entity in self.entities.items():
-            if exclude_entity_id is not None and entity_id == exclude_entity_id:
-                continue
-                
-            if cell_id in entity.territory_cells:
-                return True
-                
-        return False
+        owner_id = self.cell_owners.get_owner(cell_id)
+        return owner_id != CellOwnerIndex.NO_OWNER and owner_id != exclude_entity_id
     
     def _initialize_relations_between_entities(self) -> None:
         """
@@ -1120,12 +1999,7 @@ class MapPoliticalManager:
         entity2 = self.entities[entity2_id]
         
         # Check if they share a border
-        has_border = False
-        for border in self.borders:
-            if (border.entity1_id == entity1_id and border.entity2_id == entity2_id) or \
-               (border.entity1_id == entity2_id and border.entity2_id == entity1_id):
-                has_border = True
-                break
+        has_border = (entity1_id, entity2_id) in self._border_index or (entity2_id, entity1_id) in self._border_index
         
         # Entities that share a border are more likely to have tensions
         if has_border:
@@ -1202,19 +2076,25 @@ class MapPoliticalManager:
                 disputed_cells=border.cells
             )
     
-    def update(self) -> None:
+    def update(self, months: int = 1) -> None:
         """
         Update the political state based on world state changes
+        
+        Args:
+            months: Number of months to advance; disputes and random events are rolled
+                month by month, while relations advance all the months in one step
         """
         # Process active disputes
-        self._process_disputes()
+        for _ in range(months):
+            self._process_disputes()
         
         # Update entity relationships based on current state
-        self._update_relationships()
+        self._update_relationships(months)
         
         # Small chance for random political events
-        if random.random() < 0.1:  # 10% chance
-            self._generate_random_political_event()
+        for _ in range(months):
+            if random.random() < 0.1:  # 10% chance
+                self._generate_random_political_event()
     
     def _process_disputes(self) -> None:
         """
@@ -1251,76 +2131,44 @@ class MapPoliticalManager:
                     winner_id = entity2_id if not entity1 else entity1_id
                     self.resolve_dispute(i, winner_id)
     
-    def _update_relationships(self) -> None:
-        """
-        Update relationships between entities based on current state
+    def _update_relationships(self, months: int = 1) -> None:
         """
-        # For each pair of entities
-        entity_ids = list(self.entities.keys())
-        
-        for i, entity1_id in enumerate(entity_ids):
-            for entity2_id in entity_ids[i+1:]:
-                # Small chance to change relationship
-                if random.random() < 0.02:  # 2% chance
-                    entity1 = self.entities[entity1_id]
-                    entity2 = self.entities[entity2_id]
-                    
-                    current_relation = entity1.relations.get(entity2_id, RelationType.NEUTRAL)
-                    
-                    # Calculate new relation
-                    new_relation = self._calculate_new_relation(entity1_id, entity2_id, current_relation)
-                    
-                    if new_relation != current_relation:
-                        # Update relation
-                        self.set_relation(entity1_id, entity2_id, new_relation)
-    
-    def _calculate_new_relation(self, entity1_id: int, entity2_id: int, 
-                               current_relation: RelationType) -> RelationType:
-        """
-        Calculate a new relation between two entities
+        Update relationships between entities based on current state, for every pair at once
+        through the relation matrix
         
         Args:
-            entity1_id: ID of the first entity
-            entity2_id: ID of the second entity
-            current_relation: Current relation between them
-            
-        Returns:
-            New RelationType enum value
-        """
-        # Check for active disputes
-        has_dispute = False
-        for dispute in self.disputes:
-            if not dispute.resolved and entity1_id in dispute.claimant_ids and entity2_id in dispute.claimant_ids:
-                has_dispute = True
-                break
-        
-        # If they have an active dispute, relations tend to worsen
-        if has_dispute:
-            if current_relation == RelationType.PEACE:
-                return RelationType.NEUTRAL
-            elif current_relation == RelationType.NEUTRAL:
-                return RelationType.TENSION
-            elif current_relation == RelationType.TENSION:
-                return RelationType.CONFLICT
-            elif current_relation == RelationType.CONFLICT:
-                return RelationType.WAR if random.random() < 0.3 else RelationType.CONFLICT
-            else:
-                return current_relation
-        
-        # Without disputes, relations can improve
-        if random.random() < 0.7:  # 70% chance to improve
-            if current_relation == RelationType.WAR:
-                return RelationType.CONFLICT
-            elif current_relation == RelationType.CONFLICT:
-                return RelationType.TENSION
-            elif current_relation == RelationType.TENSION:
-                return RelationType.NEUTRAL
-            elif current_relation == RelationType.NEUTRAL:
-                return RelationType.PEACE
-            else:
-                return current_relation
-        
-        return current_relation
+            months: Number of monthly steps to take
+        """
+        matrix = self.relation_matrix
+        
+        # Hand the matrix the current entity stats and disputes; it keeps its cached target
+        # when they haven't changed (borders are kept current by the border updates)
+        entities = list(self.entities.values())
+        matrix.set_entity_stats(np.array([entity.id for entity in entities], dtype=np.int64),
+                                np.array([entity.culture_id for entity in entities], dtype=np.int64),
+                                np.array([entity.military_strength for entity in entities], dtype=np.float32),
+                                np.array([entity.economic_power for entity in entities], dtype=np.float32),
+                                np.array([entity.expansionism for entity in entities], dtype=np.float32))
+        dispute_claimants = [tuple(dispute.claimant_ids) for dispute in self.disputes if not dispute.resolved]
+        if dispute_claimants != self._relation_dispute_claimants:
+            matrix.set_disputes(dispute_claimants)
+            self._relation_dispute_claimants = dispute_claimants
+        
+        # Seeded from the random module, so random.seed still makes updates repeatable
+        rng = np.random.default_rng(random.getrandbits(64))
+        changes = matrix.update(rng, months)
+        
+        # Mirror the changes on the entities, with one event per pair that changed both ways
+        changed = {(entity1_id, entity2_id, new_relation) for entity1_id, entity2_id, _, new_relation in changes}
+        for entity1_id, entity2_id, old_relation, new_relation in changes:
+            entity1 = self.entities[entity1_id]
+            entity1.set_relation(entity2_id, new_relation)
+            if entity1_id < entity2_id or (entity2_id, entity1_id, new_relation) not in changed:
+                self.add_political_event(
+                    event_type="relation_changed",
+                    entity_ids=[entity1_id, entity2_id],
+                    description=f"Relation between {entity1.name} and {self.entities[entity2_id].name} changed from {old_relation.value} to {new_relation.value}"
+                )
     
     def _generate_random_political_event(self) -> None:
         """
@@ -1377,7 +2225,7 @@ class MapPoliticalManager:
                         break
                         
                     cell = random.choice(frontier)
-                    neighbors = self.region_manager.GetNeighboringCells(cell)
+                    neighbors = self.region_manager.get_neighboring_cells(cell)
                     
                     for neighbor in neighbors:
                         if neighbor not in entity.territory_cells and not self._cell_belongs_to_any_entity(neighbor):
@@ -1428,7 +2276,9 @@ class MapPoliticalManager:
             "borders": [border.to_dict() for border in self.borders],
             "disputes": [dispute.to_dict() for dispute in self.disputes],
             "neutral_territories": list(self.neutral_territories),
-            "political_events": self.political_events
+            "political_events": self.political_events,
+            "relation_opinions": {str(entity_id): {str(k): v for k, v in self.relation_matrix.get_opinions(entity_id).items()}
+                                  for entity_id in self.entities}
         }
     
     @classmethod
@@ -1449,6 +2299,17 @@ class MapPoliticalManager:
         # Load entities
         manager.entities = {int(entity_id): PoliticalEntity.from_dict(entity_data) 
                           for entity_id, entity_data in data["entities"].items()}
+        for entity in manager.entities.values():
+            manager._track_entity(entity)
+        
+        # Load relations into the relation matrix, with the saved opinions if there are any
+        opinions = data.get("relation_opinions", {})
+        for entity in manager.entities.values():
+            entity_opinions = opinions.get(str(entity.id), {})
+            for other_id, relation in entity.relations.items():
+                if other_id in manager.relation_matrix:
+                    manager.relation_matrix.set_relation(entity.id, other_id, relation,
+                                                         entity_opinions.get(str(other_id)))
         
         # Load historical entities
         manager.historical_entities = {int(entity_id): PoliticalEntity.from_dict(entity_data) 
@@ -1457,8 +2318,13 @@ class MapPoliticalManager:
         # Load next entity ID
         manager.next_entity_id = data["next_entity_id"]
         
-        # Load borders
+        # Load borders, and rebuild frontiers from the loaded territories
         manager.borders = [Border.from_dict(border_data) for border_data in data["borders"]]
+        for border in manager.borders:
+            manager._border_index.setdefault((border.entity1_id, border.entity2_id), border)
+        manager._sync_relation_borders()
+        manager.cell_owners.clear_changes()
+        manager._calculate_frontier_cells()
         
         # Load disputes
         manager.disputes = [TerritorialDispute.from_dict(dispute_data) for dispute_data in data["disputes"]]
@@ -1485,7 +2351,7 @@ class MapPoliticalManager:
         Returns:
             The cell ID at this position
         """
-        return self.region_manager.GetCellIdFromPosition(x, y)
+        return self.region_manager.get_cell_id_at_position(x, y)
     
     def GetPoliticalEntityAtPosition(self, x: float, y: float) -> Dict[str, Any]:
         """
@@ -1552,8 +2418,21 @@ class MapPoliticalManager:
             Dictionary mapping entity IDs to relation types
         """
         if entity_id in self.entities:
-            entity = self.entities[entity_id]
-            return {str(k): v.value for k, v in entity.relations.items()}
+            return {str(k): v.value for k, v in self.relation_matrix.get_relations(entity_id).items()}
+        return {}
+    
+    def GetEntityOpinions(self, entity_id: int) -> Dict[str, float]:
+        """
+        Unity interface method: Get an entity's opinion of the entities it has relations with
+        
+        Args:
+            entity_id: ID of the entity
+        
+        Returns:
+            Dictionary mapping entity IDs to opinions, from -100 (hostile) to 100 (friendly)
+        """
+        if entity_id in self.entities:
+            return {str(k): v for k, v in self.relation_matrix.get_opinions(entity_id).items()}
         return {}
     
     def GetEntityTerritory(self, entity_id: int) -> List[int]:
@@ -1570,6 +2449,30 @@ class MapPoliticalManager:
             return list(self.entities[entity_id].territory_cells)
         return []
     
+    def GetEntityTerritoryStructure(self, entity_id: int) -> Dict[str, Any]:
+        """
+        Unity interface method: Get how an entity's territory is laid out
+        
+        Args:
+            entity_id: ID of the entity
+        
+        Returns:
+            Dictionary with the exclaves, core and frontier provinces, and compactness
+            metrics of the territory
+        """
+        if entity_id not in self.entities:
+            return {}
+        
+        entity = self.entities[entity_id]
+        exclaves = entity.calculate_disconnected_territories(self.region_manager)
+        entity.calculate_provinces(self.region_manager)
+        return {
+            "exclaves": [sorted(exclave) for exclave in exclaves],
+            "core_provinces": entity.core_provinces,
+            "frontier_provinces": entity.frontier_provinces,
+            "metrics": entity.calculate_compactness(self.region_manager)
+        }
+    
     def GetBordersBetweenEntities(self, entity1_id: int, entity2_id: int) -> Dict[str, Any]:
         """
         Unity interface method: Get border information between two entities
@@ -1925,9 +2828,12 @@ class MapPoliticalManager:
             
             # Copy all attributes
             self.entities = manager.entities
+            self.cell_owners = manager.cell_owners
+            self.relation_matrix = manager.relation_matrix
             self.historical_entities = manager.historical_entities
             self.next_entity_id = manager.next_entity_id
             self.borders = manager.borders
+            self._border_index = manager._border_index
             self.disputes = manager.disputes
             self.neutral_territories = manager.neutral_territories
             self.political_events = manager.political_events
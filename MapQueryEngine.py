@@ -8,6 +8,8 @@ import logging
 import time
 from typing import Dict, List, Optional, Union, Any
 
+from MapRegionManager import MapRegionManager, TravelTimeMatrix
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -27,6 +29,18 @@ class MapQueryEngine:
     locations, political entities, and other map-related data.
     """
 
+    # Travel speeds in miles per day
+    TRAVEL_SPEEDS = {
+        'walking': 24,  # 3 mph for 8 hours
+        'horseback': 40,  # 5 mph for 8 hours
+        'carriage': 32,  # 4 mph for 8 hours
+        'ship': 72,  # 3 mph for 24 hours (ocean travel)
+        'river_boat': 48,  # 2 mph for 24 hours (upstream)
+        'river_boat_downstream': 96,  # 4 mph for 24 hours (downstream)
+        'fast_mount': 56,  # 7 mph for 8 hours
+        'magical': 240  # 10 mph for 24 hours (no rest needed)
+    }
+
     def __init__(self,
                  map_file_path: str = "C:\\DnD5e\\Mapping\\Test.map",
                  map_data_path: str = "C:\\MapAI\\MapData",
@@ -53,6 +67,10 @@ class MapQueryEngine:
         self.last_query_time = 0
         self.query_history = []
 
+        # Terrain model for travel-time queries (defaults to the shared MapRegionManager)
+        self.region_manager: Optional[MapRegionManager] = None
+        self.travel_matrix: Optional[TravelTimeMatrix] = None
+
         # Load map data if not using lazy loading
         if not lazy_loading:
             self._load_map_data()
@@ -714,20 +732,8 @@ class MapQueryEngine:
         """
         Estimate travel time based on distance and travel method.
         """
-        # Travel speeds in miles per day
-        travel_speeds = {
-            'walking': 24,  # 3 mph for 8 hours
-            'horseback': 40,  # 5 mph for 8 hours
-            'carriage': 32,  # 4 mph for 8 hours
-            'ship': 72,  # 3 mph for 24 hours (ocean travel)
-            'river_boat': 48,  # 2 mph for 24 hours (upstream)
-            'river_boat_downstream': 96,  # 4 mph for 24 hours (downstream)
-            'fast_mount': 56,  # 7 mph for 8 hours
-            'magical': 240  # 10 mph for 24 hours (no rest needed)
-        }
-
         # Get travel speed for method
-        speed = travel_speeds.get(travel_method.lower(), travel_speeds['walking'])
+        speed = self.TRAVEL_SPEEDS.get(travel_method.lower(), self.TRAVEL_SPEEDS['walking'])
 
         # Calculate days and hours
         total_hours = (distance / (speed / 24))
@@ -741,6 +747,34 @@ class MapQueryEngine:
             'speed_per_day': speed
         }
 
+    def get_settlement_travel_matrix(self, max_days: Optional[float] = None) -> Optional[TravelTimeMatrix]:
+        """
+        Get the terrain travel time matrix between all settlements (burgs).
+
+        The matrix is computed on first use, saved next to the map file and reused
+        until the terrain changes. Returns None if no terrain grid is available.
+
+        Args:
+            max_days: Only search this many days (at speed 1.0) out from each settlement;
+                pairs further apart are unreachable in the matrix. None searches the whole map.
+        """
+        region_manager = self.region_manager or MapRegionManager.instance()
+        if not region_manager.map_grid:
+            logger.warning("Map grid not available, cannot compute settlement travel times")
+            return None
+
+        burgs = {str(burg.get('i')): (float(burg.get('x', 0)), float(burg.get('y', 0)))
+                 for burg in self.map_data.get('burgs', []) if not burg.get('removed', False)}
+
+        max_cost = float('inf') if max_days is None else max_days * region_manager.TRAVEL_HOURS_PER_DAY
+        if (self.travel_matrix is None or
+                self.travel_matrix.map_hash != region_manager.map_grid.get_terrain_hash() or
+                not self.travel_matrix.covers(burgs, max_cost)):
+            self.travel_matrix = region_manager.get_travel_time_matrix(burgs, max_days,
+                                                                       map_file_path=self.map_file_path)
+
+        return self.travel_matrix
+
     def _find_path(self, from_location: Dict[str, Any], to_location: Dict[str, Any],
                    travel_method: str) -> List[Dict[str, Any]]:
         """
@@ -1201,13 +1235,17 @@ class MapQueryEngine:
 
     # Integration methods for CoreAI
 
-    def get_locations_near(self, location_id: int, radius: float = 50) -> Dict[str, Any]:
+    def get_locations_near(self, location_id: int, radius: float = 50,
+                           max_travel_days: Optional[float] = None, travel_speed: float = 1.0) -> Dict[str, Any]:
         """
         Get locations near a specified location.
 
         Args:
             location_id: ID of the central location
             radius: Radius in miles to search
+            max_travel_days: If given, find locations within this many days of travel over the
+                terrain instead of within a straight-line radius
+            travel_speed: Travel speed multiplier for max_travel_days
 
         Returns:
             Dictionary with nearby locations
@@ -1224,12 +1262,26 @@ class MapQueryEngine:
         loc_x = location.get('x', location.get('p', [0, 0])[0])
         loc_y = location.get('y', location.get('p', [0, 0])[1])
 
+        # Travel days to every candidate from one travel cost field, if asked for
+        burgs = [burg for burg in self.map_data.get('burgs', []) if not burg.get('removed')]
+        feature_cells = [cell for cell in self.map_data.get('cells', []) if 'featureName' in cell]
+        burg_travel_days = None
+        feature_travel_days = None
+        if max_travel_days is not None:
+            region_manager = self.region_manager or MapRegionManager.instance()
+            if region_manager.map_grid:
+                burg_travel_days = region_manager.get_travel_days_to_positions(
+                    [(loc_x, loc_y)], [burg.get('x', 0) for burg in burgs], [burg.get('y', 0) for burg in burgs],
+                    max_travel_days, travel_speed).tolist()
+                feature_travel_days = region_manager.get_travel_days_to_positions(
+                    [(loc_x, loc_y)], [cell.get('p', [0, 0])[0] for cell in feature_cells],
+                    [cell.get('p', [0, 0])[1] for cell in feature_cells], max_travel_days, travel_speed).tolist()
+            else:
+                logger.warning("Map grid not available, using straight-line distance for get_locations_near")
+
         # Find nearby burgs
         nearby_burgs = []
-        for burg in self.map_data.get('burgs', []):
-            if 'removed' in burg and burg['removed']:
-                continue
-
+        for burg_index, burg in enumerate(burgs):
             burg_x = burg.get('x', 0)
             burg_y = burg.get('y', 0)
 
@@ -1242,21 +1294,26 @@ class MapQueryEngine:
             map_scale = self.map_data.get('info', {}).get('mapScale', 1)
             distance_miles = distance * map_scale
 
-            if distance_miles <= radius:
-                nearby_burgs.append({
+            if burg_travel_days is not None:
+                in_range = burg_travel_days[burg_index] <= max_travel_days
+            else:
+                in_range = distance_miles <= radius
+
+            if in_range:
+                nearby_burg = {
                     'id': burg.get('i'),
                     'name': burg.get('name', f"Unnamed Burg {burg.get('i')}"),
                     'distance': round(distance_miles, 2),
                     'type': 'burg',
                     'population': burg.get('population', 0)
-                })
+                }
+                if burg_travel_days is not None:
+                    nearby_burg['travel_days'] = round(burg_travel_days[burg_index], 2)
+                nearby_burgs.append(nearby_burg)
 
         # Find nearby features (geographic landmarks)
         nearby_features = []
-        for cell in self.map_data.get('cells', []):
-            if 'featureName' not in cell:
-                continue
-
+        for cell_index, cell in enumerate(feature_cells):
             cell_x = cell.get('p', [0, 0])[0]
             cell_y = cell.get('p', [0, 0])[1]
 
@@ -1269,14 +1326,22 @@ class MapQueryEngine:
             map_scale = self.map_data.get('info', {}).get('mapScale', 1)
             distance_miles = distance * map_scale
 
-            if distance_miles <= radius:
-                nearby_features.append({
+            if feature_travel_days is not None:
+                in_range = feature_travel_days[cell_index] <= max_travel_days
+            else:
+                in_range = distance_miles <= radius
+
+            if in_range:
+                nearby_feature = {
                     'id': cell.get('i'),
                     'name': cell.get('featureName'),
                     'distance': round(distance_miles, 2),
                     'type': 'feature',
                     'biome': cell.get('biome', 'unknown')
-                })
+                }
+                if feature_travel_days is not None:
+                    nearby_feature['travel_days'] = round(feature_travel_days[cell_index], 2)
+                nearby_features.append(nearby_feature)
 
         return {
             'status': 'success',
@@ -1286,6 +1351,7 @@ class MapQueryEngine:
                 'type': 'burg' if 'population' in location else 'feature'
             },
             'radius': radius,
+            'max_travel_days': max_travel_days,
             'nearby_burgs': nearby_burgs,
             'nearby_features': nearby_features
         }
@@ -1634,535 +1700,560 @@ class MapQueryEngine:
                 'encounter': encounter_details
             }
 
-        def _generate_encounter_for_location(self, location: Dict[str, Any], encounter_type: str) -> Dict[str, Any]:
-            """
-            Generate an appropriate encounter based on the location.
-            """
-            import random
+    def _generate_encounter_for_location(self, location: Dict[str, Any], encounter_type: str) -> Dict[str, Any]:
+        """
+        Generate an appropriate encounter based on the location.
+        """
+        import random
 
-            # Get biome type
-            biome = location.get('biome', 'grassland')
-            is_river = location.get('river', False)
-            height = location.get('height', 0)
-
-            # Determine appropriate encounter types for the biome
-            encounter_types = {
-                'forest': ['wildlife', 'bandit', 'hunter', 'mystical', 'traveler', 'settlement'],
-                'jungle': ['wildlife', 'predator', 'tribe', 'ruins', 'mystical', 'disease'],
-                'desert': ['wildlife', 'bandit', 'caravan', 'ruins', 'natural hazard', 'oasis'],
-                'mountain': ['wildlife', 'giant', 'dwarf', 'natural hazard', 'mine', 'vista'],
-                'grassland': ['wildlife', 'bandit', 'caravan', 'farm', 'army', 'settlement'],
-                'swamp': ['wildlife', 'tribe', 'ruins', 'mystical', 'disease', 'hunter'],
-                'tundra': ['wildlife', 'tribe', 'natural hazard', 'mystical', 'explorer', 'settlement'],
-                'arctic': ['wildlife', 'natural hazard', 'explorer', 'mystical', 'giant', 'ruins']
-            }
+        # Get biome type
+        biome = location.get('biome', 'grassland')
+        is_river = location.get('river', False)
+        height = location.get('height', 0)
+
+        # Determine appropriate encounter types for the biome
+        encounter_types = {
+            'forest': ['wildlife', 'bandit', 'hunter', 'mystical', 'traveler', 'settlement'],
+            'jungle': ['wildlife', 'predator', 'tribe', 'ruins', 'mystical', 'disease'],
+            'desert': ['wildlife', 'bandit', 'caravan', 'ruins', 'natural hazard', 'oasis'],
+            'mountain': ['wildlife', 'giant', 'dwarf', 'natural hazard', 'mine', 'vista'],
+            'grassland': ['wildlife', 'bandit', 'caravan', 'farm', 'army', 'settlement'],
+            'swamp': ['wildlife', 'tribe', 'ruins', 'mystical', 'disease', 'hunter'],
+            'tundra': ['wildlife', 'tribe', 'natural hazard', 'mystical', 'explorer', 'settlement'],
+            'arctic': ['wildlife', 'natural hazard', 'explorer', 'mystical', 'giant', 'ruins']
+        }
 
-            # Ensure biome exists in our types list
-            if biome not in encounter_types:
-                biome = 'grassland'
+        # Ensure biome exists in our types list
+        if biome not in encounter_types:
+            biome = 'grassland'
 
-            # Choose encounter type if random
-            if encounter_type == 'random':
-                encounter_type = random.choice(encounter_types[biome])
+        # Choose encounter type if random
+        if encounter_type == 'random':
+            encounter_type = random.choice(encounter_types[biome])
 
-            # Generate encounter details based on type
-            encounter = {
-                'type': encounter_type,
-                'difficulty': random.choice(['easy', 'medium', 'hard']),
-                'rewards': []
+        # Generate encounter details based on type
+        encounter = {
+            'type': encounter_type,
+            'difficulty': random.choice(['easy', 'medium', 'hard']),
+            'rewards': []
+        }
+
+        # Add type-specific details
+        if encounter_type == 'wildlife':
+            # Wildlife encounters vary by biome
+            wildlife_types = {
+                'forest': ['wolves', 'bears', 'deer', 'wild boars', 'foxes'],
+                'jungle': ['tigers', 'monkeys', 'snakes', 'parrots', 'insects'],
+                'desert': ['scorpions', 'snakes', 'vultures', 'camels', 'jackals'],
+                'mountain': ['mountain goats', 'eagles', 'wolves', 'bears', 'mountain lions'],
+                'grassland': ['horses', 'bison', 'wolves', 'hawks', 'rabbits'],
+                'swamp': ['alligators', 'snakes', 'frogs', 'insects', 'fish'],
+                'tundra': ['wolves', 'bears', 'elk', 'foxes', 'birds'],
+                'arctic': ['polar bears', 'seals', 'penguins', 'whales', 'walruses']
             }
 
-            # Add type-specific details
-            if encounter_type == 'wildlife':
-                # Wildlife encounters vary by biome
-                wildlife_types = {
-                    'forest': ['wolves', 'bears', 'deer', 'wild boars', 'foxes'],
-                    'jungle': ['tigers', 'monkeys', 'snakes', 'parrots', 'insects'],
-                    'desert': ['scorpions', 'snakes', 'vultures', 'camels', 'jackals'],
-                    'mountain': ['mountain goats', 'eagles', 'wolves', 'bears', 'mountain lions'],
-                    'grassland': ['horses', 'bison', 'wolves', 'hawks', 'rabbits'],
-                    'swamp': ['alligators', 'snakes', 'frogs', 'insects', 'fish'],
-                    'tundra': ['wolves', 'bears', 'elk', 'foxes', 'birds'],
-                    'arctic': ['polar bears', 'seals', 'penguins', 'whales', 'walruses']
-                }
+            encounter['creature'] = random.choice(wildlife_types[biome])
+            encounter['behavior'] = random.choice(
+                ['aggressive', 'neutral', 'fleeing', 'hunting', 'defending territory'])
+            encounter[
+                'description'] = f"A group of {encounter['creature']} that appear to be {encounter['behavior']}."
 
-                encounter['creature'] = random.choice(wildlife_types[biome])
-                encounter['behavior'] = random.choice(
-                    ['aggressive', 'neutral', 'fleeing', 'hunting', 'defending territory'])
-                encounter[
-                    'description'] = f"A group of {encounter['creature']} that appear to be {encounter['behavior']}."
+            if encounter['difficulty'] == 'hard':
+                encounter['description'] += " They seem unusually large or numerous."
 
-                if encounter['difficulty'] == 'hard':
-                    encounter['description'] += " They seem unusually large or numerous."
+            # Add rewards if aggressive
+            if encounter['behavior'] in ['aggressive', 'hunting']:
+                encounter['rewards'].append({
+                    'type': 'crafting_materials',
+                    'description': f"{encounter['creature'].rstrip('s')} hide and meat"
+                })
 
-                # Add rewards if aggressive
-                if encounter['behavior'] in ['aggressive', 'hunting']:
-                    encounter['rewards'].append({
-                        'type': 'crafting_materials',
-                        'description': f"{encounter['creature'].rstrip('s')} hide and meat"
-                    })
+        elif encounter_type == 'bandit':
+            bandit_types = ['highwaymen', 'deserters', 'outlaws', 'pirates', 'brigands']
+            encounter['group'] = random.choice(bandit_types)
+            encounter['size'] = random.choice(['small', 'medium', 'large'])
+            encounter['activity'] = random.choice(
+                ['ambushing', 'camping', 'patrolling', 'fighting amongst themselves', 'dividing loot'])
 
-            elif encounter_type == 'bandit':
-                bandit_types = ['highwaymen', 'deserters', 'outlaws', 'pirates', 'brigands']
-                encounter['group'] = random.choice(bandit_types)
-                encounter['size'] = random.choice(['small', 'medium', 'large'])
-                encounter['activity'] = random.choice(
-                    ['ambushing', 'camping', 'patrolling', 'fighting amongst themselves', 'dividing loot'])
+            encounter[
+                'description'] = f"A {encounter['size']} group of {encounter['group']} {encounter['activity']}."
 
-                encounter[
-                    'description'] = f"A {encounter['size']} group of {encounter['group']} {encounter['activity']}."
+            # Add rewards
+            encounter['rewards'].append({
+                'type': 'gold',
+                'amount': random.randint(5, 50) * {'small': 1, 'medium': 2, 'large': 4}[encounter['size']]
+            })
 
-                # Add rewards
+            if random.random() < 0.3:
                 encounter['rewards'].append({
-                    'type': 'gold',
-                    'amount': random.randint(5, 50) * {'small': 1, 'medium': 2, 'large': 4}[encounter['size']]
+                    'type': 'item',
+                    'description': random.choice(['weapon', 'armor', 'jewelry', 'map', 'potion'])
                 })
 
-                if random.random() < 0.3:
-                    encounter['rewards'].append({
-                        'type': 'item',
-                        'description': random.choice(['weapon', 'armor', 'jewelry', 'map', 'potion'])
-                    })
-
-            elif encounter_type == 'settlement':
-                settlement_types = {
-                    'forest': ['logging camp', 'hunter\'s lodge', 'woodcutter\'s village', 'druid circle',
-                               'ranger outpost'],
-                    'jungle': ['trading post', 'expedition camp', 'native village', 'temple complex',
-                               'colonial outpost'],
-                    'desert': ['oasis town', 'trading post', 'nomad camp', 'mining outpost', 'ancient temple'],
-                    'mountain': ['mining town', 'fortress', 'monastery', 'dwarf hold', 'giant steading'],
-                    'grassland': ['farming village', 'roadside inn', 'market town', 'military outpost', 'nomad camp'],
-                    'swamp': ['fishing village', 'witch\'s hut', 'smuggler\'s hideout', 'lizardfolk village',
-                              'hermit\'s shack'],
-                    'tundra': ['fur trapper camp', 'small fort', 'tribal settlement', 'mining outpost', 'trading post'],
-                    'arctic': ['fishing village', 'explorer camp', 'native settlement', 'outpost',
-                               'magical research station']
-                }
+        elif encounter_type == 'settlement':
+            settlement_types = {
+                'forest': ['logging camp', 'hunter\'s lodge', 'woodcutter\'s village', 'druid circle',
+                           'ranger outpost'],
+                'jungle': ['trading post', 'expedition camp', 'native village', 'temple complex',
+                           'colonial outpost'],
+                'desert': ['oasis town', 'trading post', 'nomad camp', 'mining outpost', 'ancient temple'],
+                'mountain': ['mining town', 'fortress', 'monastery', 'dwarf hold', 'giant steading'],
+                'grassland': ['farming village', 'roadside inn', 'market town', 'military outpost', 'nomad camp'],
+                'swamp': ['fishing village', 'witch\'s hut', 'smuggler\'s hideout', 'lizardfolk village',
+                          'hermit\'s shack'],
+                'tundra': ['fur trapper camp', 'small fort', 'tribal settlement', 'mining outpost', 'trading post'],
+                'arctic': ['fishing village', 'explorer camp', 'native settlement', 'outpost',
+                           'magical research station']
+            }
 
-                encounter['settlement_type'] = random.choice(settlement_types[biome])
-                encounter['attitude'] = random.choice(['friendly', 'suspicious', 'neutral', 'hostile', 'desperate'])
-                encounter['notable_npc'] = random.choice(['elder', 'merchant', 'craftsman', 'guard captain', 'outcast'])
-                encounter['problem'] = random.choice(
-                    ['monster attacks', 'supply shortage', 'disease', 'internal conflict', 'natural disaster', 'none'])
-
-                encounter[
-                    'description'] = f"A {encounter['settlement_type']} where the inhabitants are {encounter['attitude']}."
-                if encounter['problem'] != 'none':
-                    encounter['description'] += f" They are dealing with {encounter['problem']}."
-
-                # Add potential quest hook
-                if encounter['problem'] != 'none':
-                    encounter['quest_hook'] = f"Help the settlement deal with {encounter['problem']}."
-
-            elif encounter_type == 'ruins':
-                ruin_types = ['temple', 'fortress', 'palace', 'village', 'outpost', 'tomb', 'monument']
-                encounter['ruin_type'] = random.choice(ruin_types)
-                encounter['age'] = random.choice(['ancient', 'recent', 'primordial', 'forgotten'])
-                encounter['condition'] = random.choice(['mostly intact', 'crumbling', 'overgrown', 'buried', 'flooded'])
-                encounter['current_occupants'] = random.choice(['monsters', 'bandits', 'wildlife', 'spirits', 'none'])
-
-                encounter[
-                    'description'] = f"The {encounter['condition']} ruins of an {encounter['age']} {encounter['ruin_type']}."
-                if encounter['current_occupants'] != 'none':
-                    encounter['description'] += f" It appears to be occupied by {encounter['current_occupants']}."
-
-                # Add rewards
-                if random.random() < 0.7:
-                    encounter['rewards'].append({
-                        'type': 'treasure',
-                        'description': random.choice(
-                            ['hidden cache', 'ancient artifact', 'historical relic', 'forgotten knowledge',
-                             'valuable treasure'])
-                    })
+            encounter['settlement_type'] = random.choice(settlement_types[biome])
+            encounter['attitude'] = random.choice(['friendly', 'suspicious', 'neutral', 'hostile', 'desperate'])
+            encounter['notable_npc'] = random.choice(['elder', 'merchant', 'craftsman', 'guard captain', 'outcast'])
+            encounter['problem'] = random.choice(
+                ['monster attacks', 'supply shortage', 'disease', 'internal conflict', 'natural disaster', 'none'])
+
+            encounter[
+                'description'] = f"A {encounter['settlement_type']} where the inhabitants are {encounter['attitude']}."
+            if encounter['problem'] != 'none':
+                encounter['description'] += f" They are dealing with {encounter['problem']}."
+
+            # Add potential quest hook
+            if encounter['problem'] != 'none':
+                encounter['quest_hook'] = f"Help the settlement deal with {encounter['problem']}."
+
+        elif encounter_type == 'ruins':
+            ruin_types = ['temple', 'fortress', 'palace', 'village', 'outpost', 'tomb', 'monument']
+            encounter['ruin_type'] = random.choice(ruin_types)
+            encounter['age'] = random.choice(['ancient', 'recent', 'primordial', 'forgotten'])
+            encounter['condition'] = random.choice(['mostly intact', 'crumbling', 'overgrown', 'buried', 'flooded'])
+            encounter['current_occupants'] = random.choice(['monsters', 'bandits', 'wildlife', 'spirits', 'none'])
+
+            encounter[
+                'description'] = f"The {encounter['condition']} ruins of an {encounter['age']} {encounter['ruin_type']}."
+            if encounter['current_occupants'] != 'none':
+                encounter['description'] += f" It appears to be occupied by {encounter['current_occupants']}."
+
+            # Add rewards
+            if random.random() < 0.7:
+                encounter['rewards'].append({
+                    'type': 'treasure',
+                    'description': random.choice(
+                        ['hidden cache', 'ancient artifact', 'historical relic', 'forgotten knowledge',
+                         'valuable treasure'])
+                })
 
-            elif encounter_type == 'mystical':
-                mystical_types = ['strange lights', 'unusual weather', 'magical phenomenon', 'planar rift',
-                                  'fey crossing', 'haunting', 'vision']
-                encounter['phenomenon'] = random.choice(mystical_types)
-                encounter['effect'] = random.choice(['beneficial', 'harmful', 'neutral', 'transformative', 'revealing'])
-
-                encounter[
-                    'description'] = f"A mystical occurrence featuring {encounter['phenomenon']} with potentially {encounter['effect']} effects."
-
-                # Add possible rewards or consequences
-                if encounter['effect'] == 'beneficial':
-                    encounter['rewards'].append({
-                        'type': 'boon',
-                        'description': random.choice(
-                            ['temporary magical enhancement', 'healing', 'prophetic vision', 'supernatural ally',
-                             'magical insight'])
-                    })
-                elif encounter['effect'] == 'harmful':
-                    encounter['consequence'] = random.choice(
-                        ['curse', 'magical affliction', 'hostile entity summoned', 'magical trap', 'corruption'])
-
-            # Add common elements
-            encounter['weather'] = random.choice(['clear', 'rainy', 'windy', 'foggy', 'stormy'])
-            encounter['time_of_day'] = random.choice(['dawn', 'day', 'dusk', 'night'])
-
-            # Add river element if applicable
-            if is_river:
-                encounter['river_element'] = random.choice(
-                    ['crossing point', 'rapids', 'waterfall', 'fishing spot', 'ambush point'])
-                encounter['description'] += f" Near a river with a {encounter['river_element']}."
-
-            # Add elevation element if applicable
-            if height > 70:  # Mountain
-                encounter['elevation_feature'] = random.choice(['peak', 'cliff', 'cave', 'pass', 'plateau'])
-                encounter['description'] += f" In a mountainous area with a {encounter['elevation_feature']}."
-            elif height > 40:  # Highland
-                encounter['elevation_feature'] = random.choice(['hill', 'ridge', 'overlook', 'valley', 'crag'])
-                encounter['description'] += f" In highlands with a {encounter['elevation_feature']}."
-
-            return encounter
-
-        def find_nearest_settlement(self, location_id: int, settlement_type: str = None) -> Dict[str, Any]:
-            """
-            Find the nearest settlement to a given location.
-
-            Args:
-                location_id: ID of the location
-                settlement_type: Optional type of settlement to find
-
-            Returns:
-                Dictionary with nearest settlement information
-            """
-            # Find the location
-            location = self._find_location_by_id(location_id)
-            if not location:
-                return {
-                    'status': 'error',
-                    'message': f"Could not find location with ID: {location_id}"
-                }
+        elif encounter_type == 'mystical':
+            mystical_types = ['strange lights', 'unusual weather', 'magical phenomenon', 'planar rift',
+                              'fey crossing', 'haunting', 'vision']
+            encounter['phenomenon'] = random.choice(mystical_types)
+            encounter['effect'] = random.choice(['beneficial', 'harmful', 'neutral', 'transformative', 'revealing'])
 
-            # Get location coordinates
-            loc_x = location.get('x', location.get('p', [0, 0])[0])
-            loc_y = location.get('y', location.get('p', [0, 0])[1])
+            encounter[
+                'description'] = f"A mystical occurrence featuring {encounter['phenomenon']} with potentially {encounter['effect']} effects."
 
-            # Filter burgs by type if specified
-            filtered_burgs = self.map_data.get('burgs', [])
-            if settlement_type:
-                if settlement_type == 'capital':
-                    filtered_burgs = [b for b in filtered_burgs if b.get('capital', 0) == 1]
-                elif settlement_type == 'port':
-                    filtered_burgs = [b for b in filtered_burgs if b.get('port', 0) > 0]
-                elif settlement_type == 'citadel':
-                    filtered_burgs = [b for b in filtered_burgs if b.get('citadel', 0) == 1]
+            # Add possible rewards or consequences
+            if encounter['effect'] == 'beneficial':
+                encounter['rewards'].append({
+                    'type': 'boon',
+                    'description': random.choice(
+                        ['temporary magical enhancement', 'healing', 'prophetic vision', 'supernatural ally',
+                         'magical insight'])
+                })
+            elif encounter['effect'] == 'harmful':
+                encounter['consequence'] = random.choice(
+                    ['curse', 'magical affliction', 'hostile entity summoned', 'magical trap', 'corruption'])
 
-            # Remove "removed" burgs
-            filtered_burgs = [b for b in filtered_burgs if not b.get('removed', False)]
+        # Add common elements
+        encounter['weather'] = random.choice(['clear', 'rainy', 'windy', 'foggy', 'stormy'])
+        encounter['time_of_day'] = random.choice(['dawn', 'day', 'dusk', 'night'])
 
-            if not filtered_burgs:
-                return {
-                    'status': 'error',
-                    'message': f"No settlements of type '{settlement_type}' found"
-                }
+        # Add river element if applicable
+        if is_river:
+            encounter['river_element'] = random.choice(
+                ['crossing point', 'rapids', 'waterfall', 'fishing spot', 'ambush point'])
+            encounter['description'] += f" Near a river with a {encounter['river_element']}."
 
-            # Find nearest burg
-            nearest_burg = None
-            min_distance = float('inf')
+        # Add elevation element if applicable
+        if height > 70:  # Mountain
+            encounter['elevation_feature'] = random.choice(['peak', 'cliff', 'cave', 'pass', 'plateau'])
+            encounter['description'] += f" In a mountainous area with a {encounter['elevation_feature']}."
+        elif height > 40:  # Highland
+            encounter['elevation_feature'] = random.choice(['hill', 'ridge', 'overlook', 'valley', 'crag'])
+            encounter['description'] += f" In highlands with a {encounter['elevation_feature']}."
 
-            for burg in filtered_burgs:
-                burg_x = burg.get('x', 0)
-                burg_y = burg.get('y', 0)
+        return encounter
 
-                # Calculate distance
-                dx = burg_x - loc_x
-                dy = burg_y - loc_y
-                distance = (dx * dx + dy * dy) ** 0.5
+    def find_nearest_settlement(self, location_id: int, settlement_type: str = None) -> Dict[str, Any]:
+        """
+        Find the nearest settlement to a given location.
 
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_burg = burg
+        Args:
+            location_id: ID of the location
+            settlement_type: Optional type of settlement to find
 
-            if not nearest_burg:
-                return {
-                    'status': 'error',
-                    'message': "Could not find nearest settlement"
-                }
+        Returns:
+            Dictionary with nearest settlement information
+        """
+        # Find the location
+        location = self._find_location_by_id(location_id)
+        if not location:
+            return {
+                'status': 'error',
+                'message': f"Could not find location with ID: {location_id}"
+            }
 
-            # Get political info for the settlement
-            political_info = self.get_political_info(nearest_burg.get('i'))
+        # Get location coordinates
+        loc_x = location.get('x', location.get('p', [0, 0])[0])
+        loc_y = location.get('y', location.get('p', [0, 0])[1])
 
-            # Calculate distance in miles
-            map_scale = self.map_data.get('info', {}).get('mapScale', 1)
-            distance_miles = min_distance * map_scale
+        # Filter burgs by type if specified
+        filtered_burgs = self.map_data.get('burgs', [])
+        if settlement_type:
+            if settlement_type == 'capital':
+                filtered_burgs = [b for b in filtered_burgs if b.get('capital', 0) == 1]
+            elif settlement_type == 'port':
+                filtered_burgs = [b for b in filtered_burgs if b.get('port', 0) > 0]
+            elif settlement_type == 'citadel':
+                filtered_burgs = [b for b in filtered_burgs if b.get('citadel', 0) == 1]
 
-            # Create travel time estimate
-            travel_time = self._estimate_travel_time(distance_miles, 'walking')
+        # Remove "removed" burgs
+        filtered_burgs = [b for b in filtered_burgs if not b.get('removed', False)]
 
+        if not filtered_burgs:
             return {
-                'status': 'success',
-                'settlement': {
-                    'id': nearest_burg.get('i'),
-                    'name': nearest_burg.get('name', f"Unnamed Burg {nearest_burg.get('i')}"),
-                    'population': nearest_burg.get('population', 0),
-                    'capital': bool(nearest_burg.get('capital', 0)),
-                    'port': bool(nearest_burg.get('port', 0)),
-                    'citadel': bool(nearest_burg.get('citadel', 0))
-                },
-                'distance': round(distance_miles, 2),
-                'unit': 'miles',
-                'travel_time': travel_time,
-                'political_info': political_info.get('political_info') if political_info.get(
-                    'status') == 'success' else None
+                'status': 'error',
+                'message': f"No settlements of type '{settlement_type}' found"
             }
 
-        def get_random_burg(self, state_id: int = None, min_population: int = 0,
-                            is_capital: bool = False, is_port: bool = False) -> Dict[str, Any]:
-            """
-            Get a random settlement based on criteria.
-
-            Args:
-                state_id: Optional ID of the state to search in
-                min_population: Minimum population required
-                is_capital: Whether the settlement must be a capital
-                is_port: Whether the settlement must be a port
-
-            Returns:
-                Dictionary with settlement information
-            """
-            # Filter burgs based on criteria
-            filtered_burgs = [b for b in self.map_data.get('burgs', [])
-                              if not b.get('removed', False) and
-                              b.get('population', 0) >= min_population and
-                              (state_id is None or b.get('state') == state_id) and
-                              (not is_capital or b.get('capital', 0) == 1) and
-                              (not is_port or b.get('port', 0) > 0)]
-
-            if not filtered_burgs:
-                return {
-                    'status': 'error',
-                    'message': "No settlements found matching the criteria"
-                }
+        # Find nearest burg
+        nearest_burg = None
+        min_distance = float('inf')
 
-            # Select random burg
-            import random
-            burg = random.choice(filtered_burgs)
+        for burg in filtered_burgs:
+            burg_x = burg.get('x', 0)
+            burg_y = burg.get('y', 0)
+
+            # Calculate distance
+            dx = burg_x - loc_x
+            dy = burg_y - loc_y
+            distance = (dx * dx + dy * dy) ** 0.5
 
-            # Get political info for the settlement
-            political_info = self.get_political_info(burg.get('i'))
+            if distance < min_distance:
+                min_distance = distance
+                nearest_burg = burg
 
+        if not nearest_burg:
             return {
-                'status': 'success',
-                'settlement': {
-                    'id': burg.get('i'),
-                    'name': burg.get('name', f"Unnamed Burg {burg.get('i')}"),
-                    'population': burg.get('population', 0),
-                    'capital': bool(burg.get('capital', 0)),
-                    'port': bool(burg.get('port', 0)),
-                    'citadel': bool(burg.get('citadel', 0))
-                },
-                'political_info': political_info.get('political_info') if political_info.get(
-                    'status') == 'success' else None
+                'status': 'error',
+                'message': "Could not find nearest settlement"
             }
 
-        def get_random_route(self, start_state_id: int = None, end_state_id: int = None,
-                             min_distance: float = 0, max_distance: float = float('inf'),
-                             travel_method: str = 'walking') -> Dict[str, Any]:
-            """
-            Generate a random travel route between settlements.
-
-            Args:
-                start_state_id: Optional ID of the starting state
-                end_state_id: Optional ID of the ending state
-                min_distance: Minimum distance in miles
-                max_distance: Maximum distance in miles
-                travel_method: Method of travel
-
-            Returns:
-                Dictionary with route information
-            """
-            # Get starting settlement
-            start_burg = None
-            if start_state_id is not None:
-                state_burgs = [b for b in self.map_data.get('burgs', [])
-                               if not b.get('removed', False) and b.get('state') == start_state_id]
-                if state_burgs:
-                    import random
-                    start_burg = random.choice(state_burgs)
-
-            if not start_burg:
-                # Select random non-removed burg
-                valid_burgs = [b for b in self.map_data.get('burgs', []) if not b.get('removed', False)]
-                if valid_burgs:
-                    import random
-                    start_burg = random.choice(valid_burgs)
-                else:
-                    return {
-                        'status': 'error',
-                        'message': "No valid settlements found for route start"
-                    }
+        # Get political info for the settlement
+        political_info = self.get_political_info(nearest_burg.get('i'))
 
-            # Find possible end settlements
-            possible_end_burgs = []
-            start_x = start_burg.get('x', 0)
-            start_y = start_burg.get('y', 0)
-            map_scale = self.map_data.get('info', {}).get('mapScale', 1)
+        # Calculate distance in miles
+        map_scale = self.map_data.get('info', {}).get('mapScale', 1)
+        distance_miles = min_distance * map_scale
 
-            for burg in self.map_data.get('burgs', []):
-                if burg.get('i') == start_burg.get('i') or burg.get('removed', False):
-                    continue
+        # Create travel time estimate
+        travel_time = self._estimate_travel_time(distance_miles, 'walking')
 
-                # Skip if end state doesn't match
-                if end_state_id is not None and burg.get('state') != end_state_id:
-                    continue
+        return {
+            'status': 'success',
+            'settlement': {
+                'id': nearest_burg.get('i'),
+                'name': nearest_burg.get('name', f"Unnamed Burg {nearest_burg.get('i')}"),
+                'population': nearest_burg.get('population', 0),
+                'capital': bool(nearest_burg.get('capital', 0)),
+                'port': bool(nearest_burg.get('port', 0)),
+                'citadel': bool(nearest_burg.get('citadel', 0))
+            },
+            'distance': round(distance_miles, 2),
+            'unit': 'miles',
+            'travel_time': travel_time,
+            'political_info': political_info.get('political_info') if political_info.get(
+                'status') == 'success' else None
+        }
+
+    def get_random_burg(self, state_id: int = None, min_population: int = 0,
+                        is_capital: bool = False, is_port: bool = False) -> Dict[str, Any]:
+        """
+        Get a random settlement based on criteria.
 
-                burg_x = burg.get('x', 0)
-                burg_y = burg.get('y', 0)
+        Args:
+            state_id: Optional ID of the state to search in
+            min_population: Minimum population required
+            is_capital: Whether the settlement must be a capital
+            is_port: Whether the settlement must be a port
 
-                # Calculate distance
-                dx = burg_x - start_x
-                dy = burg_y - start_y
-                distance = (dx * dx + dy * dy) ** 0.5 * map_scale
+        Returns:
+            Dictionary with settlement information
+        """
+        # Filter burgs based on criteria
+        filtered_burgs = [b for b in self.map_data.get('burgs', [])
+                          if not b.get('removed', False) and
+                          b.get('population', 0) >= min_population and
+                          (state_id is None or b.get('state') == state_id) and
+                          (not is_capital or b.get('capital', 0) == 1) and
+                          (not is_port or b.get('port', 0) > 0)]
 
-                if min_distance <= distance <= max_distance:
-                    possible_end_burgs.append((burg, distance))
+        if not filtered_burgs:
+            return {
+                'status': 'error',
+                'message': "No settlements found matching the criteria"
+            }
 
-            if not possible_end_burgs:
+        # Select random burg
+        import random
+        burg = random.choice(filtered_burgs)
+
+        # Get political info for the settlement
+        political_info = self.get_political_info(burg.get('i'))
+
+        return {
+            'status': 'success',
+            'settlement': {
+                'id': burg.get('i'),
+                'name': burg.get('name', f"Unnamed Burg {burg.get('i')}"),
+                'population': burg.get('population', 0),
+                'capital': bool(burg.get('capital', 0)),
+                'port': bool(burg.get('port', 0)),
+                'citadel': bool(burg.get('citadel', 0))
+            },
+            'political_info': political_info.get('political_info') if political_info.get(
+                'status') == 'success' else None
+        }
+
+    def get_random_route(self, start_state_id: int = None, end_state_id: int = None,
+                         min_distance: float = 0, max_distance: float = float('inf'),
+                         travel_method: str = 'walking', min_travel_days: float = 0,
+                         max_travel_days: float = float('inf')) -> Dict[str, Any]:
+        """
+        Generate a random travel route between settlements.
+
+        Args:
+            start_state_id: Optional ID of the starting state
+            end_state_id: Optional ID of the ending state
+            min_distance: Minimum distance in miles
+            max_distance: Maximum distance in miles
+            travel_method: Method of travel
+            min_travel_days: Minimum travel time in days over the terrain
+            max_travel_days: Maximum travel time in days over the terrain
+
+        Returns:
+            Dictionary with route information
+        """
+        # Get starting settlement
+        start_burg = None
+        if start_state_id is not None:
+            state_burgs = [b for b in self.map_data.get('burgs', [])
+                           if not b.get('removed', False) and b.get('state') == start_state_id]
+            if state_burgs:
+                import random
+                start_burg = random.choice(state_burgs)
+
+        if not start_burg:
+            # Select random non-removed burg
+            valid_burgs = [b for b in self.map_data.get('burgs', []) if not b.get('removed', False)]
+            if valid_burgs:
+                import random
+                start_burg = random.choice(valid_burgs)
+            else:
                 return {
                     'status': 'error',
-                    'message': "No valid end points found matching distance criteria"
+                    'message': "No valid settlements found for route start"
                 }
 
-            # Select random end point
-            import random
-            end_burg, distance = random.choice(possible_end_burgs)
+        # Real travel times over the terrain, when travel time limits are given
+        travel_matrix = None
+        travel_speed = (self.TRAVEL_SPEEDS.get(travel_method.lower(), self.TRAVEL_SPEEDS['walking']) /
+                        self.TRAVEL_SPEEDS['walking'])
+        if min_travel_days > 0 or max_travel_days != float('inf'):
+            # Matrix days are at speed 1.0, so search only as far as max_travel_days reaches at this speed
+            matrix_max_days = None if max_travel_days == float('inf') else max_travel_days * travel_speed
+            travel_matrix = self.get_settlement_travel_matrix(matrix_max_days)
+
+        # Find possible end settlements
+        possible_end_burgs = []
+        start_x = start_burg.get('x', 0)
+        start_y = start_burg.get('y', 0)
+        map_scale = self.map_data.get('info', {}).get('mapScale', 1)
+
+        for burg in self.map_data.get('burgs', []):
+            if burg.get('i') == start_burg.get('i') or burg.get('removed', False):
+                continue
+
+            # Skip if end state doesn't match
+            if end_state_id is not None and burg.get('state') != end_state_id:
+                continue
+
+            burg_x = burg.get('x', 0)
+            burg_y = burg.get('y', 0)
 
-            # Create path
-            path = self._find_path(start_burg, end_burg, travel_method)
+            # Calculate distance
+            dx = burg_x - start_x
+            dy = burg_y - start_y
+            distance = (dx * dx + dy * dy) ** 0.5 * map_scale
+
+            if not min_distance <= distance <= max_distance:
+                continue
 
-            # Calculate travel time
-            travel_time = self._estimate_travel_time(distance, travel_method)
+            if travel_matrix:
+                travel_days = travel_matrix.get_travel_days(str(start_burg.get('i')), str(burg.get('i')),
+                                                            travel_speed)
+                if not min_travel_days <= travel_days <= max_travel_days:
+                    continue
+
+            possible_end_burgs.append((burg, distance))
 
+        if not possible_end_burgs:
             return {
-                'status': 'success',
-                'route': {
-                    'start': {
-                        'id': start_burg.get('i'),
-                        'name': start_burg.get('name', f"Unnamed Burg {start_burg.get('i')}"),
-                        'population': start_burg.get('population', 0)
-                    },
-                    'end': {
-                        'id': end_burg.get('i'),
-                        'name': end_burg.get('name', f"Unnamed Burg {end_burg.get('i')}"),
-                        'population': end_burg.get('population', 0)
-                    },
-                    'distance': round(distance, 2),
-                    'unit': 'miles',
-                    'travel_time': travel_time,
-                    'travel_method': travel_method,
-                    'path': path
-                }
+                'status': 'error',
+                'message': "No valid end points found matching distance criteria"
             }
 
-        def get_map_stats(self) -> Dict[str, Any]:
-            """
-            Get statistical information about the map.
-
-            Returns:
-                Dictionary with map statistics
-            """
-            # Basic map information
-            info = self.map_data.get('info', {})
-            map_name = info.get('name', 'Fantasy World')
-            seed = info.get('seed', 'unknown')
-
-            # Count entities
-            total_cells = len(self.map_data.get('cells', []))
-            total_burgs = len([b for b in self.map_data.get('burgs', []) if not b.get('removed', False)])
-            total_states = len([s for s in self.map_data.get('states', []) if s.get('i', 0) > 0])  # Skip neutrals
-            total_provinces = len(self.map_data.get('provinces', []))
-            total_religions = len([r for r in self.map_data.get('religions', []) if r.get('i', 0) > 0])
-            total_cultures = len([c for c in self.map_data.get('cultures', []) if c.get('i', 0) > 0])
-
-            # Biome distribution
-            biomes = {}
-            for cell in self.map_data.get('cells', []):
-                biome = cell.get('biome', 'unknown')
-                if biome not in biomes:
-                    biomes[biome] = 0
-                biomes[biome] += 1
-
-            # State size analysis
-            states = [s for s in self.map_data.get('states', []) if s.get('i', 0) > 0]
-            state_sizes = {}
-            for state in states:
-                state_sizes[state.get('name', f"State {state.get('i')}")] = state.get('area', 0)
-
-            # Population analysis
-            total_population = sum(
-                b.get('population', 0) for b in self.map_data.get('burgs', []) if not b.get('removed', False))
-            capitals_population = sum(b.get('population', 0) for b in self.map_data.get('burgs', [])
-                                      if not b.get('removed', False) and b.get('capital', 0) == 1)
-            ports_population = sum(b.get('population', 0) for b in self.map_data.get('burgs', [])
-                                   if not b.get('removed', False) and b.get('port', 0) > 0)
-
-            # Population by state
-            population_by_state = {}
-            for state in states:
-                state_burgs = [b for b in self.map_data.get('burgs', [])
-                               if not b.get('removed', False) and b.get('state') == state.get('i')]
-                state_population = sum(b.get('population', 0) for b in state_burgs)
-                population_by_state[state.get('name', f"State {state.get('i')}")] = state_population
+        # Select random end point
+        import random
+        end_burg, distance = random.choice(possible_end_burgs)
 
-            return {
-                'status': 'success',
-                'map_info': {
-                    'name': map_name,
-                    'seed': seed
+        # Create path
+        path = self._find_path(start_burg, end_burg, travel_method)
+
+        # Calculate travel time
+        travel_time = self._estimate_travel_time(distance, travel_method)
+        if travel_matrix:
+            travel_time['terrain_days'] = round(
+                travel_matrix.get_travel_days(str(start_burg.get('i')), str(end_burg.get('i')), travel_speed), 2)
+
+        return {
+            'status': 'success',
+            'route': {
+                'start': {
+                    'id': start_burg.get('i'),
+                    'name': start_burg.get('name', f"Unnamed Burg {start_burg.get('i')}"),
+                    'population': start_burg.get('population', 0)
                 },
-                'entity_counts': {
-                    'cells': total_cells,
-                    'burgs': total_burgs,
-                    'states': total_states,
-                    'provinces': total_provinces,
-                    'religions': total_religions,
-                    'cultures': total_cultures
+                'end': {
+                    'id': end_burg.get('i'),
+                    'name': end_burg.get('name', f"Unnamed Burg {end_burg.get('i')}"),
+                    'population': end_burg.get('population', 0)
                 },
-                'biome_distribution': biomes,
-                'state_sizes': state_sizes,
-                'population': {
-                    'total': total_population,
-                    'capitals': capitals_population,
-                    'ports': ports_population,
-                    'by_state': population_by_state
-                }
+                'distance': round(distance, 2),
+                'unit': 'miles',
+                'travel_time': travel_time,
+                'travel_method': travel_method,
+                'path': path
             }
+        }
 
-            # Debugging function (optional)
-
-        def test_map_query_engine():
-            """
-            Test function for the MapQueryEngine.
-            """
-            # Initialize engine with default paths
-            engine = MapQueryEngine()
-
-            # Test loading map data
-            print("Loading map data...")
-            engine._load_map_data()
-
-            # Print basic map info
-            print(f"Map info: {engine.map_data.get('info', {})}")
-            print(f"Number of cells: {len(engine.map_data.get('cells', []))}")
-            print(f"Number of burgs: {len(engine.map_data.get('burgs', []))}")
-            print(f"Number of states: {len(engine.map_data.get('states', []))}")
-
-            # Test a simple query
-            print("\nTesting query...")
-            query_result = engine.process_query({
-                'type': 'list',
-                'entity_type': 'burgs',
-                'limit': 5
-            })
-            print(f"Query result: {query_result}")
+    def get_map_stats(self) -> Dict[str, Any]:
+        """
+        Get statistical information about the map.
+
+        Returns:
+            Dictionary with map statistics
+        """
+        # Basic map information
+        info = self.map_data.get('info', {})
+        map_name = info.get('name', 'Fantasy World')
+        seed = info.get('seed', 'unknown')
 
-            # Test world overview
-            print("\nGetting world overview...")
-            overview = engine.get_world_overview()
-            print(f"World overview: {overview}")
+        # Count entities
+        total_cells = len(self.map_data.get('cells', []))
+        total_burgs = len([b for b in self.map_data.get('burgs', []) if not b.get('removed', False)])
+        total_states = len([s for s in self.map_data.get('states', []) if s.get('i', 0) > 0])  # Skip neutrals
+        total_provinces = len(self.map_data.get('provinces', []))
+        total_religions = len([r for r in self.map_data.get('religions', []) if r.get('i', 0) > 0])
+        total_cultures = len([c for c in self.map_data.get('cultures', []) if c.get('i', 0) > 0])
+
+        # Biome distribution
+        biomes = {}
+        for cell in self.map_data.get('cells', []):
+            biome = cell.get('biome', 'unknown')
+            if biome not in biomes:
+                biomes[biome] = 0
+            biomes[biome] += 1
+
+        # State size analysis
+        states = [s for s in self.map_data.get('states', []) if s.get('i', 0) > 0]
+        state_sizes = {}
+        for state in states:
+            state_sizes[state.get('name', f"State {state.get('i')}")] = state.get('area', 0)
+
+        # Population analysis
+        total_population = sum(
+            b.get('population', 0) for b in self.map_data.get('burgs', []) if not b.get('removed', False))
+        capitals_population = sum(b.get('population', 0) for b in self.map_data.get('burgs', [])
+                                  if not b.get('removed', False) and b.get('capital', 0) == 1)
+        ports_population = sum(b.get('population', 0) for b in self.map_data.get('burgs', [])
+                               if not b.get('removed', False) and b.get('port', 0) > 0)
+
+        # Population by state
+        population_by_state = {}
+        for state in states:
+            state_burgs = [b for b in self.map_data.get('burgs', [])
+                           if not b.get('removed', False) and b.get('state') == state.get('i')]
+            state_population = sum(b.get('population', 0) for b in state_burgs)
+            population_by_state[state.get('name', f"State {state.get('i')}")] = state_population
 
-        if __name__ == "__main__":
-            test_map_query_engine()
\ No newline at end of file
+        return {
+            'status': 'success',
+            'map_info': {
+                'name': map_name,
+                'seed': seed
+            },
+            'entity_counts': {
+                'cells': total_cells,
+                'burgs': total_burgs,
+                'states': total_states,
+                'provinces': total_provinces,
+                'religions': total_religions,
+                'cultures': total_cultures
+            },
+            'biome_distribution': biomes,
+            'state_sizes': state_sizes,
+            'population': {
+                'total': total_population,
+                'capitals': capitals_population,
+                'ports': ports_population,
+                'by_state': population_by_state
+            }
+        }
+
+
+# Debugging function (optional)
+
+def test_map_query_engine():
+    """
+    Test function for the MapQueryEngine.
+    """
+    # Initialize engine with default paths
+    engine = MapQueryEngine()
+
+    # Test loading map data
+    print("Loading map data...")
+    engine._load_map_data()
+
+    # Print basic map info
+    print(f"Map info: {engine.map_data.get('info', {})}")
+    print(f"Number of cells: {len(engine.map_data.get('cells', []))}")
+    print(f"Number of burgs: {len(engine.map_data.get('burgs', []))}")
+    print(f"Number of states: {len(engine.map_data.get('states', []))}")
+
+    # Test a simple query
+    print("\nTesting query...")
+    query_result = engine.process_query({
+        'type': 'list',
+        'entity_type': 'burgs',
+        'limit': 5
+    })
+    print(f"Query result: {query_result}")
+
+    # Test world overview
+    print("\nGetting world overview...")
+    overview = engine.get_world_overview()
+    print(f"World overview: {overview}")
+
+
+if __name__ == "__main__":
+    test_map_query_engine()
\ No newline at end of file
@@ -0,0 +1,246 @@
+"""
+Whole-map raster operations on (height, width) NumPy arrays.
+"""
+
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def distance_transform(features: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Exact Euclidean distance transform with nearest-feature coordinates.
+
+    Uses the separable lower-envelope algorithm (Felzenszwalb & Huttenlocher):
+    a vectorized column pass finds the nearest feature row in each column, then
+    a row pass takes the lower envelope of the resulting parabolas, stepping all
+    rows in lockstep.
+
+    Args:
+        features: (height, width) bool array, True for feature cells
+
+    Returns:
+        (distances, nearest_y, nearest_x): float64 distance to the nearest feature
+        cell (inf if there are none) and its coordinates as int32 (-1 if none)
+    """
+    features = np.asarray(features, dtype=bool)
+    height, width = features.shape
+    if features.size == 0 or not features.any():
+        return (np.full((height, width), np.inf), np.full((height, width), -1, dtype=np.int32),
+                np.full((height, width), -1, dtype=np.int32))
+
+    # Column pass: nearest feature row above/below each cell
+    rows = np.arange(height, dtype=np.int64)[:, None]
+    above = np.maximum.accumulate(np.where(features, rows, -1), axis=0)
+    below = np.minimum.accumulate(np.where(features, rows, height * 4)[::-1], axis=0)[::-1]
+    use_below = (above < 0) | ((below < height) & (below - rows < rows - above))
+    column_rows = np.where(use_below, below, above)
+    has_column_feature = (column_rows >= 0) & (column_rows < height)
+    column_distance_sq = np.where(has_column_feature, (column_rows - rows).astype(np.float64) ** 2, np.inf)
+
+    # Row pass: lower envelope of parabolas (x - q)^2 + f(q) for every row at once
+    f = column_distance_sq
+    positions = np.arange(width, dtype=np.float64)
+    offsets = f + positions ** 2  # f(q) + q^2, inf where the column has no feature
+
+    envelope_q = np.zeros((height, width), dtype=np.int64)
+    envelope_z = np.full((height, width + 1), np.inf)
+    count = np.zeros(height, dtype=np.int64)  # parabolas in each row's envelope
+    row_index = np.arange(height)
+
+    for q in range(width):
+        active = np.isfinite(f[:, q])
+        if not active.any():
+            continue
+
+        # Rows starting their envelope with this parabola
+        first = active & (count == 0)
+        if first.any():
+            envelope_q[first, 0] = q
+            envelope_z[first, 0] = -np.inf
+            envelope_z[first, 1] = np.inf
+            count[first] = 1
+
+        # Pop parabolas that the new one hides, then push it
+        pending = active & ~first
+        if not pending.any():
+            continue
+
+        while True:
+            rows_pending = row_index[pending]
+            top = count[rows_pending] - 1
+            top_q = envelope_q[rows_pending, top]
+            intersection = (offsets[rows_pending, q] - offsets[rows_pending, top_q]) / (2.0 * (q - top_q))
+            hidden = intersection <= envelope_z[rows_pending, top]
+            if not hidden.any():
+                break
+            count[rows_pending[hidden]] -= 1
+            # Rows whose envelope emptied restart from this parabola
+            emptied = rows_pending[hidden][count[rows_pending[hidden]] == 0]
+            if emptied.size:
+                envelope_q[emptied, 0] = q
+                envelope_z[emptied, 0] = -np.inf
+                envelope_z[emptied, 1] = np.inf
+                count[emptied] = 1
+                pending[emptied] = False
+            if not pending.any():
+                break
+
+        rows_pending = row_index[pending]
+        if rows_pending.size:
+            top = count[rows_pending] - 1
+            top_q = envelope_q[rows_pending, top]
+            intersection = (offsets[rows_pending, q] - offsets[rows_pending, top_q]) / (2.0 * (q - top_q))
+            slot = top + 1
+            envelope_q[rows_pending, slot] = q
+            envelope_z[rows_pending, slot] = intersection
+            envelope_z[rows_pending, slot + 1] = np.inf
+            count[rows_pending] += 1
+
+    # Read each cell's nearest parabola off its row's envelope
+    nearest_x = np.full((height, width), -1, dtype=np.int32)
+    for y in range(height):
+        parabolas = count[y]
+        if parabolas == 0:
+            continue
+        slots = np.searchsorted(envelope_z[y, 1:parabolas + 1], positions, side="left")
+        nearest_x[y] = envelope_q[y, slots]
+
+    has_feature = nearest_x >= 0
+    safe_x = np.where(has_feature, nearest_x, 0)
+    nearest_y = np.where(has_feature, column_rows[np.arange(height)[:, None], safe_x], -1).astype(np.int32)
+    distance_sq = np.where(has_feature,
+                           (positions[None, :] - safe_x) ** 2 + f[np.arange(height)[:, None], safe_x], np.inf)
+
+    return np.sqrt(distance_sq), nearest_y, nearest_x
+
+
+class NearestFeatureMap:
+    """
+    Distance to, and coordinates of, the nearest feature cell for every cell of a raster.
+
+    Lookups are O(1) and exact at any distance. Feature changes are applied
+    incrementally: only the window of cells whose nearest feature could have
+    changed is recomputed.
+    """
+
+    def __init__(self, features: np.ndarray):
+        self.features: np.ndarray = np.array(features, dtype=bool)
+        self.height, self.width = self.features.shape
+        self.distances, self.nearest_y, self.nearest_x = distance_transform(self.features)
+
+    def nearest(self, x: int, y: int) -> Optional[Tuple[int, int]]:
+        """Get the (x, y) of the feature cell nearest to a cell, or None if there are no features"""
+        if self.nearest_x[y, x] < 0:
+            return None
+
+        return (int(self.nearest_x[y, x]), int(self.nearest_y[y, x]))
+
+    def rebuild(self):
+        """Recompute the whole map from the feature mask"""
+        self.distances, self.nearest_y, self.nearest_x = distance_transform(self.features)
+
+    def update_cells(self, xs: np.ndarray, ys: np.ndarray, is_feature: np.ndarray):
+        """
+        Set whether cells are features and bring the map up to date.
+
+        Args:
+            xs: X coordinates of the cells
+            ys: Y coordinates of the cells
+            is_feature: New feature flag, one per cell
+        """
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        is_feature = np.asarray(is_feature, dtype=bool)
+
+        changed = self.features[ys, xs] != is_feature
+        if not changed.any():
+            return
+
+        xs, ys, is_feature = xs[changed], ys[changed], is_feature[changed]
+        self.features[ys, xs] = is_feature
+
+        removed = ~is_feature
+        if removed.any():
+            self._update_removed(xs[removed], ys[removed])
+
+        added = is_feature
+        if added.any():
+            self._update_added(xs[added], ys[added])
+
+    def _update_removed(self, xs: np.ndarray, ys: np.ndarray):
+        # Only cells whose nearest feature was removed change; removing features can't
+        # bring any other cell closer to a feature
+        removed = np.zeros((self.height, self.width), dtype=bool)
+        removed[ys, xs] = True
+        has_nearest = self.nearest_x >= 0
+        affected = has_nearest & removed[np.where(has_nearest, self.nearest_y, 0),
+                                         np.where(has_nearest, self.nearest_x, 0)]
+        affected_ys, affected_xs = np.nonzero(affected)
+        if affected_ys.size == 0:
+            return
+
+        min_x, max_x = int(affected_xs.min()), int(affected_xs.max()) + 1
+        min_y, max_y = int(affected_ys.min()), int(affected_ys.max()) + 1
+        margin = max(int(math.ceil(self.distances[affected].max())), 1)
+
+        # Recompute over a window around the affected cells, growing it until every
+        # affected cell's nearest feature is closer than anything outside the window
+        while True:
+            window_min_x, window_max_x = max(min_x - margin, 0), min(max_x + margin, self.width)
+            window_min_y, window_max_y = max(min_y - margin, 0), min(max_y + margin, self.height)
+            is_whole_map = (window_min_x == 0 and window_min_y == 0 and
+                            window_max_x == self.width and window_max_y == self.height)
+
+            distances, nearest_y, nearest_x = distance_transform(
+                self.features[window_min_y:window_max_y, window_min_x:window_max_x])
+            local_ys, local_xs = affected_ys - window_min_y, affected_xs - window_min_x
+            new_distances = distances[local_ys, local_xs]
+
+            if not is_whole_map:
+                # Distance from each affected cell to the nearest cell outside the window
+                # (sides that touch the map edge have nothing beyond them)
+                outside = np.full(affected_ys.size, np.inf)
+                if window_min_x > 0:
+                    outside = np.minimum(outside, affected_xs - window_min_x + 1)
+                if window_max_x < self.width:
+                    outside = np.minimum(outside, window_max_x - affected_xs)
+                if window_min_y > 0:
+                    outside = np.minimum(outside, affected_ys - window_min_y + 1)
+                if window_max_y < self.height:
+                    outside = np.minimum(outside, window_max_y - affected_ys)
+                if (new_distances > outside).any():
+                    margin *= 2
+                    continue
+
+            found = nearest_x[local_ys, local_xs] >= 0
+            self.distances[affected_ys, affected_xs] = new_distances
+            self.nearest_x[affected_ys, affected_xs] = np.where(found, nearest_x[local_ys, local_xs] + window_min_x,
+                                                                -1)
+            self.nearest_y[affected_ys, affected_xs] = np.where(found, nearest_y[local_ys, local_xs] + window_min_y,
+                                                                -1)
+            return
+
+    def _update_added(self, xs: np.ndarray, ys: np.ndarray):
+        if not np.isfinite(self.distances).any():
+            # There were no features before, so every cell changes
+            self.rebuild()
+            return
+
+        # A cell can only get closer to a feature if it is nearer to one of the new
+        # features than the current farthest distance anywhere on the map
+        margin = int(math.ceil(self.distances.max())) + 1
+        window_min_x, window_max_x = max(int(xs.min()) - margin, 0), min(int(xs.max()) + 1 + margin, self.width)
+        window_min_y, window_max_y = max(int(ys.min()) - margin, 0), min(int(ys.max()) + 1 + margin, self.height)
+
+        # Distance transform of just the new features over that window
+        new_features = np.zeros((window_max_y - window_min_y, window_max_x - window_min_x), dtype=bool)
+        new_features[ys - window_min_y, xs - window_min_x] = True
+        distances, nearest_y, nearest_x = distance_transform(new_features)
+
+        window = (slice(window_min_y, window_max_y), slice(window_min_x, window_max_x))
+        closer = distances < self.distances[window]
+        self.distances[window][closer] = distances[closer]
+        self.nearest_x[window][closer] = nearest_x[closer] + window_min_x
+        self.nearest_y[window][closer] = nearest_y[closer] + window_min_y
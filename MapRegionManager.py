@@ -2,10 +2,20 @@ import os
 import json
 import math
 import random
+import time
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Set, Tuple, Optional, Any
 
+import numpy as np
+
 # Import the MapWorldState module
 from MapWorldState import MapWorldState
+from MapPathfinding import (AStarEngine, HierarchicalPathfinder, JumpPointEngine, PathCache, TravelCostField, INF,
+                            dijkstra_field, octile_distance, reconstruct_key_path, shortest_path_tree,
+                            travel_cost_matrix)
+from MapRaster import NearestFeatureMap
 
 
 class BiomeData:
@@ -49,6 +59,25 @@ class RegionResource:
         self.value: float = 0.0  # 0.0-1.0 scale
         self.is_rare: bool = False
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert resource to a dictionary for serialization"""
+        return {
+            "name": self.name,
+            "abundance": self.abundance,
+            "value": self.value,
+            "is_rare": self.is_rare
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RegionResource':
+        """Create a RegionResource from a dictionary"""
+        resource = cls()
+        resource.name = data["name"]
+        resource.abundance = data.get("abundance", 0.0)
+        resource.value = data.get("value", 0.0)
+        resource.is_rare = data.get("is_rare", False)
+        return resource
+
 
 class RegionAnalysis:
     """Contains analysis data for a region"""
@@ -60,6 +89,27 @@ class RegionAnalysis:
         self.contains_mountains: bool = False
         self.danger_level: float = 0.0  # 0.0-1.0 scale
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert analysis to a dictionary for serialization"""
+        return {
+            "region_id": self.region_id,
+            "resources": [resource.to_dict() for resource in self.resources],
+            "contains_water": self.contains_water,
+            "contains_mountains": self.contains_mountains,
+            "danger_level": self.danger_level
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RegionAnalysis':
+        """Create a RegionAnalysis from a dictionary"""
+        analysis = cls()
+        analysis.region_id = data["region_id"]
+        analysis.resources = [RegionResource.from_dict(resource) for resource in data.get("resources", [])]
+        analysis.contains_water = data.get("contains_water", False)
+        analysis.contains_mountains = data.get("contains_mountains", False)
+        analysis.danger_level = data.get("danger_level", 0.5)
+        return analysis
+
 
 class TravelTimeEstimate:
     """Contains travel time estimation data"""
@@ -75,6 +125,14 @@ class TravelTimeEstimate:
         self.has_mountain_crossing: bool = False
         self.has_sea_crossing: bool = False
 
+    def copy(self) -> 'TravelTimeEstimate':
+        """Create an independent copy of this estimate"""
+        estimate = TravelTimeEstimate()
+        estimate.__dict__.update(self.__dict__)
+        estimate.terrain_types_crossed = list(self.terrain_types_crossed)
+        estimate.obstacles_crossed = list(self.obstacles_crossed)
+        return estimate
+
     def __str__(self):
         if not self.is_valid:
             return "Invalid travel estimate"
@@ -108,6 +166,75 @@ class TravelTimeEstimate:
         return result
 
 
+class TravelTimeMatrix:
+    """
+    Travel costs between a fixed set of locations, for O(1) pairwise lookups.
+
+    Costs are in travel hours at speed 1.0 (inf where unreachable or beyond max_cost).
+    The matrix is tied to the terrain it was computed on by map_hash.
+    """
+
+    def __init__(self, location_ids: List[str], positions: np.ndarray, costs: np.ndarray,
+                 map_hash: str, max_cost: float = INF, hours_per_day: float = 8):
+        self.location_ids: List[str] = list(location_ids)
+        self.positions: np.ndarray = positions  # (n, 2) map coordinates
+        self.costs: np.ndarray = costs  # (n, n) float32
+        self.map_hash: str = map_hash
+        self.max_cost: float = max_cost
+        self.hours_per_day: float = hours_per_day
+        self.index: Dict[str, int] = {location_id: i for i, location_id in enumerate(self.location_ids)}
+
+    def get_travel_hours(self, from_id: str, to_id: str, travel_speed: float = 1.0) -> float:
+        """Get the travel time in hours between two locations (inf if unreachable or unknown)"""
+        from_index = self.index.get(from_id)
+        to_index = self.index.get(to_id)
+        if from_index is None or to_index is None:
+            return INF
+
+        return float(self.costs[from_index, to_index]) / travel_speed
+
+    def get_travel_days(self, from_id: str, to_id: str, travel_speed: float = 1.0) -> float:
+        """Get the travel time in days between two locations (inf if unreachable or unknown)"""
+        return self.get_travel_hours(from_id, to_id, travel_speed) / self.hours_per_day
+
+    def get_travel_days_from(self, from_id: str, travel_speed: float = 1.0) -> Dict[str, float]:
+        """Get the travel time in days from one location to every other reachable location"""
+        from_index = self.index.get(from_id)
+        if from_index is None:
+            return {}
+
+        days = self.costs[from_index] / (travel_speed * self.hours_per_day)
+        return {location_id: float(days[i]) for i, location_id in enumerate(self.location_ids)
+                if i != from_index and days[i] != INF}
+
+    def covers(self, locations: Dict[str, Tuple[float, float]], max_cost: float) -> bool:
+        """Check whether this matrix has every location at the same position, out to max_cost"""
+        if max_cost > self.max_cost:
+            return False
+
+        for location_id, (x, y) in locations.items():
+            index = self.index.get(location_id)
+            if index is None or self.positions[index, 0] != x or self.positions[index, 1] != y:
+                return False
+        return True
+
+    def save(self, filepath: str):
+        """Save the matrix as a compressed .npz file, replacing any existing file atomically"""
+        temp_path = filepath + ".tmp"
+        with open(temp_path, 'wb') as file:
+            np.savez_compressed(file, location_ids=np.array(self.location_ids, dtype=str),
+                                positions=self.positions, costs=self.costs, map_hash=np.array(self.map_hash),
+                                max_cost=np.array(self.max_cost), hours_per_day=np.array(self.hours_per_day))
+        os.replace(temp_path, filepath)
+
+    @classmethod
+    def load(cls, filepath: str) -> 'TravelTimeMatrix':
+        """Load a matrix saved with save()"""
+        with np.load(filepath, allow_pickle=False) as data:
+            return cls(data["location_ids"].tolist(), data["positions"], data["costs"], str(data["map_hash"]),
+                       float(data["max_cost"]), float(data["hours_per_day"]))
+
+
 class GridPosition:
     """Represents a position in the grid"""
 
@@ -125,71 +252,357 @@ class GridPosition:
 
 
 class GridCell:
-    """Represents a cell in the grid"""
+    """View of a single cell in a MapGrid's storage arrays"""
 
-    def __init__(self):
-        self.terrain_type: str = "unknown"
-        self.movement_cost: float = 1.0
-        self.is_passable: bool = True
+    __slots__ = ("_grid", "x", "y")
 
+    def __init__(self, grid: 'MapGrid', x: int, y: int):
+        self._grid = grid
+        self.x: int = x
+        self.y: int = y
+
+    @property
+    def terrain_type(self) -> str:
+        return self._grid.terrain_types[self._grid.terrain_codes[self.y, self.x]]
+
+    @terrain_type.setter
+    def terrain_type(self, value: str):
+        old_step_cost = self._grid.get_step_cost(self.x, self.y)
+        old_terrain_code = int(self._grid.terrain_codes[self.y, self.x])
+        self._grid.terrain_codes[self.y, self.x] = self._grid.get_terrain_code(value)
+        self._grid.cell_changed(self.x, self.y, old_step_cost, old_terrain_code)
 
-class PathNode:
-    """Represents a node in the A* pathfinding algorithm"""
+    @property
+    def movement_cost(self) -> float:
+        return float(self._grid.movement_costs[self.y, self.x])
 
-    def __init__(self, position: GridPosition):
-        self.position: GridPosition = position
-        self.g_cost: float = float('inf')  # Cost from start
-        self.h_cost: float = 0.0  # Heuristic cost to goal
-        self.parent: Optional['PathNode'] = None
+    @movement_cost.setter
+    def movement_cost(self, value: float):
+        old_step_cost = self._grid.get_step_cost(self.x, self.y)
+        self._grid.movement_costs[self.y, self.x] = value
+        self._grid.cell_changed(self.x, self.y, old_step_cost)
 
     @property
-    def f_cost(self) -> float:
-        return self.g_cost + self.h_cost
+    def is_passable(self) -> bool:
+        return bool(self._grid.passable[self.y, self.x])
+
+    @is_passable.setter
+    def is_passable(self, value: bool):
+        old_step_cost = self._grid.get_step_cost(self.x, self.y)
+        self._grid.passable[self.y, self.x] = value
+        self._grid.cell_changed(self.x, self.y, old_step_cost)
 
 
 class MapGrid:
-    """Represents a grid of the map for pathfinding and terrain analysis"""
+    """
+    Represents a grid of the map for pathfinding and terrain analysis.
+
+    Cell data is stored in contiguous (height, width) arrays: float32 movement
+    cost, bool passability and a uint8 terrain code that indexes terrain_types.
+    """
+
+    # Terrain types that cannot be walked through
+    IMPASSABLE_TERRAIN = ("ocean", "sea", "mountain")
+
+    # Pathfinding modes accepted by find_path
+    PATHFINDING_MODES = ("astar", "hierarchical", "jps")
+
+    # Bulk edits touching more cells than this rebuild derived data instead of patching it
+    LOCAL_EDIT_LIMIT = 4096
 
     def __init__(self, width: int, height: int):
         self.width: int = width
         self.height: int = height
-        self.cells: List[List[GridCell]] = []
 
-        # Initialize cells
-        for y in range(height):
-            row = []
-            for x in range(width):
-                row.append(GridCell())
-            self.cells.append(row)
+        # Terrain code lookup table (code 0 is reserved for unknown terrain)
+        self.terrain_types: List[str] = ["unknown"]
+        self._terrain_code_lookup: Dict[str, int] = {"unknown": 0}
+
+        # Cell storage
+        self.movement_costs: np.ndarray = np.ones((height, width), dtype=np.float32)
+        self.passable: np.ndarray = np.ones((height, width), dtype=bool)
+        self.terrain_codes: np.ndarray = np.zeros((height, width), dtype=np.uint8)
+
+        # Flat per-cell step costs used by the pathfinding engine (built lazily)
+        self._step_costs: Optional[List[float]] = None
+        self._min_step_cost: float = 1.0
+
+        # Pathfinding engines
+        self.pathfinder = AStarEngine(self)
+        self.hierarchical_pathfinder = HierarchicalPathfinder(self)
+        self.jump_point_pathfinder = JumpPointEngine(self)
+
+        # Cached pathfinding results and travel cost fields, invalidated when cells change
+        self.path_cache = PathCache(self)
+        self.field_cache = PathCache(self, max_entries=16)
+
+        # Nearest passable cell for every cell (built lazily, kept up to date as cells change)
+        self._nearest_passable: Optional[NearestFeatureMap] = None
+
+        # Downsampled copies for coarse queries (see build_pyramid)
+        self.pyramid: Optional[GridPyramid] = None
 
     def is_in_bounds(self, x: int, y: int) -> bool:
         """Check if a position is within the grid bounds"""
         return 0 <= x < self.width and 0 <= y < self.height
 
+    def get_terrain_hash(self) -> str:
+        """Get a hash of the grid's terrain, for keying data derived from it"""
+        digest = hashlib.sha1()
+        digest.update(np.array([self.width, self.height], dtype=np.int64).tobytes())
+        digest.update(self.movement_costs.tobytes())
+        digest.update(self.passable.tobytes())
+        return digest.hexdigest()
+
+    def to_key(self, x: int, y: int) -> int:
+        """Convert a grid position to an integer cell key"""
+        return y * self.width + x
+
+    def from_key(self, key: int) -> GridPosition:
+        """Convert an integer cell key back to a grid position"""
+        return GridPosition(key % self.width, key // self.width)
+
+    def get_terrain_code(self, terrain_type: str) -> int:
+        """Get the code for a terrain type, registering it if it is new"""
+        code = self._terrain_code_lookup.get(terrain_type)
+        if code is None:
+            code = len(self.terrain_types)
+            if code > 255:
+                raise ValueError(f"Too many terrain types for uint8 storage: {terrain_type}")
+
+            self.terrain_types.append(terrain_type)
+            self._terrain_code_lookup[terrain_type] = code
+
+        return code
+
+    def get_passable_lookup(self) -> np.ndarray:
+        """Get a bool array mapping each registered terrain code to passability"""
+        return np.array([terrain_type not in self.IMPASSABLE_TERRAIN for terrain_type in self.terrain_types],
+                        dtype=bool)
+
     def set_cell(self, x: int, y: int, terrain_type: str, movement_cost: float):
         """Set the properties of a cell in the grid"""
         if not self.is_in_bounds(x, y):
             return
 
-        self.cells[y][x].terrain_type = terrain_type
-        self.cells[y][x].movement_cost = movement_cost
-        self.cells[y][x].is_passable = terrain_type not in ["ocean", "sea", "mountain"]
+        old_step_cost = self.get_step_cost(x, y)
+        old_terrain_code = int(self.terrain_codes[y, x])
+
+        self.terrain_codes[y, x] = self.get_terrain_code(terrain_type)
+        self.movement_costs[y, x] = movement_cost
+        self.passable[y, x] = terrain_type not in self.IMPASSABLE_TERRAIN
+
+        self.cell_changed(x, y, old_step_cost, old_terrain_code)
+
+    def set_cells(self, xs: np.ndarray, ys: np.ndarray, terrain_codes: np.ndarray, movement_costs: np.ndarray,
+                  passable: Optional[np.ndarray] = None):
+        """
+        Set many cells at once.
+
+        Args:
+            xs: X coordinates of the cells
+            ys: Y coordinates of the cells
+            terrain_codes: Terrain codes from get_terrain_code, one per cell
+            movement_costs: Movement costs, one per cell
+            passable: Passability, one per cell (defaults to what the terrain allows)
+        """
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        terrain_codes = np.asarray(terrain_codes, dtype=np.uint8)
+        movement_costs = np.asarray(movement_costs, dtype=np.float32)
+        if passable is None:
+            passable = self.get_passable_lookup()[terrain_codes]
+        passable = np.asarray(passable, dtype=bool)
+
+        # Drop out-of-bounds cells, as set_cell does
+        in_bounds = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        if not in_bounds.all():
+            xs, ys = xs[in_bounds], ys[in_bounds]
+            terrain_codes, movement_costs = terrain_codes[in_bounds], movement_costs[in_bounds]
+            passable = passable[in_bounds]
+
+        old_step_costs = self.get_step_costs_at(xs, ys)
+        old_terrain_codes = self.terrain_codes[ys, xs]
+
+        self.terrain_codes[ys, xs] = terrain_codes
+        self.movement_costs[ys, xs] = movement_costs
+        self.passable[ys, xs] = passable
+
+        self.cells_changed(xs, ys, old_step_costs, old_terrain_codes)
+
+    def set_movement_costs(self, xs: np.ndarray, ys: np.ndarray, movement_costs: np.ndarray):
+        """
+        Change the movement cost of many cells, keeping their terrain type and passability.
+
+        Args:
+            xs: X coordinates of the cells
+            ys: Y coordinates of the cells
+            movement_costs: New movement costs, one per cell
+        """
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        movement_costs = np.asarray(movement_costs, dtype=np.float32)
+
+        in_bounds = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        if not in_bounds.all():
+            xs, ys, movement_costs = xs[in_bounds], ys[in_bounds], movement_costs[in_bounds]
+
+        old_step_costs = self.get_step_costs_at(xs, ys)
+        self.movement_costs[ys, xs] = movement_costs
+        self.cells_changed(xs, ys, old_step_costs)
+
+    def set_all_cells(self, terrain_codes: np.ndarray, movement_costs: np.ndarray,
+                      passable: Optional[np.ndarray] = None):
+        """
+        Replace the whole grid from (height, width) terrain code and movement cost arrays,
+        and optionally passability (defaults to what each cell's terrain allows)
+        """
+        self.terrain_codes[:, :] = terrain_codes
+        self.movement_costs[:, :] = movement_costs
+        self.passable[:, :] = self.get_passable_lookup()[self.terrain_codes] if passable is None else passable
+
+        self._step_costs = None
+        self._nearest_passable = None
+        self.hierarchical_pathfinder.invalidate()
+        self.jump_point_pathfinder.invalidate()
+        self.path_cache.clear()
+        self.field_cache.clear()
+        if self.pyramid is not None:
+            self.pyramid.build()
 
     def get_cell(self, x: int, y: int) -> Optional[GridCell]:
         """Get a cell from the grid"""
         if not self.is_in_bounds(x, y):
             return None
 
-        return self.cells[y][x]
+        return GridCell(self, x, y)
+
+    def get_step_costs(self) -> List[float]:
+        """Get the flat list of per-cell step costs (inf for impassable cells)"""
+        if self._step_costs is None:
+            costs = np.where(self.passable, self.movement_costs.astype(np.float64), INF)
+            self._step_costs = costs.ravel().tolist()
+
+            passable_costs = self.movement_costs[self.passable]
+            self._min_step_cost = float(passable_costs.min()) if passable_costs.size else 1.0
+
+        return self._step_costs
+
+    def get_step_cost(self, x: int, y: int) -> float:
+        """Get the cost of stepping into a cell (inf if impassable)"""
+        return float(self.movement_costs[y, x]) if self.passable[y, x] else INF
+
+    def get_step_costs_at(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Get the step costs of many cells as a float64 array (inf where impassable)"""
+        return np.where(self.passable[ys, xs], self.movement_costs[ys, xs].astype(np.float64), INF)
+
+    def cell_changed(self, x: int, y: int, old_step_cost: float, old_terrain_code: Optional[int] = None):
+        """
+        Update derived pathfinding data after one cell's storage was modified.
+
+        old_terrain_code is the cell's terrain code before the edit, for edits that may retype it.
+        """
+        if self.pyramid is not None:
+            self.pyramid.update_cells([x], [y])
+
+        new_step_cost = self.get_step_cost(x, y)
+        if new_step_cost == old_step_cost:
+            # Cached travel estimates list the terrain types along their path, so they go
+            # stale when a cell is retyped even if its step cost stays the same
+            if old_terrain_code is not None and self.terrain_codes[y, x] != old_terrain_code:
+                self.path_cache.invalidate_cells([x], [y], [False])
+            return
+
+        self.refresh_step_cost(x, y)
+        self.hierarchical_pathfinder.mark_dirty(x, y)
+        self.jump_point_pathfinder.mark_dirty(x, y)
+        self.path_cache.invalidate_cells([x], [y], [new_step_cost < old_step_cost])
+        self.field_cache.invalidate_cells([x], [y], [new_step_cost < old_step_cost])
+        if self._nearest_passable is not None and (new_step_cost == INF) != (old_step_cost == INF):
+            self._nearest_passable.update_cells([x], [y], [new_step_cost != INF])
+
+    def cells_changed(self, xs: np.ndarray, ys: np.ndarray, old_step_costs: np.ndarray,
+                      old_terrain_codes: Optional[np.ndarray] = None):
+        """
+        Update derived pathfinding data after many cells' storage was modified.
+
+        old_terrain_codes are the cells' terrain codes before the edit, for edits that may retype them.
+        """
+        if self.pyramid is not None and len(xs):
+            self.pyramid.update_cells(xs, ys)
+
+        new_step_costs = self.get_step_costs_at(xs, ys)
+        changed = new_step_costs != old_step_costs
+
+        # Retyped cells with an unchanged step cost still stale the terrain lists of cached travel estimates
+        if old_terrain_codes is not None:
+            retyped = (self.terrain_codes[ys, xs] != old_terrain_codes) & ~changed
+            if retyped.any():
+                self.path_cache.invalidate_cells(xs[retyped].tolist(), ys[retyped].tolist(),
+                                                 [False] * int(retyped.sum()))
+
+        if not changed.any():
+            return
+
+        xs, ys = xs[changed], ys[changed]
+        decreased = new_step_costs[changed] < old_step_costs[changed]
+
+        # Patch the caches in place for local edits; rebuild them lazily for large ones
+        if len(xs) <= self.LOCAL_EDIT_LIMIT:
+            for x, y in zip(xs.tolist(), ys.tolist()):
+                self.refresh_step_cost(x, y)
+                self.hierarchical_pathfinder.mark_dirty(x, y)
+                self.jump_point_pathfinder.mark_dirty(x, y)
+            if self._nearest_passable is not None:
+                self._nearest_passable.update_cells(xs, ys, self.passable[ys, xs])
+        else:
+            self._step_costs = None
+            self._nearest_passable = None
+            self.hierarchical_pathfinder.invalidate()
+            self.jump_point_pathfinder.invalidate()
+
+        self.path_cache.invalidate_cells(xs.tolist(), ys.tolist(), decreased.tolist())
+        self.field_cache.invalidate_cells(xs.tolist(), ys.tolist(), decreased.tolist())
+
+    def refresh_step_cost(self, x: int, y: int):
+        """Bring the cached step cost of one cell in line with the storage arrays"""
+        if self._step_costs is None:
+            return
+
+        if self.passable[y, x]:
+            movement_cost = float(self.movement_costs[y, x])
+            self._step_costs[y * self.width + x] = movement_cost
+            if movement_cost < self._min_step_cost:
+                self._min_step_cost = movement_cost
+        else:
+            self._step_costs[y * self.width + x] = INF
+
+    def get_min_step_cost(self) -> float:
+        """Get a lower bound on the cost of entering any passable cell"""
+        self.get_step_costs()
+        return self._min_step_cost
+
+    def find_path(self, start: GridPosition, end: GridPosition, mode: str = "astar") -> List[GridPosition]:
+        """
+        Find a path between two points.
+
+        Args:
+            start: Start position
+            end: End position
+            mode: "astar" for full-resolution A*, "hierarchical" to route long
+                queries over the precomputed cluster graph (HPA*), or "jps" for jump
+                point search, which finds the same optimal paths as A* with far fewer
+                expansions across uniform-cost terrain
+        """
+        if mode not in self.PATHFINDING_MODES:
+            raise ValueError(f"Unknown pathfinding mode: {mode}")
 
-    def find_path(self, start: GridPosition, end: GridPosition) -> List[GridPosition]:
-        """Find a path between two points using A* pathfinding"""
         # Check if start or end is out of bounds
         if not self.is_in_bounds(start.x, start.y) or not self.is_in_bounds(end.x, end.y):
             return []
 
         # Check if end is not passable
-        if not self.cells[end.y][end.x].is_passable:
+        if not self.passable[end.y, end.x]:
             # Try to find nearest passable cell
             nearest_passable = self.find_nearest_passable_cell(end)
             if nearest_passable.x == -1:
@@ -198,7 +611,7 @@ class MapGrid:
             end = nearest_passable
 
         # Check if start is not passable
-        if not self.cells[start.y][start.x].is_passable:
+        if not self.passable[start.y, start.x]:
             # Try to find nearest passable cell
             nearest_passable = self.find_nearest_passable_cell(start)
             if nearest_passable.x == -1:
@@ -206,128 +619,276 @@ class MapGrid:
 
             start = nearest_passable
 
-        # Initialize open and closed lists
-        open_list: List[PathNode] = []
-        closed_set: Set[GridPosition] = set()
-        all_nodes: Dict[GridPosition, PathNode] = {}
-
-        # Add start node to open list
-        start_node = PathNode(start)
-        start_node.g_cost = 0
-        start_node.h_cost = self.calculate_heuristic(start, end)
-        open_list.append(start_node)
-        all_nodes[start] = start_node
-
-        while open_list:
-            # Get node with lowest F cost
-            current_node = open_list[0]
-            for i in range(1, len(open_list)):
-                if (open_list[i].f_cost < current_node.f_cost or
-                        (open_list[i].f_cost == current_node.f_cost and
-                         open_list[i].h_cost < current_node.h_cost)):
-                    current_node = open_list[i]
-
-            # Remove current node from open list and add to closed list
-            open_list.remove(current_node)
-            closed_set.add(current_node.position)
-
-            # Check if we reached the end
-            if current_node.position.x == end.x and current_node.position.y == end.y:
-                # Reconstruct path
-                return self.reconstruct_path(current_node)
-
-            # Check neighbors
-            for dy in range(-1, 2):
-                for dx in range(-1, 2):
-                    # Skip current node
-                    if dx == 0 and dy == 0:
-                        continue
+        start_key = self.to_key(start.x, start.y)
+        end_key = self.to_key(end.x, end.y)
+        if mode == "hierarchical":
+            key_path = self.hierarchical_pathfinder.find_path(start_key, end_key)
+        elif mode == "jps":
+            key_path = self.jump_point_pathfinder.find_path(start_key, end_key)
+        else:
+            key_path = self.pathfinder.find_path(start_key, end_key)
 
-                    # Calculate neighbor position
-                    nx = current_node.position.x + dx
-                    ny = current_node.position.y + dy
+        return [self.from_key(key) for key in key_path]
 
-                    # Check bounds
-                    if not self.is_in_bounds(nx, ny):
-                        continue
+    def build_pyramid(self) -> 'GridPyramid':
+        """Build the downsampled copies of this grid used by coarse queries, kept up to date from then on"""
+        self.pyramid = GridPyramid(self)
+        self.pyramid.build()
+        return self.pyramid
 
-                    # Check if neighbor is in closed list
-                    neighbor_pos = GridPosition(nx, ny)
-                    if neighbor_pos in closed_set:
-                        continue
+    def get_nearest_passable_map(self) -> NearestFeatureMap:
+        """Get the nearest-passable-cell map for the whole grid, building it if necessary"""
+        if self._nearest_passable is None:
+            self._nearest_passable = NearestFeatureMap(self.passable)
 
-                    # Check if neighbor is passable
-                    if not self.cells[ny][nx].is_passable:
-                        continue
+        return self._nearest_passable
 
-                    # Calculate cost to neighbor
-                    movement_cost = self.cells[ny][nx].movement_cost
+    def find_nearest_passable_cell(self, position: GridPosition) -> GridPosition:
+        """Find the nearest passable cell to a given position (by straight-line distance)"""
+        # Positions off the grid start from the closest cell on it
+        x = min(max(position.x, 0), self.width - 1)
+        y = min(max(position.y, 0), self.height - 1)
 
-                    # Diagonal movement costs more
-                    if dx != 0 and dy != 0:
-                        movement_cost *= 1.414  # Sqrt(2)
+        nearest = self.get_nearest_passable_map().nearest(x, y)
+        if nearest is None:
+            # No passable cell found
+            return GridPosition(-1, -1)
 
-                    g_cost = current_node.g_cost + movement_cost
+        return GridPosition(nearest[0], nearest[1])
 
-                    # Get or create neighbor node
-                    if neighbor_pos in all_nodes:
-                        neighbor_node = all_nodes[neighbor_pos]
-                        # Skip if path to neighbor is not better
-                        if g_cost >= neighbor_node.g_cost:
-                            continue
-                    else:
-                        # Create new node
-                        neighbor_node = PathNode(neighbor_pos)
-                        all_nodes[neighbor_pos] = neighbor_node
+    def calculate_heuristic(self, from_pos: GridPosition, to_pos: GridPosition) -> float:
+        """Calculate heuristic (estimated cost) from a position to the goal"""
+        # Octile distance, consistent with the diagonal movement cost
+        return octile_distance(from_pos.x - to_pos.x, from_pos.y - to_pos.y, self.get_min_step_cost())
 
-                    # Update neighbor node
-                    neighbor_node.g_cost = g_cost
-                    neighbor_node.h_cost = self.calculate_heuristic(neighbor_pos, end)
-                    neighbor_node.parent = current_node
 
-                    # Add to open list if not already in it
-                    if neighbor_node not in open_list:
-                        open_list.append(neighbor_node)
+class GridPyramid:
+    """
+    Mip-style stack of downsampled copies of a MapGrid for coarse queries.
 
-        # No path found
-        return []
+    Level 0 is the grid itself; level k merges 2^k x 2^k blocks of it into one cell.
+    A merged cell's movement cost is the mean over its passable cells and its terrain
+    is the most common one in the block. It is impassable unless most of the block
+    is passable, so barriers such as coastlines and mountain ranges survive.
+    """
 
-    def find_nearest_passable_cell(self, position: GridPosition) -> GridPosition:
-        """Find the nearest passable cell to a given position"""
-        # Search in expanding squares around the position
-        for radius in range(1, 11):
-            # Check perimeter of square
-            for y in range(position.y - radius, position.y + radius + 1):
-                for x in range(position.x - radius, position.x + radius + 1):
-                    # Only check perimeter
-                    if (x == position.x - radius or x == position.x + radius or
-                            y == position.y - radius or y == position.y + radius):
-                        # Check bounds
-                        if self.is_in_bounds(x, y) and self.cells[y][x].is_passable:
-                            return GridPosition(x, y)
-
-        # No passable cell found
-        return GridPosition(-1, -1)
+    # Stop adding levels once the coarsest level is this small
+    MIN_LEVEL_SIZE = 16
+
+    # Largest grid dimension allowed at each query precision (None for full resolution)
+    PRECISION_LEVEL_SIZES = {
+        "exact": None,
+        "coarse": 256,
+        "rough": 64
+    }
+
+    # Shortest path trees kept per level for rough queries
+    MAX_CACHED_TREES = 256
+
+    def __init__(self, grid: 'MapGrid'):
+        self.grid = grid
+        self.levels: List['MapGrid'] = [grid]
+        self.factors: List[int] = [1]
+        self._trees: List['OrderedDict[int, Tuple[List[float], List[int]]]'] = [OrderedDict()]
+
+    def build(self):
+        """Build every level from the base grid"""
+        self.levels = [self.grid]
+        self.factors = [1]
+        self._trees = [OrderedDict()]
+
+        factor = 2
+        while max(self.grid.width, self.grid.height) / factor >= self.MIN_LEVEL_SIZE:
+            level_width = -(-self.grid.width // factor)
+            level_height = -(-self.grid.height // factor)
+            level = MapGrid(level_width, level_height)
+            level.terrain_types = list(self.grid.terrain_types)
+            level._terrain_code_lookup = dict(self.grid._terrain_code_lookup)
+
+            terrain_codes, movement_costs, passable = self._downsample(factor, 0, level_height, 0, level_width)
+            level.set_all_cells(terrain_codes, movement_costs, passable)
+
+            self.levels.append(level)
+            self.factors.append(factor)
+            self._trees.append(OrderedDict())
+            factor *= 2
+
+    def get_level_for_precision(self, precision: str) -> int:
+        """Get the finest level no larger than the precision allows"""
+        if precision not in self.PRECISION_LEVEL_SIZES:
+            raise ValueError(f"Unknown precision: {precision}")
+
+        max_size = self.PRECISION_LEVEL_SIZES[precision]
+        if max_size is None:
+            return 0
+
+        for level_index, level in enumerate(self.levels):
+            if max(level.width, level.height) <= max_size:
+                return level_index
+        return len(self.levels) - 1
+
+    def to_level_position(self, level_index: int, x: float, y: float) -> GridPosition:
+        """Convert a base grid position to the cell containing it at a level"""
+        level, factor = self.levels[level_index], self.factors[level_index]
+        return GridPosition(min(max(int(x // factor), 0), level.width - 1),
+                            min(max(int(y // factor), 0), level.height - 1))
+
+    def get_shortest_path_tree(self, level_index: int, source_key: int) -> Tuple[List[float], List[int]]:
+        """Get the (cached) shortest path tree from a cell of a level"""
+        trees = self._trees[level_index]
+        tree = trees.get(source_key)
+        if tree is not None:
+            trees.move_to_end(source_key)
+            return tree
+
+        level = self.levels[level_index]
+        tree = shortest_path_tree(level.get_step_costs(), level.width, level.height, source_key)
+        trees[source_key] = tree
+        if len(trees) > self.MAX_CACHED_TREES:
+            trees.popitem(last=False)
+        return tree
+
+    def update_cells(self, xs: np.ndarray, ys: np.ndarray):
+        """Recompute the merged cells covering changed base grid cells"""
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        self._trees[0].clear()
+
+        for level_index in range(1, len(self.levels)):
+            level, factor = self.levels[level_index], self.factors[level_index]
+            level.terrain_types = list(self.grid.terrain_types)
+            level._terrain_code_lookup = dict(self.grid._terrain_code_lookup)
+            self._trees[level_index].clear()
+
+            blocks = np.unique((ys // factor) * level.width + xs // factor)
+            if blocks.size > self.grid.LOCAL_EDIT_LIMIT:
+                terrain_codes, movement_costs, passable = self._downsample(factor, 0, level.height, 0, level.width)
+                level.set_all_cells(terrain_codes, movement_costs, passable)
+                continue
+
+            block_xs, block_ys = blocks % level.width, blocks // level.width
+            terrain_codes = np.empty(blocks.size, dtype=np.uint8)
+            movement_costs = np.empty(blocks.size, dtype=np.float32)
+            passable = np.empty(blocks.size, dtype=bool)
+            for i, (block_x, block_y) in enumerate(zip(block_xs.tolist(), block_ys.tolist())):
+                codes, costs, open_cells = self._downsample(factor, block_y, block_y + 1, block_x, block_x + 1)
+                terrain_codes[i], movement_costs[i], passable[i] = codes[0, 0], costs[0, 0], open_cells[0, 0]
+            level.set_cells(block_xs, block_ys, terrain_codes, movement_costs, passable)
+
+    def _downsample(self, factor: int, min_block_y: int, max_block_y: int,
+                    min_block_x: int, max_block_x: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Merge the base grid blocks in a range into (terrain codes, movement costs, passable) arrays"""
+        block_rows, block_columns = max_block_y - min_block_y, max_block_x - min_block_x
+        window = (slice(min_block_y * factor, max_block_y * factor),
+                  slice(min_block_x * factor, max_block_x * factor))
+
+        window_height = min(max_block_y * factor, self.grid.height) - min_block_y * factor
+        window_width = min(max_block_x * factor, self.grid.width) - min_block_x * factor
+
+        def blocks_of(values: np.ndarray, fill) -> np.ndarray:
+            # Pad the partial blocks along the right and bottom edges
+            padded = np.full((block_rows * factor, block_columns * factor), fill, dtype=values.dtype)
+            padded[:window_height, :window_width] = values
+            return padded.reshape(block_rows, factor, block_columns, factor)
+
+        valid = blocks_of(np.ones((window_height, window_width), dtype=bool), False)
+        passable = blocks_of(self.grid.passable[window], False)
+        movement_costs = blocks_of(self.grid.movement_costs[window], 0.0)
+        terrain_codes = blocks_of(self.grid.terrain_codes[window], 0)
+
+        valid_counts = valid.sum(axis=(1, 3))
+        passable_counts = passable.sum(axis=(1, 3))
+        cost_sums = np.where(passable, movement_costs, 0.0).sum(axis=(1, 3), dtype=np.float64)
+        merged_costs = np.where(passable_counts > 0, cost_sums / np.maximum(passable_counts, 1), 1.0)
+        merged_passable = passable_counts * 2 > valid_counts
+
+        # Most common terrain in each block
+        merged_codes = np.zeros((block_rows, block_columns), dtype=np.uint8)
+        best_counts = np.zeros((block_rows, block_columns), dtype=np.int64)
+        for code in np.unique(terrain_codes[valid]).tolist():
+            counts = ((terrain_codes == code) & valid).sum(axis=(1, 3))
+            better = counts > best_counts
+            merged_codes[better] = code
+            best_counts[better] = counts[better]
+
+        return merged_codes, merged_costs.astype(np.float32), merged_passable
+
+
+def scan_region_cells(cell_ids: np.ndarray, offsets: np.ndarray, cell_terrain_index: np.ndarray,
+                      cell_has_river: np.ndarray, mountain_lookup: np.ndarray, water_lookup: np.ndarray,
+                      resource_lookup: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Summarize the cells of many regions at once.
+
+    Region i owns cell_ids[offsets[i]:offsets[i + 1]], in the order its cells are visited.
+
+    Args:
+        cell_ids: Concatenated cell IDs of every region
+        offsets: Start of each region's cells in cell_ids, plus the total count at the end
+        cell_terrain_index: Per-cell terrain index (MapRegionManager.cell_terrain_index)
+        cell_has_river: Per-cell flag for cells with a river
+        mountain_lookup: By terrain index, whether the terrain counts as mountains
+        water_lookup: By terrain index, whether the terrain counts as water
+        resource_lookup: By terrain index, whether a cell of that terrain can yield resources
+            whatever the biome
+
+    Returns:
+        Per-region arrays: mountain_count and contains_water; first_terrain and first_river for
+        the first cell; trigger_terrain and trigger_river for the first cell that can yield
+        resources (a river, or a terrain in resource_lookup), with has_trigger False if none can
+    """
+    in_range = (cell_ids >= 0) & (cell_ids < cell_terrain_index.size)
+    safe_ids = np.where(in_range, cell_ids, 0)
+    terrain = np.where(in_range, cell_terrain_index[safe_ids], MapRegionManager.NO_TERRAIN_INDEX)
+    river = in_range & cell_has_river[safe_ids]
 
-    def calculate_heuristic(self, from_pos: GridPosition, to_pos: GridPosition) -> float:
-        """Calculate heuristic (estimated cost) from a position to the goal"""
-        # Manhattan distance
-        return abs(from_pos.x - to_pos.x) + abs(from_pos.y - to_pos.y)
+    mountain = mountain_lookup[terrain]
+    water = water_lookup[terrain] | river
+    trigger = resource_lookup[terrain] | river
 
-    def reconstruct_path(self, end_node: PathNode) -> List[GridPosition]:
-        """Reconstruct path from end node to start node"""
-        path: List[GridPosition] = []
-        current_node = end_node
+    starts, ends = offsets[:-1], offsets[1:]
+    mountain_sums = np.concatenate(([0], np.cumsum(mountain)))
+    water_sums = np.concatenate(([0], np.cumsum(water)))
 
-        # Traverse from end to start
-        while current_node:
-            path.append(current_node.position)
-            current_node = current_node.parent
+    # First triggering cell at or after each region's start, if it's still inside the region
+    trigger_positions = np.flatnonzero(trigger)
+    candidates = np.searchsorted(trigger_positions, starts)
+    if trigger_positions.size:
+        trigger_at = trigger_positions[np.minimum(candidates, trigger_positions.size - 1)]
+    else:
+        trigger_at = np.zeros(starts.size, dtype=np.int64)
+    has_trigger = (candidates < trigger_positions.size) & (trigger_at < ends)
+    first_at = np.where(ends > starts, starts, 0)
 
-        # Reverse to get path from start to end
-        path.reverse()
+    def at(values: np.ndarray, positions: np.ndarray, fill) -> np.ndarray:
+        if not values.size:
+            return np.full(positions.size, fill, dtype=values.dtype)
+        return values[np.minimum(positions, values.size - 1)]
 
-        return path
+    return {
+        "mountain_count": mountain_sums[ends] - mountain_sums[starts],
+        "contains_water": (water_sums[ends] - water_sums[starts]) > 0,
+        "first_terrain": at(terrain, first_at, MapRegionManager.NO_TERRAIN_INDEX),
+        "first_river": at(river, first_at, False),
+        "has_trigger": has_trigger,
+        "trigger_terrain": at(terrain, trigger_at, MapRegionManager.NO_TERRAIN_INDEX),
+        "trigger_river": at(river, trigger_at, False)
+    }
+
+
+# Per-cell arrays shared with region analysis worker processes (set by _init_region_worker)
+_worker_region_cells: Optional[Tuple[np.ndarray, ...]] = None
+
+
+def _init_region_worker(*cell_arrays: np.ndarray):
+    global _worker_region_cells
+    _worker_region_cells = cell_arrays
+
+
+def _scan_region_chunk(cell_ids: np.ndarray, offsets: np.ndarray) -> Dict[str, np.ndarray]:
+    cell_terrain_index, cell_has_river, mountain_lookup, water_lookup, resource_lookup = _worker_region_cells
+    return scan_region_cells(cell_ids, offsets, cell_terrain_index, cell_has_river, mountain_lookup, water_lookup,
+                             resource_lookup)
 
 
 class MapRegionManager:
@@ -339,6 +900,39 @@ class MapRegionManager:
     # Singleton instance
     _instance = None
 
+    # Terrain types by height band, based on Azgaar's map generator conventions.
+    # A height below a threshold gets that terrain; anything higher is HIGHEST_TERRAIN.
+    TERRAIN_HEIGHT_THRESHOLDS: List[Tuple[float, str]] = [
+        (0.2, "ocean"),
+        (0.25, "sea"),
+        (0.3, "water"),
+        (0.4, "plain"),
+        (0.5, "grassland"),
+        (0.65, "hill"),
+        (0.8, "highland")
+    ]
+    HIGHEST_TERRAIN = "mountain"
+
+    # Terrain index for cells without height data
+    NO_TERRAIN_INDEX = 255
+
+    # Hours of travel in a day
+    TRAVEL_HOURS_PER_DAY = 8
+
+    # Terrain groups used by region analysis
+    MOUNTAIN_TERRAINS = ["mountain", "highland"]
+    WATER_TERRAINS = ["water", "sea", "ocean"]
+    # Terrains that yield resources in any biome (see determine_region_resources)
+    RESOURCE_TERRAINS = ["mountain", "highland", "forest", "grassland", "plain", "water", "sea", "ocean"]
+
+    # Regions handed to each worker task by analyze_all_regions
+    REGION_CHUNK_SIZE = 64
+
+    # (dx, dy) to each of a cell's eight neighbors; the first four reach every adjacent pair once
+    CELL_NEIGHBOR_OFFSETS = [(1, 0), (0, 1), (1, 1), (-1, 1), (-1, 0), (0, -1), (-1, -1), (1, -1)]
+    # (dx, dy) to the four neighbors sharing an edge with a cell
+    ORTHOGONAL_NEIGHBOR_OFFSETS = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+
     @classmethod
     def instance(cls):
         if cls._instance is None:
@@ -360,10 +954,29 @@ class MapRegionManager:
 
         # Cached region analysis
         self.region_analyses: Dict[str, RegionAnalysis] = {}
+        self.region_analysis_timings: Dict[str, float] = {}  # seconds per stage of the last analyze_all_regions
 
         # Map grid data for pathfinding and terrain analysis
         self.map_grid: Optional[MapGrid] = None
 
+        # Default pathfinding mode for find_path ("astar", "hierarchical" or "jps")
+        self.pathfinding_mode: str = "astar"
+
+        # Dense per-cell lookup arrays, indexed by cell ID (see build_cell_indexes)
+        self.cell_indexes_dirty: bool = True
+        self.cell_index_width: int = 1000
+        self.cell_heights: Optional[np.ndarray] = None  # float32, NaN where there is no height data
+        self.cell_terrain_index: Optional[np.ndarray] = None  # uint8 into get_height_terrain_types()
+        self.cell_biome_index: Optional[np.ndarray] = None  # int32 into biome_index_ids, -1 for none
+        self.cell_river_index: Optional[np.ndarray] = None  # int32 into river_index_ids, -1 for none
+        self.cell_is_water: Optional[np.ndarray] = None
+        self.biome_index_ids: List[str] = []
+        self.river_index_ids: List[str] = []
+        self._heightmap_by_cell: List[Optional[HeightmapData]] = []
+        self._water_map: Optional[NearestFeatureMap] = None  # see get_water_map
+        self._land_map: Optional[NearestFeatureMap] = None  # see get_land_map
+        self._cell_neighbor_pairs: Optional[Tuple[np.ndarray, np.ndarray]] = None  # see get_cell_neighbor_pairs
+
         # Terrain difficulty multipliers by type
         self.terrain_difficulty_multipliers: Dict[str, float] = {
             "water": 2.5,
@@ -396,9 +1009,15 @@ class MapRegionManager:
             # Load river data from map
             self.load_rivers_from_map()
 
+            # Build per-cell lookup arrays
+            self.build_cell_indexes()
+
             # Generate the map grid for terrain analysis
             self.generate_map_grid()
 
+            # Analyze every region up front
+            self.analyze_all_regions()
+
             print("MapRegionManager initialization complete")
         except Exception as ex:
             print(f"Error initializing MapRegionManager: {str(ex)}")
@@ -407,6 +1026,7 @@ class MapRegionManager:
         """Load biome data from the map"""
         try:
             self.biomes.clear()
+            self.cell_indexes_dirty = True
 
             map_data = self.world_state.map_data
             if not map_data:
@@ -451,6 +1071,7 @@ class MapRegionManager:
         """Load heightmap data from the map"""
         try:
             self.heightmap.clear()
+            self.cell_indexes_dirty = True
 
             map_data = self.world_state.map_data
             if not map_data:
@@ -487,6 +1108,7 @@ class MapRegionManager:
         """Load river data from the map"""
         try:
             self.rivers.clear()
+            self.cell_indexes_dirty = True
 
             map_data = self.world_state.map_data
             if not map_data:
@@ -542,62 +1164,148 @@ class MapRegionManager:
             # Get grid size from map data
             width = int(map_data.get("info", {}).get("width", 1000))
             height = int(map_data.get("info", {}).get("height", 1000))
+            cell_count = width * height
 
             # Create grid
             self.map_grid = MapGrid(width, height)
 
-            # Populate grid with terrain data
-            for height_key, height_data in self.heightmap.items():
-                cell_id = height_data.cell_id
-
-                # Convert cell ID to grid position
-                # Note: This is a simplified conversion that doesn't match Azgaar's exact cell system
-                # In a full implementation, we would need to use the actual cell coordinates from the map
-                x = cell_id % width
-                y = cell_id // width
-
-                if x < 0 or x >= width or y < 0 or y >= height:
-                    continue
-
-                # Set grid cell terrain type and movement cost
-                terrain_type = height_data.terrain_type
-                movement_cost = self.get_movement_cost_for_terrain(terrain_type)
-
-                self.map_grid.set_cell(x, y, terrain_type, movement_cost)
-
-                # Add river crossings (if any)
-                for river in self.rivers.values():
-                    if cell_id in river.cells:
-                        # Rivers increase movement cost
-                        river_cost = movement_cost * self.get_river_crossing_multiplier(
-                            river.type, river.width)
-                        self.map_grid.set_cell(x, y, f"{terrain_type}+river", river_cost)
-                        break
-
-            print(f"Generated map grid of size {width}x{height}")
+            # Cells with height data
+            # Note: Cell IDs map to grid positions with a simplified row-major conversion that doesn't
+            # match Azgaar's exact cell system
+            self._ensure_cell_indexes()
+            grid_terrain_index = self.cell_terrain_index[:cell_count]
+            cell_ids = np.flatnonzero(grid_terrain_index != self.NO_TERRAIN_INDEX)
+            terrain_index = grid_terrain_index[cell_ids]
+
+            # Terrain and movement cost through per-terrain lookup tables
+            terrain_names = self.get_height_terrain_types()
+            cost_lookup = np.array([self.get_movement_cost_for_terrain(t) for t in terrain_names], dtype=np.float64)
+            code_lookup = np.array([self.map_grid.get_terrain_code(t) for t in terrain_names], dtype=np.uint8)
+            river_code_lookup = np.array([self.map_grid.get_terrain_code(f"{t}+river") for t in terrain_names],
+                                         dtype=np.uint8)
+
+            movement_costs = cost_lookup[terrain_index]
+            terrain_codes = code_lookup[terrain_index]
+
+            # Rivers multiply the movement cost of the cells they flow through
+            river_multipliers = np.array([self.get_river_crossing_multiplier(self.rivers[river_id].type,
+                                                                             self.rivers[river_id].width)
+                                          for river_id in self.river_index_ids], dtype=np.float64)
+            cell_rivers = self.cell_river_index[cell_ids]
+            has_river = cell_rivers >= 0
+            if river_multipliers.size:
+                movement_costs[has_river] *= river_multipliers[cell_rivers[has_river]]
+            terrain_codes[has_river] = river_code_lookup[terrain_index[has_river]]
+
+            # Fill the whole grid in one pass
+            grid_codes = np.zeros(cell_count, dtype=np.uint8)
+            grid_costs = np.ones(cell_count, dtype=np.float32)
+            grid_codes[cell_ids] = terrain_codes
+            grid_costs[cell_ids] = movement_costs
+            self.map_grid.set_all_cells(grid_codes.reshape(height, width), grid_costs.reshape(height, width))
+            self.map_grid.build_pyramid()
+
+            print(f"Generated map grid of size {width}x{height} "
+                  f"({len(self.map_grid.pyramid.levels)} pyramid levels)")
+
+            # Precompute the cluster graph up front when hierarchical pathfinding is the default
+            if self.pathfinding_mode == "hierarchical":
+                self.map_grid.hierarchical_pathfinder.build()
+                print(f"Built hierarchical pathfinding graph in "
+                      f"{self.map_grid.hierarchical_pathfinder.build_time:.2f}s")
         except Exception as ex:
             print(f"Error generating map grid: {str(ex)}")
 
+    def build_cell_indexes(self):
+        """
+        Build dense per-cell lookup arrays (height, terrain, biome, river, water) from the loaded data.
+
+        Where biomes or rivers overlap, the first one in load order wins, matching the
+        order the per-object scans used to check them in.
+        """
+        map_data = self.world_state.map_data if self.world_state else None
+        info = map_data.get("info", {}) if map_data else {}
+        width = int(info.get("width", 1000))
+        height = int(info.get("height", 1000))
+
+        entry_count = len(self.heightmap)
+        height_cell_ids = np.fromiter((h.cell_id for h in self.heightmap.values()), dtype=np.int64,
+                                      count=entry_count)
+        height_values = np.fromiter((h.height_value for h in self.heightmap.values()), dtype=np.float64,
+                                    count=entry_count)
+        cell_count = max(width * height, int(height_cell_ids.max()) + 1 if entry_count else 0)
+
+        self.cell_index_width = width
+
+        # Heights and terrain
+        self.cell_heights = np.full(cell_count, np.nan, dtype=np.float32)
+        self.cell_heights[height_cell_ids] = height_values
+        self.cell_terrain_index = np.full(cell_count, self.NO_TERRAIN_INDEX, dtype=np.uint8)
+        self.cell_terrain_index[height_cell_ids] = self.classify_terrain_heights(height_values)
+        self._heightmap_by_cell = [None] * cell_count
+        for height_data in self.heightmap.values():
+            self._heightmap_by_cell[height_data.cell_id] = height_data
+
+        # Biomes
+        self.biome_index_ids = list(self.biomes.keys())
+        self.cell_biome_index = np.full(cell_count, -1, dtype=np.int32)
+        for index, biome_id in enumerate(self.biome_index_ids):
+            biome_cells = np.fromiter(self.biomes[biome_id].cell_ids, dtype=np.int64,
+                                      count=len(self.biomes[biome_id].cell_ids))
+            biome_cells = biome_cells[(biome_cells >= 0) & (biome_cells < cell_count)]
+            unclaimed = biome_cells[self.cell_biome_index[biome_cells] < 0]
+            self.cell_biome_index[unclaimed] = index
+
+        # Rivers
+        self.build_river_index(cell_count)
+
+        # Water: ocean, sea or lake terrain, or a river
+        water_lookup = np.zeros(256, dtype=bool)
+        for index, terrain_type in enumerate(self.get_height_terrain_types()):
+            water_lookup[index] = terrain_type in ["ocean", "sea", "water"]
+        self.cell_is_water = water_lookup[self.cell_terrain_index] | (self.cell_river_index >= 0)
+        self._water_map = None
+        self._land_map = None
+        self._cell_neighbor_pairs = None
+
+        self.cell_indexes_dirty = False
+
+    def _ensure_cell_indexes(self):
+        if self.cell_indexes_dirty or self.cell_heights is None:
+            self.build_cell_indexes()
+
+    def build_river_index(self, cell_count: int):
+        """
+        Build the cell -> river lookup array from the loaded rivers.
+
+        When several rivers share a cell, the first river in load order wins.
+        """
+        self.river_index_ids = list(self.rivers.keys())
+        self.cell_river_index = np.full(cell_count, -1, dtype=np.int32)
+
+        for index, river_id in enumerate(self.river_index_ids):
+            river_cells = np.asarray(self.rivers[river_id].cells, dtype=np.int64)
+            river_cells = river_cells[(river_cells >= 0) & (river_cells < cell_count)]
+            unclaimed = river_cells[self.cell_river_index[river_cells] < 0]
+            self.cell_river_index[unclaimed] = index
+
+    def get_height_terrain_types(self) -> List[str]:
+        """Get the terrain types in height order, as indexed by classify_terrain_heights"""
+        return [terrain for _, terrain in self.TERRAIN_HEIGHT_THRESHOLDS] + [self.HIGHEST_TERRAIN]
+
+    def classify_terrain_heights(self, heights: np.ndarray) -> np.ndarray:
+        """Get the index into get_height_terrain_types() for each height value"""
+        thresholds = np.array([threshold for threshold, _ in self.TERRAIN_HEIGHT_THRESHOLDS])
+        return np.searchsorted(thresholds, heights, side="right")
+
     def get_terrain_type_from_height(self, height: float) -> str:
         """Get the terrain type from a height value"""
         # Convert height value to terrain type
-        # Thresholds based on Azgaar's map generator conventions
-        if height < 0.2:
-            return "ocean"
-        elif height < 0.25:
-            return "sea"
-        elif height < 0.3:
-            return "water"
-        elif height < 0.4:
-            return "plain"
-        elif height < 0.5:
-            return "grassland"
-        elif height < 0.65:
-            return "hill"
-        elif height < 0.8:
-            return "highland"
-        else:
-            return "mountain"
+        for threshold, terrain_type in self.TERRAIN_HEIGHT_THRESHOLDS:
+            if height < threshold:
+                return terrain_type
+
+        return self.HIGHEST_TERRAIN
 
     def get_movement_cost_for_terrain(self, terrain_type: str) -> float:
         """Calculate the movement cost for a terrain type"""
@@ -623,8 +1331,9 @@ class MapRegionManager:
         else:
             return 1.5
 
-    def find_path(self, start_x: float, start_y: float, end_x: float, end_y: float) -> List[Tuple[float, float]]:
-        """Find a path between two points on the map"""
+    def find_path(self, start_x: float, start_y: float, end_x: float, end_y: float,
+                  mode: Optional[str] = None) -> List[Tuple[float, float]]:
+        """Find a path between two points on the map (mode defaults to self.pathfinding_mode)"""
         if not self.map_grid:
             print("Map grid not initialized")
             return []
@@ -641,10 +1350,21 @@ class MapRegionManager:
             print("Path start or end is out of bounds")
             return []
 
-        # Perform A* pathfinding
+        mode = mode or self.pathfinding_mode
+        start_key = self.map_grid.to_key(start_grid_x, start_grid_y)
+        end_key = self.map_grid.to_key(end_grid_x, end_grid_y)
+
+        # Return a cached route if the terrain along it hasn't changed
+        cache_key = ("path", start_key, end_key, mode)
+        cached_path = self.map_grid.path_cache.get(cache_key)
+        if cached_path is not None:
+            return list(cached_path)
+
+        # Perform pathfinding
         grid_path = self.map_grid.find_path(
             GridPosition(start_grid_x, start_grid_y),
-            GridPosition(end_grid_x, end_grid_y)
+            GridPosition(end_grid_x, end_grid_y),
+            mode
         )
 
         # Convert grid path to world coordinates
@@ -652,18 +1372,107 @@ class MapRegionManager:
         for grid_pos in grid_path:
             world_path.append((float(grid_pos.x), float(grid_pos.y)))
 
+        self.map_grid.path_cache.put(cache_key, tuple(world_path), start_key, end_key,
+                                     [self.map_grid.to_key(p.x, p.y) for p in grid_path])
+
         return world_path
 
     def calculate_travel_time(self, start_x: float, start_y: float, end_x: float, end_y: float,
-                              travel_speed: float = 1.0) -> TravelTimeEstimate:
-        """Calculate the estimated travel time between two points based on terrain"""
+                              travel_speed: float = 1.0, mode: Optional[str] = None,
+                              precision: str = "exact") -> TravelTimeEstimate:
+        """
+        Calculate the estimated travel time between two points based on terrain.
+
+        precision is "exact" for a full-resolution path, or "coarse" or "rough" to route
+        over a downsampled level of the grid pyramid instead (see GridPyramid).
+        """
+        if precision != "exact" and self.map_grid and self.map_grid.pyramid:
+            level_index = self.map_grid.pyramid.get_level_for_precision(precision)
+            if level_index > 0:
+                return self.calculate_travel_time_at_level(start_x, start_y, end_x, end_y, level_index,
+                                                           travel_speed, use_path_tree=precision == "rough")
+
+        cache_key = None
+        if self.map_grid:
+            start_grid_x, start_grid_y = round(start_x), round(start_y)
+            end_grid_x, end_grid_y = round(end_x), round(end_y)
+            if (self.map_grid.is_in_bounds(start_grid_x, start_grid_y) and
+                    self.map_grid.is_in_bounds(end_grid_x, end_grid_y)):
+                start_key = self.map_grid.to_key(start_grid_x, start_grid_y)
+                end_key = self.map_grid.to_key(end_grid_x, end_grid_y)
+                cache_key = ("travel", start_key, end_key, round(travel_speed, 6), mode or self.pathfinding_mode)
+
+                cached_estimate = self.map_grid.path_cache.get(cache_key)
+                if cached_estimate is not None:
+                    return cached_estimate.copy()
+
         # Find path between points
-        path = self.find_path(start_x, start_y, end_x, end_y)
+        path = self.find_path(start_x, start_y, end_x, end_y, mode)
 
         if not path:
             print("Could not find path for travel time calculation")
+            if cache_key:
+                self.map_grid.path_cache.put(cache_key, TravelTimeEstimate(), start_key, end_key, [])
             return TravelTimeEstimate()
 
+        estimate = self.build_travel_estimate(self.map_grid, path, travel_speed)
+
+        if cache_key:
+            path_keys = [self.map_grid.to_key(round(px), round(py)) for px, py in path]
+            self.map_grid.path_cache.put(cache_key, estimate.copy(), start_key, end_key, path_keys)
+
+        return estimate
+
+    def calculate_travel_time_at_level(self, start_x: float, start_y: float, end_x: float, end_y: float,
+                                       level_index: int, travel_speed: float = 1.0,
+                                       use_path_tree: bool = False) -> TravelTimeEstimate:
+        """
+        Estimate the travel time between two points by routing over one level of the grid pyramid.
+
+        Args:
+            level_index: Pyramid level to route over (0 is full resolution)
+            use_path_tree: Read the route off a cached shortest path tree from the start cell,
+                so repeated queries from the same area skip the search entirely
+        """
+        pyramid = self.map_grid.pyramid
+        level, factor = pyramid.levels[level_index], pyramid.factors[level_index]
+
+        # Impassable endpoints move to the nearest passable cell, as find_path does
+        endpoints = []
+        for x, y in ((start_x, start_y), (end_x, end_y)):
+            position = pyramid.to_level_position(level_index, x, y)
+            if not level.passable[position.y, position.x]:
+                position = level.find_nearest_passable_cell(position)
+                if position.x == -1:
+                    return TravelTimeEstimate()
+            endpoints.append(position)
+        start, end = endpoints
+
+        if use_path_tree:
+            distances, parents = pyramid.get_shortest_path_tree(level_index, level.to_key(start.x, start.y))
+            end_key = level.to_key(end.x, end.y)
+            if distances[end_key] == INF:
+                return TravelTimeEstimate()
+            level_path = [level.from_key(key) for key in reconstruct_key_path(parents, end_key)]
+        else:
+            level_path = level.find_path(start, end)
+            if not level_path:
+                return TravelTimeEstimate()
+
+        return self.build_travel_estimate(level, [(float(p.x), float(p.y)) for p in level_path], travel_speed,
+                                          factor)
+
+    def build_travel_estimate(self, grid: MapGrid, path: List[Tuple[float, float]], travel_speed: float,
+                              scale: float = 1.0) -> TravelTimeEstimate:
+        """
+        Build a travel time estimate from a path over a grid.
+
+        Args:
+            grid: Grid the path's coordinates refer to
+            path: Path points in grid coordinates
+            travel_speed: Travel speed multiplier
+            scale: Full-resolution cells per grid cell (for pyramid levels)
+        """
         # Calculate total distance and adjusted distance (accounting for terrain)
         total_distance = 0.0
         adjusted_distance = 0.0
@@ -675,13 +1484,13 @@ class MapRegionManager:
             current_point = path[i]
             dx = current_point[0] - last_point[0]
             dy = current_point[1] - last_point[1]
-            segment_distance = math.sqrt(dx * dx + dy * dy)
+            segment_distance = math.sqrt(dx * dx + dy * dy) * scale
             total_distance += segment_distance
 
             # Get terrain type and movement cost for this segment
             grid_x = round(current_point[0])
             grid_y = round(current_point[1])
-            cell = self.map_grid.get_cell(grid_x, grid_y)
+            cell = grid.get_cell(grid_x, grid_y)
 
             # Track terrain types crossed
             if cell and cell.terrain_type not in terrain_types_crossed:
@@ -712,7 +1521,7 @@ class MapRegionManager:
         estimate.is_valid = True
         estimate.total_distance_km = total_distance * 10  # Scale to km (approximation)
         estimate.travel_time_hours = travel_time_hours
-        estimate.travel_time_days = travel_time_hours / 8  # Assuming 8 hours of travel per day
+        estimate.travel_time_days = travel_time_hours / self.TRAVEL_HOURS_PER_DAY
         estimate.terrain_types_crossed = terrain_types_crossed
         estimate.obstacles_crossed = obstacles_crossed
         estimate.has_river_crossing = "river" in obstacles_crossed
@@ -721,51 +1530,407 @@ class MapRegionManager:
 
         return estimate
 
+    def get_travel_cost_field(self, sources: List[Tuple[float, float]], max_days: Optional[float] = None,
+                              travel_speed: float = 1.0) -> Optional[TravelCostField]:
+        """
+        Get the travel cost from the nearest of one or more source points to every grid cell.
+
+        The field is computed with one multi-source Dijkstra search and cached per source set
+        until the terrain it covers changes. Costs don't depend on travel speed, so a cached
+        field serves every speed; a search is only rerun when a longer reach is needed.
+
+        Args:
+            sources: Source points in map coordinates
+            max_days: Only search as far as this many days of travel (None for the whole map)
+            travel_speed: Travel speed the max_days reach is measured at
+
+        Returns:
+            Travel cost field, or None if the grid isn't initialized or no source is on it
+        """
+        if not self.map_grid:
+            print("Map grid not initialized")
+            return None
+
+        # Sources snap to grid cells, moving off impassable cells as find_path does
+        source_keys = set()
+        for x, y in sources:
+            position = GridPosition(round(x), round(y))
+            if not self.map_grid.is_in_bounds(position.x, position.y):
+                continue
+            if not self.map_grid.passable[position.y, position.x]:
+                position = self.map_grid.find_nearest_passable_cell(position)
+                if position.x == -1:
+                    continue
+            source_keys.add(self.map_grid.to_key(position.x, position.y))
+
+        if not source_keys:
+            return None
+
+        max_cost = INF if max_days is None else max_days * self.TRAVEL_HOURS_PER_DAY * travel_speed
+        cache_key = ("field", tuple(sorted(source_keys)))
+        field = self.map_grid.field_cache.get(cache_key)
+        if field is not None and field.covers(max_cost):
+            return field
+
+        costs = dijkstra_field(self.map_grid.get_step_costs(), self.map_grid.width, self.map_grid.height,
+                               cache_key[1], max_cost)
+        field = TravelCostField(cache_key[1], costs, max_cost)
+        self.map_grid.field_cache.put_field(cache_key, field)
+        return field
+
+    def get_travel_days_to_positions(self, sources: List[Tuple[float, float]], xs: np.ndarray, ys: np.ndarray,
+                                     max_days: Optional[float] = None, travel_speed: float = 1.0) -> np.ndarray:
+        """
+        Get the days of travel from the nearest source point to each of many positions.
+
+        Returns:
+            Float64 array of days, inf where a position is unreachable or beyond max_days
+        """
+        xs = np.asarray(xs, dtype=np.float64)
+        field = self.get_travel_cost_field(sources, max_days, travel_speed)
+        if field is None:
+            return np.full(xs.shape, INF)
+
+        costs = field.get_costs_at(np.rint(xs), np.rint(np.asarray(ys, dtype=np.float64)))
+        days = costs / (travel_speed * self.TRAVEL_HOURS_PER_DAY)
+        if max_days is not None:
+            days[days > max_days] = INF
+        return days
+
+    def get_isochrone(self, sources: List[Tuple[float, float]], max_days: float,
+                      travel_speed: float = 1.0) -> Optional[np.ndarray]:
+        """Get a (height, width) bool mask of the grid cells reachable from the sources within max_days"""
+        field = self.get_travel_cost_field(sources, max_days, travel_speed)
+        if field is None:
+            return None
+
+        return field.isochrone(max_days * self.TRAVEL_HOURS_PER_DAY * travel_speed)
+
+    def get_travel_time_matrix(self, locations: Dict[str, Tuple[float, float]], max_days: Optional[float] = None,
+                               workers: Optional[int] = None,
+                               map_file_path: Optional[str] = None) -> Optional[TravelTimeMatrix]:
+        """
+        Get the travel times between every pair of a set of locations.
+
+        The matrix runs one Dijkstra search per location across a process pool. It is saved
+        next to the map file, keyed by a hash of the terrain, and reloaded from there while
+        the terrain is unchanged.
+
+        Args:
+            locations: Location positions in map coordinates by ID
+            max_days: Only search this many days out from each location (None for unbounded);
+                pairs further apart are left unreachable
+            workers: Number of worker processes (defaults to the CPU count)
+            map_file_path: Map file to save the matrix next to (defaults to the world state's map
+                file; pass "" to skip saving and loading)
+
+        Returns:
+            Travel time matrix, or None if the map grid isn't initialized
+        """
+        if not self.map_grid:
+            print("Map grid not initialized")
+            return None
+
+        max_cost = INF if max_days is None else max_days * self.TRAVEL_HOURS_PER_DAY
+        map_hash = self.map_grid.get_terrain_hash()
+
+        if map_file_path is None and self.world_state:
+            map_file_path = self.world_state.map_file_path
+        cache_path = None
+        if map_file_path:
+            cache_path = f"{os.path.splitext(map_file_path)[0]}.travel_{map_hash[:16]}.npz"
+
+        # Reuse a saved matrix for this terrain if it covers the request
+        if cache_path and os.path.exists(cache_path):
+            try:
+                matrix = TravelTimeMatrix.load(cache_path)
+                if matrix.map_hash == map_hash and matrix.covers(locations, max_cost):
+                    return matrix
+            except Exception as ex:
+                print(f"Error loading travel time matrix: {str(ex)}")
+
+        # Snap each location to a passable grid cell, as find_path does
+        location_ids = list(locations.keys())
+        positions = np.array([locations[location_id] for location_id in location_ids],
+                             dtype=np.float64).reshape(-1, 2)
+        cell_keys = []
+        for x, y in positions.tolist():
+            position = GridPosition(min(max(round(x), 0), self.map_grid.width - 1),
+                                    min(max(round(y), 0), self.map_grid.height - 1))
+            if not self.map_grid.passable[position.y, position.x]:
+                nearest = self.map_grid.find_nearest_passable_cell(position)
+                position = nearest if nearest.x != -1 else position
+            cell_keys.append(self.map_grid.to_key(position.x, position.y))
+
+        costs = travel_cost_matrix(self.map_grid.get_step_costs(), self.map_grid.width, self.map_grid.height,
+                                   cell_keys, cell_keys, max_cost, workers)
+        matrix = TravelTimeMatrix(location_ids, positions, costs.astype(np.float32), map_hash, max_cost,
+                                  self.TRAVEL_HOURS_PER_DAY)
+
+        if cache_path:
+            try:
+                matrix.save(cache_path)
+            except Exception as ex:
+                print(f"Error saving travel time matrix: {str(ex)}")
+
+        return matrix
+
+    def get_path_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics for the path and travel time cache"""
+        if not self.map_grid:
+            return {}
+
+        return self.map_grid.path_cache.get_stats()
+
+    def apply_terrain_cost_modifier(self, center_x: float, center_y: float, radius: float,
+                                    cost_multiplier: float) -> int:
+        """
+        Scale the movement cost of every cell within a radius, e.g. for floods or wildfires.
+
+        Cached routes through the area are invalidated. Returns the number of cells changed.
+        """
+        if not self.map_grid:
+            print("Map grid not initialized")
+            return 0
+
+        min_x, max_x = max(0, math.floor(center_x - radius)), min(self.map_grid.width - 1, math.ceil(center_x + radius))
+        min_y, max_y = max(0, math.floor(center_y - radius)), min(self.map_grid.height - 1, math.ceil(center_y + radius))
+        if min_x > max_x or min_y > max_y:
+            return 0
+
+        ys, xs = np.mgrid[min_y:max_y + 1, min_x:max_x + 1]
+        inside = (xs - center_x) ** 2 + (ys - center_y) ** 2 <= radius * radius
+        xs, ys = xs[inside], ys[inside]
+
+        self.map_grid.set_movement_costs(xs, ys, self.map_grid.movement_costs[ys, xs] * cost_multiplier)
+        return int(xs.size)
+
+    def get_cell_id_at_position(self, x: float, y: float) -> int:
+        """Convert a map position to a cell ID"""
+        # Note: This is a simplified conversion that doesn't match Azgaar's exact cell system
+        width = self.map_grid.width if self.map_grid else self.cell_index_width
+        return round(y) * width + round(x)
+
+    def get_cell_ids_at_positions(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Convert arrays of map positions to cell IDs (-1 where outside the indexed cells)"""
+        self._ensure_cell_indexes()
+        width = self.map_grid.width if self.map_grid else self.cell_index_width
+        cell_ids = np.rint(np.asarray(ys, dtype=np.float64)).astype(np.int64) * width + \
+            np.rint(np.asarray(xs, dtype=np.float64)).astype(np.int64)
+        cell_ids[(cell_ids < 0) | (cell_ids >= self.cell_heights.size)] = -1
+        return cell_ids
+
+    def get_cell_position(self, cell_id: int) -> Tuple[float, float]:
+        """Convert a cell ID to the map position get_cell_id_at_position maps to it"""
+        width = self.map_grid.width if self.map_grid else self.cell_index_width
+        return (float(cell_id % width), float(cell_id // width))
+
+    def get_terrain_type_for_cell(self, cell_id: int) -> Optional[str]:
+        """Get the terrain type of a cell, or None if it has no height data"""
+        self._ensure_cell_indexes()
+        if cell_id < 0 or cell_id >= self.cell_terrain_index.size:
+            return None
+
+        terrain_index = int(self.cell_terrain_index[cell_id])
+        if terrain_index == self.NO_TERRAIN_INDEX:
+            return None
+        return self.get_height_terrain_types()[terrain_index]
+
+    def get_terrain_cell_mask(self, terrain_types: List[str], cell_ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Get a per-cell flag array, True for cells whose terrain is one of terrain_types.
+        Cells with a river count as "river" terrain.
+
+        Args:
+            terrain_types: Terrain types to flag
+            cell_ids: Cells to get flags for (False outside the map); defaults to every cell
+        """
+        self._ensure_cell_indexes()
+        lookup = np.zeros(256, dtype=bool)
+        for index, terrain_type in enumerate(self.get_height_terrain_types()):
+            lookup[index] = terrain_type in terrain_types
+
+        if cell_ids is None:
+            mask = lookup[self.cell_terrain_index]
+            if "river" in terrain_types:
+                mask |= self.cell_river_index >= 0
+            return mask
+
+        cell_ids = np.asarray(cell_ids, dtype=np.int64)
+        in_range = (cell_ids >= 0) & (cell_ids < self.cell_terrain_index.size)
+        cells = np.where(in_range, cell_ids, 0)
+        mask = lookup[self.cell_terrain_index[cells]]
+        if "river" in terrain_types:
+            mask |= self.cell_river_index[cells] >= 0
+        return mask & in_range
+
+    def get_cell_neighbors(self, cell_ids: np.ndarray,
+                           offsets: Optional[List[Tuple[int, int]]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get every (cell, neighbor) pair for some cells, over the eight neighbors of each cell
+        that lie on the map
+
+        Args:
+            cell_ids: Cells to get the neighbors of
+            offsets: (dx, dy) of the neighbors to include (default: CELL_NEIGHBOR_OFFSETS)
+
+        Returns:
+            (cells, neighbors): equal-length int64 arrays, grouped by neighbor direction
+        """
+        self._ensure_cell_indexes()
+        width = self.map_grid.width if self.map_grid else self.cell_index_width
+        cell_count = self.cell_heights.size
+        cell_ids = np.asarray(cell_ids, dtype=np.int64)
+        cell_ids = cell_ids[(cell_ids >= 0) & (cell_ids < cell_count)]
+        xs, ys = cell_ids % width, cell_ids // width
+
+        cells, neighbors = [], []
+        for dx, dy in self.CELL_NEIGHBOR_OFFSETS if offsets is None else offsets:
+            neighbor_xs, neighbor_ys = xs + dx, ys + dy
+            neighbor_ids = neighbor_ys * width + neighbor_xs
+            valid = (neighbor_xs >= 0) & (neighbor_xs < width) & (neighbor_ys >= 0) & (neighbor_ids < cell_count)
+            cells.append(cell_ids[valid])
+            neighbors.append(neighbor_ids[valid])
+        return np.concatenate(cells), np.concatenate(neighbors)
+
+    def get_neighboring_cells(self, cell_id: int) -> List[int]:
+        """Get the IDs of the cells adjacent to a cell"""
+        return self.get_cell_neighbors(np.array([cell_id]))[1].tolist()
+
+    def get_cell_neighbor_pairs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the cell adjacency list of the whole map: every pair of adjacent cells, once
+
+        Returns:
+            (cells_a, cells_b): equal-length int32 arrays with cells_a[i] adjacent to cells_b[i]
+            (cached until the cell indexes are rebuilt)
+        """
+        self._ensure_cell_indexes()
+        if self._cell_neighbor_pairs is None:
+            width = self.map_grid.width if self.map_grid else self.cell_index_width
+            cell_count = self.cell_heights.size
+            row_count = -(-cell_count // width)
+            cell_grid = np.full(row_count * width, -1, dtype=np.int32)
+            cell_grid[:cell_count] = np.arange(cell_count, dtype=np.int32)
+            cell_grid = cell_grid.reshape(row_count, width)
+
+            # Forward offsets only, as shifted views of the cell grid
+            cells_a, cells_b = [], []
+            for dx, dy in self.CELL_NEIGHBOR_OFFSETS[:4]:
+                start_x, end_x = max(0, -dx), width - max(0, dx)
+                first = cell_grid[:row_count - dy, start_x:end_x]
+                second = cell_grid[dy:, start_x + dx:end_x + dx]
+                valid = (first >= 0) & (second >= 0)
+                cells_a.append(first[valid])
+                cells_b.append(second[valid])
+            self._cell_neighbor_pairs = (np.concatenate(cells_a), np.concatenate(cells_b))
+        return self._cell_neighbor_pairs
+
     def get_biome_at_position(self, x: float, y: float) -> Optional[BiomeData]:
         """Get the biome at a specific point on the map"""
-        # Convert position to cell ID
-        # Note: This is a simplified conversion that doesn't match Azgaar's exact cell system
-        width = self.map_grid.width if self.map_grid else 1000
-        cell_id = round(y) * width + round(x)
+        self._ensure_cell_indexes()
+        cell_id = self.get_cell_id_at_position(x, y)
+        if cell_id < 0 or cell_id >= self.cell_biome_index.size:
+            return None
 
-        # Find the biome that contains this cell
-        for biome in self.biomes.values():
-            if cell_id in biome.cell_ids:
-                return biome
+        biome_index = self.cell_biome_index[cell_id]
+        if biome_index < 0:
+            # No biome found
+            return None
 
-        # No biome found
-        return None
+        return self.biomes[self.biome_index_ids[biome_index]]
+
+    def get_biome_indices_at_positions(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Get the biome index (into biome_index_ids) at each position, or -1 where there is none"""
+        cell_ids = self.get_cell_ids_at_positions(xs, ys)
+        return np.where(cell_ids >= 0, self.cell_biome_index[cell_ids], -1)
 
     def get_height_at_position(self, x: float, y: float) -> Optional[HeightmapData]:
         """Get the height data at a specific point on the map"""
-        # Convert position to cell ID
-        width = self.map_grid.width if self.map_grid else 1000
-        cell_id = round(y) * width + round(x)
+        self._ensure_cell_indexes()
+        cell_id = self.get_cell_id_at_position(x, y)
+        if cell_id < 0 or cell_id >= len(self._heightmap_by_cell):
+            return None
 
-        # Find the height data for this cell
-        if str(cell_id) in self.heightmap:
-            return self.heightmap[str(cell_id)]
+        return self._heightmap_by_cell[cell_id]
 
-        # No height data found
-        return None
+    def get_heights_at_positions(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Get the height value at each position, or NaN where there is no height data"""
+        cell_ids = self.get_cell_ids_at_positions(xs, ys)
+        return np.where(cell_ids >= 0, self.cell_heights[cell_ids], np.nan)
+
+    def get_terrain_indices_at_positions(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Get the terrain index (into get_height_terrain_types()) at each position, or NO_TERRAIN_INDEX"""
+        cell_ids = self.get_cell_ids_at_positions(xs, ys)
+        return np.where(cell_ids >= 0, self.cell_terrain_index[cell_ids], self.NO_TERRAIN_INDEX).astype(np.uint8)
+
+    def get_river_indices_at_positions(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Get the river index (into river_index_ids) at each position, or -1 where there is none"""
+        cell_ids = self.get_cell_ids_at_positions(xs, ys)
+        return np.where(cell_ids >= 0, self.cell_river_index[cell_ids], -1)
 
     def is_water(self, x: float, y: float) -> bool:
         """Check if a point is on water (ocean, sea, lake, or river)"""
-        # Check heightmap first
-        height = self.get_height_at_position(x, y)
-        if height:
-            if height.terrain_type in ["ocean", "sea", "water"]:
-                return True
+        self._ensure_cell_indexes()
+        cell_id = self.get_cell_id_at_position(x, y)
+        if cell_id < 0 or cell_id >= self.cell_is_water.size:
+            return False
+
+        return bool(self.cell_is_water[cell_id])
+
+    def is_water_at_positions(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Check which of many points are on water"""
+        cell_ids = self.get_cell_ids_at_positions(xs, ys)
+        return (cell_ids >= 0) & self.cell_is_water[cell_ids]
+
+    def set_water_at_positions(self, xs: np.ndarray, ys: np.ndarray, is_water: np.ndarray):
+        """
+        Mark map positions as water or land (flooding, drained lakes, land reclamation).
+
+        The nearest-water and nearest-land maps are updated incrementally.
+        """
+        cell_ids = self.get_cell_ids_at_positions(xs, ys)
+        is_water = np.broadcast_to(np.asarray(is_water, dtype=bool), cell_ids.shape)
+        valid = cell_ids >= 0
+        cell_ids, is_water = cell_ids[valid], is_water[valid]
+        self.cell_is_water[cell_ids] = is_water
+
+        if self.map_grid:
+            on_grid = cell_ids < self.map_grid.width * self.map_grid.height
+            grid_xs = cell_ids[on_grid] % self.map_grid.width
+            grid_ys = cell_ids[on_grid] // self.map_grid.width
+            if self._water_map is not None:
+                self._water_map.update_cells(grid_xs, grid_ys, is_water[on_grid])
+            if self._land_map is not None:
+                self._land_map.update_cells(grid_xs, grid_ys, ~is_water[on_grid])
+
+    def get_grid_water_raster(self) -> Optional[np.ndarray]:
+        """Get a (height, width) bool raster of water cells over the map grid"""
+        if not self.map_grid:
+            return None
+
+        self._ensure_cell_indexes()
+        width, height = self.map_grid.width, self.map_grid.height
+        water = np.zeros(width * height, dtype=bool)
+        indexed = min(width * height, self.cell_is_water.size)
+        water[:indexed] = self.cell_is_water[:indexed]
+        return water.reshape(height, width)
 
-        # Check for rivers
-        width = self.map_grid.width if self.map_grid else 1000
-        cell_id = round(y) * width + round(x)
+    def get_water_map(self) -> Optional[NearestFeatureMap]:
+        """Get the nearest-water map over the grid, building it if necessary"""
+        self._ensure_cell_indexes()
+        if self._water_map is None and self.map_grid:
+            self._water_map = NearestFeatureMap(self.get_grid_water_raster())
 
-        for river in self.rivers.values():
-            if cell_id in river.cells:
-                return True
+        return self._water_map
 
-        return False
+    def get_land_map(self) -> Optional[NearestFeatureMap]:
+        """Get the nearest-land map over the grid, building it if necessary"""
+        self._ensure_cell_indexes()
+        if self._land_map is None and self.map_grid:
+            self._land_map = NearestFeatureMap(~self.get_grid_water_raster())
+
+        return self._land_map
 
     def find_nearest_land(self, x: float, y: float) -> Tuple[float, float]:
         """Find the nearest land point to a given position (useful if position is in water)"""
@@ -773,28 +1938,12 @@ class MapRegionManager:
         if not self.is_water(x, y):
             return (x, y)
 
-        # Grid search for nearest land
-        max_search_radius = 20  # Limit search radius
-        width = self.map_grid.width if self.map_grid else 1000
-        height = self.map_grid.height if self.map_grid else 1000
-
-        center_x = round(x)
-        center_y = round(y)
-
-        for radius in range(1, max_search_radius + 1):
-            # Search in a square pattern outward
-            for y_offset in range(-radius, radius + 1):
-                for x_offset in range(-radius, radius + 1):
-                    # Only check the perimeter of the square
-                    if (x_offset == -radius or x_offset == radius or
-                            y_offset == -radius or y_offset == radius):
-                        # Check bounds
-                        check_x = center_x + x_offset
-                        check_y = center_y + y_offset
-
-                        if 0 <= check_x < width and 0 <= check_y < height:
-                            if not self.is_water(float(check_x), float(check_y)):
-                                return (float(check_x), float(check_y))
+        land_map = self.get_land_map()
+        center_x, center_y = round(x), round(y)
+        if land_map and 0 <= center_x < land_map.width and 0 <= center_y < land_map.height:
+            nearest = land_map.nearest(center_x, center_y)
+            if nearest is not None:
+                return (float(nearest[0]), float(nearest[1]))
 
         # If no land found, return original position
         print("Could not find nearby land")
@@ -808,6 +1957,13 @@ class MapRegionManager:
         """Get a list of all biomes"""
         return list(self.biomes.values())
 
+    def get_region_cells(self, region_id: str) -> np.ndarray:
+        """Get the cell IDs of a region as a sorted int64 array (empty for unknown regions)"""
+        biome = self.biomes.get(str(region_id))
+        if biome is None:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.fromiter(biome.cell_ids, dtype=np.int64, count=len(biome.cell_ids)))
+
     def get_region_danger_level(self, region_id: str) -> float:
         """Get the danger level for a specific region on the map"""
         # Get or compute region analysis
@@ -844,42 +2000,187 @@ class MapRegionManager:
 
     def analyze_region(self, biome: BiomeData) -> RegionAnalysis:
         """Analyze a region to determine its characteristics"""
+        self._ensure_cell_indexes()
+        cell_ids, offsets = self.pack_region_cells([biome])
+        summary = scan_region_cells(cell_ids, offsets, *self.get_region_scan_arrays())
+        return self.build_region_analysis(biome, summary, 0, len(biome.cell_ids))
+
+    def analyze_all_regions(self, workers: Optional[int] = None,
+                            map_file_path: Optional[str] = None) -> Dict[str, RegionAnalysis]:
+        """
+        Analyze every biome region in one batch.
+
+        The per-cell scan fans out across a process pool in chunks of regions, with the
+        per-cell arrays sent to each worker once. Resources are then picked in this process
+        in region order, so the random draws match a serial run. Results are saved next to
+        the map file, keyed by a hash of the region inputs, and reloaded from there while the
+        map is unchanged. Per-stage timings are kept in region_analysis_timings.
+
+        Args:
+            workers: Number of worker processes (defaults to the CPU count; 1 runs in this process)
+            map_file_path: Map file to save the analyses next to (defaults to the world state's map
+                file; pass "" to skip saving and loading)
+
+        Returns:
+            Region analyses by region ID
+        """
+        timings: Dict[str, float] = {}
+        stage_start = time.perf_counter()
+
+        self._ensure_cell_indexes()
+        biomes = list(self.biomes.values())
+        cell_ids, offsets = self.pack_region_cells(biomes)
+        scan_arrays = self.get_region_scan_arrays()
+        region_hash = self.get_region_hash(biomes, cell_ids, offsets)
+        timings["pack"] = time.perf_counter() - stage_start
+
+        if map_file_path is None and self.world_state:
+            map_file_path = self.world_state.map_file_path
+        cache_path = None
+        if map_file_path:
+            cache_path = f"{os.path.splitext(map_file_path)[0]}.regions_{region_hash[:16]}.json"
+
+        # Reuse saved analyses for this map
+        if cache_path and os.path.exists(cache_path):
+            stage_start = time.perf_counter()
+            try:
+                with open(cache_path, 'r') as f:
+                    data = json.load(f)
+                if data.get("region_hash") == region_hash:
+                    analyses = {analysis["region_id"]: RegionAnalysis.from_dict(analysis)
+                                for analysis in data.get("analyses", [])}
+                    self.region_analyses.update(analyses)
+                    timings["load"] = time.perf_counter() - stage_start
+                    self.region_analysis_timings = timings
+                    print(f"Loaded {len(analyses)} region analyses ({self.format_region_timings()})")
+                    return analyses
+            except Exception as ex:
+                print(f"Error loading region analyses: {str(ex)}")
+
+        # Scan cells, in chunks of regions across a process pool
+        stage_start = time.perf_counter()
+        chunks = [(start, min(start + self.REGION_CHUNK_SIZE, len(biomes)))
+                  for start in range(0, len(biomes), self.REGION_CHUNK_SIZE)]
+        chunk_args = [(cell_ids[offsets[start]:offsets[end]], offsets[start:end + 1] - offsets[start])
+                      for start, end in chunks]
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(chunks))
+
+        if workers <= 1:
+            results = [scan_region_cells(chunk_cells, chunk_offsets, *scan_arrays)
+                       for chunk_cells, chunk_offsets in chunk_args]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_region_worker,
+                                     initargs=scan_arrays) as executor:
+                results = list(executor.map(_scan_region_chunk, *zip(*chunk_args)))
+
+        summary = {key: np.concatenate([result[key] for result in results]) if results else np.zeros(0)
+                   for key in ("mountain_count", "contains_water", "first_terrain", "first_river",
+                               "has_trigger", "trigger_terrain", "trigger_river")}
+        timings["scan"] = time.perf_counter() - stage_start
+
+        # Resources and danger, in region order
+        stage_start = time.perf_counter()
+        analyses = {}
+        for index, biome in enumerate(biomes):
+            analyses[biome.id] = self.build_region_analysis(biome, summary, index,
+                                                            int(offsets[index + 1] - offsets[index]))
+        self.region_analyses.update(analyses)
+        timings["resources"] = time.perf_counter() - stage_start
+
+        if cache_path:
+            stage_start = time.perf_counter()
+            try:
+                temp_path = cache_path + ".tmp"
+                with open(temp_path, 'w') as f:
+                    json.dump({"region_hash": region_hash,
+                               "analyses": [analysis.to_dict() for analysis in analyses.values()]}, f)
+                os.replace(temp_path, cache_path)
+            except Exception as ex:
+                print(f"Error saving region analyses: {str(ex)}")
+            timings["save"] = time.perf_counter() - stage_start
+
+        self.region_analysis_timings = timings
+        print(f"Analyzed {len(analyses)} regions with {workers} worker(s) ({self.format_region_timings()})")
+        return analyses
+
+    def format_region_timings(self) -> str:
+        """Format the stage timings of the last analyze_all_regions for logging"""
+        return ", ".join(f"{stage} {seconds * 1000:.1f}ms" for stage, seconds in self.region_analysis_timings.items())
+
+    def pack_region_cells(self, biomes: List[BiomeData]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pack the cells of a list of biomes into one array for scan_region_cells.
+
+        Returns:
+            (cell_ids, offsets): concatenated int64 cell IDs, in each biome's iteration order,
+            and the start of each biome's cells with the total count appended
+        """
+        counts = np.fromiter((len(biome.cell_ids) for biome in biomes), dtype=np.int64, count=len(biomes))
+        offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        cell_ids = np.empty(int(offsets[-1]), dtype=np.int64)
+        for index, biome in enumerate(biomes):
+            cell_ids[offsets[index]:offsets[index + 1]] = np.fromiter(biome.cell_ids, dtype=np.int64,
+                                                                      count=int(counts[index]))
+        return cell_ids, offsets
+
+    def get_region_scan_arrays(self) -> Tuple[np.ndarray, ...]:
+        """Get the per-cell arrays and terrain lookups that scan_region_cells takes after the region cells"""
+        terrain_names = self.get_height_terrain_types()
+        lookups = []
+        for group in (self.MOUNTAIN_TERRAINS, self.WATER_TERRAINS, self.RESOURCE_TERRAINS):
+            lookup = np.zeros(256, dtype=bool)
+            for index, terrain_type in enumerate(terrain_names):
+                lookup[index] = terrain_type in group
+            lookups.append(lookup)
+
+        return (self.cell_terrain_index, self.cell_river_index >= 0, *lookups)
+
+    def get_region_hash(self, biomes: List[BiomeData], cell_ids: np.ndarray, offsets: np.ndarray) -> str:
+        """Hash everything region analysis depends on, to key saved analyses"""
+        digest = hashlib.sha1()
+        digest.update(self.cell_terrain_index.tobytes())
+        digest.update((self.cell_river_index >= 0).tobytes())
+        digest.update(cell_ids.tobytes())
+        digest.update(offsets.tobytes())
+        digest.update(json.dumps([[biome.id, biome.type] for biome in biomes]).encode())
+        digest.update(repr(self.resource_density_multiplier).encode())
+        return digest.hexdigest()
+
+    def build_region_analysis(self, biome: BiomeData, summary: Dict[str, np.ndarray], index: int,
+                              cell_count: int) -> RegionAnalysis:
+        """Build a region's analysis from its entry in a scan_region_cells summary"""
         analysis = RegionAnalysis()
         analysis.region_id = biome.id
         analysis.resources = []
-        analysis.contains_water = False
-        analysis.contains_mountains = False
-        analysis.danger_level = 0.5  # Default medium danger
-
-        # Examine cells in this region
-        for cell_id in biome.cell_ids:
-            # Check height/terrain type
-            if str(cell_id) in self.heightmap:
-                height = self.heightmap[str(cell_id)]
-
-                # Check for mountains
-                if height.terrain_type in ["mountain", "highland"]:
-                    analysis.contains_mountains = True
-
-                    # Mountains increase danger level
-                    analysis.danger_level += 0.05
-
-                # Check for water
-                if height.terrain_type in ["water", "sea", "ocean"]:
-                    analysis.contains_water = True
-
-            # Check for rivers
-            cell_has_river = False
-            for river in self.rivers.values():
-                if cell_id in river.cells:
-                    analysis.contains_water = True
-                    cell_has_river = True
+        terrain_names = self.get_height_terrain_types()
+
+        def terrain_name(terrain_index: int) -> Optional[str]:
+            return terrain_names[terrain_index] if terrain_index < len(terrain_names) else None
+
+        # Resources are picked at the first cell that yields any. That's the first cell if the
+        # biome type alone yields resources, otherwise the first cell whose terrain or river does.
+        # No earlier cell is water or mountains, so the flags seen there are that cell's own.
+        if cell_count:
+            probes = [(summary["first_terrain"][index], summary["first_river"][index])]
+            if summary["has_trigger"][index]:
+                probes.append((summary["trigger_terrain"][index], summary["trigger_river"][index]))
+
+            for terrain_index, has_river in probes:
+                terrain_type = terrain_name(int(terrain_index))
+                analysis.contains_water = bool(has_river) or terrain_type in self.WATER_TERRAINS
+                analysis.contains_mountains = terrain_type in self.MOUNTAIN_TERRAINS
+                self.determine_region_resources(analysis, biome.type, terrain_type, bool(has_river))
+                if analysis.resources:
                     break
 
-            # Determine resources based on biome type and terrain
-            self.determine_region_resources(analysis, biome.type,
-                                            height.terrain_type if str(cell_id) in self.heightmap else None,
-                                            cell_has_river)
+        mountain_count = int(summary["mountain_count"][index])
+        analysis.contains_water = bool(summary["contains_water"][index])
+        analysis.contains_mountains = mountain_count > 0
+
+        # Mountains increase danger level
+        analysis.danger_level = 0.5 + 0.05 * mountain_count
 
         # Adjust danger level based on biome type
         self.adjust_danger_level_for_biome(analysis, biome.type)
@@ -1034,8 +2335,99 @@ class MapRegionManager:
         if analysis.contains_water:
             analysis.danger_level -= 0.05  # Water generally makes areas less dangerous (access to resources)
 
-    def find_settlement_locations(self, count: int = 5) -> List[Tuple[float, float]]:
-        """Find suitable locations for a settlement based on terrain and resources"""
+    def get_water_distance_raster(self) -> Optional[np.ndarray]:
+        """
+        Get the (height, width) raster of Euclidean distances from each grid cell to the nearest
+        water cell (inf if the map has no water)
+        """
+        water_map = self.get_water_map()
+        return water_map.distances if water_map else None
+
+    def get_biome_settlement_scores(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get per-biome settlement score terms from the region analyses, indexed like biome_index_ids.
+
+        Returns:
+            (resource_scores, danger_levels): sum of value * abundance per biome, and its danger level
+        """
+        self._ensure_cell_indexes()
+        resource_scores = np.zeros(len(self.biome_index_ids), dtype=np.float64)
+        danger_levels = np.zeros(len(self.biome_index_ids), dtype=np.float64)
+
+        for index, biome_id in enumerate(self.biome_index_ids):
+            analysis = self.get_region_analysis(biome_id)
+            if analysis:
+                resource_scores[index] = sum(resource.value * resource.abundance for resource in analysis.resources)
+                danger_levels[index] = analysis.danger_level
+
+        return resource_scores, danger_levels
+
+    def score_settlement_sites(self, water_search_radius: float = 5.0) -> Optional[np.ndarray]:
+        """
+        Score every grid cell as a settlement site in one pass over whole-map rasters.
+
+        A site must be on land, not in mountains, and within water_search_radius of water.
+        Its score adds up closeness to water, the resources and danger of its biome, and
+        a bonus for flat terrain.
+
+        Returns:
+            (height, width) float64 scores, -inf where a settlement can't be placed
+        """
+        if not self.map_grid:
+            return None
+
+        self._ensure_cell_indexes()
+        width, height = self.map_grid.width, self.map_grid.height
+        cell_count = width * height
+
+        def grid_raster(cell_values: np.ndarray, fill) -> np.ndarray:
+            raster = np.full(cell_count, fill, dtype=cell_values.dtype)
+            indexed = min(cell_count, cell_values.size)
+            raster[:indexed] = cell_values[:indexed]
+            return raster.reshape(height, width)
+
+        terrain_index = grid_raster(self.cell_terrain_index, self.NO_TERRAIN_INDEX)
+        biome_index = grid_raster(self.cell_biome_index, -1)
+        is_water = self.get_grid_water_raster()
+        water_distance = self.get_water_distance_raster()
+
+        # Per-terrain lookup tables: flat terrain bonus, and terrain where settlements can't go
+        terrain_bonus = np.zeros(256, dtype=np.float64)
+        excluded_terrain = np.zeros(256, dtype=bool)
+        for index, terrain_type in enumerate(self.get_height_terrain_types()):
+            if terrain_type in ["plain", "grassland"]:
+                terrain_bonus[index] = 5
+            elif terrain_type == "hill":
+                terrain_bonus[index] = 2
+            excluded_terrain[index] = terrain_type == "mountain"
+
+        # Prefer locations near water (rivers or lakes); closer water is better
+        scores = 10 * (1.0 - water_distance / water_search_radius)
+
+        # Biome resources and danger
+        resource_scores, danger_levels = self.get_biome_settlement_scores()
+        has_biome = biome_index >= 0
+        if resource_scores.size:
+            safe_biome = np.where(has_biome, biome_index, 0)
+            scores += np.where(has_biome, resource_scores[safe_biome] * 5 - danger_levels[safe_biome] * 10, 0.0)
+
+        # Prefer flatter terrain (plains, grasslands)
+        scores += terrain_bonus[terrain_index]
+
+        # Skip water, mountains, and locations not near water
+        suitable = ~is_water & ~excluded_terrain[terrain_index] & (water_distance <= water_search_radius)
+        scores[~suitable] = -np.inf
+
+        return scores
+
+    def find_settlement_locations(self, count: int = 5, step_size: int = 1) -> List[Tuple[float, float]]:
+        """
+        Find suitable locations for a settlement based on terrain and resources.
+
+        Args:
+            count: Maximum number of locations to return
+            step_size: Only consider every step_size-th cell in each direction (1 for full resolution)
+        """
         locations = []
 
         if not self.map_grid:
@@ -1047,94 +2439,42 @@ class MapRegionManager:
         # 2. Not in mountains or ocean
         # 3. Access to resources
         # 4. Not too close to other settlements
-
-        # Score all potential locations
-        location_scores = {}
-
-        # Sample grid at lower resolution for performance
-        step_size = max(1, self.map_grid.width // 100)
-
-        for y in range(0, self.map_grid.height, step_size):
-            for x in range(0, self.map_grid.width, step_size):
-                # Skip water and mountains
-                if self.is_water(float(x), float(y)):
-                    continue
-
-                height = self.get_height_at_position(float(x), float(y))
-                if height and height.terrain_type == "mountain":
-                    continue
-
-                # Calculate score for this location
-                score = 0.0
-
-                # Prefer locations near water (rivers or lakes)
-                near_water = False
-                water_search_radius = 5
-
-                for dy in range(-water_search_radius, water_search_radius + 1):
-                    for dx in range(-water_search_radius, water_search_radius + 1):
-                        nx = x + dx
-                        ny = y + dy
-
-                        if 0 <= nx < self.map_grid.width and 0 <= ny < self.map_grid.height:
-                            if self.is_water(float(nx), float(ny)):
-                                near_water = True
-                                # Closer water is better
-                                distance = math.sqrt(dx * dx + dy * dy)
-                                score += 10 * (1.0 - distance / water_search_radius)
-                                break
-
-                    if near_water:
-                        break
-
-                if not near_water:
-                    continue  # Skip locations not near water
-
-                # Check biome resources
-                biome = self.get_biome_at_position(float(x), float(y))
-                if biome:
-                    analysis = self.get_region_analysis(biome.id)
-                    if analysis:
-                        # Add points for resources
-                        for resource in analysis.resources:
-                            score += resource.value * resource.abundance * 5
-
-                        # Subtract points for danger
-                        score -= analysis.danger_level * 10
-
-                # Prefer flatter terrain (plains, grasslands)
-                if height:
-                    if height.terrain_type in ["plain", "grassland"]:
-                        score += 5
-                    elif height.terrain_type == "hill":
-                        score += 2
-
-                # Store score for this location
-                location_scores[(float(x), float(y))] = score
-
-        # Get top scoring locations
-        sorted_locations = sorted(location_scores.items(), key=lambda x: x[1], reverse=True)
-        top_locations = sorted_locations[:count * 2]
-
-        # Filter to ensure locations aren't too close to each other
+        scores = self.score_settlement_sites()[::step_size, ::step_size]
+        candidate_ys, candidate_xs = np.nonzero(np.isfinite(scores))
+        # Only the best count * 2 sites are candidates, so spacing may leave fewer than count
+        order = np.argsort(-scores[candidate_ys, candidate_xs], kind="stable")[:count * 2]
+        candidate_xs = candidate_xs[order] * step_size
+        candidate_ys = candidate_ys[order] * step_size
+
+        # Filter to ensure locations aren't too close to each other, checking only the
+        # selected locations in neighbouring spacing-sized buckets
         min_distance_between_locations = max(10, self.map_grid.width / 20)
+        min_distance_sq = min_distance_between_locations * min_distance_between_locations
+        bucket_columns = int(self.map_grid.width // min_distance_between_locations) + 1
+        buckets: Dict[int, List[Tuple[float, float]]] = {}
 
-        for loc, score in top_locations:
-            # Check if this location is far enough from already selected locations
-            too_close = False
-            for selected_loc in locations:
-                dx = loc[0] - selected_loc[0]
-                dy = loc[1] - selected_loc[1]
-                dist = math.sqrt(dx * dx + dy * dy)
+        for x, y in zip(candidate_xs.tolist(), candidate_ys.tolist()):
+            bucket_x = int(x // min_distance_between_locations)
+            bucket_y = int(y // min_distance_between_locations)
 
-                if dist < min_distance_between_locations:
-                    too_close = True
+            too_close = False
+            for neighbor_y in range(bucket_y - 1, bucket_y + 2):
+                for neighbor_x in range(bucket_x - 1, bucket_x + 2):
+                    for selected_x, selected_y in buckets.get(neighbor_y * bucket_columns + neighbor_x, ()):
+                        if (x - selected_x) ** 2 + (y - selected_y) ** 2 < min_distance_sq:
+                            too_close = True
+                            break
+                    if too_close:
+                        break
+                if too_close:
                     break
 
             if not too_close:
-                locations.append(loc)
+                location = (float(x), float(y))
+                locations.append(location)
+                buckets.setdefault(bucket_y * bucket_columns + bucket_x, []).append(location)
 
                 if len(locations) >= count:
                     break
 
-        return locations
\ No newline at end of file
+        return locations
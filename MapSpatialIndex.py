@@ -0,0 +1,692 @@
+"""
+Spatial indexes over point locations in map coordinates.
+
+Entries are (id, x, y) points keyed by a string ID, so the indexes can be used
+for any kind of location without depending on the location classes.
+"""
+
+import heapq
+import math
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+
+class UniformGridIndex:
+    """
+    Uniform grid spatial hash over points.
+
+    Buckets are keyed by a single integer packed from the bucket's grid coordinates,
+    so lookups never build strings or tuples. The bucket size adapts to the density
+    of the indexed points: it is chosen on build so that buckets hold about
+    TARGET_PER_BUCKET points, and the index rebuilds itself when the point count
+    drifts far enough from the count it was sized for.
+    """
+
+    # Average points per occupied bucket the cell size is chosen for
+    TARGET_PER_BUCKET = 2.0
+
+    # Cell size used when there is too little data to size from
+    DEFAULT_CELL_SIZE = 10.0
+    MIN_CELL_SIZE = 0.5
+
+    # Rebuild (and resize buckets) when the point count grows or shrinks this much
+    RESIZE_FACTOR = 4.0
+
+    def __init__(self, cell_size: Optional[float] = None):
+        self.cell_size: float = cell_size or self.DEFAULT_CELL_SIZE
+        self.fixed_cell_size: bool = cell_size is not None
+
+        # Bucket key -> (id, x, y) entries, and each ID's position
+        self.buckets: Dict[int, List[Tuple[str, float, float]]] = {}
+        self.positions: Dict[str, Tuple[float, float]] = {}
+
+        # Occupied bucket coordinate range, for bounding nearest-neighbor searches
+        self.min_bucket_x: int = 0
+        self.max_bucket_x: int = -1
+        self.min_bucket_y: int = 0
+        self.max_bucket_y: int = -1
+
+        # Point count the cell size was chosen for
+        self.sized_for: int = 0
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.positions
+
+    @staticmethod
+    def bucket_key(bucket_x: int, bucket_y: int) -> int:
+        """Pack bucket coordinates (each within +/-2^31) into one integer key"""
+        return (bucket_x << 32) + bucket_y
+
+    @staticmethod
+    def choose_cell_size(points: List[Tuple[float, float]], target_per_bucket: float) -> float:
+        """Pick a cell size that puts about target_per_bucket points in each bucket"""
+        if len(points) < 2:
+            return UniformGridIndex.DEFAULT_CELL_SIZE
+
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        width = max(xs) - min(xs)
+        height = max(ys) - min(ys)
+
+        # Points spread along a line cover a strip one cell wide, not an area
+        if width <= 0 or height <= 0:
+            return max(max(width, height) * target_per_bucket / len(points), UniformGridIndex.MIN_CELL_SIZE)
+
+        return max(math.sqrt(width * height * target_per_bucket / len(points)), UniformGridIndex.MIN_CELL_SIZE)
+
+    def build(self, items: Iterable[Tuple[str, float, float]]):
+        """Replace the index contents with (id, x, y) items, resizing the buckets for them"""
+        items = list(items)
+        if not self.fixed_cell_size:
+            self.cell_size = self.choose_cell_size([(x, y) for _, x, y in items], self.TARGET_PER_BUCKET)
+
+        cell_size = self.cell_size
+        floor = math.floor
+        columns = [floor(x / cell_size) for _, x, _ in items]
+        rows = [floor(y / cell_size) for _, _, y in items]
+
+        buckets: Dict[int, List[Tuple[str, float, float]]] = {}
+        positions: Dict[str, Tuple[float, float]] = {}
+        for (item_id, x, y), column, row in zip(items, columns, rows):
+            x, y = float(x), float(y)
+            key = (column << 32) + row
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [(item_id, x, y)]
+            else:
+                bucket.append((item_id, x, y))
+            positions[item_id] = (x, y)
+
+        self.buckets = buckets
+        self.positions = positions
+        self.sized_for = len(items)
+        if items:
+            self.min_bucket_x, self.max_bucket_x = min(columns), max(columns)
+            self.min_bucket_y, self.max_bucket_y = min(rows), max(rows)
+        else:
+            self.min_bucket_x = self.min_bucket_y = 0
+            self.max_bucket_x = self.max_bucket_y = -1
+
+    def insert(self, item_id: str, x: float, y: float):
+        """Add a point, or move it if the ID is already indexed"""
+        if item_id in self.positions:
+            self._discard(item_id)
+        self._add(item_id, float(x), float(y))
+        self._resize_if_needed()
+
+    def remove(self, item_id: str) -> bool:
+        """Remove a point; returns False if the ID wasn't indexed"""
+        if item_id not in self.positions:
+            return False
+
+        self._discard(item_id)
+        self._resize_if_needed()
+        return True
+
+    def move(self, item_id: str, x: float, y: float):
+        """Update the position of an indexed point (adds it if missing)"""
+        self.insert(item_id, x, y)
+
+    def query_radius(self, x: float, y: float, radius: float) -> List[str]:
+        """
+        Get the IDs of all points within a distance of a position.
+
+        Only buckets that intersect the circle are visited. Each bucket row is
+        clipped to the circle's extent at that row, and buckets lying wholly
+        inside the circle are taken without per-point distance checks.
+        """
+        result = []
+        if radius < 0 or not self.positions:
+            return result
+
+        cell_size = self.cell_size
+        buckets = self.buckets
+        radius_sq = radius * radius
+
+        min_row = max(math.floor((y - radius) / cell_size), self.min_bucket_y)
+        max_row = min(math.floor((y + radius) / cell_size), self.max_bucket_y)
+
+        for row in range(min_row, max_row + 1):
+            row_top = row * cell_size
+            row_bottom = row_top + cell_size
+
+            # Circle's half-width across the nearest and farthest edges of this row
+            near_dy = 0.0 if row_top <= y <= row_bottom else min(abs(y - row_top), abs(y - row_bottom))
+            far_dy = max(abs(y - row_top), abs(y - row_bottom))
+            half_width = math.sqrt(max(radius_sq - near_dy * near_dy, 0.0))
+            inner_half_width = math.sqrt(radius_sq - far_dy * far_dy) if far_dy < radius else -1.0
+
+            min_column = max(math.floor((x - half_width) / cell_size), self.min_bucket_x)
+            max_column = min(math.floor((x + half_width) / cell_size), self.max_bucket_x)
+
+            for column in range(min_column, max_column + 1):
+                bucket = buckets.get((column << 32) + row)
+                if not bucket:
+                    continue
+
+                column_left = column * cell_size
+                if x - inner_half_width <= column_left and column_left + cell_size <= x + inner_half_width:
+                    # Whole bucket is inside the circle
+                    result.extend(item[0] for item in bucket)
+                    continue
+
+                for item_id, item_x, item_y in bucket:
+                    dx = item_x - x
+                    dy = item_y - y
+                    if dx * dx + dy * dy <= radius_sq:
+                        result.append(item_id)
+
+        return result
+
+    def nearest(self, x: float, y: float, max_distance: float = math.inf,
+                accept: Optional[Callable[[str], bool]] = None) -> Optional[Tuple[str, float]]:
+        """
+        Find the nearest point to a position.
+
+        Searches rings of buckets outwards from the position's bucket, stopping once
+        no unvisited bucket can hold anything closer than the best match so far.
+
+        Args:
+            x: X coordinate
+            y: Y coordinate
+            max_distance: Ignore points further away than this
+            accept: Optional filter on point IDs
+
+        Returns:
+            (id, distance) of the nearest accepted point, or None if there is none
+        """
+        if not self.positions:
+            return None
+
+        cell_size = self.cell_size
+        buckets = self.buckets
+        center_column = math.floor(x / cell_size)
+        center_row = math.floor(y / cell_size)
+
+        # Rings between the position and the farthest occupied bucket (skipping empty rings
+        # when the position is outside the occupied range)
+        min_ring = max(self.min_bucket_x - center_column, center_column - self.max_bucket_x,
+                       self.min_bucket_y - center_row, center_row - self.max_bucket_y, 0)
+        max_ring = max(center_column - self.min_bucket_x, self.max_bucket_x - center_column,
+                       center_row - self.min_bucket_y, self.max_bucket_y - center_row, 0)
+
+        best_id = None
+        best_distance_sq = max_distance * max_distance if max_distance != math.inf else math.inf
+
+        for ring in range(min_ring, max_ring + 1):
+            # Closest any point in this ring can be
+            if ring > 0:
+                ring_distance = (ring - 1) * cell_size + min(x - center_column * cell_size,
+                                                             (center_column + 1) * cell_size - x,
+                                                             y - center_row * cell_size,
+                                                             (center_row + 1) * cell_size - y)
+                if ring_distance * ring_distance > best_distance_sq:
+                    break
+
+            for column, row in self._ring_buckets(center_column, center_row, ring):
+                bucket = buckets.get((column << 32) + row)
+                if not bucket:
+                    continue
+
+                for item_id, item_x, item_y in bucket:
+                    dx = item_x - x
+                    dy = item_y - y
+                    distance_sq = dx * dx + dy * dy
+                    if distance_sq < best_distance_sq and (accept is None or accept(item_id)):
+                        best_distance_sq = distance_sq
+                        best_id = item_id
+
+        if best_id is None:
+            return None
+        return best_id, math.sqrt(best_distance_sq)
+
+    def _ring_buckets(self, center_column: int, center_row: int, ring: int) -> Iterable[Tuple[int, int]]:
+        """Bucket coordinates on the square ring at a Chebyshev distance, clipped to the occupied range"""
+        if ring == 0:
+            yield center_column, center_row
+            return
+
+        min_column = max(center_column - ring, self.min_bucket_x)
+        max_column = min(center_column + ring, self.max_bucket_x)
+        for row in (center_row - ring, center_row + ring):
+            if self.min_bucket_y <= row <= self.max_bucket_y:
+                for column in range(min_column, max_column + 1):
+                    yield column, row
+
+        min_row = max(center_row - ring + 1, self.min_bucket_y)
+        max_row = min(center_row + ring - 1, self.max_bucket_y)
+        for column in (center_column - ring, center_column + ring):
+            if self.min_bucket_x <= column <= self.max_bucket_x:
+                for row in range(min_row, max_row + 1):
+                    yield column, row
+
+    def _add(self, item_id: str, x: float, y: float):
+        column = math.floor(x / self.cell_size)
+        row = math.floor(y / self.cell_size)
+        key = (column << 32) + row
+
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            self.buckets[key] = [(item_id, x, y)]
+        else:
+            bucket.append((item_id, x, y))
+        self.positions[item_id] = (x, y)
+
+        if self.max_bucket_x < self.min_bucket_x:
+            self.min_bucket_x = self.max_bucket_x = column
+            self.min_bucket_y = self.max_bucket_y = row
+        else:
+            self.min_bucket_x = min(self.min_bucket_x, column)
+            self.max_bucket_x = max(self.max_bucket_x, column)
+            self.min_bucket_y = min(self.min_bucket_y, row)
+            self.max_bucket_y = max(self.max_bucket_y, row)
+
+    def _discard(self, item_id: str):
+        # The occupied range is left as is; it only bounds searches and stays valid when it's too wide
+        x, y = self.positions.pop(item_id)
+        key = (math.floor(x / self.cell_size) << 32) + math.floor(y / self.cell_size)
+        bucket = self.buckets[key]
+        for index, item in enumerate(bucket):
+            if item[0] == item_id:
+                bucket.pop(index)
+                break
+        if not bucket:
+            del self.buckets[key]
+
+    def _resize_if_needed(self):
+        if self.fixed_cell_size:
+            return
+
+        count = len(self.positions)
+        sized_for = max(self.sized_for, 1)
+        if count > sized_for * self.RESIZE_FACTOR or count * self.RESIZE_FACTOR < sized_for:
+            self.build((item_id, x, y) for item_id, (x, y) in self.positions.items())
+
+
+class KDTree:
+    """
+    Static 2-d tree over points, for exact k-nearest-neighbor queries at any range.
+
+    Points are split at the median of the wider axis until at most LEAF_SIZE remain.
+    Each node keeps its bounding box, and queries visit nodes best-first by distance
+    to the box, so they stop as soon as no unvisited node can hold a closer point.
+    IDs added to `removed` stay in the tree but are skipped by queries.
+    """
+
+    LEAF_SIZE = 16
+
+    def __init__(self, ids: List[str], xs: Iterable[float], ys: Iterable[float]):
+        points = np.column_stack((np.asarray(list(xs), dtype=np.float64).reshape(-1),
+                                  np.asarray(list(ys), dtype=np.float64).reshape(-1)))
+        order = np.arange(len(ids))
+
+        # Node arrays; leaves have children -1 and own points [start, end) of the point order
+        self.node_start: List[int] = []
+        self.node_end: List[int] = []
+        self.node_left: List[int] = []
+        self.node_right: List[int] = []
+        self.node_boxes: List[Tuple[float, float, float, float]] = []
+
+        if len(ids):
+            self._add_node(points, order, 0, len(ids))
+            stack = [0]
+            while stack:
+                node = stack.pop()
+                start, end = self.node_start[node], self.node_end[node]
+                if end - start <= self.LEAF_SIZE:
+                    continue
+
+                min_x, min_y, max_x, max_y = self.node_boxes[node]
+                dim = 0 if max_x - min_x >= max_y - min_y else 1
+                middle = (end - start) // 2
+                segment = order[start:end]
+                order[start:end] = segment[np.argpartition(points[segment, dim], middle)]
+
+                self.node_left[node] = self._add_node(points, order, start, start + middle)
+                self.node_right[node] = self._add_node(points, order, start + middle, end)
+                stack.append(self.node_left[node])
+                stack.append(self.node_right[node])
+
+        # Points in tree order, as plain lists for the query loop
+        self.point_ids: List[str] = [ids[i] for i in order.tolist()]
+        self.point_xs: List[float] = points[order, 0].tolist()
+        self.point_ys: List[float] = points[order, 1].tolist()
+
+        # IDs of points that are no longer live
+        self.removed: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self.point_ids)
+
+    def _add_node(self, points: np.ndarray, order: np.ndarray, start: int, end: int) -> int:
+        segment = points[order[start:end]]
+        low = segment.min(axis=0)
+        high = segment.max(axis=0)
+        self.node_start.append(start)
+        self.node_end.append(end)
+        self.node_left.append(-1)
+        self.node_right.append(-1)
+        self.node_boxes.append((float(low[0]), float(low[1]), float(high[0]), float(high[1])))
+        return len(self.node_start) - 1
+
+    def k_nearest(self, x: float, y: float, k: int, max_distance: float = math.inf) -> List[Tuple[str, float]]:
+        """
+        Find the k nearest points to a position.
+
+        Args:
+            x: X coordinate
+            y: Y coordinate
+            k: Number of points to return
+            max_distance: Ignore points further away than this
+
+        Returns:
+            Up to k (id, distance) pairs, nearest first
+        """
+        if k <= 0 or not self.point_ids:
+            return []
+
+        limit_sq = max_distance * max_distance if max_distance != math.inf else math.inf
+        point_ids = self.point_ids
+        point_xs = self.point_xs
+        point_ys = self.point_ys
+        boxes = self.node_boxes
+        removed = self.removed
+
+        # Max-heap of the best points so far as (-distance squared, point index)
+        best: List[Tuple[float, int]] = []
+        nodes = [(self._box_distance_sq(boxes[0], x, y), 0)]
+
+        while nodes:
+            box_distance_sq, node = heapq.heappop(nodes)
+            bound_sq = -best[0][0] if len(best) == k else limit_sq
+            if box_distance_sq > bound_sq:
+                break
+
+            left = self.node_left[node]
+            if left >= 0:
+                right = self.node_right[node]
+                heapq.heappush(nodes, (self._box_distance_sq(boxes[left], x, y), left))
+                heapq.heappush(nodes, (self._box_distance_sq(boxes[right], x, y), right))
+                continue
+
+            for index in range(self.node_start[node], self.node_end[node]):
+                if removed and point_ids[index] in removed:
+                    continue
+                dx = point_xs[index] - x
+                dy = point_ys[index] - y
+                distance_sq = dx * dx + dy * dy
+                if len(best) < k:
+                    if distance_sq <= limit_sq:
+                        heapq.heappush(best, (-distance_sq, index))
+                elif distance_sq < -best[0][0]:
+                    heapq.heapreplace(best, (-distance_sq, index))
+
+        best.sort(reverse=True)
+        return [(point_ids[index], math.sqrt(-negative_sq)) for negative_sq, index in best]
+
+    @staticmethod
+    def _box_distance_sq(box: Tuple[float, float, float, float], x: float, y: float) -> float:
+        min_x, min_y, max_x, max_y = box
+        dx = min_x - x if x < min_x else (x - max_x if x > max_x else 0.0)
+        dy = min_y - y if y < min_y else (y - max_y if y > max_y else 0.0)
+        return dx * dx + dy * dy
+
+
+class DynamicKDTree:
+    """
+    k-nearest-neighbor index that stays exact under inserts, moves and removals
+    without rebuilding everything on each change.
+
+    Uses the logarithmic method: new points collect in a small buffer that queries
+    scan directly, a full buffer is turned into a KDTree, and trees of equal level are
+    merged into one of the next level, so each point is rebuilt O(log n) times in
+    total. Removing or moving a point marks its old tree entry as removed; once
+    removed entries outnumber live points everything is rebuilt into a single tree.
+    """
+
+    BUFFER_SIZE = 32
+
+    def __init__(self):
+        # ID -> (x, y) of every live point
+        self.positions: Dict[str, Tuple[float, float]] = {}
+
+        # Live points not yet in a tree
+        self.buffer: Dict[str, Tuple[float, float]] = {}
+
+        # levels[i] is None or a tree built from up to BUFFER_SIZE * 2**i points
+        self.levels: List[Optional[KDTree]] = []
+
+        # ID -> tree holding the live entry for points that aren't in the buffer
+        self.owners: Dict[str, KDTree] = {}
+        self.removed_count = 0
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.positions
+
+    def build(self, items: Iterable[Tuple[str, float, float]]):
+        """Replace the index contents with (id, x, y) items"""
+        self.positions = {item_id: (float(x), float(y)) for item_id, x, y in items}
+        self.rebuild()
+
+    def rebuild(self):
+        """Fold every live point into a single tree"""
+        self.buffer = {}
+        self.levels = []
+        self.owners = {}
+        self.removed_count = 0
+        if not self.positions:
+            return
+
+        level = 0
+        while self.BUFFER_SIZE << level < len(self.positions):
+            level += 1
+        self.levels = [None] * (level + 1)
+        self._set_level(level, list(self.positions))
+
+    def insert(self, item_id: str, x: float, y: float):
+        """Add a point, or move it if the ID is already indexed"""
+        if item_id in self.positions:
+            self.remove(item_id)
+
+        position = (float(x), float(y))
+        self.positions[item_id] = position
+        self.buffer[item_id] = position
+        if len(self.buffer) >= self.BUFFER_SIZE:
+            self._flush_buffer()
+
+    def remove(self, item_id: str) -> bool:
+        """Remove a point; returns False if the ID wasn't indexed"""
+        if self.positions.pop(item_id, None) is None:
+            return False
+
+        if self.buffer.pop(item_id, None) is None:
+            self.owners.pop(item_id).removed.add(item_id)
+            self.removed_count += 1
+            if self.removed_count > len(self.positions):
+                self.rebuild()
+        return True
+
+    def move(self, item_id: str, x: float, y: float):
+        """Update the position of an indexed point"""
+        self.insert(item_id, x, y)
+
+    def _flush_buffer(self):
+        # Carry the buffer up the levels like a binary counter, merging each occupied level into it
+        item_ids = list(self.buffer)
+        self.buffer = {}
+        level = 0
+        while level < len(self.levels) and self.levels[level] is not None:
+            tree = self.levels[level]
+            item_ids.extend(item_id for item_id in tree.point_ids if item_id not in tree.removed)
+            self.removed_count -= len(tree.removed)
+            self.levels[level] = None
+            level += 1
+
+        if level == len(self.levels):
+            self.levels.append(None)
+        self._set_level(level, item_ids)
+
+    def _set_level(self, level: int, item_ids: List[str]):
+        positions = self.positions
+        tree = KDTree(item_ids, (positions[item_id][0] for item_id in item_ids),
+                      (positions[item_id][1] for item_id in item_ids))
+        self.levels[level] = tree
+        for item_id in item_ids:
+            self.owners[item_id] = tree
+
+    def k_nearest(self, x: float, y: float, k: int, max_distance: float = math.inf) -> List[Tuple[str, float]]:
+        """
+        Find the k nearest points to a position, exactly and at any range.
+
+        Args:
+            x: X coordinate
+            y: Y coordinate
+            k: Number of points to return
+            max_distance: Ignore points further away than this
+
+        Returns:
+            Up to k (id, distance) pairs, nearest first
+        """
+        if k <= 0:
+            return []
+
+        # Largest trees first; each tree's results tighten the search bound for the rest
+        results: List[Tuple[str, float]] = []
+        bound = max_distance
+        for tree in reversed(self.levels):
+            if tree is None:
+                continue
+            found = tree.k_nearest(x, y, k, bound)
+            if found:
+                results = sorted(results + found, key=lambda result: result[1])[:k]
+                if len(results) == k:
+                    bound = results[-1][1]
+
+        if self.buffer:
+            for item_id, (item_x, item_y) in self.buffer.items():
+                distance = math.hypot(item_x - x, item_y - y)
+                if distance <= bound:
+                    results.append((item_id, distance))
+            results.sort(key=lambda result: result[1])
+            del results[k:]
+        return results
+
+
+class CategoryKDTreeIndex:
+    """
+    k-nearest-neighbor index over categorized points: one DynamicKDTree per category
+    plus a combined tree over everything.
+
+    Queries without a category filter use the combined tree; filtered queries search
+    each requested category's tree and merge the results. Inserts, moves and removals
+    update the trees incrementally.
+    """
+
+    def __init__(self):
+        # ID -> (category, x, y)
+        self.items: Dict[str, Tuple[Hashable, float, float]] = {}
+
+        self.trees: Dict[Hashable, DynamicKDTree] = {}
+        self.combined_tree = DynamicKDTree()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.items
+
+    def build(self, items: Iterable[Tuple[str, Hashable, float, float]]):
+        """Replace the index contents with (id, category, x, y) items"""
+        self.items = {item_id: (category, float(x), float(y)) for item_id, category, x, y in items}
+
+        category_items: Dict[Hashable, List[Tuple[str, float, float]]] = {}
+        for item_id, (category, x, y) in self.items.items():
+            category_items.setdefault(category, []).append((item_id, x, y))
+
+        self.trees = {}
+        for category, entries in category_items.items():
+            self.trees[category] = DynamicKDTree()
+            self.trees[category].build(entries)
+        self.combined_tree = DynamicKDTree()
+        self.combined_tree.build((item_id, x, y) for item_id, (_, x, y) in self.items.items())
+
+    def insert(self, item_id: str, category: Hashable, x: float, y: float):
+        """Add a point, or update it if the ID is already indexed"""
+        old = self.items.get(item_id)
+        if old is not None and old[0] != category:
+            self.trees[old[0]].remove(item_id)
+
+        self.items[item_id] = (category, float(x), float(y))
+        if category not in self.trees:
+            self.trees[category] = DynamicKDTree()
+        self.trees[category].insert(item_id, x, y)
+        self.combined_tree.insert(item_id, x, y)
+
+    def remove(self, item_id: str) -> bool:
+        """Remove a point; returns False if the ID wasn't indexed"""
+        old = self.items.pop(item_id, None)
+        if old is None:
+            return False
+
+        self.trees[old[0]].remove(item_id)
+        self.combined_tree.remove(item_id)
+        return True
+
+    def move(self, item_id: str, x: float, y: float):
+        """Update the position of an indexed point"""
+        category = self.items[item_id][0]
+        self.insert(item_id, category, x, y)
+
+    def k_nearest(self, x: float, y: float, k: int, categories: Optional[Iterable[Hashable]] = None,
+                  max_distance: float = math.inf) -> List[Tuple[str, float]]:
+        """
+        Find the k nearest points to a position, exactly and at any range.
+
+        Args:
+            x: X coordinate
+            y: Y coordinate
+            k: Number of points to return
+            categories: Only return points in these categories (None for any)
+            max_distance: Ignore points further away than this
+
+        Returns:
+            Up to k (id, distance) pairs, nearest first
+        """
+        if categories is None:
+            return self.combined_tree.k_nearest(x, y, k, max_distance)
+
+        results = []
+        for category in set(categories):
+            if category in self.trees:
+                results.extend(self.trees[category].k_nearest(x, y, k, max_distance))
+        results.sort(key=lambda result: result[1])
+        return results[:k]
+
+    def k_nearest_batch(self, points: Iterable[Tuple[float, float]], k: int,
+                        categories: Optional[Iterable[Hashable]] = None,
+                        max_distance: float = math.inf) -> List[List[Tuple[str, float]]]:
+        """Run k_nearest for many query points"""
+        category_list = None if categories is None else list(set(categories))
+        trees = [self.combined_tree] if category_list is None else [self.trees[category]
+                                                                     for category in category_list
+                                                                     if category in self.trees]
+
+        results = []
+        for x, y in points:
+            if len(trees) == 1:
+                results.append(trees[0].k_nearest(x, y, k, max_distance))
+                continue
+
+            merged = []
+            for tree in trees:
+                merged.extend(tree.k_nearest(x, y, k, max_distance))
+            merged.sort(key=lambda result: result[1])
+            results.append(merged[:k])
+        return results